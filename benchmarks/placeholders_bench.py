@@ -0,0 +1,71 @@
+"""Micro-benchmark: render placeholder kiểu cũ (5 lượt str.replace) vs template đã compile.
+
+Chạy từ thư mục gốc repo::
+
+    python -m benchmarks.placeholders_bench
+"""
+
+import timeit
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from utils.placeholders import compile_template, render_placeholders
+
+TEMPLATES = {
+    "ngắn": "Chào mừng {user_mention} đến với **{server}**! 👋",
+    "dài": (
+        "Xin chào {user_mention} ({user_name})! Bạn là thành viên thứ "
+        "{member_count} của **{server}**. " + "Đọc luật ở kênh #rules nhé. " * 20
+    ),
+    "không placeholder": "Chào mừng bạn mới! " * 10,
+}
+
+
+def legacy_render(text: str, member) -> str:
+    """Cài đặt trước đây, giữ lại để so sánh."""
+    if not text:
+        return text
+    guild = member.guild
+    replacements = {
+        "{user}": str(member),
+        "{user_mention}": member.mention,
+        "{user_name}": member.display_name,
+        "{server}": guild.name,
+        "{member_count}": str(guild.member_count or len(guild.members)),
+    }
+    for key, value in replacements.items():
+        text = text.replace(key, value)
+    return text
+
+
+class _FakeMember:
+    def __init__(self):
+        self.guild = SimpleNamespace(
+            name="BlastBot Community", member_count=200_000, members=[]
+        )
+        self.mention = "<@123456789012345678>"
+        self.display_name = "Người mới"
+        self.created_at = datetime(2024, 1, 1, tzinfo=UTC)
+        self.joined_at = None
+
+    def __str__(self) -> str:
+        return "nguoimoi"
+
+
+def main(number: int = 100_000) -> None:
+    member = _FakeMember()
+    print(f"{'template':<20}{'cũ (µs)':>12}{'mới (µs)':>12}{'nhanh hơn':>12}")
+    for label, text in TEMPLATES.items():
+        compile_template(text)  # warm cache như khi bot đã chạy một lúc
+        old = timeit.timeit(lambda t=text: legacy_render(t, member), number=number)
+        new = timeit.timeit(
+            lambda t=text: render_placeholders(t, member), number=number
+        )
+        print(
+            f"{label:<20}{old / number * 1e6:>12.2f}{new / number * 1e6:>12.2f}"
+            f"{old / new:>11.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ from utils.error_handler import (
     validate_number_range,
     validate_string_length,
 )
+from utils.placeholders import compile_template
 
 logger = logging.getLogger("BlastBot.Automation.AutoMessage")
 
@@ -36,7 +37,7 @@ class AutoMessage(commands.Cog):
     @automsg.command(name="add", description="Thêm auto-message")
     @app_commands.describe(
         channel="Channel gửi tin",
-        content="Nội dung tin nhắn",
+        content="Nội dung tin nhắn (hỗ trợ {server}, {member_count}, {channel})",
         interval="Chu kỳ (phút)",
         use_embed="Gửi dạng embed?",
     )
@@ -176,6 +177,7 @@ class AutoMessage(commands.Cog):
                     )
                     await db.toggle_auto_message(m["guild_id"], m["id"], False)
                     continue
+                content = compile_template(m["content"]).render(guild, channel=channel)
                 try:
                     allowed_mentions = discord.AllowedMentions(
                         everyone=False, roles=False, users=True
@@ -183,14 +185,12 @@ class AutoMessage(commands.Cog):
                     if m["use_embed"]:
                         await channel.send(
                             embed=create_embed(
-                                description=m["content"], color=COLORS["primary"]
+                                description=content, color=COLORS["primary"]
                             ),
                             allowed_mentions=allowed_mentions,
                         )
                     else:
-                        await channel.send(
-                            m["content"], allowed_mentions=allowed_mentions
-                        )
+                        await channel.send(content, allowed_mentions=allowed_mentions)
                     await db.mark_auto_message_sent(m["id"])
                 except discord.HTTPException as e:
                     logger.warning(f"Auto-message {m['id']} lỗi gửi: {e}")
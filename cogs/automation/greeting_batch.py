@@ -0,0 +1,157 @@
+"""Gộp lời chào/tạm biệt khi có đợt join/leave dồn dập.
+
+Bình thường mỗi member nhận một tin riêng như cũ. Khi số sự kiện trong cửa sổ
+trượt vượt ngưỡng (raid, mass-invite), coalescer chuyển sang chế độ gộp: member
+được dồn vào hàng chờ và gửi thành tin tổng hợp sau ``batch_delay`` giây, nên một
+đợt 300 người chỉ tốn vài lần đọc config và vài tin nhắn thay vì 300.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+import discord
+
+from utils.constants import AUTOMATION_CONFIG
+
+logger = logging.getLogger("BlastBot.Automation.GreetingBatch")
+
+SendSingle = Callable[[discord.Member, str], Awaitable[None]]
+SendBatch = Callable[[discord.Guild, str, list[discord.Member]], Awaitable[None]]
+
+
+def build_digest_chunks(
+    header: str, names: list[str], limit: int, max_messages: int
+) -> list[str]:
+    """Chia ``names`` thành tối đa ``max_messages`` đoạn, mỗi đoạn ≤ ``limit`` ký tự.
+
+    Đoạn đầu mở bằng ``header``. Tên không vừa thì được gom vào dòng cuối
+    "… và N người khác".
+    """
+    chunks: list[str] = []
+    current = header
+    separator = " "
+    for i, name in enumerate(names):
+        remaining = len(names) - i
+        # Đoạn cuối cùng luôn chừa chỗ cho dòng "và N người khác"
+        reserve = (
+            len(f"\n… và {remaining} người khác")
+            if len(chunks) == max_messages - 1
+            else 0
+        )
+        if len(current) + len(separator) + len(name) + reserve <= limit:
+            current += separator + name
+            separator = ", "
+            continue
+        if len(chunks) == max_messages - 1:
+            chunks.append(f"{current}\n… và {remaining} người khác")
+            return chunks
+        chunks.append(current)
+        current, separator = name, ", "
+    chunks.append(current)
+    return chunks
+
+
+class _GuildBurst:
+    __slots__ = ("recent", "pending", "flush_task")
+
+    def __init__(self, threshold: int):
+        # Chỉ cần biết có vượt ngưỡng không nên giữ tối đa threshold + 1 mốc
+        self.recent: deque[float] = deque(maxlen=threshold + 1)
+        self.pending: list[discord.Member] = []
+        self.flush_task: asyncio.Task | None = None
+
+
+class GreetingCoalescer:
+    """Quyết định gửi lẻ hay gộp theo tốc độ sự kiện của từng (guild, kind)."""
+
+    def __init__(
+        self,
+        send_single: SendSingle,
+        send_batch: SendBatch,
+        *,
+        threshold: int = AUTOMATION_CONFIG["greeting_burst_threshold"],
+        window_seconds: float = AUTOMATION_CONFIG["greeting_burst_window_seconds"],
+        batch_delay: float = AUTOMATION_CONFIG["greeting_batch_delay_seconds"],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._send_single = send_single
+        self._send_batch = send_batch
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.batch_delay = batch_delay
+        self._clock = clock
+        self._bursts: dict[tuple[int, str], _GuildBurst] = {}
+        self._last_prune = clock()
+
+    def _burst(self, guild_id: int, kind: str) -> _GuildBurst:
+        key = (guild_id, kind)
+        burst = self._bursts.get(key)
+        if burst is None:
+            burst = self._bursts[key] = _GuildBurst(self.threshold)
+        return burst
+
+    def _prune(self, now: float) -> None:
+        """Bỏ (guild, kind) không còn lô chờ và không có sự kiện trong cửa sổ.
+
+        Chạy tối đa mỗi ``window_seconds`` một lần nên chi phí chia đều theo push.
+        """
+        if now - self._last_prune < self.window_seconds:
+            return
+        self._last_prune = now
+        for key in [
+            k
+            for k, b in self._bursts.items()
+            if b.flush_task is None
+            and (not b.recent or now - b.recent[-1] > self.window_seconds)
+        ]:
+            del self._bursts[key]
+
+    def batching(self, guild_id: int, kind: str) -> bool:
+        burst = self._bursts.get((guild_id, kind))
+        return burst is not None and burst.flush_task is not None
+
+    async def push(self, member: discord.Member, kind: str):
+        now = self._clock()
+        self._prune(now)
+        burst = self._burst(member.guild.id, kind)
+        burst.recent.append(now)
+        while burst.recent and now - burst.recent[0] > self.window_seconds:
+            burst.recent.popleft()
+
+        if burst.flush_task is None and len(burst.recent) <= self.threshold:
+            await self._send_single(member, kind)
+            return
+
+        burst.pending.append(member)
+        if burst.flush_task is None:
+            burst.flush_task = asyncio.create_task(
+                self._flush_later(member.guild, kind, burst)
+            )
+
+    async def _flush_later(self, guild: discord.Guild, kind: str, burst: _GuildBurst):
+        try:
+            await asyncio.sleep(self.batch_delay)
+        finally:
+            members, burst.pending = burst.pending, []
+            burst.flush_task = None
+        if not members:
+            return
+        try:
+            if len(members) == 1:
+                await self._send_single(members[0], kind)
+            else:
+                await self._send_batch(guild, kind, members)
+        except Exception as e:
+            logger.error(
+                f"Lỗi khi gửi {kind} gộp ở guild {guild.id}: {e}", exc_info=True
+            )
+
+    def close(self):
+        """Hủy các lô đang chờ (dùng khi unload cog)."""
+        for burst in self._bursts.values():
+            if burst.flush_task is not None:
+                burst.flush_task.cancel()
+        self._bursts.clear()
@@ -12,12 +12,18 @@ from utils.embeds import create_embed, error_embed, success_embed
 from utils.error_handler import ValidationError, validate_string_length
 from utils.placeholders import render_placeholders
 
+from .greeting_batch import GreetingCoalescer, build_digest_chunks
+
 logger = logging.getLogger("BlastBot.Automation.Greetings")
 
 
 class Greetings(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.coalescer = GreetingCoalescer(self._send_greeting, self._send_digest)
+
+    def cog_unload(self):
+        self.coalescer.close()
 
     greeting = app_commands.Group(
         name="greeting",
@@ -26,16 +32,25 @@ class Greetings(commands.Cog):
         guild_only=True,
     )
 
-    async def _send_greeting(self, member: discord.Member, kind: str):
+    async def _greeting_channel(
+        self, guild: discord.Guild, kind: str
+    ) -> tuple[dict, discord.TextChannel] | None:
         db = getattr(self.bot, "db", None)
         if db is None:
-            return
-        cfg = await db.get_greeting(member.guild.id, kind)
+            return None
+        cfg = await db.get_greeting(guild.id, kind)
         if not cfg["enabled"] or not cfg["channel_id"]:
-            return
-        channel = member.guild.get_channel(cfg["channel_id"])
+            return None
+        channel = guild.get_channel(cfg["channel_id"])
         if not isinstance(channel, discord.TextChannel):
+            return None
+        return cfg, channel
+
+    async def _send_greeting(self, member: discord.Member, kind: str):
+        resolved = await self._greeting_channel(member.guild, kind)
+        if resolved is None:
             return
+        cfg, channel = resolved
 
         message = render_placeholders(
             cfg["message"]
@@ -45,11 +60,13 @@ class Greetings(commands.Cog):
                 else "Tạm biệt **{user_name}**, hẹn gặp lại! 👋"
             ),
             member,
+            channel,
         )
         try:
             if cfg["use_embed"]:
                 embed = create_embed(
-                    title=render_placeholders(cfg["title"] or "", member) or None,
+                    title=render_placeholders(cfg["title"] or "", member, channel)
+                    or None,
                     description=message,
                     color=cfg["color"] or COLORS["primary"],
                     thumbnail=member.display_avatar.url,
@@ -60,15 +77,61 @@ class Greetings(commands.Cog):
         except discord.HTTPException as e:
             logger.warning(f"Không gửi được {kind} cho {member}: {e}")
 
+    async def _send_digest(
+        self, guild: discord.Guild, kind: str, members: list[discord.Member]
+    ):
+        """Một lô join/leave: đọc config một lần, gửi vài tin tổng hợp."""
+        resolved = await self._greeting_channel(guild, kind)
+        if resolved is None:
+            return
+        cfg, channel = resolved
+
+        if kind == "welcome":
+            header = (
+                f"Chào mừng {len(members)} thành viên mới đến với **{guild.name}**:"
+            )
+            names = [m.mention for m in members]
+        else:
+            header = f"Tạm biệt {len(members)} thành viên:"
+            names = [
+                f"**{discord.utils.escape_markdown(m.display_name)}**" for m in members
+            ]
+        chunks = build_digest_chunks(
+            header,
+            names,
+            limit=4096 if cfg["use_embed"] else 2000,
+            max_messages=AUTOMATION_CONFIG["greeting_digest_max_messages"],
+        )
+        logger.info(
+            f"Gộp {kind} cho {len(members)} member ở {guild} ({len(chunks)} tin)"
+        )
+        try:
+            for chunk in chunks:
+                if cfg["use_embed"]:
+                    await channel.send(
+                        embed=create_embed(
+                            description=chunk, color=cfg["color"] or COLORS["primary"]
+                        )
+                    )
+                else:
+                    await channel.send(chunk)
+        except discord.HTTPException as e:
+            logger.warning(f"Không gửi được {kind} gộp ở {guild}: {e}")
+
+    def _suppressed(self, member: discord.Member) -> bool:
+        """Bot, hoặc server đang raid lockdown (không chào hàng loạt raider)."""
+        db = getattr(self.bot, "db", None)
+        return member.bot or (db is not None and db.in_raid_lockdown(member.guild.id))
+
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        if not member.bot:
-            await self._send_greeting(member, "welcome")
+        if not self._suppressed(member):
+            await self.coalescer.push(member, "welcome")
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
-        if not member.bot:
-            await self._send_greeting(member, "goodbye")
+        if not self._suppressed(member):
+            await self.coalescer.push(member, "goodbye")
 
     async def _setup_cmd(self, interaction, kind, channel, message, title, use_embed):
         if interaction.guild is None:
@@ -99,7 +162,8 @@ class Greetings(commands.Cog):
                 "Đã cấu hình",
                 f"{'Lời chào' if kind == 'welcome' else 'Lời tạm biệt'} sẽ gửi vào "
                 f"{channel.mention}.\nDùng placeholder: `{{user_mention}}`, `{{user_name}}`, "
-                f"`{{server}}`, `{{member_count}}`.",
+                f"`{{server}}`, `{{member_count}}`, `{{created_at}}`, `{{join_position}}`, "
+                f"`{{channel}}`.",
             ),
             ephemeral=True,
         )
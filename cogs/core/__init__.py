@@ -1,8 +1,13 @@
 """Core commands - Essential bot features"""
 
 from .help import HelpCommand
+from .member_counts import MemberCounts
+from .metrics import MetricsCommand
+from .retention import DataRetention
 
 
 async def setup(bot):
     """Load core commands"""
-    await bot.add_cog(HelpCommand(bot))
+    for cog_cls in (HelpCommand, MetricsCommand, DataRetention, MemberCounts):
+        if bot.get_cog(cog_cls.__name__) is None:
+            await bot.add_cog(cog_cls(bot))
@@ -0,0 +1,75 @@
+"""Giữ bộ đếm member/role (utils.member_counts) khớp với event và đối soát định kỳ."""
+
+import asyncio
+import logging
+
+import discord
+from discord.ext import commands, tasks
+
+from utils.constants import MEMBER_COUNT_CONFIG
+from utils.member_counts import member_counts
+from utils.metrics import metrics
+from utils.placeholders import join_order
+
+logger = logging.getLogger("BlastBot.Core.MemberCounts")
+
+
+class MemberCounts(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self._seeding: set[asyncio.Task] = set()
+        self.reconcile_counts.start()
+
+    def cog_unload(self):
+        self.reconcile_counts.cancel()
+        for task in self._seeding:
+            task.cancel()
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        member_counts.member_joined(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        member_counts.member_removed(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles != after.roles:
+            member_counts.roles_changed(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        member_counts.role_deleted(role)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        task = asyncio.create_task(member_counts.reconcile(guild))
+        self._seeding.add(task)
+        task.add_done_callback(self._seeding.discard)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        member_counts.forget(guild.id)
+        join_order.forget(guild.id)
+
+    @tasks.loop(minutes=MEMBER_COUNT_CONFIG["reconcile_minutes"])
+    async def reconcile_counts(self):
+        """Lượt đầu (ngay sau ready) seed mọi guild; các lượt sau sửa lệch nếu có."""
+        for guild in list(self.bot.guilds):
+            try:
+                drift = await member_counts.reconcile(guild)
+            except Exception as e:
+                logger.error(f"Lỗi khi đối soát bộ đếm {guild}: {e}", exc_info=True)
+                continue
+            if drift:
+                metrics.incr("member_counts.drift", drift)
+                logger.warning(f"Bộ đếm member/role của {guild} lệch {drift}, đã sửa")
+
+    @reconcile_counts.before_loop
+    async def before_reconcile(self):
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot):
+    await bot.add_cog(MemberCounts(bot))
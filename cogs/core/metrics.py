@@ -0,0 +1,73 @@
+"""Metrics command - Xem số liệu hiệu năng in-memory của bot"""
+
+import logging
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from cogs.moderation.base import require_guild_permissions
+from utils.constants import COLORS
+from utils.embeds import create_embed
+from utils.metrics import metrics
+
+
+def _fmt_ms(value: float | None) -> str:
+    return "—" if value is None else f"{value:.0f}ms"
+
+
+def format_metrics(snapshot: dict) -> dict[str, str]:
+    """Chuyển snapshot thành các field embed (tên field → nội dung)."""
+    fields: dict[str, str] = {}
+
+    latency_lines = [
+        f"`{name}` p50 **{_fmt_ms(s['p50'])}** · p99 **{_fmt_ms(s['p99'])}** · n={s['count']}"
+        for name, s in sorted(snapshot["latencies"].items())
+    ]
+    if latency_lines:
+        fields["⏱️ Latency"] = "\n".join(latency_lines)
+
+    counter_lines = [
+        f"`{name}`: **{value}**" for name, value in sorted(snapshot["counters"].items())
+    ]
+    if counter_lines:
+        fields["🔢 Counters"] = "\n".join(counter_lines)
+
+    gauge_lines = []
+    for name, value in sorted(snapshot["gauges"].items()):
+        if isinstance(value, dict):
+            value = ", ".join(f"{k}={v}" for k, v in value.items())
+        gauge_lines.append(f"`{name}`: {value}")
+    if gauge_lines:
+        fields["📊 Gauges"] = "\n".join(gauge_lines)
+
+    # Embed field tối đa 1024 ký tự
+    return {k: v if len(v) <= 1024 else v[:1020] + "\n…" for k, v in fields.items()}
+
+
+class MetricsCommand(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.logger = logging.getLogger("BlastBot.Core.Metrics")
+
+    @app_commands.command(
+        name="metrics", description="📈 Xem số liệu hiệu năng nội bộ của bot"
+    )
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    @require_guild_permissions(administrator=True)
+    async def metrics_cmd(self, interaction: discord.Interaction):
+        fields = format_metrics(metrics.snapshot())
+        embed = create_embed(
+            title="📈 Metrics",
+            description=None if fields else "Chưa có số liệu nào từ lần khởi động này.",
+            color=COLORS["info"],
+            footer_text="Số liệu in-memory, reset khi bot khởi động lại",
+        )
+        for name, value in fields.items():
+            embed.add_field(name=name, value=value, inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(MetricsCommand(bot))
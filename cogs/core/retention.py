@@ -0,0 +1,53 @@
+"""Daemon lưu trữ lạnh: chuyển ticket đã đóng và mod log quá hạn sang file archive,
+xóa job /mass, /role đã kết thúc quá hạn."""
+
+import logging
+import time
+
+from discord.ext import commands, tasks
+
+from utils.constants import RETENTION_CONFIG
+from utils.metrics import metrics
+
+logger = logging.getLogger("BlastBot.Core.Retention")
+
+
+class DataRetention(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.retention_job.start()
+
+    def cog_unload(self):
+        self.retention_job.cancel()
+
+    @tasks.loop(minutes=RETENTION_CONFIG["job_interval_minutes"])
+    async def retention_job(self):
+        db = getattr(self.bot, "db", None)
+        if db is None:
+            return
+        started = time.perf_counter()
+        try:
+            moved = await db.run_retention(
+                RETENTION_CONFIG["job_budget_seconds"], RETENTION_CONFIG["batch_size"]
+            )
+        except Exception as e:
+            logger.error(f"Lỗi khi chạy job lưu trữ: {e}", exc_info=True)
+            return
+        metrics.observe("retention.run", (time.perf_counter() - started) * 1000)
+        metrics.incr("retention.tickets", moved["tickets"])
+        metrics.incr("retention.modlogs", moved["modlogs"])
+        metrics.incr("retention.mod_jobs", moved["mod_jobs"])
+        if moved["tickets"] or moved["modlogs"]:
+            logger.info(
+                f"Đã lưu trữ {moved['tickets']} ticket, {moved['modlogs']} mod log"
+            )
+        if moved["mod_jobs"]:
+            logger.info(f"Đã xóa {moved['mod_jobs']} dòng job hàng loạt cũ")
+
+    @retention_job.before_loop
+    async def before_retention(self):
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot):
+    await bot.add_cog(DataRetention(bot))
@@ -8,6 +8,7 @@ from discord.ext import commands
 
 from utils.constants import COLORS
 from utils.embeds import create_embed, success_embed, user_info_embed
+from utils.member_resolver import member_resolver
 from utils.modals import ReportModal
 
 logger = logging.getLogger("BlastBot.ContextMenus")
@@ -46,6 +47,19 @@ class ContextMenus(commands.Cog):
         )
         self.bot.tree.add_command(self.bookmark_message_menu)
 
+    # Member lấy qua REST được giữ trong member_resolver; bỏ entry khi có thay đổi
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        member_resolver.invalidate(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        member_resolver.invalidate(payload.guild_id, payload.user.id)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        member_resolver.invalidate(after.guild.id, after.id)
+
     async def cog_unload(self):
         """Cleanup khi unload cog"""
         self.bot.tree.remove_command(
@@ -72,9 +86,9 @@ class ContextMenus(commands.Cog):
 
         if interaction.guild:
             try:
-                target = await interaction.guild.fetch_member(user.id)
-            except discord.NotFound:
-                pass
+                target = (
+                    await member_resolver.resolve(interaction.guild, user.id) or user
+                )
             except discord.HTTPException as e:
                 self.logger.warning(f"Failed to fetch member {user.id}: {e}")
 
@@ -1,8 +1,11 @@
 """Moderation module - Các lệnh quản lý server"""
 
+from .antiraid import AntiRaid
 from .ban import BanCommand
 from .clear import ClearCommand
 from .kick import KickCommand
+from .mass import MassModeration
+from .reports import ReportsCommand
 from .softban import SoftbanCommand
 from .temprole import TempRoleCommand
 from .timeout import TimeoutCommand
@@ -19,6 +22,9 @@ async def setup(bot):
         WarnCommand,
         SoftbanCommand,
         TempRoleCommand,
+        MassModeration,
+        AntiRaid,
+        ReportsCommand,
     ):
         if bot.get_cog(cog_cls.__name__) is None:
             await bot.add_cog(cog_cls(bot))
@@ -0,0 +1,561 @@
+"""Chống raid - phát hiện đợt join dồn dập và tự động lockdown server"""
+
+import asyncio
+import contextlib
+import time
+from datetime import timedelta
+
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+
+from utils.constants import COLORS, RAID_CONFIG
+from utils.embeds import create_embed, error_embed, success_embed
+from utils.error_handler import ValidationError, validate_number_range
+
+from .base import BaseModerationCog, require_guild_permissions
+from .mass import run_mass_job
+
+
+def name_key(name: str, length: int = RAID_CONFIG["name_key_length"]) -> str:
+    """Khung tên để gom cụm: chỉ giữ chữ cái, bỏ số/ký hiệu. ``raider_123`` → ``raider``."""
+    return "".join(c for c in name.casefold() if c.isalpha())[:length]
+
+
+class JoinWindow:
+    """Ring buffer cố định ``size`` lần join gần nhất của một guild.
+
+    Mọi thống kê (số join đáng ngờ, cụm tên) được cộng/trừ khi ghi đè slot cũ nên
+    mỗi lần ``push`` là O(1), không quét lại buffer.
+    """
+
+    __slots__ = (
+        "size",
+        "times",
+        "user_ids",
+        "flags",
+        "names",
+        "pos",
+        "count",
+        "flagged",
+        "name_counts",
+    )
+
+    def __init__(self, size: int):
+        self.size = size
+        self.times = [0.0] * size
+        self.user_ids = [0] * size
+        self.flags = [False] * size
+        self.names = [""] * size
+        self.pos = 0
+        self.count = 0
+        self.flagged = 0
+        self.name_counts: dict[str, int] = {}
+
+    def push(self, now: float, user_id: int, young: bool, key: str) -> bool:
+        """Ghi một lần join; trả True nếu join này bị đánh dấu đáng ngờ."""
+        slot = self.pos
+        if self.count == self.size:
+            if self.flags[slot]:
+                self.flagged -= 1
+            old = self.names[slot]
+            if old:
+                left = self.name_counts[old] - 1
+                if left:
+                    self.name_counts[old] = left
+                else:
+                    del self.name_counts[old]
+        else:
+            self.count += 1
+
+        cluster = 0
+        if key:
+            cluster = self.name_counts.get(key, 0) + 1
+            self.name_counts[key] = cluster
+        suspicious = young or cluster >= RAID_CONFIG["name_cluster_min"]
+        self.times[slot] = now
+        self.user_ids[slot] = user_id
+        self.flags[slot] = suspicious
+        self.names[slot] = key
+        self.flagged += suspicious
+        self.pos = (slot + 1) % self.size
+        return suspicious
+
+    def span(self) -> float | None:
+        """Khoảng thời gian giữa join cũ nhất và mới nhất khi buffer đã đầy."""
+        if self.count < self.size:
+            return None
+        newest = self.times[(self.pos - 1) % self.size]
+        return newest - self.times[self.pos]
+
+    def is_raid(self, window_seconds: float) -> bool:
+        span = self.span()
+        return (
+            span is not None
+            and span <= window_seconds
+            and self.flagged >= self.size * RAID_CONFIG["suspicious_ratio"]
+        )
+
+    def recent_user_ids(self) -> list[int]:
+        return self.user_ids[: self.count]
+
+
+class AntiRaid(BaseModerationCog):
+    """Anti-raid cog"""
+
+    antiraid = app_commands.Group(
+        name="antiraid",
+        description="Chống raid: phát hiện join dồn dập và lockdown",
+        default_permissions=discord.Permissions(manage_guild=True),
+        guild_only=True,
+    )
+
+    def __init__(self, bot):
+        super().__init__(bot)
+        self._windows: dict[int, JoinWindow] = {}
+        # guild_id → member join trong lúc lockdown, chờ giữ theo lô
+        self._hold_queue: dict[int, list[int]] = {}
+        self._hold_tasks: dict[int, asyncio.Task] = {}
+        self._triggering: set[int] = set()
+        self.restore_lockdowns.start()
+
+    def cog_unload(self):
+        self.restore_lockdowns.cancel()
+        for task in self._hold_tasks.values():
+            task.cancel()
+
+    @tasks.loop(count=1)
+    async def restore_lockdowns(self):
+        """Nạp lại lockdown còn hiệu lực sau restart để tiếp tục chặn greeting/giữ member."""
+        db = getattr(self.bot, "db", None)
+        if db is None:
+            return
+        try:
+            rows = await db.list_raid_lockdowns()
+            if rows:
+                self.logger.info(f"Khôi phục {len(rows)} raid lockdown")
+        except Exception as e:
+            self.logger.error(f"Lỗi khi nạp raid lockdown: {e}", exc_info=True)
+
+    @restore_lockdowns.before_loop
+    async def before_restore_lockdowns(self):
+        await self.bot.wait_until_ready()
+
+    # ---------- detector ----------
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.bot:
+            return
+        db = getattr(self.bot, "db", None)
+        if db is None:
+            return
+        guild = member.guild
+        if db.in_raid_lockdown(guild.id):
+            self._queue_hold(guild, member.id)
+            return
+        settings = await db.get_raid_settings(guild.id)
+        if not settings["enabled"]:
+            return
+
+        window = self._windows.get(guild.id)
+        if window is None or window.size != settings["join_threshold"]:
+            window = self._windows[guild.id] = JoinWindow(settings["join_threshold"])
+        age = discord.utils.utcnow() - member.created_at
+        window.push(
+            time.monotonic(),
+            member.id,
+            age < timedelta(days=settings["min_account_age_days"]),
+            name_key(member.name),
+        )
+        if (
+            window.is_raid(settings["window_seconds"])
+            and guild.id not in self._triggering
+        ):
+            del self._windows[guild.id]
+            self._triggering.add(guild.id)
+            try:
+                await self.start_lockdown(
+                    guild,
+                    self.bot.user,
+                    f"Phát hiện raid: {window.size} join trong {window.span():.0f}s, "
+                    f"{window.flagged} đáng ngờ",
+                    window.recent_user_ids(),
+                )
+            except Exception as e:
+                self.logger.error(f"Lỗi khi lockdown {guild}: {e}", exc_info=True)
+            finally:
+                self._triggering.discard(guild.id)
+
+    # ---------- lockdown ----------
+    async def _lock_channels(
+        self, guild: discord.Guild, settings: dict, reason: str
+    ) -> dict[int, object]:
+        """Áp slowmode hoặc khóa chat; trả trạng thái cũ của từng channel để khôi phục."""
+        state: dict[int, object] = {}
+        for channel_id in settings["channels"]:
+            channel = guild.get_channel(channel_id)
+            if not isinstance(channel, discord.TextChannel):
+                continue
+            try:
+                if settings["lock_mode"] == "lock":
+                    overwrite = channel.overwrites_for(guild.default_role)
+                    state[channel_id] = overwrite.send_messages
+                    overwrite.send_messages = False
+                    await channel.set_permissions(
+                        guild.default_role, overwrite=overwrite, reason=reason
+                    )
+                else:
+                    state[channel_id] = channel.slowmode_delay
+                    await channel.edit(
+                        slowmode_delay=settings["slowmode_seconds"], reason=reason
+                    )
+            except discord.HTTPException as e:
+                state.pop(channel_id, None)
+                self.logger.warning(f"Không lockdown được {channel}: {e}")
+        return state
+
+    async def _restore_channels(
+        self, guild: discord.Guild, lock_mode: str, state: dict[int, object]
+    ) -> int:
+        restored = 0
+        for channel_id, previous in state.items():
+            channel = guild.get_channel(channel_id)
+            if not isinstance(channel, discord.TextChannel):
+                continue
+            try:
+                if lock_mode == "lock":
+                    overwrite = channel.overwrites_for(guild.default_role)
+                    overwrite.send_messages = previous
+                    await channel.set_permissions(
+                        guild.default_role,
+                        overwrite=None if overwrite.is_empty() else overwrite,
+                        reason="Kết thúc raid lockdown",
+                    )
+                else:
+                    await channel.edit(
+                        slowmode_delay=previous or 0, reason="Kết thúc raid lockdown"
+                    )
+                restored += 1
+            except discord.HTTPException as e:
+                self.logger.warning(f"Không khôi phục được {channel}: {e}")
+        return restored
+
+    async def start_lockdown(
+        self,
+        guild: discord.Guild,
+        moderator: discord.abc.User,
+        reason: str,
+        suspects: list[int],
+    ) -> bool:
+        db = self.bot.db
+        if db.in_raid_lockdown(guild.id):
+            return False
+        settings = await db.get_raid_settings(guild.id)
+        # Giữ chỗ trước khi khóa: lượt thua (tự động vs /antiraid lockdown) không được
+        # chụp trạng thái đã bị khóa làm "trạng thái cũ" để khôi phục
+        if not await db.start_raid_lockdown(
+            guild.id, reason, settings["lock_mode"], {}
+        ):
+            return False
+        state = await self._lock_channels(guild, settings, reason)
+        if not await db.set_raid_lockdown_state(guild.id, state):
+            # Lockdown bị gỡ trong lúc đang khóa → trả channel về như cũ ngay
+            await self._restore_channels(guild, settings["lock_mode"], state)
+            return False
+        self.logger.warning(f"Raid lockdown ở {guild}: {reason}")
+        await self.log_moderation_action(
+            guild,
+            moderator,
+            "raid_lockdown",
+            reason=reason,
+            extra_info=(
+                f"Chế độ: {settings['lock_mode']} · "
+                f"{len(state)}/{len(settings['channels'])} channel · "
+                "lời chào tạm tắt"
+            ),
+            lock_mode=settings["lock_mode"],
+            channels=list(state),
+        )
+        for user_id in suspects:
+            self._queue_hold(guild, user_id)
+        return True
+
+    def _queue_hold(self, guild: discord.Guild, user_id: int):
+        """Gom member cần giữ rồi xử lý theo lô bằng mass job (resume được)."""
+        self._hold_queue.setdefault(guild.id, []).append(user_id)
+        if guild.id not in self._hold_tasks:
+            self._hold_tasks[guild.id] = asyncio.create_task(self._flush_holds(guild))
+
+    async def _flush_holds(self, guild: discord.Guild):
+        try:
+            await asyncio.sleep(RAID_CONFIG["hold_batch_delay_seconds"])
+        finally:
+            user_ids = self._hold_queue.pop(guild.id, [])
+            self._hold_tasks.pop(guild.id, None)
+        db = self.bot.db
+        try:
+            settings = await db.get_raid_settings(guild.id)
+            if not user_ids or not db.in_raid_lockdown(guild.id):
+                return
+            await db.add_raid_holds(guild.id, user_ids)
+            if not settings["hold_minutes"]:
+                return
+            reason = "Raid lockdown: giữ chờ xét"
+            job_id = await db.create_mod_job(
+                guild.id,
+                self.bot.user.id,
+                "timeout",
+                reason,
+                {"seconds": settings["hold_minutes"] * 60},
+                user_ids,
+            )
+            counts = await run_mass_job(self.bot, guild, await db.get_mod_job(job_id))
+            await self.log_moderation_action(
+                guild,
+                self.bot.user,
+                "raid_hold",
+                reason=reason,
+                extra_info=(
+                    f"Job #{job_id}: timeout {counts.get('done', 0)}/{len(user_ids)} "
+                    f"member trong {settings['hold_minutes']} phút"
+                ),
+                job_id=job_id,
+                counts=counts,
+            )
+        except Exception as e:
+            self.logger.error(f"Lỗi khi giữ member raid ở {guild}: {e}", exc_info=True)
+
+    async def end_lockdown(
+        self, guild: discord.Guild, moderator: discord.abc.User, release: bool
+    ) -> tuple[int, int] | None:
+        """Khôi phục channel và (tùy chọn) gỡ timeout; trả (số channel, số member gỡ)."""
+        lockdown, holds = await self.bot.db.end_raid_lockdown(guild.id)
+        if lockdown is None:
+            return None
+        # Lô giữ đang chờ sẽ tự bỏ qua vì guild không còn lockdown
+        restored = await self._restore_channels(
+            guild, lockdown["lock_mode"], lockdown["channels"]
+        )
+        released = 0
+        if release:
+            for user_id in holds:
+                member = guild.get_member(user_id)
+                if member is None or not member.is_timed_out():
+                    continue
+                with contextlib.suppress(discord.HTTPException):
+                    await member.timeout(None, reason="Kết thúc raid lockdown")
+                    released += 1
+        await self.log_moderation_action(
+            guild,
+            moderator,
+            "raid_lift",
+            reason="Kết thúc raid lockdown",
+            extra_info=(
+                f"Khôi phục {restored} channel · {len(holds)} member bị giữ, "
+                f"đã gỡ timeout {released}"
+            ),
+            held=len(holds),
+            released=released,
+        )
+        return restored, released
+
+    # ---------- lệnh ----------
+    @antiraid.command(name="setup", description="Bật/tắt và cấu hình chống raid")
+    @app_commands.describe(
+        enabled="Bật detector",
+        threshold=(
+            f"Số join trong cửa sổ để xét là raid "
+            f"({RAID_CONFIG['min_join_threshold']}-{RAID_CONFIG['max_join_threshold']})"
+        ),
+        window=f"Cửa sổ thời gian (1-{RAID_CONFIG['max_window_seconds']} giây)",
+        account_age_days=(
+            "Account trẻ hơn số ngày này bị tính là đáng ngờ "
+            f"(0-{RAID_CONFIG['max_account_age_days']})"
+        ),
+        mode="Cách lockdown channel",
+        slowmode=f"Slowmode khi lockdown (1-{RAID_CONFIG['max_slowmode_seconds']} giây)",
+        hold_minutes=(
+            "Timeout member bị giữ chờ xét "
+            f"(0-{RAID_CONFIG['max_hold_minutes']} phút, 0 = không giữ)"
+        ),
+    )
+    @app_commands.choices(
+        mode=[
+            app_commands.Choice(name="Slowmode", value="slowmode"),
+            app_commands.Choice(name="Khóa chat", value="lock"),
+        ]
+    )
+    @require_guild_permissions(manage_guild=True)
+    async def setup_cmd(
+        self,
+        interaction: discord.Interaction,
+        enabled: bool,
+        threshold: int | None = None,
+        window: int | None = None,
+        account_age_days: int | None = None,
+        mode: app_commands.Choice[str] | None = None,
+        slowmode: int | None = None,
+        hold_minutes: int | None = None,
+    ):
+        if interaction.guild is None:
+            return
+        updates: dict = {"enabled": int(enabled)}
+        try:
+            if threshold is not None:
+                updates["join_threshold"] = validate_number_range(
+                    threshold,
+                    RAID_CONFIG["min_join_threshold"],
+                    RAID_CONFIG["max_join_threshold"],
+                    "Số join",
+                )
+            if window is not None:
+                updates["window_seconds"] = validate_number_range(
+                    window, 1, RAID_CONFIG["max_window_seconds"], "Cửa sổ (giây)"
+                )
+            if account_age_days is not None:
+                updates["min_account_age_days"] = validate_number_range(
+                    account_age_days,
+                    0,
+                    RAID_CONFIG["max_account_age_days"],
+                    "Tuổi account (ngày)",
+                )
+            if slowmode is not None:
+                updates["slowmode_seconds"] = validate_number_range(
+                    slowmode, 1, RAID_CONFIG["max_slowmode_seconds"], "Slowmode (giây)"
+                )
+            if hold_minutes is not None:
+                updates["hold_minutes"] = validate_number_range(
+                    hold_minutes,
+                    0,
+                    RAID_CONFIG["max_hold_minutes"],
+                    "Thời gian giữ (phút)",
+                )
+        except ValidationError as e:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", e.user_message), ephemeral=True
+            )
+        if mode is not None:
+            updates["lock_mode"] = mode.value
+        await self.bot.db.set_raid_settings(interaction.guild.id, **updates)
+        self._windows.pop(interaction.guild.id, None)
+        await self._send_status(interaction, "Đã lưu cấu hình chống raid")
+
+    @antiraid.command(
+        name="channel", description="Thêm/bỏ channel bị lockdown khi có raid"
+    )
+    @app_commands.describe(channel="Channel cần thêm hoặc bỏ")
+    @require_guild_permissions(manage_guild=True)
+    async def channel_cmd(
+        self, interaction: discord.Interaction, channel: discord.TextChannel
+    ):
+        if interaction.guild is None:
+            return
+        settings = await self.bot.db.get_raid_settings(interaction.guild.id)
+        channels = list(settings["channels"])
+        if channel.id in channels:
+            channels.remove(channel.id)
+            action = f"Đã bỏ {channel.mention} khỏi danh sách lockdown."
+        elif len(channels) >= RAID_CONFIG["max_lockdown_channels"]:
+            return await interaction.response.send_message(
+                embed=error_embed(
+                    "Lỗi",
+                    f"Tối đa {RAID_CONFIG['max_lockdown_channels']} channel lockdown.",
+                ),
+                ephemeral=True,
+            )
+        else:
+            channels.append(channel.id)
+            action = f"Đã thêm {channel.mention} vào danh sách lockdown."
+        await self.bot.db.set_raid_settings(interaction.guild.id, channels=channels)
+        await interaction.response.send_message(
+            embed=success_embed("Channel lockdown", action), ephemeral=True
+        )
+
+    @antiraid.command(name="status", description="Xem cấu hình và trạng thái lockdown")
+    @require_guild_permissions(manage_guild=True)
+    async def status(self, interaction: discord.Interaction):
+        if interaction.guild is None:
+            return
+        await self._send_status(interaction, "🛡️ Chống raid")
+
+    async def _send_status(self, interaction: discord.Interaction, title: str):
+        db = self.bot.db
+        guild = interaction.guild
+        s = await db.get_raid_settings(guild.id)
+        lines = [
+            f"**Detector:** {'bật' if s['enabled'] else 'tắt'} · "
+            f"{s['join_threshold']} join / {s['window_seconds']}s · "
+            f"account < {s['min_account_age_days']} ngày là đáng ngờ",
+            "**Lockdown:** "
+            + (
+                "khóa chat"
+                if s["lock_mode"] == "lock"
+                else f"slowmode {s['slowmode_seconds']}s"
+            )
+            + f" · giữ member {s['hold_minutes']} phút",
+            "**Channel:** "
+            + (" ".join(f"<#{c}>" for c in s["channels"]) or "chưa chọn"),
+        ]
+        if db.in_raid_lockdown(guild.id):
+            lines.append(
+                f"🚨 **Đang lockdown** · {await db.count_raid_holds(guild.id)} "
+                "member bị giữ · dùng `/antiraid lift` để kết thúc"
+            )
+        await interaction.response.send_message(
+            embed=create_embed(
+                title=title, description="\n".join(lines), color=COLORS["info"]
+            ),
+            ephemeral=True,
+        )
+
+    @antiraid.command(name="lockdown", description="🚨 Lockdown thủ công ngay lập tức")
+    @app_commands.describe(reason="Lý do")
+    @require_guild_permissions(manage_guild=True)
+    async def lockdown(
+        self, interaction: discord.Interaction, reason: str = "Lockdown thủ công"
+    ):
+        if interaction.guild is None:
+            return
+        await interaction.response.defer(ephemeral=True)
+        started = await self.start_lockdown(
+            interaction.guild, interaction.user, reason, []
+        )
+        if not started:
+            return await interaction.followup.send(
+                embed=error_embed("Lỗi", "Server đang trong lockdown rồi!"),
+                ephemeral=True,
+            )
+        await interaction.followup.send(
+            embed=success_embed(
+                "Đã lockdown",
+                "Lời chào tạm tắt, member mới sẽ bị giữ chờ xét.",
+            ),
+            ephemeral=True,
+        )
+
+    @antiraid.command(name="lift", description="Kết thúc lockdown")
+    @app_commands.describe(release="Gỡ timeout cho member đang bị giữ")
+    @require_guild_permissions(manage_guild=True)
+    async def lift(self, interaction: discord.Interaction, release: bool = True):
+        if interaction.guild is None:
+            return
+        await interaction.response.defer(ephemeral=True)
+        result = await self.end_lockdown(interaction.guild, interaction.user, release)
+        if result is None:
+            return await interaction.followup.send(
+                embed=error_embed("Lỗi", "Server không ở trong lockdown."),
+                ephemeral=True,
+            )
+        restored, released = result
+        await interaction.followup.send(
+            embed=success_embed(
+                "Đã kết thúc lockdown",
+                f"Khôi phục {restored} channel, gỡ timeout {released} member.\n"
+                "Member đáng ngờ có thể xử lý tiếp bằng `/mass ban`.",
+            ),
+            ephemeral=True,
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(AntiRaid(bot))
@@ -6,6 +6,7 @@ from discord import app_commands
 from utils.constants import COMMAND_COOLDOWNS
 from utils.embeds import error_embed, success_embed, warning_embed
 from utils.error_handler import ValidationError, validate_number_range
+from utils.keyed_lock import LockTimeout
 from utils.views import ConfirmView
 
 from .base import BaseModerationCog, require_guild_permissions
@@ -58,79 +59,86 @@ class BanCommand(BaseModerationCog):
     ):
         """Ban member khỏi server"""
         try:
-            # Validate target
-            is_valid, error_msg = await self.validate_target(interaction, member)
-            if not is_valid:
-                await self.send_error(interaction, error_msg or "Invalid target")
-                return
-
-            # Validate hierarchy
-            is_valid, error_msg = await self.validate_hierarchy(
-                interaction, member, "ban member này"
-            )
-            if not is_valid:
-                await self.send_error(
-                    interaction, error_msg or "Hierarchy check failed"
+            async with self.target_lock(member):
+                # Validate target
+                is_valid, error_msg = await self.validate_target(interaction, member)
+                if not is_valid:
+                    await self.send_error(interaction, error_msg or "Invalid target")
+                    return
+
+                # Validate hierarchy
+                is_valid, error_msg = await self.validate_hierarchy(
+                    interaction, member, "ban member này"
+                )
+                if not is_valid:
+                    await self.send_error(
+                        interaction, error_msg or "Hierarchy check failed"
+                    )
+                    return
+
+                delete_messages = validate_number_range(
+                    delete_messages, 0, 7, "Số ngày xóa tin nhắn"
                 )
-                return
 
-            delete_messages = validate_number_range(
-                delete_messages, 0, 7, "Số ngày xóa tin nhắn"
-            )
+                # Xác nhận
+                view = ConfirmView(interaction.user)
+                await interaction.response.send_message(
+                    embed=warning_embed(
+                        "Xác nhận ban",
+                        f"Bạn có chắc muốn ban {member.mention}?\n"
+                        f"**Lý do:** {reason}\n"
+                        f"**Xóa tin nhắn:** {delete_messages} ngày",
+                    ),
+                    view=view,
+                    ephemeral=True,
+                )
 
-            # Xác nhận
-            view = ConfirmView(interaction.user)
-            await interaction.response.send_message(
-                embed=warning_embed(
-                    "Xác nhận ban",
-                    f"Bạn có chắc muốn ban {member.mention}?\n"
-                    f"**Lý do:** {reason}\n"
-                    f"**Xóa tin nhắn:** {delete_messages} ngày",
-                ),
-                view=view,
-                ephemeral=True,
-            )
+                await view.wait()
 
-            await view.wait()
+                if not view.value:
+                    await interaction.edit_original_response(
+                        embed=error_embed("Đã hủy", "Đã hủy thao tác ban."), view=None
+                    )
+                    return
 
-            if not view.value:
-                await interaction.edit_original_response(
-                    embed=error_embed("Đã hủy", "Đã hủy thao tác ban."), view=None
+                # Thực hiện ban
+                await member.ban(
+                    reason=f"{interaction.user}: {reason}",
+                    delete_message_seconds=delete_messages * 86400,
                 )
-                return
 
-            # Thực hiện ban
-            await member.ban(
-                reason=f"{interaction.user}: {reason}",
-                delete_message_seconds=delete_messages * 86400,
-            )
-
-            self.logger.info(f"{interaction.user} banned {member} - Reason: {reason}")
-
-            # Log moderation action
-            if interaction.guild and isinstance(interaction.user, discord.Member):
-                await self.log_moderation_action(
-                    interaction.guild,
-                    interaction.user,
-                    "ban",
-                    member,
-                    reason,
-                    f"Delete messages: {delete_messages} days",
+                self.logger.info(
+                    f"{interaction.user} banned {member} - Reason: {reason}"
                 )
 
-            await interaction.edit_original_response(
-                embed=success_embed(
-                    "Đã ban",
-                    f"{member.mention} đã được ban khỏi server.\n**Lý do:** {reason}",
-                ),
-                view=None,
-            )
+                # Log moderation action
+                if interaction.guild and isinstance(interaction.user, discord.Member):
+                    await self.log_moderation_action(
+                        interaction.guild,
+                        interaction.user,
+                        "ban",
+                        member,
+                        reason,
+                        f"Delete messages: {delete_messages} days",
+                    )
+
+                await interaction.edit_original_response(
+                    embed=success_embed(
+                        "Đã ban",
+                        f"{member.mention} đã được ban khỏi server.\n**Lý do:** {reason}",
+                    ),
+                    view=None,
+                )
         except ValidationError as e:
             await self.send_error(interaction, e.user_message)
+        except LockTimeout:
+            await self.send_busy(interaction)
         except Exception as e:
             self.logger.error(f"Error in ban command: {e}", exc_info=True)
             await self.safe_error_response(
-                interaction, "Lỗi", "Không thể thực hiện ban do lỗi hệ thống hoặc thiếu quyền."
+                interaction,
+                "Lỗi",
+                "Không thể thực hiện ban do lỗi hệ thống hoặc thiếu quyền.",
             )
 
 
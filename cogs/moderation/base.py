@@ -7,7 +7,12 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from utils.constants import MODERATION_CONFIG
 from utils.embeds import error_embed
+from utils.keyed_lock import KeyedLock
+
+# Dùng chung mọi moderation cog: serialize thao tác trên cùng (guild, member)
+target_locks = KeyedLock("moderation.target")
 
 
 def require_guild_permissions(**perms):
@@ -94,6 +99,49 @@ class BaseModerationCog(commands.Cog):
 
         return True, None
 
+    async def partition_targets(
+        self,
+        interaction: discord.Interaction,
+        targets: list[discord.Member],
+        action: str = "thực hiện hành động này",
+    ) -> tuple[list[discord.Member], dict[int, str]]:
+        """Chạy validate_target + validate_hierarchy cho cả danh sách.
+
+        Trả (target hợp lệ, {user_id: lý do bị loại}).
+        """
+        allowed: list[discord.Member] = []
+        rejected: dict[int, str] = {}
+        for target in targets:
+            is_valid, error_msg = await self.validate_target(interaction, target)
+            if is_valid:
+                is_valid, error_msg = await self.validate_hierarchy(
+                    interaction, target, action
+                )
+            if is_valid:
+                allowed.append(target)
+            else:
+                rejected[target.id] = error_msg or "Không hợp lệ"
+        return allowed, rejected
+
+    def target_lock(
+        self,
+        target: discord.Member,
+        max_wait: float = MODERATION_CONFIG["target_lock_command_wait_seconds"],
+    ):
+        """Khoá theo target để hai lệnh moderation không chạy chồng lên cùng member.
+
+        Lệnh giữ lock suốt chuỗi kiểm tra → thực hiện → ghi log. Ném ``LockTimeout``
+        nếu thao tác khác giữ quá ``max_wait`` giây → dùng ``send_busy``.
+        """
+        return target_locks.acquire((target.guild.id, target.id), max_wait=max_wait)
+
+    async def send_busy(self, interaction: discord.Interaction):
+        await self.safe_error_response(
+            interaction,
+            "Đang bận",
+            "Member này đang được xử lý bởi một thao tác khác, vui lòng thử lại sau.",
+        )
+
     async def send_error(
         self, interaction: discord.Interaction, message: str, use_followup: bool = False
     ):
@@ -1,7 +1,8 @@
 """Clear/Purge command"""
 
 import asyncio
-from datetime import UTC, datetime, timedelta
+import contextlib
+import re
 
 import discord
 from discord import app_commands
@@ -11,6 +12,14 @@ from utils.embeds import success_embed
 from utils.error_handler import ValidationError, validate_number_range
 
 from .base import BaseModerationCog, require_guild_permissions
+from .purge import PurgeFilter, PurgeProgress, purge_channel
+
+
+def _progress_text(progress: PurgeProgress, limit: int) -> str:
+    return (
+        f"🧹 Đang xóa... đã quét **{progress.scanned}/{limit}**, "
+        f"khớp **{progress.matched}**, đã xóa **{progress.deleted}**"
+    )
 
 
 class ClearCommand(BaseModerationCog):
@@ -18,19 +27,90 @@ class ClearCommand(BaseModerationCog):
 
     def __init__(self, bot):
         super().__init__(bot)
+        # Mỗi channel chỉ chạy một lượt purge một lúc
+        self._active_channels: set[int] = set()
+
+    def _build_filter(
+        self,
+        user: discord.User | None,
+        bots: bool,
+        regex: str | None,
+        contains: str | None,
+        attachments: bool,
+        links: bool,
+    ) -> PurgeFilter:
+        pattern = None
+        if regex:
+            if len(regex) > CLEAR_CONFIG["regex_max_length"]:
+                raise ValidationError(
+                    f"Regex tối đa {CLEAR_CONFIG['regex_max_length']} ký tự."
+                )
+            try:
+                pattern = re.compile(regex, re.IGNORECASE)
+            except re.error as e:
+                raise ValidationError(f"Regex không hợp lệ: {e}") from e
+        if contains and len(contains) > CLEAR_CONFIG["contains_max_length"]:
+            raise ValidationError(
+                f"Chuỗi lọc tối đa {CLEAR_CONFIG['contains_max_length']} ký tự."
+            )
+        return PurgeFilter(
+            user_id=user.id if user else None,
+            bots=bots,
+            pattern=pattern,
+            contains=contains.casefold() if contains else None,
+            attachments=attachments,
+            links=links,
+        )
+
+    async def _report_progress(
+        self,
+        interaction: discord.Interaction,
+        progress: PurgeProgress,
+        limit: int,
+    ):
+        """Sửa response đã defer định kỳ thay vì mỗi lô để không tốn rate limit."""
+        while not progress.done:
+            await asyncio.sleep(CLEAR_CONFIG["progress_interval_seconds"])
+            if progress.done:
+                return
+            with contextlib.suppress(discord.HTTPException):
+                await interaction.edit_original_response(
+                    content=_progress_text(progress, limit)
+                )
 
     @app_commands.command(
         name="clear",
-        description="🧹 Xóa hàng loạt tin nhắn trong channel (1-100 messages)",
+        description="🧹 Xóa hàng loạt tin nhắn trong channel (tối đa 10.000, có bộ lọc)",
+    )
+    @app_commands.describe(
+        amount="Số tin nhắn gần nhất cần quét (1-10000)",
+        user="Chỉ xóa tin của user này",
+        bots="Chỉ xóa tin của bot",
+        regex=(
+            f"Chỉ xóa tin khớp regex (tối đa {CLEAR_CONFIG['regex_max_length']} "
+            "ký tự, không phân biệt hoa thường)"
+        ),
+        contains="Chỉ xóa tin chứa chuỗi này (không phân biệt hoa thường)",
+        attachments="Chỉ xóa tin có file đính kèm",
+        links="Chỉ xóa tin có link",
     )
-    @app_commands.describe(amount="Số lượng tin nhắn cần xóa (1-100)")
     @app_commands.guild_only()
     @app_commands.default_permissions(manage_messages=True)
     @require_guild_permissions(manage_messages=True)
     @app_commands.checks.cooldown(
         1, COMMAND_COOLDOWNS["clear"], key=lambda i: i.user.id
     )
-    async def clear(self, interaction: discord.Interaction, amount: int):
+    async def clear(
+        self,
+        interaction: discord.Interaction,
+        amount: int,
+        user: discord.User | None = None,
+        bots: bool = False,
+        regex: str | None = None,
+        contains: str | None = None,
+        attachments: bool = False,
+        links: bool = False,
+    ):
         """Xóa tin nhắn"""
         try:
             # Kiểm tra channel type trước
@@ -47,63 +127,39 @@ class ClearCommand(BaseModerationCog):
                 CLEAR_CONFIG["max_messages"],
                 "Số lượng tin nhắn",
             )
+            purge_filter = self._build_filter(
+                user, bots, regex, contains, attachments, links
+            )
 
-            await interaction.response.defer(ephemeral=True)
+            channel = interaction.channel
+            if channel.id in self._active_channels:
+                await self.send_error(
+                    interaction, "Channel này đang được xóa tin nhắn, vui lòng chờ!"
+                )
+                return
+
+            await interaction.response.defer(ephemeral=True, thinking=True)
 
-            # Lấy tin nhắn để xóa, bỏ qua pinned messages
-            messages = []
-            async for message in interaction.channel.history(limit=amount):
-                if message.pinned:
-                    continue
-                messages.append(message)
+            self._active_channels.add(channel.id)
+            progress = PurgeProgress()
+            reporter = asyncio.create_task(
+                self._report_progress(interaction, progress, amount)
+            )
+            try:
+                await purge_channel(channel, amount, purge_filter, progress)
+            finally:
+                self._active_channels.discard(channel.id)
+                reporter.cancel()
 
-            if not messages:
+            if not progress.matched:
                 await self.safe_error_response(
                     interaction, "Lỗi", "Không tìm thấy tin nhắn để xóa!"
                 )
                 return
 
-            # Phân loại tin nhắn theo độ tuổi
-            two_weeks_ago = datetime.now(UTC) - timedelta(
-                days=CLEAR_CONFIG["message_age_limit_days"]
-            )
-            bulk_delete_messages = [
-                msg for msg in messages if msg.created_at > two_weeks_ago
-            ]
-            old_messages = [msg for msg in messages if msg.created_at <= two_weeks_ago]
-
-            deleted_count = 0
-
-            # Xóa tin nhắn mới theo batch để tránh rate limit
-            if bulk_delete_messages:
-                batch_size = CLEAR_CONFIG["batch_size"]
-                for i in range(0, len(bulk_delete_messages), batch_size):
-                    batch = bulk_delete_messages[i : i + batch_size]
-                    try:
-                        if len(batch) == 1:
-                            await batch[0].delete()
-                        else:
-                            await interaction.channel.delete_messages(batch)
-                        deleted_count += len(batch)
-                        if i + batch_size < len(bulk_delete_messages):
-                            await asyncio.sleep(CLEAR_CONFIG["batch_delay_seconds"])
-                    except discord.HTTPException as e:
-                        self.logger.warning(f"Error deleting batch: {e}")
-
-            # Xóa tin nhắn cũ từng cái một
-            if old_messages:
-                for message in old_messages:
-                    try:
-                        await message.delete()
-                        deleted_count += 1
-                        await asyncio.sleep(
-                            CLEAR_CONFIG["old_message_delete_delay_seconds"]
-                        )
-                    except discord.HTTPException as e:
-                        self.logger.warning(f"Error deleting old message: {e}")
-
             self.logger.info(
-                f"{interaction.user} cleared {deleted_count} messages in {interaction.channel}"
+                f"{interaction.user} cleared {progress.deleted}/{progress.matched} "
+                f"messages in {channel} (scanned {progress.scanned})"
             )
 
             # Log moderation action
@@ -113,15 +169,24 @@ class ClearCommand(BaseModerationCog):
                     interaction.user,
                     "clear",
                     target=None,
-                    reason=f"Đã xóa {deleted_count} tin nhắn trong #{interaction.channel.name}",
+                    reason=(
+                        f"Đã xóa {progress.deleted} tin nhắn trong #{channel.name} "
+                        f"(lọc: {purge_filter.describe()})"
+                    ),
                 )
 
-            await interaction.followup.send(
-                embed=success_embed(
-                    "Đã xóa tin nhắn", f"Đã xóa {deleted_count} tin nhắn."
-                ),
-                ephemeral=True,
-            )
+            desc = f"Đã xóa {progress.deleted} tin nhắn."
+            if progress.failed:
+                desc += f"\n⚠️ {progress.failed} tin không xóa được."
+            embed = success_embed("Đã xóa tin nhắn", desc)
+            try:
+                await interaction.edit_original_response(content=None, embed=embed)
+            except discord.HTTPException:
+                # Token interaction hết hạn sau 15 phút với lượt purge dài
+                with contextlib.suppress(discord.HTTPException):
+                    await channel.send(
+                        f"{interaction.user.mention}", embed=embed, delete_after=30
+                    )
         except ValidationError as e:
             await self.safe_error_response(interaction, "Lỗi", e.user_message)
         except Exception as e:
@@ -5,6 +5,7 @@ from discord import app_commands
 
 from utils.constants import COMMAND_COOLDOWNS
 from utils.embeds import error_embed, success_embed, warning_embed
+from utils.keyed_lock import LockTimeout
 from utils.views import ConfirmView
 
 from .base import BaseModerationCog, require_guild_permissions
@@ -52,63 +53,70 @@ class KickCommand(BaseModerationCog):
     ):
         """Kick member khỏi server"""
         try:
-            # Validate target
-            is_valid, error_msg = await self.validate_target(interaction, member)
-            if not is_valid:
-                await self.send_error(interaction, error_msg or "Invalid target")
-                return
-
-            # Validate hierarchy
-            is_valid, error_msg = await self.validate_hierarchy(
-                interaction, member, "kick member này"
-            )
-            if not is_valid:
-                await self.send_error(
-                    interaction, error_msg or "Hierarchy check failed"
+            async with self.target_lock(member):
+                # Validate target
+                is_valid, error_msg = await self.validate_target(interaction, member)
+                if not is_valid:
+                    await self.send_error(interaction, error_msg or "Invalid target")
+                    return
+
+                # Validate hierarchy
+                is_valid, error_msg = await self.validate_hierarchy(
+                    interaction, member, "kick member này"
                 )
-                return
-
-            # Xác nhận
-            view = ConfirmView(interaction.user)
-            await interaction.response.send_message(
-                embed=warning_embed(
-                    "Xác nhận kick",
-                    f"Bạn có chắc muốn kick {member.mention}?\n**Lý do:** {reason}",
-                ),
-                view=view,
-                ephemeral=True,
-            )
-
-            await view.wait()
-
-            if not view.value:
-                await interaction.edit_original_response(
-                    embed=error_embed("Đã hủy", "Đã hủy thao tác kick."), view=None
+                if not is_valid:
+                    await self.send_error(
+                        interaction, error_msg or "Hierarchy check failed"
+                    )
+                    return
+
+                # Xác nhận
+                view = ConfirmView(interaction.user)
+                await interaction.response.send_message(
+                    embed=warning_embed(
+                        "Xác nhận kick",
+                        f"Bạn có chắc muốn kick {member.mention}?\n**Lý do:** {reason}",
+                    ),
+                    view=view,
+                    ephemeral=True,
                 )
-                return
 
-            # Thực hiện kick
-            await member.kick(reason=f"{interaction.user}: {reason}")
+                await view.wait()
 
-            self.logger.info(f"{interaction.user} kicked {member} - Reason: {reason}")
+                if not view.value:
+                    await interaction.edit_original_response(
+                        embed=error_embed("Đã hủy", "Đã hủy thao tác kick."), view=None
+                    )
+                    return
 
-            # Log moderation action
-            if interaction.guild and isinstance(interaction.user, discord.Member):
-                await self.log_moderation_action(
-                    interaction.guild, interaction.user, "kick", member, reason
+                # Thực hiện kick
+                await member.kick(reason=f"{interaction.user}: {reason}")
+
+                self.logger.info(
+                    f"{interaction.user} kicked {member} - Reason: {reason}"
                 )
 
-            await interaction.edit_original_response(
-                embed=success_embed(
-                    "Đã kick",
-                    f"{member.mention} đã được kick khỏi server.\n**Lý do:** {reason}",
-                ),
-                view=None,
-            )
+                # Log moderation action
+                if interaction.guild and isinstance(interaction.user, discord.Member):
+                    await self.log_moderation_action(
+                        interaction.guild, interaction.user, "kick", member, reason
+                    )
+
+                await interaction.edit_original_response(
+                    embed=success_embed(
+                        "Đã kick",
+                        f"{member.mention} đã được kick khỏi server.\n**Lý do:** {reason}",
+                    ),
+                    view=None,
+                )
+        except LockTimeout:
+            await self.send_busy(interaction)
         except Exception as e:
             self.logger.error(f"Error in kick command: {e}", exc_info=True)
             await self.safe_error_response(
-                interaction, "Lỗi", "Không thể thực hiện kick do lỗi hệ thống hoặc thiếu quyền."
+                interaction,
+                "Lỗi",
+                "Không thể thực hiện kick do lỗi hệ thống hoặc thiếu quyền.",
             )
 
 
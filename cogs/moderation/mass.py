@@ -0,0 +1,481 @@
+"""Mass moderation - ban/kick/timeout hàng loạt khi bị raid, chạy như một job có thể resume"""
+
+import asyncio
+import contextlib
+import re
+from dataclasses import dataclass
+from datetime import timedelta
+
+import discord
+from discord import app_commands
+from discord.ext import tasks
+
+from utils.constants import COMMAND_COOLDOWNS, MASS_CONFIG, MODERATION_CONFIG
+from utils.embeds import error_embed, success_embed, warning_embed
+from utils.error_handler import ValidationError, validate_number_range
+from utils.keyed_lock import LockTimeout
+from utils.views import ConfirmView
+
+from .base import BaseModerationCog, require_guild_permissions, target_locks
+
+ID_PATTERN = re.compile(r"\d{15,20}")
+MASS_ACTIONS = ("ban", "kick", "timeout")
+# Số kết quả kick/timeout gom lại trước khi ghi DB (cũng là mức mất tối đa khi crash)
+_MARK_CHUNK = 50
+
+
+def parse_user_ids(text: str | None) -> list[int]:
+    """Lấy user ID từ danh sách ID/mention, bỏ trùng, giữ thứ tự."""
+    if not text:
+        return []
+    return list(dict.fromkeys(int(m) for m in ID_PATTERN.findall(text)))
+
+
+def recent_joiners(guild: discord.Guild, minutes: int) -> list[discord.Member]:
+    since = discord.utils.utcnow() - timedelta(minutes=minutes)
+    return [m for m in guild.members if m.joined_at and m.joined_at >= since]
+
+
+@dataclass
+class MassProgress:
+    total: int
+    done: int = 0
+    failed: int = 0
+    skipped: int = 0
+    finished: bool = False
+
+    def record(self, results: dict[int, tuple[str, str | None]]) -> None:
+        for status, _ in results.values():
+            if status == "done":
+                self.done += 1
+            elif status == "skipped":
+                self.skipped += 1
+            else:
+                self.failed += 1
+
+    def text(self) -> str:
+        processed = self.done + self.failed + self.skipped
+        return (
+            f"⚙️ Đang xử lý **{processed}/{self.total}** · "
+            f"✅ {self.done} · ❌ {self.failed} · ⏭️ {self.skipped}"
+        )
+
+
+async def run_each(
+    guild: discord.Guild,
+    user_ids: list[int],
+    op,
+    concurrency: int = MASS_CONFIG["concurrency"],
+) -> dict:
+    """Chạy ``op(user_id)`` song song có giới hạn; mỗi target giữ target lock."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(user_id: int) -> tuple[str, str | None]:
+        async with semaphore:
+            try:
+                async with target_locks.acquire(
+                    (guild.id, user_id),
+                    max_wait=MODERATION_CONFIG["target_lock_timeout_seconds"],
+                ):
+                    return await op(user_id)
+            except LockTimeout:
+                return "failed", "Đang bị thao tác khác xử lý"
+            except TimeoutError:
+                return "failed", "Discord không phản hồi kịp"
+            except discord.NotFound:
+                return "skipped", "Không tìm thấy"
+            except discord.HTTPException as e:
+                return "failed", str(e)[:200]
+
+    statuses = await asyncio.gather(*(one(uid) for uid in user_ids))
+    return dict(zip(user_ids, statuses, strict=True))
+
+
+async def _bulk_ban(guild: discord.Guild, job: dict, user_ids: list[int], reason: str):
+    """Ban theo lô 200 bằng endpoint bulk ban; thiếu quyền Manage Server thì ban lẻ."""
+    delete_seconds = job["params"].get("delete_message_seconds", 0)
+    try:
+        result = await guild.bulk_ban(
+            [discord.Object(id=uid) for uid in user_ids],
+            reason=reason,
+            delete_message_seconds=delete_seconds,
+        )
+    except discord.Forbidden:
+
+        async def ban_one(user_id: int):
+            await guild.ban(
+                discord.Object(id=user_id),
+                reason=reason,
+                delete_message_seconds=delete_seconds,
+            )
+            return "done", None
+
+        return await run_each(guild, user_ids, ban_one)
+    except discord.HTTPException as e:
+        return {uid: ("failed", str(e)[:200]) for uid in user_ids}
+    banned = {obj.id for obj in result.banned}
+    return {
+        uid: ("done", None) if uid in banned else ("failed", "Discord từ chối ban")
+        for uid in user_ids
+    }
+
+
+async def run_mass_job(
+    bot, guild: discord.Guild, job: dict, progress: MassProgress | None = None
+) -> dict[str, int]:
+    """Chạy (hoặc chạy tiếp) các target còn 'pending' của job; trả số target theo trạng thái."""
+    db = bot.db
+    job_id = job["job_id"]
+    action = job["action"]
+    reason = f"[Mass #{job_id}] {job['reason'] or 'Không có lý do'}"
+    await db.set_mod_job_status(job_id, "running")
+    pending = await db.get_pending_job_targets(job_id)
+
+    async def kick_one(user_id: int):
+        member = guild.get_member(user_id)
+        if member is None:
+            return "skipped", "Không còn trong server"
+        await member.kick(reason=reason)
+        return "done", None
+
+    async def timeout_one(user_id: int):
+        member = guild.get_member(user_id)
+        if member is None:
+            return "skipped", "Không còn trong server"
+        await member.timeout(timedelta(seconds=job["params"]["seconds"]), reason=reason)
+        return "done", None
+
+    try:
+        chunk = MASS_CONFIG["bulk_ban_chunk"] if action == "ban" else _MARK_CHUNK
+        for i in range(0, len(pending), chunk):
+            ids = pending[i : i + chunk]
+            if action == "ban":
+                results = await _bulk_ban(guild, job, ids, reason)
+            else:
+                op = kick_one if action == "kick" else timeout_one
+                results = await run_each(guild, ids, op)
+            await db.mark_job_targets(job_id, results)
+            if progress is not None:
+                progress.record(results)
+    finally:
+        if progress is not None:
+            progress.finished = True
+    await db.set_mod_job_status(job_id, "done")
+    return await db.get_job_target_counts(job_id)
+
+
+class MassModeration(BaseModerationCog):
+    """Mass moderation cog"""
+
+    mass = app_commands.Group(
+        name="mass",
+        description="Moderation hàng loạt khi bị raid",
+        default_permissions=discord.Permissions(ban_members=True),
+        guild_only=True,
+    )
+
+    def __init__(self, bot):
+        super().__init__(bot)
+        self.resume_jobs.start()
+
+    def cog_unload(self):
+        self.resume_jobs.cancel()
+
+    @tasks.loop(count=1)
+    async def resume_jobs(self):
+        """Chạy tiếp các job bị ngắt giữa chừng do restart."""
+        db = getattr(self.bot, "db", None)
+        if db is None:
+            return
+        try:
+            jobs = await db.list_unfinished_mod_jobs(MASS_ACTIONS)
+        except Exception as e:
+            self.logger.error(f"Lỗi khi đọc mass job dở dang: {e}", exc_info=True)
+            return
+        for job in jobs:
+            guild = self.bot.get_guild(job["guild_id"])
+            if guild is None:
+                await db.set_mod_job_status(job["job_id"], "failed")
+                continue
+            try:
+                counts = await run_mass_job(self.bot, guild, job)
+                moderator = guild.get_member(job["moderator_id"]) or self.bot.user
+                await self._log_summary(guild, moderator, job, counts)
+                self.logger.info(f"Đã chạy tiếp mass job #{job['job_id']}: {counts}")
+            except Exception as e:
+                self.logger.error(
+                    f"Lỗi khi chạy tiếp mass job #{job['job_id']}: {e}", exc_info=True
+                )
+
+    @resume_jobs.before_loop
+    async def before_resume_jobs(self):
+        await self.bot.wait_until_ready()
+
+    async def _log_summary(self, guild, moderator, job: dict, counts: dict[str, int]):
+        """Một mod log tổng hợp cho cả job thay vì mỗi target một dòng."""
+        total = sum(counts.values())
+        await self.log_moderation_action(
+            guild,
+            moderator,
+            f"mass_{job['action']}",
+            target=None,
+            reason=job["reason"],
+            extra_info=(
+                f"Job #{job['job_id']}: {counts.get('done', 0)}/{total} thành công, "
+                f"{counts.get('failed', 0)} lỗi, {counts.get('skipped', 0)} bỏ qua"
+            ),
+            job_id=job["job_id"],
+            counts=counts,
+        )
+
+    async def _report_progress(
+        self, interaction: discord.Interaction, progress: MassProgress
+    ):
+        while not progress.finished:
+            await asyncio.sleep(MASS_CONFIG["progress_interval_seconds"])
+            if progress.finished:
+                return
+            with contextlib.suppress(discord.HTTPException):
+                await interaction.edit_original_response(
+                    content=progress.text(), embed=None, view=None
+                )
+
+    async def _collect_targets(
+        self,
+        interaction: discord.Interaction,
+        action: str,
+        ids: str | None,
+        joined_within: int | None,
+    ) -> tuple[list[int], dict[int, str]]:
+        """Gom target từ danh sách ID và/hoặc cửa sổ join, rồi validate một lượt."""
+        guild = interaction.guild
+        members: dict[int, discord.Member] = {}
+        missing: list[int] = []
+        for user_id in parse_user_ids(ids):
+            member = guild.get_member(user_id)
+            if member is not None:
+                members[user_id] = member
+            else:
+                missing.append(user_id)
+        if joined_within:
+            for member in recent_joiners(guild, joined_within):
+                members.setdefault(member.id, member)
+
+        allowed, rejected = await self.partition_targets(
+            interaction, list(members.values()), f"{action} member này"
+        )
+        user_ids = [m.id for m in allowed]
+        protected = {interaction.user.id, guild.owner_id}
+        if self.bot.user:
+            protected.add(self.bot.user.id)
+        for user_id in missing:
+            # Ban được cả user đã rời server; kick/timeout thì không
+            if action == "ban" and user_id not in protected:
+                user_ids.append(user_id)
+            else:
+                rejected[user_id] = "Không ở trong server"
+        return user_ids, rejected
+
+    async def _execute(
+        self,
+        interaction: discord.Interaction,
+        action: str,
+        ids: str | None,
+        joined_within: int | None,
+        reason: str,
+        params: dict,
+    ):
+        try:
+            if interaction.guild is None or not isinstance(
+                interaction.user, discord.Member
+            ):
+                return
+            if not ids and not joined_within:
+                await self.send_error(
+                    interaction, "Cần nhập `ids` hoặc `joined_within`!"
+                )
+                return
+            if joined_within is not None:
+                validate_number_range(
+                    joined_within,
+                    1,
+                    MASS_CONFIG["max_join_window_minutes"],
+                    "Cửa sổ join (phút)",
+                )
+
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            user_ids, rejected = await self._collect_targets(
+                interaction, action, ids, joined_within
+            )
+            if not user_ids:
+                await self.safe_error_response(
+                    interaction,
+                    "Lỗi",
+                    f"Không có target hợp lệ ({len(rejected)} bị loại).",
+                )
+                return
+            if len(user_ids) > MASS_CONFIG["max_targets"]:
+                await self.safe_error_response(
+                    interaction,
+                    "Lỗi",
+                    f"Tối đa {MASS_CONFIG['max_targets']} target mỗi lần "
+                    f"(đang có {len(user_ids)}).",
+                )
+                return
+
+            preview = " ".join(
+                f"<@{uid}>" for uid in user_ids[: MASS_CONFIG["preview_mentions"]]
+            )
+            if len(user_ids) > MASS_CONFIG["preview_mentions"]:
+                preview += f" … (+{len(user_ids) - MASS_CONFIG['preview_mentions']})"
+            desc = (
+                f"Sẽ **{action}** **{len(user_ids)}** user.\n"
+                f"**Lý do:** {reason}\n{preview}"
+            )
+            if rejected:
+                desc += f"\n⚠️ {len(rejected)} user bị loại (hierarchy/không hợp lệ)."
+
+            view = ConfirmView(interaction.user)
+            await interaction.edit_original_response(
+                embed=warning_embed(f"Xác nhận mass {action}", desc), view=view
+            )
+            await view.wait()
+            if not view.value:
+                await interaction.edit_original_response(
+                    embed=error_embed("Đã hủy", f"Đã hủy mass {action}."), view=None
+                )
+                return
+
+            db = self.bot.db
+            job_id = await db.create_mod_job(
+                interaction.guild.id,
+                interaction.user.id,
+                action,
+                reason,
+                params,
+                user_ids,
+            )
+            job = await db.get_mod_job(job_id)
+            progress = MassProgress(total=len(user_ids))
+            reporter = asyncio.create_task(self._report_progress(interaction, progress))
+            try:
+                counts = await run_mass_job(self.bot, interaction.guild, job, progress)
+            finally:
+                reporter.cancel()
+
+            self.logger.info(
+                f"{interaction.user} mass {action} job #{job_id} in "
+                f"{interaction.guild}: {counts}"
+            )
+            await self._log_summary(interaction.guild, interaction.user, job, counts)
+            await interaction.edit_original_response(
+                content=None,
+                embed=success_embed(
+                    f"Mass {action} hoàn tất",
+                    f"Job #{job_id}: ✅ {counts.get('done', 0)} · "
+                    f"❌ {counts.get('failed', 0)} · ⏭️ {counts.get('skipped', 0)}",
+                ),
+                view=None,
+            )
+        except ValidationError as e:
+            await self.safe_error_response(interaction, "Lỗi", e.user_message)
+        except Exception as e:
+            self.logger.error(f"Error in mass {action}: {e}", exc_info=True)
+            await self.safe_error_response(
+                interaction, "Lỗi", f"Không thể thực hiện mass {action}."
+            )
+
+    @mass.command(name="ban", description="🔨 Ban hàng loạt theo ID hoặc theo giờ join")
+    @app_commands.describe(
+        ids="Danh sách ID/mention, cách nhau bởi dấu cách",
+        joined_within="Ban member join trong N phút gần nhất",
+        reason="Lý do ban",
+        delete_messages="Xóa tin nhắn trong bao nhiêu ngày (0-7)",
+    )
+    @require_guild_permissions(ban_members=True)
+    @app_commands.checks.cooldown(
+        1, COMMAND_COOLDOWNS["mass"], key=lambda i: i.guild_id
+    )
+    async def mass_ban(
+        self,
+        interaction: discord.Interaction,
+        ids: str | None = None,
+        joined_within: int | None = None,
+        reason: str = "Raid",
+        delete_messages: int = 1,
+    ):
+        try:
+            delete_messages = validate_number_range(
+                delete_messages, 0, 7, "Số ngày xóa tin nhắn"
+            )
+        except ValidationError as e:
+            return await self.send_error(interaction, e.user_message)
+        await self._execute(
+            interaction,
+            "ban",
+            ids,
+            joined_within,
+            reason,
+            {"delete_message_seconds": delete_messages * 86400},
+        )
+
+    @mass.command(
+        name="kick", description="👢 Kick hàng loạt theo ID hoặc theo giờ join"
+    )
+    @app_commands.describe(
+        ids="Danh sách ID/mention, cách nhau bởi dấu cách",
+        joined_within="Kick member join trong N phút gần nhất",
+        reason="Lý do kick",
+    )
+    @require_guild_permissions(kick_members=True)
+    @app_commands.checks.cooldown(
+        1, COMMAND_COOLDOWNS["mass"], key=lambda i: i.guild_id
+    )
+    async def mass_kick(
+        self,
+        interaction: discord.Interaction,
+        ids: str | None = None,
+        joined_within: int | None = None,
+        reason: str = "Raid",
+    ):
+        await self._execute(interaction, "kick", ids, joined_within, reason, {})
+
+    @mass.command(
+        name="timeout", description="⏱️ Timeout hàng loạt theo ID hoặc theo giờ join"
+    )
+    @app_commands.describe(
+        duration="Thời gian timeout (phút)",
+        ids="Danh sách ID/mention, cách nhau bởi dấu cách",
+        joined_within="Timeout member join trong N phút gần nhất",
+        reason="Lý do timeout",
+    )
+    @require_guild_permissions(moderate_members=True)
+    @app_commands.checks.cooldown(
+        1, COMMAND_COOLDOWNS["mass"], key=lambda i: i.guild_id
+    )
+    async def mass_timeout(
+        self,
+        interaction: discord.Interaction,
+        duration: int,
+        ids: str | None = None,
+        joined_within: int | None = None,
+        reason: str = "Raid",
+    ):
+        try:
+            duration = validate_number_range(
+                duration, 1, 10080, "Thời gian timeout (phút)"
+            )
+        except ValidationError as e:
+            return await self.send_error(interaction, e.user_message)
+        await self._execute(
+            interaction,
+            "timeout",
+            ids,
+            joined_within,
+            reason,
+            {"seconds": duration * 60},
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(MassModeration(bot))
@@ -0,0 +1,148 @@
+"""Engine xóa tin nhắn số lượng lớn cho /clear: lọc một lượt, fetch và delete chạy song song."""
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from datetime import timedelta
+
+import discord
+
+from utils.constants import CLEAR_CONFIG
+
+logger = logging.getLogger("BlastBot.Moderation.Purge")
+
+LINK_PATTERN = re.compile(r"https?://\S+|discord(?:\.gg|app\.com/invite)/\S+", re.I)
+# Giới hạn của endpoint bulk delete
+BULK_DELETE_MAX = 100
+
+
+@dataclass(frozen=True)
+class PurgeFilter:
+    """Các điều kiện được AND với nhau; không đặt gì = mọi tin nhắn không ghim."""
+
+    user_id: int | None = None
+    bots: bool = False
+    pattern: re.Pattern | None = None
+    contains: str | None = None  # chuỗi con, đã casefold
+    attachments: bool = False
+    links: bool = False
+
+    def matches(self, message: discord.Message) -> bool:
+        if message.pinned:
+            return False
+        if self.user_id is not None and message.author.id != self.user_id:
+            return False
+        if self.bots and not message.author.bot:
+            return False
+        if self.attachments and not message.attachments:
+            return False
+        if self.links and not LINK_PATTERN.search(message.content):
+            return False
+        if (
+            self.contains is not None
+            and self.contains not in message.content.casefold()
+        ):
+            return False
+        return self.pattern is None or bool(self.pattern.search(message.content))
+
+    def describe(self) -> str:
+        parts = []
+        if self.user_id is not None:
+            parts.append(f"user <@{self.user_id}>")
+        if self.bots:
+            parts.append("bot")
+        if self.pattern is not None:
+            parts.append(f"regex `{self.pattern.pattern}`")
+        if self.contains is not None:
+            parts.append(f"chứa `{self.contains}`")
+        if self.attachments:
+            parts.append("có file")
+        if self.links:
+            parts.append("có link")
+        return ", ".join(parts) or "tất cả"
+
+
+@dataclass
+class PurgeProgress:
+    scanned: int = 0
+    matched: int = 0
+    deleted: int = 0
+    failed: int = 0
+    done: bool = False
+
+
+async def purge_channel(
+    channel: discord.TextChannel,
+    limit: int,
+    purge_filter: PurgeFilter,
+    progress: PurgeProgress | None = None,
+) -> PurgeProgress:
+    """Quét ``limit`` tin nhắn gần nhất và xóa những tin khớp ``purge_filter``.
+
+    History được phân trang (``before=``) trong khi các lô trước vẫn đang bị xóa:
+    tin dưới 14 ngày đi qua ``delete_messages`` theo lô 100, tin cũ hơn xóa từng cái
+    ở worker riêng. Không có sleep cố định — HTTP client của discord.py đọc header
+    rate limit của từng bucket và tự chờ đúng lúc.
+    """
+    progress = progress or PurgeProgress()
+    cutoff = (
+        discord.utils.utcnow()
+        - timedelta(days=CLEAR_CONFIG["message_age_limit_days"])
+        # Chừa biên vì tin có thể "già" thêm trong lúc nằm chờ ở queue
+        + timedelta(minutes=CLEAR_CONFIG["bulk_age_margin_minutes"])
+    )
+    bulk_queue: asyncio.Queue = asyncio.Queue(maxsize=CLEAR_CONFIG["pipeline_depth"])
+    old_queue: asyncio.Queue = asyncio.Queue(maxsize=BULK_DELETE_MAX)
+
+    async def bulk_worker():
+        while (batch := await bulk_queue.get()) is not None:
+            try:
+                if len(batch) == 1:
+                    await batch[0].delete()
+                else:
+                    await channel.delete_messages(batch)
+                progress.deleted += len(batch)
+            except discord.NotFound:
+                # Tin đã bị xóa ở nơi khác giữa chừng
+                progress.deleted += len(batch)
+            except discord.HTTPException as e:
+                progress.failed += len(batch)
+                logger.warning(f"Lỗi khi bulk delete ở {channel}: {e}")
+
+    async def old_worker():
+        while (message := await old_queue.get()) is not None:
+            try:
+                await message.delete()
+                progress.deleted += 1
+            except discord.NotFound:
+                progress.deleted += 1
+            except discord.HTTPException as e:
+                progress.failed += 1
+                logger.warning(f"Lỗi khi xóa tin cũ {message.id} ở {channel}: {e}")
+
+    workers = [asyncio.create_task(bulk_worker()), asyncio.create_task(old_worker())]
+    try:
+        batch: list[discord.Message] = []
+        async for message in channel.history(limit=limit):
+            progress.scanned += 1
+            if not purge_filter.matches(message):
+                continue
+            progress.matched += 1
+            if message.created_at > cutoff:
+                batch.append(message)
+                if len(batch) == BULK_DELETE_MAX:
+                    await bulk_queue.put(batch)
+                    batch = []
+            else:
+                await old_queue.put(message)
+        if batch:
+            await bulk_queue.put(batch)
+        await bulk_queue.put(None)
+        await old_queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        progress.done = True
+    return progress
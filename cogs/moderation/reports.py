@@ -0,0 +1,55 @@
+"""Reports command - tra cứu báo cáo gửi qua context menu"""
+
+import discord
+from discord import app_commands
+
+from utils.constants import COLORS, REPORT_CONFIG
+from utils.embeds import create_embed
+
+from .base import BaseModerationCog, require_guild_permissions
+from .mass import ID_PATTERN
+
+
+class ReportsCommand(BaseModerationCog):
+    @app_commands.command(name="reports", description="📢 Xem các báo cáo gần đây")
+    @app_commands.describe(target="User (mention/ID) hoặc ID tin nhắn bị báo cáo")
+    @app_commands.default_permissions(moderate_members=True)
+    @require_guild_permissions(moderate_members=True)
+    @app_commands.guild_only()
+    async def reports(
+        self, interaction: discord.Interaction, target: str | None = None
+    ):
+        target_id = None
+        if target is not None:
+            match = ID_PATTERN.search(target)
+            if match is None:
+                await self.send_error(interaction, "Target phải là mention hoặc ID.")
+                return
+            target_id = int(match.group())
+
+        db = self.bot.db
+        rows = await db.list_reports(
+            interaction.guild.id, target_id, REPORT_CONFIG["list_limit"]
+        )
+        lines = [
+            f"`#{r['report_id']}` {r['created_at'][:16]} · {r['target_type']} "
+            f"`{r['target_id']}` · bởi <@{r['reporter_id']}> — {r['reason']}"
+            for r in rows
+        ]
+        embed = create_embed(
+            title="📢 Báo cáo gần đây",
+            description="\n".join(lines) or "Chưa có báo cáo nào.",
+            color=COLORS["warning"],
+        )
+        if target_id is not None:
+            total, reporters = await db.count_reports(interaction.guild.id, target_id)
+            embed.add_field(
+                name="Tổng cộng",
+                value=f"**{total}** báo cáo từ **{reporters}** người",
+                inline=False,
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(ReportsCommand(bot))
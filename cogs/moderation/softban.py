@@ -6,6 +6,7 @@ from discord import app_commands
 from utils.constants import COMMAND_COOLDOWNS
 from utils.embeds import error_embed, success_embed, warning_embed
 from utils.error_handler import ValidationError, validate_number_range
+from utils.keyed_lock import LockTimeout
 from utils.views import ConfirmView
 
 from .base import BaseModerationCog, require_guild_permissions
@@ -39,90 +40,96 @@ class SoftbanCommand(BaseModerationCog):
     ):
         """Softban member"""
         try:
-            is_valid, error_msg = await self.validate_target(interaction, member)
-            if not is_valid:
-                await self.send_error(interaction, error_msg or "Invalid target")
-                return
+            async with self.target_lock(member):
+                is_valid, error_msg = await self.validate_target(interaction, member)
+                if not is_valid:
+                    await self.send_error(interaction, error_msg or "Invalid target")
+                    return
+
+                is_valid, error_msg = await self.validate_hierarchy(
+                    interaction, member, "softban member này"
+                )
+                if not is_valid:
+                    await self.send_error(
+                        interaction, error_msg or "Hierarchy check failed"
+                    )
+                    return
+
+                delete_messages = validate_number_range(
+                    delete_messages, 1, 7, "Số ngày xóa tin nhắn"
+                )
 
-            is_valid, error_msg = await self.validate_hierarchy(
-                interaction, member, "softban member này"
-            )
-            if not is_valid:
-                await self.send_error(
-                    interaction, error_msg or "Hierarchy check failed"
+                view = ConfirmView(interaction.user)
+                await interaction.response.send_message(
+                    embed=warning_embed(
+                        "Xác nhận softban",
+                        f"Bạn có chắc muốn softban {member.mention}?\n"
+                        f"**Lý do:** {reason}\n"
+                        f"**Xóa tin nhắn:** {delete_messages} ngày\n"
+                        f"*(Member sẽ bị ban rồi unban ngay, có thể join lại)*",
+                    ),
+                    view=view,
+                    ephemeral=True,
                 )
-                return
 
-            delete_messages = validate_number_range(
-                delete_messages, 1, 7, "Số ngày xóa tin nhắn"
-            )
+                await view.wait()
 
-            view = ConfirmView(interaction.user)
-            await interaction.response.send_message(
-                embed=warning_embed(
-                    "Xác nhận softban",
-                    f"Bạn có chắc muốn softban {member.mention}?\n"
-                    f"**Lý do:** {reason}\n"
-                    f"**Xóa tin nhắn:** {delete_messages} ngày\n"
-                    f"*(Member sẽ bị ban rồi unban ngay, có thể join lại)*",
-                ),
-                view=view,
-                ephemeral=True,
-            )
+                if not view.value:
+                    await interaction.edit_original_response(
+                        embed=error_embed("Đã hủy", "Đã hủy thao tác softban."),
+                        view=None,
+                    )
+                    return
 
-            await view.wait()
+                guild = interaction.guild
+                if guild is None:
+                    await self.safe_error_response(
+                        interaction, "Lỗi", "Không xác định được guild!"
+                    )
+                    return
 
-            if not view.value:
-                await interaction.edit_original_response(
-                    embed=error_embed("Đã hủy", "Đã hủy thao tác softban."), view=None
+                await guild.ban(
+                    member,
+                    reason=f"Softban bởi {interaction.user}: {reason}",
+                    delete_message_seconds=delete_messages * 86400,
                 )
-                return
-
-            guild = interaction.guild
-            if guild is None:
-                await self.safe_error_response(
-                    interaction, "Lỗi", "Không xác định được guild!"
+                await guild.unban(
+                    discord.Object(id=member.id),
+                    reason=f"Softban (unban tự động) bởi {interaction.user}",
                 )
-                return
 
-            await guild.ban(
-                member,
-                reason=f"Softban bởi {interaction.user}: {reason}",
-                delete_message_seconds=delete_messages * 86400,
-            )
-            await guild.unban(
-                discord.Object(id=member.id),
-                reason=f"Softban (unban tự động) bởi {interaction.user}",
-            )
+                self.logger.info(
+                    f"{interaction.user} softbanned {member} - Reason: {reason}"
+                )
 
-            self.logger.info(
-                f"{interaction.user} softbanned {member} - Reason: {reason}"
-            )
+                if isinstance(interaction.user, discord.Member):
+                    await self.log_moderation_action(
+                        guild,
+                        interaction.user,
+                        "softban",
+                        member,
+                        reason,
+                        f"Delete messages: {delete_messages} days",
+                    )
 
-            if isinstance(interaction.user, discord.Member):
-                await self.log_moderation_action(
-                    guild,
-                    interaction.user,
-                    "softban",
-                    member,
-                    reason,
-                    f"Delete messages: {delete_messages} days",
+                await interaction.edit_original_response(
+                    embed=success_embed(
+                        "Đã softban",
+                        f"{member.mention} đã bị softban (tin nhắn {delete_messages} ngày đã xóa).\n"
+                        f"**Lý do:** {reason}",
+                    ),
+                    view=None,
                 )
-
-            await interaction.edit_original_response(
-                embed=success_embed(
-                    "Đã softban",
-                    f"{member.mention} đã bị softban (tin nhắn {delete_messages} ngày đã xóa).\n"
-                    f"**Lý do:** {reason}",
-                ),
-                view=None,
-            )
         except ValidationError as e:
             await self.send_error(interaction, e.user_message)
+        except LockTimeout:
+            await self.send_busy(interaction)
         except Exception as e:
             self.logger.error(f"Error in softban command: {e}", exc_info=True)
             await self.safe_error_response(
-                interaction, "Lỗi", "Không thể thực hiện softban do lỗi hệ thống hoặc thiếu quyền."
+                interaction,
+                "Lỗi",
+                "Không thể thực hiện softban do lỗi hệ thống hoặc thiếu quyền.",
             )
 
 
@@ -6,9 +6,10 @@ import discord
 from discord import app_commands
 from discord.ext import tasks
 
-from utils.constants import COMMAND_COOLDOWNS
+from utils.constants import COMMAND_COOLDOWNS, MODERATION_CONFIG
 from utils.embeds import success_embed
 from utils.error_handler import ValidationError, validate_number_range
+from utils.keyed_lock import LockTimeout
 
 from .base import BaseModerationCog, require_guild_permissions
 
@@ -49,76 +50,84 @@ class TempRoleCommand(BaseModerationCog):
     ):
         """Gán role tạm thời"""
         try:
-            guild = interaction.guild
-            if guild is None or not isinstance(interaction.user, discord.Member):
-                await self.send_error(interaction, "Không xác định được guild/member!")
-                return
-
-            # Validate duration: 1 phút - 28 ngày (40320 phút)
-            validate_number_range(duration, 1, 40320, "Thời gian (phút)")
-
-            # Kiểm tra hierarchy của role với người dùng
-            if (
-                role >= interaction.user.top_role
-                and interaction.user.id != guild.owner_id
-            ):
-                await self.send_error(
-                    interaction, "Role này cao hơn hoặc bằng role cao nhất của bạn!"
-                )
-                return
+            async with self.target_lock(member):
+                guild = interaction.guild
+                if guild is None or not isinstance(interaction.user, discord.Member):
+                    await self.send_error(
+                        interaction, "Không xác định được guild/member!"
+                    )
+                    return
+
+                # Validate duration: 1 phút - 28 ngày (40320 phút)
+                validate_number_range(duration, 1, 40320, "Thời gian (phút)")
+
+                # Kiểm tra hierarchy của role với người dùng
+                if (
+                    role >= interaction.user.top_role
+                    and interaction.user.id != guild.owner_id
+                ):
+                    await self.send_error(
+                        interaction, "Role này cao hơn hoặc bằng role cao nhất của bạn!"
+                    )
+                    return
 
-            # Kiểm tra hierarchy của bot
-            bot_member = guild.get_member(self.bot.user.id) if self.bot.user else None
-            if bot_member and role >= bot_member.top_role:
-                await self.send_error(
-                    interaction, "Role này cao hơn hoặc bằng role cao nhất của bot!"
+                # Kiểm tra hierarchy của bot
+                bot_member = (
+                    guild.get_member(self.bot.user.id) if self.bot.user else None
                 )
-                return
+                if bot_member and role >= bot_member.top_role:
+                    await self.send_error(
+                        interaction, "Role này cao hơn hoặc bằng role cao nhất của bot!"
+                    )
+                    return
 
-            if role.managed:
-                await self.send_error(
-                    interaction,
-                    "Không thể gán role được quản lý bởi tích hợp (bot/booster)!",
-                )
-                return
+                if role.managed:
+                    await self.send_error(
+                        interaction,
+                        "Không thể gán role được quản lý bởi tích hợp (bot/booster)!",
+                    )
+                    return
 
-            await interaction.response.defer(ephemeral=True)
+                await interaction.response.defer(ephemeral=True)
 
-            await member.add_roles(
-                role, reason=f"Temprole bởi {interaction.user}: {reason}"
-            )
-
-            expires_at = datetime.now(UTC) + timedelta(minutes=duration)
-            await self.bot.db.add_temp_role(guild.id, member.id, role.id, expires_at)
+                await member.add_roles(
+                    role, reason=f"Temprole bởi {interaction.user}: {reason}"
+                )
+                expires_at = datetime.now(UTC) + timedelta(minutes=duration)
+                await self.bot.db.add_temp_role(
+                    guild.id, member.id, role.id, expires_at
+                )
 
-            self.logger.info(
-                f"{interaction.user} gave temp role {role} to {member} for {duration}m"
-            )
+                self.logger.info(
+                    f"{interaction.user} gave temp role {role} to {member} for {duration}m"
+                )
 
-            await self.log_moderation_action(
-                guild,
-                interaction.user,
-                "temprole",
-                member,
-                reason,
-                f"Role: {role.name} | Duration: {duration} minutes",
-            )
+                await self.log_moderation_action(
+                    guild,
+                    interaction.user,
+                    "temprole",
+                    member,
+                    reason,
+                    f"Role: {role.name} | Duration: {duration} minutes",
+                )
 
-            await interaction.followup.send(
-                embed=success_embed(
-                    "Đã gán temprole",
-                    f"Đã gán {role.mention} cho {member.mention} trong **{duration} phút**.\n"
-                    f"Hết hạn: <t:{int(expires_at.timestamp())}:R>\n"
-                    f"**Lý do:** {reason}",
-                ),
-                ephemeral=True,
-            )
+                await interaction.followup.send(
+                    embed=success_embed(
+                        "Đã gán temprole",
+                        f"Đã gán {role.mention} cho {member.mention} trong **{duration} phút**.\n"
+                        f"Hết hạn: <t:{int(expires_at.timestamp())}:R>\n"
+                        f"**Lý do:** {reason}",
+                    ),
+                    ephemeral=True,
+                )
         except ValidationError as e:
             await self.send_error(interaction, e.user_message)
         except discord.Forbidden:
             await self.safe_error_response(
                 interaction, "Lỗi", "Bot không có quyền quản lý role này!"
             )
+        except LockTimeout:
+            await self.send_busy(interaction)
         except Exception as e:
             self.logger.error(f"Error in temprole command: {e}", exc_info=True)
             await self.safe_error_response(
@@ -127,52 +136,96 @@ class TempRoleCommand(BaseModerationCog):
 
     @tasks.loop(minutes=1)
     async def check_expired_roles(self):
-        """Quét và gỡ các temp role đã hết hạn."""
+        """Quét và gỡ các temp role đã hết hạn, gom theo (guild, member)."""
         db = getattr(self.bot, "db", None)
         if db is None:
             return
 
         try:
             expired = await db.get_expired_temp_roles()
+            by_member: dict[tuple[int, int], set[int]] = {}
             for entry in expired:
-                guild = self.bot.get_guild(entry["guild_id"])
-                if not guild:
-                    await db.remove_temp_role(
-                        entry["guild_id"], entry["user_id"], entry["role_id"]
-                    )
+                key = (entry["guild_id"], entry["user_id"])
+                by_member.setdefault(key, set()).add(entry["role_id"])
+
+            done: list[tuple[int, int, int]] = []
+            departed: list[tuple[int, int]] = []
+            for (guild_id, user_id), role_ids in by_member.items():
+                guild = self.bot.get_guild(guild_id)
+                if guild is None:
+                    departed.append((guild_id, user_id))  # bot không còn ở server
                     continue
-
-                member = guild.get_member(entry["user_id"])
-                role = guild.get_role(entry["role_id"])
-
-                if not role or member is None:
-                    await db.remove_temp_role(
-                        entry["guild_id"], entry["user_id"], entry["role_id"]
-                    )
+                if guild.unavailable:
+                    continue  # outage: giữ nguyên, thử lại lần quét sau
+                member = guild.get_member(user_id)
+                if member is None:
+                    if guild.chunked:
+                        departed.append((guild_id, user_id))
+                    else:
+                        # Cache chưa đủ member: chỉ bỏ dòng đã hết hạn, giữ dòng còn hạn
+                        done.extend((guild_id, user_id, r) for r in role_ids)
                     continue
+                if await self._expire_member_roles(member, role_ids):
+                    done.extend((guild_id, user_id, r) for r in role_ids)
 
-                if role in member.roles:
-                    try:
-                        await member.remove_roles(role, reason="Temprole hết hạn")
-                        self.logger.info(f"Đã gỡ temp role {role} khỏi {member}")
-                        await db.remove_temp_role(
-                            entry["guild_id"], entry["user_id"], entry["role_id"]
-                        )
-                    except discord.Forbidden as e:
-                        self.logger.error(
-                            f"Bot không đủ quyền gỡ temp role {role.name} khỏi {member} (role cao hơn bot hoặc thiếu permission): {e}"
-                        )
-                    except discord.HTTPException as e:
-                        self.logger.warning(
-                            f"Lỗi HTTP tạm thời khi gỡ temp role {role.name} khỏi {member}: {e}"
-                        )
-                else:
-                    await db.remove_temp_role(
-                        entry["guild_id"], entry["user_id"], entry["role_id"]
-                    )
+            await db.clear_temp_roles(done, departed)
         except Exception as e:
             self.logger.error(f"Lỗi khi quét temp roles: {e}", exc_info=True)
 
+    async def _expire_member_roles(
+        self, member: discord.Member, role_ids: set[int]
+    ) -> bool:
+        """Gỡ mọi temp role hết hạn của member bằng một lần edit.
+
+        Role bot không còn quản lý được (managed hoặc không thấp hơn role cao nhất
+        của bot) được ghi log rồi bỏ dòng DB, để không làm hỏng cả lần edit. Trả
+        False nếu lỗi tạm thời/thiếu quyền để giữ dòng DB và thử lại lần quét sau.
+        """
+        try:
+            async with self.target_lock(
+                member, MODERATION_CONFIG["target_lock_timeout_seconds"]
+            ):
+                me = member.guild.me
+                removed, blocked = [], []
+                for role in member.roles:
+                    if role.id not in role_ids:
+                        continue
+                    if role.managed or (me is not None and role >= me.top_role):
+                        blocked.append(role)
+                    else:
+                        removed.append(role)
+                if blocked:
+                    self.logger.error(
+                        f"Bỏ temp role {', '.join(r.name for r in blocked)} của {member}: "
+                        "role cao hơn bot hoặc được quản lý bởi tích hợp"
+                    )
+                if not removed:
+                    return True  # role đã bị xóa, đã được gỡ tay hoặc bị chặn
+                await member.edit(
+                    roles=[
+                        r
+                        for r in member.roles
+                        if not r.is_default() and r not in removed
+                    ],
+                    reason="Temprole hết hạn",
+                )
+        except discord.Forbidden as e:
+            self.logger.error(
+                f"Bot không đủ quyền gỡ temp role khỏi {member} (role cao hơn bot hoặc thiếu permission): {e}"
+            )
+            return False
+        except discord.HTTPException as e:
+            self.logger.warning(
+                f"Lỗi HTTP tạm thời khi gỡ temp role khỏi {member}: {e}"
+            )
+            return False
+        except TimeoutError:
+            return False
+        self.logger.info(
+            f"Đã gỡ temp role {', '.join(r.name for r in removed)} khỏi {member}"
+        )
+        return True
+
     @check_expired_roles.before_loop
     async def before_check(self):
         await self.bot.wait_until_ready()
@@ -8,6 +8,7 @@ from discord import app_commands
 from utils.constants import COMMAND_COOLDOWNS
 from utils.embeds import error_embed, success_embed, warning_embed
 from utils.error_handler import ValidationError, validate_number_range
+from utils.keyed_lock import LockTimeout
 from utils.views import ConfirmView
 
 from .base import BaseModerationCog, require_guild_permissions
@@ -60,79 +61,87 @@ class TimeoutCommand(BaseModerationCog):
     ):
         """Timeout member"""
         try:
-            # Validate target
-            is_valid, error_msg = await self.validate_target(interaction, member)
-            if not is_valid:
-                await self.send_error(interaction, error_msg or "Invalid target")
-                return
-
-            # Validate hierarchy
-            is_valid, error_msg = await self.validate_hierarchy(
-                interaction, member, "timeout member này"
-            )
-            if not is_valid:
-                await self.send_error(
-                    interaction, error_msg or "Hierarchy check failed"
+            async with self.target_lock(member):
+                # Validate target
+                is_valid, error_msg = await self.validate_target(interaction, member)
+                if not is_valid:
+                    await self.send_error(interaction, error_msg or "Invalid target")
+                    return
+
+                # Validate hierarchy
+                is_valid, error_msg = await self.validate_hierarchy(
+                    interaction, member, "timeout member này"
+                )
+                if not is_valid:
+                    await self.send_error(
+                        interaction, error_msg or "Hierarchy check failed"
+                    )
+                    return
+
+                duration = validate_number_range(
+                    duration, 1, 10080, "Thời gian timeout (phút)"
                 )
-                return
 
-            duration = validate_number_range(
-                duration, 1, 10080, "Thời gian timeout (phút)"
-            )
+                # Xác nhận
+                view = ConfirmView(interaction.user)
+                await interaction.response.send_message(
+                    embed=warning_embed(
+                        "Xác nhận timeout",
+                        f"Bạn có chắc muốn timeout {member.mention}?\n"
+                        f"**Thời gian:** {duration} phút\n"
+                        f"**Lý do:** {reason}",
+                    ),
+                    view=view,
+                    ephemeral=True,
+                )
 
-            # Xác nhận
-            view = ConfirmView(interaction.user)
-            await interaction.response.send_message(
-                embed=warning_embed(
-                    "Xác nhận timeout",
-                    f"Bạn có chắc muốn timeout {member.mention}?\n"
-                    f"**Thời gian:** {duration} phút\n"
-                    f"**Lý do:** {reason}",
-                ),
-                view=view,
-                ephemeral=True,
-            )
+                await view.wait()
 
-            await view.wait()
+                if not view.value:
+                    await interaction.edit_original_response(
+                        embed=error_embed("Đã hủy", "Đã hủy thao tác timeout."),
+                        view=None,
+                    )
+                    return
 
-            if not view.value:
-                await interaction.edit_original_response(
-                    embed=error_embed("Đã hủy", "Đã hủy thao tác timeout."), view=None
+                # Thực hiện timeout
+                timeout_until = timedelta(minutes=duration)
+                await member.timeout(
+                    timeout_until, reason=f"{interaction.user}: {reason}"
                 )
-                return
 
-            # Thực hiện timeout
-            timeout_until = timedelta(minutes=duration)
-            await member.timeout(timeout_until, reason=f"{interaction.user}: {reason}")
+                self.logger.info(
+                    f"{interaction.user} timed out {member} for {duration}m - Reason: {reason}"
+                )
 
-            self.logger.info(
-                f"{interaction.user} timed out {member} for {duration}m - Reason: {reason}"
-            )
+                # Log moderation action
+                if interaction.guild and isinstance(interaction.user, discord.Member):
+                    await self.log_moderation_action(
+                        interaction.guild,
+                        interaction.user,
+                        "timeout",
+                        member,
+                        reason,
+                        f"Duration: {duration} minutes",
+                    )
 
-            # Log moderation action
-            if interaction.guild and isinstance(interaction.user, discord.Member):
-                await self.log_moderation_action(
-                    interaction.guild,
-                    interaction.user,
-                    "timeout",
-                    member,
-                    reason,
-                    f"Duration: {duration} minutes",
+                await interaction.edit_original_response(
+                    embed=success_embed(
+                        "Đã timeout",
+                        f"{member.mention} đã bị timeout {duration} phút.\n**Lý do:** {reason}",
+                    ),
+                    view=None,
                 )
-
-            await interaction.edit_original_response(
-                embed=success_embed(
-                    "Đã timeout",
-                    f"{member.mention} đã bị timeout {duration} phút.\n**Lý do:** {reason}",
-                ),
-                view=None,
-            )
         except ValidationError as e:
             await self.send_error(interaction, e.user_message)
+        except LockTimeout:
+            await self.send_busy(interaction)
         except Exception as e:
             self.logger.error(f"Error in timeout command: {e}", exc_info=True)
             await self.safe_error_response(
-                interaction, "Lỗi", "Không thể thực hiện timeout do lỗi hệ thống hoặc thiếu quyền."
+                interaction,
+                "Lỗi",
+                "Không thể thực hiện timeout do lỗi hệ thống hoặc thiếu quyền.",
             )
 
 
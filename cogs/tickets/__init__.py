@@ -1,8 +1,11 @@
 """Ticket module - Hệ thống ticket hỗ trợ server."""
 
 from .autoclose import TicketAutoclose
+from .overflow import TicketOverflow
 from .panel import TicketPanel
+from .pool import TicketPool
 from .setup import TicketSetup
+from .stats import TicketStats
 from .tags import TicketTags
 from .ticket_cmds import TicketCommands
 
@@ -15,6 +18,9 @@ async def setup(bot):
         TicketCommands,
         TicketTags,
         TicketAutoclose,
+        TicketPool,
+        TicketOverflow,
+        TicketStats,
     ):
         if bot.get_cog(cog_cls.__name__) is None:
             await bot.add_cog(cog_cls(bot))
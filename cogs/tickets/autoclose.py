@@ -6,7 +6,9 @@ import discord
 from discord.ext import commands, tasks
 
 from utils.constants import TICKET_CONFIG
+from utils.metrics import metrics
 
+from .helpers import TICKET_CHANNEL_TYPES, is_ticket_staff, resolve_ticket_channel
 from .views import perform_close
 
 logger = logging.getLogger("BlastBot.Tickets.Autoclose")
@@ -16,15 +18,35 @@ class TicketAutoclose(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.autoclose_check.start()
+        self.reconcile_orphans.start()
 
     def cog_unload(self):
         self.autoclose_check.cancel()
+        self.reconcile_orphans.cancel()
+
+    async def _close_orphan(self, channel_id: int):
+        db = getattr(self.bot, "db", None)
+        if db is None:
+            return
+        if await db.close_ticket_db(channel_id, TICKET_CONFIG["orphan_close_reason"]):
+            metrics.incr("ticket.orphans.closed")
+            logger.info(f"Đóng ticket của channel {channel_id} vừa bị xóa.")
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        # perform_close đã đóng ticket trước khi xóa → UPDATE không khớp row nào
+        if isinstance(channel, discord.TextChannel):
+            await self._close_orphan(channel.id)
+
+    @commands.Cog.listener()
+    async def on_raw_thread_delete(self, payload: discord.RawThreadDeleteEvent):
+        await self._close_orphan(payload.thread_id)
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.bot or not message.guild:
             return
-        if not isinstance(message.channel, discord.TextChannel):
+        if not isinstance(message.channel, TICKET_CHANNEL_TYPES):
             return
         db = getattr(self.bot, "db", None)
         if db is None:
@@ -32,6 +54,13 @@ class TicketAutoclose(commands.Cog):
         ticket = await db.get_ticket_by_channel(message.channel.id)
         if ticket and ticket["open"]:
             await db.touch_ticket(message.channel.id)
+            # Phản hồi đầu tiên của staff → mốc first-response cho thống kê SLA
+            if (
+                ticket.get("first_response_time") is None
+                and message.author.id != ticket["owner_id"]
+                and await is_ticket_staff(self.bot, message.author)
+            ):
+                await db.record_first_response(message.channel.id, message.author.id)
 
     @tasks.loop(minutes=TICKET_CONFIG["autoclose_check_minutes"])
     async def autoclose_check(self):
@@ -47,13 +76,15 @@ class TicketAutoclose(commands.Cog):
                     guild = self.bot.get_guild(t["guild_id"])
                     if not guild:
                         continue
-                    channel = guild.get_channel(t["channel_id"])
-                    if not isinstance(channel, discord.TextChannel):
+                    channel = await resolve_ticket_channel(guild, t["channel_id"])
+                    if channel is None:
                         # Orphan ticket: channel was deleted on Discord manually
                         logger.info(
                             f"Dọn dẹp orphan ticket #{t['number']} (channel {t['channel_id']} đã bị xóa)."
                         )
-                        await db.close_ticket_db(t["channel_id"], "Channel đã bị xóa")
+                        await db.close_ticket_db(
+                            t["channel_id"], TICKET_CONFIG["orphan_close_reason"]
+                        )
                         continue
 
                     closer = self.bot.user or guild.me
@@ -78,6 +109,55 @@ class TicketAutoclose(commands.Cog):
     async def before_autoclose(self):
         await self.bot.wait_until_ready()
 
+    @tasks.loop(count=1)
+    async def reconcile_orphans(self):
+        """Lúc khởi động: đóng ticket có channel bị xóa trong lúc bot offline."""
+        db = getattr(self.bot, "db", None)
+        if db is None:
+            return
+        try:
+            open_channels = await db.list_open_ticket_channels()
+        except Exception as e:
+            logger.error(f"Lỗi khi đọc ticket đang mở: {e}", exc_info=True)
+            return
+        for guild_id, channel_ids in open_channels.items():
+            guild = self.bot.get_guild(guild_id)
+            # Không còn trong guild / guild outage: không đủ dữ liệu để kết luận
+            if guild is None or guild.unavailable:
+                continue
+            try:
+                orphans = await self._find_orphans(guild, channel_ids)
+                if not orphans:
+                    continue
+                closed = await db.close_orphan_tickets(
+                    orphans, TICKET_CONFIG["orphan_close_reason"]
+                )
+                metrics.incr("ticket.orphans.closed", closed)
+                logger.info(f"Đóng {closed} orphan ticket ở {guild}.")
+            except Exception as e:
+                logger.error(
+                    f"Lỗi khi đối chiếu orphan ticket ở guild {guild_id}: {e}",
+                    exc_info=True,
+                )
+
+    @staticmethod
+    async def _find_orphans(guild: discord.Guild, channel_ids: list[int]) -> list[int]:
+        orphans = []
+        for channel_id in channel_ids:
+            if guild.get_channel_or_thread(channel_id) is not None:
+                continue
+            # Thread đã archive không có trong cache → hỏi API trước khi kết luận
+            try:
+                if await resolve_ticket_channel(guild, channel_id) is None:
+                    orphans.append(channel_id)
+            except discord.HTTPException:
+                continue
+        return orphans
+
+    @reconcile_orphans.before_loop
+    async def before_reconcile(self):
+        await self.bot.wait_until_ready()
+
 
 async def setup(bot):
     await bot.add_cog(TicketAutoclose(bot))
@@ -1,7 +1,17 @@
 """Helper dùng chung cho ticket cogs."""
 
+import contextlib
+import logging
+
 import discord
 
+from utils.constants import TICKET_CONFIG
+
+logger = logging.getLogger("BlastBot.Tickets.Helpers")
+
+# Ticket có thể là text channel (mode 'channel') hoặc private thread (mode 'thread')
+TICKET_CHANNEL_TYPES = (discord.TextChannel, discord.Thread)
+
 
 async def is_ticket_staff(bot, member: discord.Member) -> bool:
     """Admin server, hoặc nằm trong staff support/admin của ticket."""
@@ -12,14 +22,8 @@ async def is_ticket_staff(bot, member: discord.Member) -> bool:
     db = getattr(bot, "db", None)
     if db is None:
         return False
-    staff = await db.get_staff(member.guild.id)
-    member_role_ids = {r.id for r in member.roles}
-    for entry in staff:
-        if entry["is_role"] and entry["entity_id"] in member_role_ids:
-            return True
-        if not entry["is_role"] and entry["entity_id"] == member.id:
-            return True
-    return False
+    index = await db.get_ticket_permission_index(member.guild.id)
+    return index.is_staff(member.id, {r.id for r in member.roles})
 
 
 async def is_blacklisted(bot, member: discord.Member) -> bool:
@@ -30,11 +34,201 @@ async def is_blacklisted(bot, member: discord.Member) -> bool:
     db = getattr(bot, "db", None)
     if db is None:
         return False
-    bl = await db.get_blacklist(member.guild.id)
-    member_role_ids = {r.id for r in member.roles}
-    for entry in bl:
-        if entry["is_role"] and entry["entity_id"] in member_role_ids:
-            return True
-        if not entry["is_role"] and entry["entity_id"] == member.id:
-            return True
-    return False
+    index = await db.get_ticket_permission_index(member.guild.id)
+    return index.is_blacklisted(member.id, {r.id for r in member.roles})
+
+
+def _seed_workload(guild: discord.Guild, index, workload) -> None:
+    """Nạp staff chưa nhận ticket nào vào heap (quét role một lần mỗi khi staff đổi)."""
+    workload.ensure(index.staff_users)
+    for role_id in index.staff_roles:
+        role = guild.get_role(role_id)
+        if role:
+            workload.ensure(m.id for m in role.members if not m.bot)
+    workload.seeded = True
+
+
+async def auto_assign_ticket(
+    bot, guild: discord.Guild, channel_id: int, owner_id: int
+) -> discord.Member | None:
+    """Giao ticket cho staff đang giữ ít ticket nhất.
+
+    Khi bot có presence intent, ưu tiên staff đang online; không ai online thì
+    giao cho người ít việc nhất bất kể trạng thái.
+    """
+    db = bot.db
+    index = await db.get_ticket_permission_index(guild.id)
+    workload = await db.get_staff_workload(guild.id)
+    if not workload.seeded:
+        _seed_workload(guild, index, workload)
+
+    def eligible(staff_id: int, online_only: bool) -> bool:
+        member = guild.get_member(staff_id)
+        if member is None or member.bot or member.id == owner_id:
+            return False
+        if not index.is_staff(member.id, {r.id for r in member.roles}):
+            return False
+        return not online_only or member.status is not discord.Status.offline
+
+    staff_id = None
+    if bot.intents.presences:
+        staff_id = await db.assign_least_loaded(
+            guild.id, channel_id, lambda i: eligible(i, True)
+        )
+    if staff_id is None:
+        staff_id = await db.assign_least_loaded(
+            guild.id, channel_id, lambda i: eligible(i, False)
+        )
+    return guild.get_member(staff_id) if staff_id is not None else None
+
+
+def plan_overwrites(current: dict, changes: dict) -> dict | None:
+    """Gộp thay đổi (target → overwrite, None = gỡ) vào map overwrite hiện tại.
+
+    Trả map đích để gửi trong MỘT ``channel.edit(overwrites=...)``, hoặc None nếu
+    không có gì thay đổi (khỏi tốn request).
+    """
+    target = dict(current)
+    for key, overwrite in changes.items():
+        if overwrite is None:
+            target.pop(key, None)
+        else:
+            target[key] = overwrite
+    return None if target == current else target
+
+
+async def apply_overwrites(
+    channel: discord.TextChannel, changes: dict, *, reason: str | None = None
+) -> bool:
+    """Áp thay đổi overwrite bằng tối đa một request. Trả True nếu đã gọi API."""
+    target = plan_overwrites(channel.overwrites, changes)
+    if target is None:
+        return False
+    await channel.edit(overwrites=target, reason=reason)
+    return True
+
+
+def pool_overwrites(guild: discord.Guild) -> dict:
+    """Kênh dự phòng: ẩn với mọi người, chỉ bot thấy."""
+    ow: dict = {guild.default_role: discord.PermissionOverwrite(view_channel=False)}
+    if guild.me:
+        ow[guild.me] = discord.PermissionOverwrite(
+            view_channel=True,
+            send_messages=True,
+            manage_channels=True,
+            read_message_history=True,
+            embed_links=True,
+            attach_files=True,
+        )
+    return ow
+
+
+async def acquire_pool_channel(
+    bot,
+    guild: discord.Guild,
+    panel: dict,
+    *,
+    name: str,
+    overwrites: dict,
+    topic: str,
+    reason: str,
+) -> discord.TextChannel | None:
+    """Lấy kênh dựng sẵn của panel và biến nó thành ticket bằng MỘT lần edit.
+
+    Trả None khi pool rỗng hoặc không dùng được kênh nào → caller tự quyết fallback.
+    """
+    db = bot.db
+    while True:
+        channel_id = await db.take_pool_channel(panel["panel_id"])
+        if channel_id is None:
+            return None
+        channel = guild.get_channel(channel_id)
+        if not isinstance(channel, discord.TextChannel):
+            # Orphan: admin đã xóa tay kênh dự phòng, row đã bị lấy ra khỏi pool
+            continue
+        try:
+            await channel.edit(
+                name=name, overwrites=overwrites, topic=topic, reason=reason
+            )
+        except discord.NotFound:
+            continue
+        except discord.HTTPException as e:
+            logger.warning(f"Không dùng được kênh dự phòng {channel_id}: {e}")
+            with contextlib.suppress(discord.HTTPException):
+                await channel.delete(reason="Kênh dự phòng lỗi")
+            return None
+        return channel
+
+
+async def resolve_ticket_channel(
+    guild: discord.Guild, channel_id: int
+) -> discord.TextChannel | discord.Thread | None:
+    """Tìm channel/thread của ticket; thread đã archive không nằm trong cache nên hỏi API.
+
+    Trả None khi channel/thread đã bị xóa. Lỗi HTTP khác được ném ra để caller
+    không nhầm lỗi tạm thời thành orphan.
+    """
+    channel = guild.get_channel_or_thread(channel_id)
+    if channel is not None:
+        return channel if isinstance(channel, TICKET_CHANNEL_TYPES) else None
+    try:
+        fetched = await guild.fetch_channel(channel_id)
+    except discord.NotFound:
+        return None
+    return fetched if isinstance(fetched, discord.Thread) else None
+
+
+async def create_ticket_thread(
+    guild: discord.Guild,
+    panel: dict,
+    owner: discord.Member,
+    staff_entries: list[dict],
+    *,
+    name: str,
+    reason: str,
+) -> discord.Thread | None:
+    """Mở private thread dưới kênh chứa panel thay cho một text channel riêng.
+
+    Thread không có overwrite: owner và staff cá nhân được add trực tiếp, staff
+    role được kéo vào bằng mention sửa sau khi gửi (không ping, 3 request cho
+    mọi role). Trả None nếu panel chưa được gửi hoặc kênh chứa panel đã mất.
+    """
+    parent = guild.get_channel(panel.get("channel_id") or 0)
+    if not isinstance(parent, discord.TextChannel):
+        return None
+    thread = await parent.create_thread(
+        name=name,
+        type=discord.ChannelType.private_thread,
+        invitable=False,
+        auto_archive_duration=TICKET_CONFIG["thread_auto_archive_minutes"],
+        reason=reason,
+    )
+    try:
+        await thread.add_user(owner)
+    except discord.HTTPException:
+        # Owner không vào được thread thì thread vô dụng: xóa để không bị rò
+        with contextlib.suppress(discord.HTTPException):
+            await thread.delete(reason="Không thể thêm owner vào ticket")
+        raise
+
+    role_mentions = []
+    for entry in staff_entries:
+        if entry["is_role"]:
+            if guild.get_role(entry["entity_id"]):
+                role_mentions.append(f"<@&{entry['entity_id']}>")
+            continue
+        member = guild.get_member(entry["entity_id"])
+        if member and member.id != owner.id:
+            with contextlib.suppress(discord.HTTPException):
+                await thread.add_user(member)
+
+    if role_mentions:
+        # Mention thêm vào bằng edit không gửi thông báo nhưng vẫn add thành viên role
+        with contextlib.suppress(discord.HTTPException):
+            msg = await thread.send("🛡️ Đang thêm đội ngũ hỗ trợ...")
+            await msg.edit(
+                content=" ".join(role_mentions),
+                allowed_mentions=discord.AllowedMentions(roles=True),
+            )
+            await msg.delete()
+    return thread
@@ -0,0 +1,191 @@
+"""Category tràn (overflow) cho ticket khi category chính đã đủ 50 kênh."""
+
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import discord
+from discord.ext import commands
+
+from utils.constants import TICKET_CONFIG
+from utils.keyed_lock import KeyedLock
+from utils.metrics import metrics
+
+logger = logging.getLogger("BlastBot.Tickets.Overflow")
+
+# Tạo/dọn category tràn tuần tự theo category chính để không tạo trùng số
+_overflow_locks = KeyedLock()
+
+
+class CategoryCounter:
+    """Kênh con của từng category, giữ bằng gateway event thay vì quét guild.channels.
+
+    Category được nạp lười lần đầu hỏi tới; sau đó chỉ cập nhật qua event nên
+    kiểm tra sức chứa là O(1). Slot đang tạo dở được tính vào qua reservation.
+    """
+
+    def __init__(self):
+        self._children: dict[int, set[int]] = {}
+        self._pending: dict[int, int] = {}
+
+    def _ensure(self, category: discord.CategoryChannel) -> set[int]:
+        children = self._children.get(category.id)
+        if children is None:
+            children = self._children[category.id] = {c.id for c in category.channels}
+        return children
+
+    def count(self, category: discord.CategoryChannel) -> int:
+        return len(self._ensure(category)) + self._pending.get(category.id, 0)
+
+    def has_room(self, category: discord.CategoryChannel) -> bool:
+        return self.count(category) < TICKET_CONFIG["category_channel_limit"]
+
+    def add(self, category_id: int, channel_id: int) -> None:
+        if category_id in self._children:
+            self._children[category_id].add(channel_id)
+
+    def discard(self, category_id: int, channel_id: int) -> None:
+        if category_id in self._children:
+            self._children[category_id].discard(channel_id)
+
+    def forget(self, category_id: int) -> None:
+        self._children.pop(category_id, None)
+        self._pending.pop(category_id, None)
+
+    def reserve(self, category_id: int) -> None:
+        self._pending[category_id] = self._pending.get(category_id, 0) + 1
+
+    def release(self, category_id: int) -> None:
+        left = self._pending.get(category_id, 0) - 1
+        if left > 0:
+            self._pending[category_id] = left
+        else:
+            self._pending.pop(category_id, None)
+
+
+category_counter = CategoryCounter()
+
+
+async def _pick_category(
+    bot, primary: discord.CategoryChannel
+) -> discord.CategoryChannel:
+    if category_counter.has_room(primary):
+        category_counter.reserve(primary.id)
+        return primary
+
+    guild = primary.guild
+    async with _overflow_locks.acquire(primary.id):
+        used = set()
+        for row in await bot.db.list_overflow_categories(primary.id):
+            category = guild.get_channel(row["category_id"])
+            if not isinstance(category, discord.CategoryChannel):
+                await bot.db.remove_overflow_category(row["category_id"])
+                continue
+            used.add(row["idx"])
+            if category_counter.has_room(category):
+                category_counter.reserve(category.id)
+                return category
+
+        idx = 2
+        while idx in used:
+            idx += 1
+        category = await guild.create_category(
+            name=f"{primary.name} {idx}",
+            overwrites=primary.overwrites,
+            reason=f"Category ticket tràn (category {primary.name} đã đầy)",
+        )
+        await bot.db.add_overflow_category(guild.id, primary.id, category.id, idx)
+        metrics.incr("ticket.overflow.created")
+        logger.info(f"Tạo category tràn {category.name} ({category.id}) ở {guild}")
+        category_counter.reserve(category.id)
+        return category
+
+
+@asynccontextmanager
+async def reserve_ticket_slot(
+    bot, primary: discord.CategoryChannel
+) -> AsyncIterator[discord.CategoryChannel]:
+    """Giữ một slot trong category chính hoặc category tràn trong lúc tạo kênh.
+
+    Caller nên gọi ``category_counter.add`` ngay khi tạo xong để không phải chờ event.
+    """
+    category = await _pick_category(bot, primary)
+    try:
+        yield category
+    finally:
+        category_counter.release(category.id)
+
+
+async def create_ticket_channel(
+    bot, guild: discord.Guild, category: discord.CategoryChannel | None, **kwargs
+) -> discord.TextChannel:
+    """``create_text_channel`` vào category chính, hoặc category tràn nếu đã đầy."""
+    if category is None:
+        return await guild.create_text_channel(**kwargs)
+    async with reserve_ticket_slot(bot, category) as target:
+        channel = await guild.create_text_channel(category=target, **kwargs)
+        category_counter.add(target.id, channel.id)
+        return channel
+
+
+async def cleanup_overflow_category(
+    bot, guild: discord.Guild, category_id: int, channel_id: int
+):
+    """Gọi sau khi xóa kênh ticket: xóa category tràn nếu nó đã trống."""
+    category_counter.discard(category_id, channel_id)
+    row = await bot.db.get_overflow_category(category_id)
+    if not row:
+        return
+    async with _overflow_locks.acquire(row["primary_id"]):
+        category = guild.get_channel(category_id)
+        if isinstance(category, discord.CategoryChannel):
+            if category_counter.count(category) > 0:
+                return
+            with contextlib.suppress(discord.HTTPException):
+                await category.delete(reason="Category ticket tràn đã trống")
+        await bot.db.remove_overflow_category(category_id)
+        category_counter.forget(category_id)
+
+
+class TicketOverflow(commands.Cog):
+    """Cập nhật bộ đếm kênh theo category từ gateway event."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        if channel.category_id:
+            category_counter.add(channel.category_id, channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        if isinstance(channel, discord.CategoryChannel):
+            category_counter.forget(channel.id)
+            db = getattr(self.bot, "db", None)
+            if db is not None:
+                await db.remove_overflow_category(channel.id)
+        elif channel.category_id:
+            # Kênh ticket bị xóa tay (không qua perform_close) cũng dọn category tràn
+            if getattr(self.bot, "db", None) is not None:
+                await cleanup_overflow_category(
+                    self.bot, channel.guild, channel.category_id, channel.id
+                )
+            else:
+                category_counter.discard(channel.category_id, channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(
+        self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel
+    ):
+        if before.category_id == after.category_id:
+            return
+        if before.category_id:
+            category_counter.discard(before.category_id, before.id)
+        if after.category_id:
+            category_counter.add(after.category_id, after.id)
+
+
+async def setup(bot):
+    await bot.add_cog(TicketOverflow(bot))
@@ -1,5 +1,7 @@
 """Tạo/gửi panel ticket."""
 
+import contextlib
+
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -7,6 +9,7 @@ from discord.ext import commands
 from cogs.moderation.base import require_guild_permissions
 from utils.constants import COLORS, TICKET_CONFIG
 from utils.embeds import create_embed, error_embed, success_embed
+from utils.error_handler import ValidationError, validate_number_range
 
 from .views import TicketPanelView
 
@@ -122,6 +125,9 @@ class TicketPanel(commands.Cog):
             )
         lines = [
             f"`{p['panel_id']}` — **{p['title']}** (Category: <#{p['category_id']}>)"
+            + (" · thread" if p.get("mode") == "thread" else "")
+            + (" · auto-assign" if p.get("auto_assign") else "")
+            + (f" · pool `{p['pool_size']}`" if p.get("pool_size") else "")
             for p in panels
         ]
         await interaction.response.send_message(
@@ -197,12 +203,146 @@ class TicketPanel(commands.Cog):
                 except (discord.NotFound, discord.Forbidden, discord.HTTPException):
                     pass  # admin đã xóa tay rồi, bỏ qua
 
+        # Dọn kênh dự phòng của panel (nếu có)
+        for channel_id in await self.bot.db.list_pool_channels(panel_id):
+            channel = interaction.guild.get_channel(channel_id)
+            if isinstance(channel, discord.TextChannel):
+                with contextlib.suppress(discord.HTTPException):
+                    await channel.delete(reason="Panel ticket bị xóa")
+
         await self.bot.db.delete_panel(panel_id)
         await interaction.response.send_message(
             embed=success_embed("Đã xóa panel", f"Panel `{panel_id}` đã được xóa."),
             ephemeral=True,
         )
 
+    @panel.command(
+        name="pool", description="Cấu hình kênh dựng sẵn giúp mở ticket nhanh hơn"
+    )
+    @app_commands.describe(
+        panel_id="ID panel",
+        size="Số kênh dựng sẵn (0 = tắt)",
+        refill="Số kênh tạo thêm mỗi lượt bổ sung",
+        fallback="Tạo kênh mới khi pool hết kênh?",
+    )
+    @require_guild_permissions(manage_guild=True)
+    async def panel_pool(
+        self,
+        interaction: discord.Interaction,
+        panel_id: int,
+        size: int,
+        refill: int = 1,
+        fallback: bool = True,
+    ):
+        if interaction.guild is None:
+            return
+        try:
+            validate_number_range(
+                size, 0, TICKET_CONFIG["pool_max_size"], "Số kênh dựng sẵn"
+            )
+            validate_number_range(
+                refill, 1, TICKET_CONFIG["pool_max_refill"], "Số kênh mỗi lượt"
+            )
+        except ValidationError as e:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", e.user_message), ephemeral=True
+            )
+        panel = await self.bot.db.get_panel(panel_id)
+        if not panel or panel["guild_id"] != interaction.guild.id:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", "Không tìm thấy panel."), ephemeral=True
+            )
+
+        await self.bot.db.update_panel(
+            panel_id, pool_size=size, pool_refill=refill, pool_fallback=int(fallback)
+        )
+        if size == 0:
+            desc = "Đã tắt pool, kênh dựng sẵn sẽ được dọn ở lượt bổ sung kế tiếp."
+        else:
+            desc = (
+                f"Giữ sẵn **{size}** kênh, bổ sung tối đa **{refill}** kênh mỗi "
+                f"{TICKET_CONFIG['pool_refill_seconds']} giây.\n"
+                f"Khi hết kênh: {'tạo kênh mới' if fallback else 'báo người dùng thử lại'}."
+            )
+        await interaction.response.send_message(
+            embed=success_embed("Đã cấu hình pool", desc), ephemeral=True
+        )
+
+    @panel.command(
+        name="mode", description="Chọn kiểu ticket: channel riêng hoặc private thread"
+    )
+    @app_commands.describe(
+        panel_id="ID panel",
+        mode="channel: mỗi ticket một kênh · thread: private thread dưới kênh chứa panel",
+    )
+    @app_commands.choices(
+        mode=[
+            app_commands.Choice(name="Channel riêng", value="channel"),
+            app_commands.Choice(name="Private thread", value="thread"),
+        ]
+    )
+    @require_guild_permissions(manage_guild=True)
+    async def panel_mode(
+        self,
+        interaction: discord.Interaction,
+        panel_id: int,
+        mode: app_commands.Choice[str],
+    ):
+        if interaction.guild is None:
+            return
+        panel = await self.bot.db.get_panel(panel_id)
+        if not panel or panel["guild_id"] != interaction.guild.id:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", "Không tìm thấy panel."), ephemeral=True
+            )
+
+        await self.bot.db.update_panel(panel_id, mode=mode.value)
+        if mode.value == "thread":
+            desc = (
+                "Ticket mới sẽ là **private thread** dưới kênh chứa panel, "
+                "không tính vào giới hạn kênh của server.\n"
+                "Bot cần quyền **Create Private Threads** và **Manage Threads**; "
+                "staff role cần mentionable (hoặc bot có quyền Mention Everyone) "
+                "để được thêm vào thread."
+            )
+            if not panel.get("channel_id"):
+                desc += "\n⚠️ Panel chưa được gửi — dùng `/panel send` trước."
+        else:
+            desc = "Ticket mới sẽ là channel riêng trong category của panel."
+        await interaction.response.send_message(
+            embed=success_embed("Đã đổi kiểu ticket", desc), ephemeral=True
+        )
+
+    @panel.command(
+        name="autoassign", description="Tự giao ticket mới cho staff ít việc nhất"
+    )
+    @app_commands.describe(panel_id="ID panel", enabled="Bật/tắt tự động giao")
+    @require_guild_permissions(manage_guild=True)
+    async def panel_autoassign(
+        self, interaction: discord.Interaction, panel_id: int, enabled: bool
+    ):
+        if interaction.guild is None:
+            return
+        panel = await self.bot.db.get_panel(panel_id)
+        if not panel or panel["guild_id"] != interaction.guild.id:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", "Không tìm thấy panel."), ephemeral=True
+            )
+
+        await self.bot.db.update_panel(panel_id, auto_assign=int(enabled))
+        if enabled:
+            desc = (
+                "Ticket mới sẽ được claim sẵn cho staff đang giữ ít ticket nhất "
+                "(chỉ tính staff đã thêm qua `/ticket addsupport`)."
+            )
+            if self.bot.intents.presences:
+                desc += "\nStaff đang online được ưu tiên."
+        else:
+            desc = "Staff sẽ tự bấm **Nhận xử lý** như trước."
+        await interaction.response.send_message(
+            embed=success_embed("Đã cập nhật auto-assign", desc), ephemeral=True
+        )
+
     async def _refresh_panel_message(self, guild: discord.Guild, panel_id: int):
         """Cập nhật lại embed của message panel đang hiển thị (nếu còn)."""
         panel = await self.bot.db.get_panel(panel_id)
@@ -0,0 +1,101 @@
+"""Daemon bổ sung pool kênh dựng sẵn (pre-warm) cho panel ticket."""
+
+import contextlib
+import logging
+
+import discord
+from discord.ext import commands, tasks
+
+from utils.constants import TICKET_CONFIG
+from utils.metrics import metrics
+
+from .helpers import pool_overwrites
+from .overflow import category_counter
+
+logger = logging.getLogger("BlastBot.Tickets.Pool")
+
+
+class TicketPool(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.pool_refill.start()
+
+    def cog_unload(self):
+        self.pool_refill.cancel()
+
+    @tasks.loop(seconds=TICKET_CONFIG["pool_refill_seconds"])
+    async def pool_refill(self):
+        db = getattr(self.bot, "db", None)
+        if db is None:
+            return
+        try:
+            for panel in await db.list_pooled_panels():
+                try:
+                    await self._refill_panel(db, panel)
+                except Exception as e:
+                    logger.error(
+                        f"Lỗi khi bổ sung pool cho panel {panel['panel_id']}: {e}",
+                        exc_info=True,
+                    )
+        except Exception as e:
+            logger.error(f"Lỗi khi chạy pool refill: {e}", exc_info=True)
+
+    async def _refill_panel(self, db, panel: dict):
+        guild = self.bot.get_guild(panel["guild_id"])
+        if not guild:
+            return
+        # Pool tắt hoặc panel đã chuyển sang thread → chỉ dọn kênh còn sót
+        pool_size = panel["pool_size"] if panel["mode"] == "channel" else 0
+
+        # Dọn row của kênh đã bị xóa tay
+        alive = []
+        for channel_id in await db.list_pool_channels(panel["panel_id"]):
+            if isinstance(guild.get_channel(channel_id), discord.TextChannel):
+                alive.append(channel_id)
+            else:
+                await db.remove_pool_channel(channel_id)
+
+        # Pool bị thu nhỏ → xóa bớt kênh thừa (cũ nhất trước, list theo created_at)
+        excess = max(0, len(alive) - pool_size)
+        for channel_id in alive[:excess]:
+            channel = guild.get_channel(channel_id)
+            await db.remove_pool_channel(channel_id)
+            if isinstance(channel, discord.TextChannel):
+                with contextlib.suppress(discord.HTTPException):
+                    await channel.delete(reason="Thu nhỏ pool ticket")
+
+        alive = alive[excess:]
+
+        category = guild.get_channel(panel["category_id"])
+        if not isinstance(category, discord.CategoryChannel):
+            return
+        missing = min(pool_size - len(alive), panel["pool_refill"])
+        for _ in range(max(0, missing)):
+            # Không chiếm chỗ của ticket thật khi category sắp đầy
+            if not category_counter.has_room(category):
+                return
+            try:
+                channel = await guild.create_text_channel(
+                    name=TICKET_CONFIG["pool_channel_name"],
+                    category=category,
+                    overwrites=pool_overwrites(guild),
+                    topic=f"Kênh dự phòng cho panel {panel['panel_id']}",
+                    reason="Bổ sung pool ticket",
+                )
+            except discord.HTTPException as e:
+                # Forbidden hoặc rate limit: đợi lượt sau
+                logger.warning(
+                    f"Không tạo được kênh dự phòng cho panel {panel['panel_id']}: {e}"
+                )
+                return
+            category_counter.add(category.id, channel.id)
+            await db.add_pool_channel(guild.id, panel["panel_id"], channel.id)
+            metrics.incr("ticket.pool.refilled")
+
+    @pool_refill.before_loop
+    async def before_pool_refill(self):
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot):
+    await bot.add_cog(TicketPool(bot))
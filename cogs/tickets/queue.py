@@ -0,0 +1,163 @@
+"""Hàng đợi tạo ticket theo guild: giới hạn số luồng open_ticket chạy song song."""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import discord
+
+from utils.constants import TICKET_CONFIG
+from utils.metrics import metrics
+
+logger = logging.getLogger("BlastBot.Tickets.Queue")
+
+
+@dataclass(eq=False)
+class _Entry:
+    enqueued: float = field(default_factory=time.perf_counter)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    message: discord.WebhookMessage | None = None
+    shown_position: int = 0
+
+
+@dataclass
+class _GuildQueue:
+    limit: int
+    active: int = 0
+    waiting: deque[_Entry] = field(default_factory=deque)
+    users: dict[int, _Entry] = field(default_factory=dict)
+    updater: asyncio.Task | None = None
+
+
+class TicketOpenQueue:
+    """Admission control cho luồng tạo ticket.
+
+    Mỗi guild chạy tối đa ``open_concurrency`` lượt open_ticket cùng lúc, phần còn
+    lại xếp hàng FIFO và thấy vị trí của mình trong followup ephemeral. Một user
+    bấm nhiều lần chỉ giữ một chỗ trong hàng.
+    """
+
+    def __init__(self):
+        self._guilds: dict[int, _GuildQueue] = {}
+        self._tasks: set[asyncio.Task] = set()
+        metrics.register_gauge("ticket.queue", self.stats)
+
+    def stats(self) -> dict:
+        return {
+            "waiting": sum(len(q.waiting) for q in self._guilds.values()),
+            "active": sum(q.active for q in self._guilds.values()),
+            "guilds": len(self._guilds),
+        }
+
+    def position(self, guild_id: int, user_id: int) -> int | None:
+        """Vị trí (1-based) của user trong hàng chờ, None nếu không chờ."""
+        q = self._guilds.get(guild_id)
+        entry = q.users.get(user_id) if q else None
+        if q is None or entry is None or entry not in q.waiting:
+            return None
+        return q.waiting.index(entry) + 1
+
+    async def submit(self, bot, interaction: discord.Interaction, run) -> None:
+        """Chạy ``run()`` khi tới lượt. Interaction phải được defer trước."""
+        guild_id = interaction.guild.id
+        user_id = interaction.user.id
+        settings = await bot.db.get_ticket_settings(guild_id)
+        limit = settings.get(
+            "open_concurrency", TICKET_CONFIG["open_concurrency_default"]
+        )
+
+        q = self._guilds.get(guild_id)
+        if q is None:
+            q = self._guilds[guild_id] = _GuildQueue(limit=limit)
+        q.limit = limit
+
+        if user_id in q.users:
+            metrics.incr("ticket.queue.collapsed")
+            pos = self.position(guild_id, user_id)
+            text = (
+                f"⏳ Bạn đã ở vị trí **#{pos}** trong hàng đợi, vui lòng chờ."
+                if pos
+                else "⏳ Ticket của bạn đang được tạo, vui lòng chờ."
+            )
+            await interaction.followup.send(text, ephemeral=True)
+            return
+
+        entry = _Entry()
+        q.users[user_id] = entry
+        try:
+            if q.active >= q.limit or q.waiting:
+                q.waiting.append(entry)
+                entry.shown_position = len(q.waiting)
+                with contextlib.suppress(discord.HTTPException):
+                    entry.message = await interaction.followup.send(
+                        f"⏳ Bạn đang ở vị trí **#{entry.shown_position}** "
+                        "trong hàng đợi tạo ticket.",
+                        ephemeral=True,
+                        wait=True,
+                    )
+                self._ensure_updater(q)
+                try:
+                    await entry.ready.wait()
+                except asyncio.CancelledError:
+                    # Bị huỷ khi đang chờ → trả chỗ (hoặc trả slot đã được nhường)
+                    if entry.ready.is_set():
+                        q.active -= 1
+                        self._admit(q)
+                    else:
+                        q.waiting.remove(entry)
+                    raise
+            else:
+                q.active += 1
+
+            metrics.observe(
+                "ticket.queue.wait", (time.perf_counter() - entry.enqueued) * 1000
+            )
+            try:
+                await run()
+            finally:
+                q.active -= 1
+                self._admit(q)
+        finally:
+            q.users.pop(user_id, None)
+            if not q.active and not q.waiting and not q.users:
+                self._guilds.pop(guild_id, None)
+
+    def _admit(self, q: _GuildQueue) -> None:
+        """Nhường slot trống cho người đứng đầu hàng (slot được giữ sẵn cho họ)."""
+        while q.waiting and q.active < q.limit:
+            entry = q.waiting.popleft()
+            q.active += 1
+            entry.ready.set()
+            if entry.message is not None:
+                task = asyncio.create_task(
+                    self._edit(entry, "🎫 Đã tới lượt bạn, đang tạo ticket...")
+                )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    def _ensure_updater(self, q: _GuildQueue) -> None:
+        if q.updater is None or q.updater.done():
+            q.updater = asyncio.create_task(self._update_positions(q))
+
+    async def _update_positions(self, q: _GuildQueue) -> None:
+        """Cập nhật vị trí định kỳ thay vì sửa mọi message mỗi lần hàng dịch chuyển."""
+        while q.waiting:
+            await asyncio.sleep(TICKET_CONFIG["queue_update_seconds"])
+            for pos, entry in enumerate(list(q.waiting), start=1):
+                if entry.message is not None and entry.shown_position != pos:
+                    entry.shown_position = pos
+                    await self._edit(
+                        entry,
+                        f"⏳ Bạn đang ở vị trí **#{pos}** trong hàng đợi tạo ticket.",
+                    )
+
+    @staticmethod
+    async def _edit(entry: _Entry, content: str) -> None:
+        with contextlib.suppress(discord.HTTPException):
+            await entry.message.edit(content=content)
+
+
+ticket_queue = TicketOpenQueue()
@@ -5,8 +5,11 @@ from discord import app_commands
 from discord.ext import commands
 
 from cogs.moderation.base import require_guild_permissions
-from utils.constants import COLORS, TICKET_CONFIG
+from utils.constants import COLORS, RETENTION_CONFIG, TICKET_CONFIG
 from utils.embeds import create_embed, error_embed, success_embed
+from utils.error_handler import ValidationError, validate_number_range
+
+from .stats import format_ticket_stats
 
 
 class TicketSetup(commands.Cog):
@@ -49,6 +52,35 @@ class TicketSetup(commands.Cog):
             ephemeral=True,
         )
 
+    @ticket.command(
+        name="concurrency",
+        description="Số ticket được tạo song song, phần còn lại xếp hàng",
+    )
+    @app_commands.describe(
+        amount=f"Số ticket tạo cùng lúc (1-{TICKET_CONFIG['max_open_concurrency']})"
+    )
+    @require_guild_permissions(manage_guild=True)
+    async def concurrency(self, interaction: discord.Interaction, amount: int):
+        if interaction.guild is None:
+            return
+        try:
+            validate_number_range(
+                amount, 1, TICKET_CONFIG["max_open_concurrency"], "Số ticket song song"
+            )
+        except ValidationError as e:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", e.user_message), ephemeral=True
+            )
+        await self.bot.db.update_ticket_settings(
+            interaction.guild.id, open_concurrency=amount
+        )
+        await interaction.response.send_message(
+            embed=success_embed(
+                "Đã đặt", f"Tạo tối đa **{amount}** ticket cùng lúc, còn lại xếp hàng."
+            ),
+            ephemeral=True,
+        )
+
     @ticket.command(
         name="autoclose",
         description="Tự đóng ticket sau N giờ không hoạt động (0 = tắt)",
@@ -92,6 +124,140 @@ class TicketSetup(commands.Cog):
             embed=success_embed("Claim mode", f"Đã đặt: {mode.name}"), ephemeral=True
         )
 
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        # Role staff/blacklist bị xóa → dựng lại index quyền ở lần kiểm tra sau
+        db = getattr(self.bot, "db", None)
+        if db is not None:
+            db.invalidate_ticket_permissions(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        # Vừa được cấp role staff → đưa vào heap auto-assign với 0 ticket
+        if before.roles == after.roles or after.bot:
+            return
+        db = getattr(self.bot, "db", None)
+        workload = db.peek_staff_workload(after.guild.id) if db else None
+        if workload is None or not workload.seeded or after.id in workload:
+            return
+        index = await db.get_ticket_permission_index(after.guild.id)
+        if index.is_staff(after.id, {r.id for r in after.roles}):
+            workload.ensure((after.id,))
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        db = getattr(self.bot, "db", None)
+        if db is not None:
+            db.invalidate_ticket_permissions(guild.id)
+
+    @ticket.command(name="stats", description="Thống kê SLA ticket (đọc từ rollup)")
+    @app_commands.describe(
+        days=f"Số ngày gần nhất (1-{TICKET_CONFIG['stats_max_days']}, mặc định 7)"
+    )
+    @require_guild_permissions(manage_guild=True)
+    async def stats(self, interaction: discord.Interaction, days: int = 7):
+        if interaction.guild is None:
+            return
+        try:
+            validate_number_range(days, 1, TICKET_CONFIG["stats_max_days"], "Số ngày")
+        except ValidationError as e:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", e.user_message), ephemeral=True
+            )
+        summary = await self.bot.db.get_ticket_stats(interaction.guild.id, days)
+        staff = await self.bot.db.get_staff_stats(interaction.guild.id, days)
+        embed = create_embed(
+            title=f"📊 Thống kê ticket — {days} ngày",
+            color=COLORS["info"],
+            footer_text="Ngày tính theo UTC",
+        )
+        for name, value in format_ticket_stats(summary, staff).items():
+            embed.add_field(name=name, value=value, inline=name != "🛡️ Staff")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @ticket.command(
+        name="retention",
+        description="Số ngày giữ dữ liệu trước khi chuyển sang kho lưu trữ",
+    )
+    @app_commands.describe(
+        ticket_days="Ticket đã đóng (0 = giữ mãi)",
+        modlog_days="Mod log (0 = giữ mãi)",
+    )
+    @require_guild_permissions(manage_guild=True)
+    async def retention(
+        self,
+        interaction: discord.Interaction,
+        ticket_days: int | None = None,
+        modlog_days: int | None = None,
+    ):
+        if interaction.guild is None:
+            return
+        limit = RETENTION_CONFIG["max_days"]
+        if ticket_days is not None or modlog_days is not None:
+            await self.bot.db.set_retention(
+                interaction.guild.id,
+                ticket_days=None
+                if ticket_days is None
+                else max(0, min(limit, ticket_days)),
+                modlog_days=None
+                if modlog_days is None
+                else max(0, min(limit, modlog_days)),
+            )
+        current = await self.bot.db.get_retention(interaction.guild.id)
+
+        def fmt(days: int) -> str:
+            return "giữ mãi" if days == 0 else f"**{days}** ngày"
+
+        await interaction.response.send_message(
+            embed=success_embed(
+                "Lưu trữ dữ liệu",
+                f"Ticket đã đóng: {fmt(current['ticket_days'])}\n"
+                f"Mod log: {fmt(current['modlog_days'])}\n"
+                "Quá hạn sẽ được chuyển sang file lưu trữ, vẫn xem được qua "
+                "`/ticket history`.",
+            ),
+            ephemeral=True,
+        )
+
+    @ticket.command(name="history", description="Lịch sử ticket (kể cả đã lưu trữ)")
+    @app_commands.describe(user="Chỉ xem ticket của user này")
+    @require_guild_permissions(manage_guild=True)
+    async def history(
+        self, interaction: discord.Interaction, user: discord.User | None = None
+    ):
+        if interaction.guild is None:
+            return
+        await interaction.response.defer(ephemeral=True)
+        rows = await self.bot.db.get_ticket_history(
+            interaction.guild.id,
+            owner_id=user.id if user else None,
+            limit=RETENTION_CONFIG["history_limit"],
+            include_archived=True,
+        )
+        if not rows:
+            return await interaction.followup.send(
+                embed=create_embed(
+                    title="Lịch sử ticket",
+                    description="Chưa có ticket nào.",
+                    color=COLORS["info"],
+                ),
+                ephemeral=True,
+            )
+        lines = [
+            f"`#{r['number']:04d}` <@{r['owner_id']}> · "
+            + ("🟢 đang mở" if r["open"] else f"🔒 {(r['close_time'] or '')[:10]}")
+            + (f" · {r['close_reason']}" if r["close_reason"] else "")
+            for r in rows
+        ]
+        await interaction.followup.send(
+            embed=create_embed(
+                title="🗂️ Lịch sử ticket",
+                description="\n".join(lines)[:4000],
+                color=COLORS["info"],
+            ),
+            ephemeral=True,
+        )
+
     # ---- staff ----
     @ticket.command(name="addsupport", description="Thêm user/role làm support")
     @require_guild_permissions(manage_guild=True)
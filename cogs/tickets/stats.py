@@ -0,0 +1,84 @@
+"""Thống kê ticket: backfill rollup cho ticket cũ và định dạng số liệu cho /ticket stats."""
+
+import logging
+
+from discord.ext import commands, tasks
+
+from utils.constants import TICKET_CONFIG
+
+logger = logging.getLogger("BlastBot.Tickets.Stats")
+
+
+def format_duration(seconds: float | None) -> str:
+    if seconds is None:
+        return "—"
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, _ = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}h{minutes:02d}m"
+    days, hours = divmod(hours, 24)
+    return f"{days}d{hours:02d}h"
+
+
+def _avg(total: int, count: int) -> float | None:
+    return total / count if count else None
+
+
+def format_ticket_stats(summary: dict, staff: list[dict]) -> dict[str, str]:
+    """Chuyển rollup thành các field embed (tên field → nội dung)."""
+    fields = {
+        "📥 Mở / Đóng": f"**{summary['opened']}** / **{summary['closed']}**",
+        "⚡ Phản hồi đầu TB": format_duration(
+            _avg(summary["response_secs"], summary["responded"])
+        ),
+        "✅ Xử lý xong TB": format_duration(
+            _avg(summary["resolution_secs"], summary["closed"])
+        ),
+    }
+    lines = [
+        f"<@{s['staff_id']}> — đóng **{s['closes']}** · nhận **{s['claims']}** · "
+        f"phản hồi TB {format_duration(_avg(s['response_secs'], s['responded']))}"
+        for s in staff
+    ]
+    if lines:
+        fields["🛡️ Staff"] = "\n".join(lines)[:1024]
+    return fields
+
+
+class TicketStats(commands.Cog):
+    """Cộng rollup cho ticket đã đóng từ trước khi có bảng thống kê, theo lô."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.stats_backfill.start()
+
+    def cog_unload(self):
+        self.stats_backfill.cancel()
+
+    @tasks.loop(minutes=TICKET_CONFIG["stats_backfill_minutes"])
+    async def stats_backfill(self):
+        db = getattr(self.bot, "db", None)
+        if db is None:
+            return
+        try:
+            done = await db.backfill_ticket_stats(TICKET_CONFIG["stats_backfill_batch"])
+            if done:
+                logger.info(f"Đã backfill thống kê cho {done} ticket")
+            else:
+                # Ticket mới được cộng ngay khi đóng nên hết backlog là xong việc
+                self.stats_backfill.stop()
+        except Exception as e:
+            logger.error(f"Lỗi khi backfill thống kê ticket: {e}", exc_info=True)
+
+    @stats_backfill.before_loop
+    async def before_stats_backfill(self):
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot):
+    await bot.add_cog(TicketStats(bot))
@@ -1,19 +1,54 @@
 """Canned responses / tags system cho tickets."""
 
+import logging
+
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 from cogs.moderation.base import require_guild_permissions
-from utils.constants import COLORS
+from utils.constants import COLORS, TICKET_CONFIG
 from utils.embeds import create_embed, error_embed, success_embed
 
 from .helpers import is_ticket_staff
 
+logger = logging.getLogger("BlastBot.Tickets.Tags")
+
 
 class TicketTags(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.flush_usage.start()
+
+    def cog_unload(self):
+        self.flush_usage.cancel()
+
+    @tasks.loop(seconds=TICKET_CONFIG["tag_usage_flush_seconds"])
+    async def flush_usage(self):
+        db = getattr(self.bot, "db", None)
+        if db is None:
+            return
+        try:
+            await db.flush_tag_usage()
+        except Exception as e:
+            logger.error(f"Lỗi khi ghi lượt dùng tag: {e}", exc_info=True)
+
+    @flush_usage.before_loop
+    async def before_flush_usage(self):
+        await self.bot.wait_until_ready()
+
+    async def tag_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        """Gợi ý từ index trong bộ nhớ, tag dùng nhiều xếp trước."""
+        db = getattr(self.bot, "db", None)
+        if db is None or interaction.guild is None:
+            return []
+        index = await db.get_tag_index(interaction.guild.id)
+        return [
+            app_commands.Choice(name=tag_id, value=tag_id)
+            for tag_id in index.complete(current)
+        ]
 
     managetags = app_commands.Group(
         name="managetags",
@@ -25,6 +60,7 @@ class TicketTags(commands.Cog):
     @app_commands.command(name="tag", description="💬 Trả lời nhanh bằng tag mẫu")
     @app_commands.describe(tag_id="Mã tag cần gửi")
     @app_commands.guild_only()
+    @app_commands.autocomplete(tag_id=tag_autocomplete)
     async def tag_cmd(self, interaction: discord.Interaction, tag_id: str):
         if interaction.guild is None or interaction.channel is None:
             return
@@ -48,6 +84,7 @@ class TicketTags(commands.Cog):
             )
 
         await interaction.response.send_message(content)
+        self.bot.db.record_tag_use(interaction.guild.id, tag_id)
 
     @managetags.command(name="add", description="Thêm hoặc sửa tag mẫu")
     @require_guild_permissions(manage_guild=True)
@@ -64,6 +101,7 @@ class TicketTags(commands.Cog):
         )
 
     @managetags.command(name="delete", description="Xóa tag mẫu")
+    @app_commands.autocomplete(tag_id=tag_autocomplete)
     @require_guild_permissions(manage_guild=True)
     async def tag_delete(self, interaction: discord.Interaction, tag_id: str):
         if interaction.guild is None:
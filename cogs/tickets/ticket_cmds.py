@@ -1,14 +1,16 @@
 """Standalone ticket moderation slash commands."""
 
 import logging
+import time
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
 from utils.embeds import success_embed
+from utils.metrics import metrics
 
-from .helpers import is_ticket_staff
+from .helpers import TICKET_CHANNEL_TYPES, apply_overwrites, is_ticket_staff
 from .views import apply_claim_perms
 
 logger = logging.getLogger("BlastBot.Tickets.Cmds")
@@ -37,14 +39,21 @@ class TicketCommands(commands.Cog):
             )
 
         if isinstance(interaction.channel, discord.TextChannel):
-            await interaction.channel.set_permissions(
-                member,
-                view_channel=True,
-                send_messages=True,
-                read_message_history=True,
-                attach_files=True,
-                embed_links=True,
+            await apply_overwrites(
+                interaction.channel,
+                {
+                    member: discord.PermissionOverwrite(
+                        view_channel=True,
+                        send_messages=True,
+                        read_message_history=True,
+                        attach_files=True,
+                        embed_links=True,
+                    )
+                },
+                reason=f"Thêm vào ticket bởi {interaction.user}",
             )
+        elif isinstance(interaction.channel, discord.Thread):
+            await interaction.channel.add_user(member)
         await self.bot.db.add_ticket_member(interaction.channel.id, member.id)
         await interaction.response.send_message(
             embed=success_embed("Đã thêm", f"Đã thêm {member.mention} vào ticket.")
@@ -75,7 +84,13 @@ class TicketCommands(commands.Cog):
             )
 
         if isinstance(interaction.channel, discord.TextChannel):
-            await interaction.channel.set_permissions(member, overwrite=None)
+            await apply_overwrites(
+                interaction.channel,
+                {member: None},
+                reason=f"Gỡ khỏi ticket bởi {interaction.user}",
+            )
+        elif isinstance(interaction.channel, discord.Thread):
+            await interaction.channel.remove_user(member)
         await self.bot.db.remove_ticket_member(interaction.channel.id, member.id)
         await interaction.response.send_message(
             embed=success_embed("Đã gỡ", f"Đã gỡ {member.mention} khỏi ticket.")
@@ -100,7 +115,7 @@ class TicketCommands(commands.Cog):
             )
 
         clean_name = name.lower().replace(" ", "-")[:100]
-        if isinstance(interaction.channel, discord.TextChannel):
+        if isinstance(interaction.channel, TICKET_CHANNEL_TYPES):
             await interaction.channel.edit(name=clean_name)
         await interaction.response.send_message(
             embed=success_embed(
@@ -134,9 +149,11 @@ class TicketCommands(commands.Cog):
                 "❌ Người nhận chuyển giao phải là staff.", ephemeral=True
             )
 
+        started = time.perf_counter()
         await self.bot.db.set_claim(interaction.channel.id, staff.id)
         if isinstance(interaction.channel, discord.TextChannel):
             await apply_claim_perms(self.bot, interaction.channel, ticket, staff)
+        metrics.observe("ticket.claim", (time.perf_counter() - started) * 1000)
         await interaction.response.send_message(
             embed=success_embed(
                 "Đã chuyển giao", f"Đã chuyển giao ticket cho {staff.mention}."
@@ -1,25 +1,32 @@
-import asyncio
 import contextlib
 import logging
-from collections import defaultdict
+import time
 
 import discord
 
 from utils.constants import COLORS
 from utils.embeds import create_embed, error_embed, success_embed
+from utils.keyed_lock import KeyedLock
+from utils.metrics import metrics
 from utils.transcript import generate_transcript
 
-from .helpers import is_blacklisted, is_ticket_staff
+from .helpers import (
+    TICKET_CHANNEL_TYPES,
+    acquire_pool_channel,
+    apply_overwrites,
+    auto_assign_ticket,
+    create_ticket_thread,
+    is_blacklisted,
+    is_ticket_staff,
+)
+from .overflow import cleanup_overflow_category, create_ticket_channel
+from .queue import ticket_queue
 
 logger = logging.getLogger("BlastBot.Tickets.Views")
 
 # Synchronize user ticket creation per (guild, user) to prevent concurrent creation races.
-# Trade-off: Keeps an asyncio.Lock per active user in memory.
-_user_open_locks: defaultdict[tuple[int, int], asyncio.Lock] = defaultdict(asyncio.Lock)
-
-
-def _get_user_open_lock(guild_id: int, user_id: int) -> asyncio.Lock:
-    return _user_open_locks[(guild_id, user_id)]
+# Entry bị xóa khi user tạo xong nên bộ nhớ không tăng theo số user từng mở ticket.
+_user_open_locks = KeyedLock("ticket.open")
 
 
 def build_overwrites(
@@ -61,7 +68,7 @@ def build_overwrites(
 async def apply_claim_perms(
     bot, channel: discord.TextChannel, ticket: dict, claimer: discord.Member
 ):
-    """Theo claim_mode: khoá quyền gửi của staff khác."""
+    """Theo claim_mode: khoá quyền gửi của staff khác (gộp thành một lần edit)."""
     settings = await bot.db.get_ticket_settings(channel.guild.id)
     mode = settings.get("claim_mode", "reply_only")
     if mode != "reply_only":
@@ -69,44 +76,39 @@ async def apply_claim_perms(
 
     staff = await bot.db.get_staff(channel.guild.id)
     owner_id = ticket["owner_id"]
+    read_only = discord.PermissionOverwrite(
+        view_channel=True, send_messages=False, read_message_history=True
+    )
 
+    changes: dict = {}
     for entry in staff:
         if entry["is_role"]:
             role = channel.guild.get_role(entry["entity_id"])
             if role:
-                with contextlib.suppress(discord.HTTPException):
-                    await channel.set_permissions(
-                        role,
-                        view_channel=True,
-                        send_messages=False,
-                        read_message_history=True,
-                    )
+                changes[role] = read_only
         else:
             member = channel.guild.get_member(entry["entity_id"])
             if member and member.id not in {claimer.id, owner_id}:
-                with contextlib.suppress(discord.HTTPException):
-                    await channel.set_permissions(
-                        member,
-                        view_channel=True,
-                        send_messages=False,
-                        read_message_history=True,
-                    )
+                changes[member] = read_only
+    changes[claimer] = discord.PermissionOverwrite(
+        view_channel=True,
+        send_messages=True,
+        attach_files=True,
+        embed_links=True,
+        read_message_history=True,
+    )
 
     with contextlib.suppress(discord.HTTPException):
-        await channel.set_permissions(
-            claimer,
-            view_channel=True,
-            send_messages=True,
-            attach_files=True,
-            embed_links=True,
-            read_message_history=True,
-        )
+        await apply_overwrites(channel, changes, reason=f"Ticket claim bởi {claimer}")
 
 
 async def perform_close(
-    bot, channel: discord.TextChannel, closer: discord.abc.User, reason: str | None
+    bot,
+    channel: discord.TextChannel | discord.Thread,
+    closer: discord.abc.User,
+    reason: str | None,
 ):
-    """Lưu transcript → log → xóa channel."""
+    """Lưu transcript → log → xóa channel (hoặc thread)."""
     db = bot.db
     ticket = await db.get_ticket_by_channel(channel.id)
     if not ticket:
@@ -135,6 +137,30 @@ async def perform_close(
         logger.error(f"Transcript lỗi: {e}")
     with contextlib.suppress(discord.HTTPException):
         await channel.delete(reason=f"Ticket đóng bởi {closer}")
+    if isinstance(channel, discord.TextChannel) and channel.category_id:
+        await cleanup_overflow_category(
+            bot, channel.guild, channel.category_id, channel.id
+        )
+
+
+async def _auto_assign(
+    bot,
+    guild: discord.Guild,
+    channel: discord.TextChannel | discord.Thread,
+    owner: discord.Member,
+):
+    assignee = await auto_assign_ticket(bot, guild, channel.id, owner.id)
+    if assignee is None:
+        return
+    metrics.incr("ticket.auto_assign")
+    if isinstance(channel, discord.TextChannel):
+        await apply_claim_perms(bot, channel, {"owner_id": owner.id}, assignee)
+    with contextlib.suppress(discord.HTTPException):
+        await channel.send(
+            embed=success_embed(
+                "Đã tự động giao", f"{assignee.mention} phụ trách ticket này."
+            )
+        )
 
 
 async def open_ticket(bot, interaction: discord.Interaction, panel: dict | None):
@@ -146,7 +172,8 @@ async def open_ticket(bot, interaction: discord.Interaction, panel: dict | None)
         )
         return
 
-    async with _get_user_open_lock(guild.id, interaction.user.id):
+    started = time.perf_counter()
+    async with _user_open_locks.acquire((guild.id, interaction.user.id)):
         db = bot.db
         settings = await db.get_ticket_settings(guild.id)
 
@@ -164,12 +191,17 @@ async def open_ticket(bot, interaction: discord.Interaction, panel: dict | None)
             )
             return
 
+        mode = panel.get("mode", "channel") if panel else "channel"
         category = (
             guild.get_channel(panel["category_id"])
             if panel and panel.get("category_id")
             else None
         )
-        if panel and not isinstance(category, discord.CategoryChannel):
+        if (
+            panel
+            and mode == "channel"
+            and not isinstance(category, discord.CategoryChannel)
+        ):
             await interaction.followup.send(
                 "❌ Category ticket không hợp lệ.", ephemeral=True
             )
@@ -177,21 +209,86 @@ async def open_ticket(bot, interaction: discord.Interaction, panel: dict | None)
 
         number = await db.next_ticket_number(guild.id)
         staff_entries = await db.get_staff(guild.id)
-        overwrites = build_overwrites(guild, interaction.user, staff_entries)
-
-        try:
-            channel = await guild.create_text_channel(
-                name=f"ticket-{number:04d}",
-                category=category,
-                overwrites=overwrites,
-                topic=f"Ticket #{number} | Owner: {interaction.user.id}",
-                reason=f"Ticket bởi {interaction.user}",
-            )
-        except discord.Forbidden:
-            await interaction.followup.send(
-                "❌ Bot thiếu quyền Manage Channels.", ephemeral=True
-            )
-            return
+        name = f"ticket-{number:04d}"
+        topic = f"Ticket #{number} | Owner: {interaction.user.id}"
+        reason = f"Ticket bởi {interaction.user}"
+
+        channel = None
+        path = "create"
+        if mode == "thread":
+            try:
+                channel = await create_ticket_thread(
+                    guild,
+                    panel,
+                    interaction.user,
+                    staff_entries,
+                    name=name,
+                    reason=reason,
+                )
+            except discord.Forbidden:
+                await interaction.followup.send(
+                    "❌ Bot thiếu quyền Create Private Threads.", ephemeral=True
+                )
+                return
+            except discord.HTTPException as e:
+                logger.error(f"Không tạo được thread ticket ở {guild}: {e}")
+                await interaction.followup.send(
+                    "❌ Không tạo được ticket, vui lòng thử lại sau.", ephemeral=True
+                )
+                return
+            if channel is None:
+                await interaction.followup.send(
+                    "❌ Panel chưa được gửi hoặc kênh chứa panel đã bị xóa.",
+                    ephemeral=True,
+                )
+                return
+            path = "thread"
+        else:
+            overwrites = build_overwrites(guild, interaction.user, staff_entries)
+            if panel and panel.get("pool_size"):
+                channel = await acquire_pool_channel(
+                    bot,
+                    guild,
+                    panel,
+                    name=name,
+                    overwrites=overwrites,
+                    topic=topic,
+                    reason=reason,
+                )
+                if channel is not None:
+                    path = "pool"
+                else:
+                    metrics.incr("ticket.pool.miss")
+                    if not panel.get("pool_fallback", 1):
+                        await interaction.followup.send(
+                            "❌ Hệ thống đang quá tải, vui lòng thử lại sau ít phút.",
+                            ephemeral=True,
+                        )
+                        return
+
+            if channel is None:
+                try:
+                    channel = await create_ticket_channel(
+                        bot,
+                        guild,
+                        category,
+                        name=name,
+                        overwrites=overwrites,
+                        topic=topic,
+                        reason=reason,
+                    )
+                except discord.Forbidden:
+                    await interaction.followup.send(
+                        "❌ Bot thiếu quyền Manage Channels.", ephemeral=True
+                    )
+                    return
+                except discord.HTTPException as e:
+                    logger.error(f"Không tạo được kênh ticket ở {guild}: {e}")
+                    await interaction.followup.send(
+                        "❌ Không tạo được kênh ticket, vui lòng thử lại sau.",
+                        ephemeral=True,
+                    )
+                    return
 
         await db.create_ticket(
             guild.id,
@@ -225,10 +322,16 @@ async def open_ticket(bot, interaction: discord.Interaction, panel: dict | None)
             embed=embed,
             view=TicketControlView(bot),
         )
+        if panel and panel.get("auto_assign"):
+            await _auto_assign(bot, guild, channel, interaction.user)
         await interaction.followup.send(
             f"✅ Đã tạo ticket: {channel.mention}", ephemeral=True
         )
-        logger.info(f"{interaction.user} mở ticket #{number} ({channel.id})")
+        # p50/p99 tách theo đường đi để so sánh pool với tạo kênh trực tiếp
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.observe(f"ticket.open.{path}", elapsed_ms)
+        metrics.observe("ticket.open", elapsed_ms)
+        logger.info(f"{interaction.user} mở ticket #{number} ({channel.id}, {path})")
 
 
 class TicketPanelView(discord.ui.View):
@@ -258,17 +361,17 @@ class TicketPanelView(discord.ui.View):
         db = getattr(bot, "db", None)
         if db is None or interaction.guild is None or interaction.message is None:
             return
-        panels = await db.list_panels(interaction.guild.id)
-        panel = next(
-            (p for p in panels if p["message_id"] == interaction.message.id), None
-        )
-        if panel is None:
-            await interaction.response.send_message(
+        # Defer trước để không vượt 3 giây khi DB/gateway chậm
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        panel = await db.get_panel_by_message(interaction.message.id)
+        if panel is None or panel["guild_id"] != interaction.guild.id:
+            await interaction.followup.send(
                 "❌ Panel này không còn tồn tại.", ephemeral=True
             )
             return
-        await interaction.response.defer(ephemeral=True, thinking=True)
-        await open_ticket(bot, interaction, panel)
+        await ticket_queue.submit(
+            bot, interaction, lambda: open_ticket(bot, interaction, panel)
+        )
 
 
 class TicketControlView(discord.ui.View):
@@ -306,9 +409,12 @@ class TicketControlView(discord.ui.View):
             return await interaction.response.send_message(
                 f"❌ Đã được <@{ticket['claimed_by']}> nhận.", ephemeral=True
             )
+        started = time.perf_counter()
         await db.set_claim(interaction.channel.id, interaction.user.id)
+        # Thread không có overwrite riêng nên claim chỉ được ghi nhận, không khoá quyền
         if isinstance(interaction.channel, discord.TextChannel):
             await apply_claim_perms(bot, interaction.channel, ticket, interaction.user)
+        metrics.observe("ticket.claim", (time.perf_counter() - started) * 1000)
         await interaction.response.send_message(
             embed=success_embed(
                 "Đã nhận xử lý", f"{interaction.user.mention} phụ trách ticket này."
@@ -357,7 +463,7 @@ class ConfirmCloseView(discord.ui.View):
         bot = self.bot or interaction.client
         db = getattr(bot, "db", None)
 
-        if db is None or not isinstance(interaction.channel, discord.TextChannel):
+        if db is None or not isinstance(interaction.channel, TICKET_CHANNEL_TYPES):
             await interaction.response.send_message(
                 "❌ Không xác định được ticket.", ephemeral=True
             )
@@ -400,7 +506,7 @@ class ConfirmCloseView(discord.ui.View):
             ),
             view=None,
         )
-        if isinstance(interaction.channel, discord.TextChannel):
+        if isinstance(interaction.channel, TICKET_CHANNEL_TYPES):
             await perform_close(bot, interaction.channel, interaction.user, None)
 
     @discord.ui.button(label="Hủy", style=discord.ButtonStyle.secondary, emoji="❌")
@@ -443,7 +549,7 @@ class CloseRequestView(discord.ui.View):
         await interaction.response.edit_message(
             content="Đang đóng ticket...", view=None
         )
-        if isinstance(interaction.channel, discord.TextChannel):
+        if isinstance(interaction.channel, TICKET_CHANNEL_TYPES):
             await perform_close(bot, interaction.channel, interaction.user, self.reason)
 
     @discord.ui.button(
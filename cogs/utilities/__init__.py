@@ -1,6 +1,8 @@
-"""Utilities module - Role management commands"""
+"""Utilities module - Role management commands role job hàng loạt và role menu"""
 
 from .feedback import Feedback
+from .role_jobs import RoleJobs
+from .role_menus import RoleMenus
 from .roles import RolesCommand
 
 
@@ -8,3 +10,5 @@ async def setup(bot):
     """Load all utility commands"""
     await bot.add_cog(RolesCommand(bot))
     await bot.add_cog(Feedback(bot))
+    await bot.add_cog(RoleJobs(bot))
+    await bot.add_cog(RoleMenus(bot))
@@ -0,0 +1,533 @@
+"""Role job - gán/gỡ role hàng loạt chạy nền, lưu tiến độ để chạy tiếp sau restart"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable
+from datetime import timedelta
+
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+
+from cogs.moderation.base import require_guild_permissions
+from cogs.moderation.mass import MassProgress, run_each
+from utils.constants import COLORS, COMMAND_COOLDOWNS, ROLE_JOB_CONFIG
+from utils.embeds import create_embed, error_embed, success_embed, warning_embed
+from utils.error_handler import ValidationError, validate_number_range
+from utils.mod_jobs_db import UNFINISHED_JOB_STATUSES
+from utils.views import ConfirmView
+
+logger = logging.getLogger("BlastBot.Utilities.RoleJobs")
+
+ROLE_ACTIONS = ("role_add", "role_remove")
+MEMBER_KINDS = {"all": "tất cả", "humans": "chỉ người", "bots": "chỉ bot"}
+
+
+async def select_targets(
+    guild: discord.Guild,
+    role: discord.Role,
+    adding: bool,
+    has_role: discord.Role | None = None,
+    joined_within_days: int | None = None,
+    kind: str = "all",
+    chunk_size: int = ROLE_JOB_CONFIG["select_chunk"],
+) -> list[int]:
+    """Member cần đổi: chưa có ``role`` (khi gán) hoặc đang có (khi gỡ), khớp bộ lọc.
+
+    Duyệt cache theo lô và nhường event loop giữa các lô, như ``member_counts``.
+    """
+    since = (
+        discord.utils.utcnow() - timedelta(days=joined_within_days)
+        if joined_within_days
+        else None
+    )
+    targets = []
+    for i, member in enumerate(list(guild.members)):
+        if (i + 1) % chunk_size == 0:
+            await asyncio.sleep(0)
+        if (member.get_role(role.id) is not None) == adding:
+            continue
+        if kind == "humans" and member.bot or kind == "bots" and not member.bot:
+            continue
+        if has_role is not None and member.get_role(has_role.id) is None:
+            continue
+        if since is not None and (member.joined_at is None or member.joined_at < since):
+            continue
+        targets.append(member.id)
+    return targets
+
+
+async def run_role_job(
+    bot,
+    guild: discord.Guild,
+    job: dict,
+    progress: MassProgress | None = None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> str | None:
+    """Chạy các target còn 'pending'. Trả trạng thái cuối ('done' | 'failed'),
+    None nếu dừng giữa chừng do pause/cancel.
+
+    Không có sleep cố định: các request role đi qua HTTP client của discord.py, vốn
+    đọc header rate limit của từng bucket và tự chờ; ``concurrency`` chỉ giới hạn
+    số request đang xếp hàng cùng lúc.
+    """
+    db = bot.db
+    job_id = job["job_id"]
+    role = guild.get_role(job["params"]["role_id"])
+    if role is None:
+        await db.set_mod_job_status(job_id, "failed")
+        return "failed"
+    adding = job["action"] == "role_add"
+    reason = f"[Role job #{job_id}] {job['reason'] or ''}".strip()
+    await db.set_mod_job_status(job_id, "running")
+    pending = await db.get_pending_job_targets(job_id)
+
+    async def apply_one(user_id: int):
+        member = guild.get_member(user_id)
+        if member is None:
+            return "skipped", "Không còn trong server"
+        if (member.get_role(role.id) is not None) == adding:
+            return "skipped", "Đã đúng trạng thái"
+        if adding:
+            await member.add_roles(role, reason=reason)
+        else:
+            await member.remove_roles(role, reason=reason)
+        return "done", None
+
+    try:
+        chunk = ROLE_JOB_CONFIG["chunk"]
+        for i in range(0, len(pending), chunk):
+            if should_stop():
+                return None
+            results = await run_each(
+                guild,
+                pending[i : i + chunk],
+                apply_one,
+                ROLE_JOB_CONFIG["concurrency"],
+            )
+            await db.mark_job_targets(job_id, results)
+            if progress is not None:
+                progress.record(results)
+    finally:
+        if progress is not None:
+            progress.finished = True
+    await db.set_mod_job_status(job_id, "done")
+    return "done"
+
+
+class RoleJobs(commands.Cog):
+    """Role job cog"""
+
+    role = app_commands.Group(
+        name="role",
+        description="Gán/gỡ role hàng loạt",
+        default_permissions=discord.Permissions(manage_roles=True),
+        guild_only=True,
+    )
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._running: dict[int, asyncio.Task] = {}
+        # job_id → trạng thái muốn chuyển sang ('paused' | 'cancelled') ở lô kế tiếp
+        self._stop_requests: dict[int, str] = {}
+        self.resume_jobs.start()
+
+    def cog_unload(self):
+        self.resume_jobs.cancel()
+        for task in self._running.values():
+            task.cancel()
+
+    @tasks.loop(count=1)
+    async def resume_jobs(self):
+        """Chạy tiếp role job bị ngắt do restart (job đang pause thì giữ nguyên)."""
+        db = getattr(self.bot, "db", None)
+        if db is None:
+            return
+        try:
+            jobs = await db.list_unfinished_mod_jobs(ROLE_ACTIONS)
+        except Exception as e:
+            logger.error(f"Lỗi khi đọc role job dở dang: {e}", exc_info=True)
+            return
+        for job in jobs:
+            guild = self.bot.get_guild(job["guild_id"])
+            if guild is None:
+                await db.set_mod_job_status(job["job_id"], "failed")
+                continue
+            logger.info(f"Chạy tiếp role job #{job['job_id']}")
+            await self._start(guild, job)
+
+    @resume_jobs.before_loop
+    async def before_resume_jobs(self):
+        await self.bot.wait_until_ready()
+
+    # ---------- chạy job ----------
+    def _progress_embed(self, job: dict, progress: MassProgress, state: str):
+        verb = "Gán" if job["action"] == "role_add" else "Gỡ"
+        processed = progress.done + progress.failed + progress.skipped
+        pct = processed * 100 // progress.total if progress.total else 100
+        return create_embed(
+            title=f"🎭 Role job #{job['job_id']} — {state}",
+            description=(
+                f"{verb} <@&{job['params']['role_id']}>\n"
+                f"**{processed}/{progress.total}** ({pct}%) · ✅ {progress.done} · "
+                f"❌ {progress.failed} · ⏭️ {progress.skipped}"
+            ),
+            color=COLORS["success"] if state == "Hoàn tất" else COLORS["info"],
+        )
+
+    def _progress_message(
+        self, guild: discord.Guild, job: dict
+    ) -> discord.PartialMessage | None:
+        channel = guild.get_channel_or_thread(job["params"].get("channel_id") or 0)
+        if not isinstance(channel, (discord.TextChannel, discord.Thread)):
+            return None
+        return channel.get_partial_message(job["params"]["message_id"])
+
+    async def _start(self, guild: discord.Guild, job: dict):
+        counts = await self.bot.db.get_job_target_counts(job["job_id"])
+        progress = MassProgress(
+            total=job["total"],
+            done=counts.get("done", 0),
+            failed=counts.get("failed", 0),
+            skipped=counts.get("skipped", 0),
+        )
+        task = asyncio.create_task(self._run(guild, job, progress))
+        self._running[job["job_id"]] = task
+
+    async def _run(self, guild: discord.Guild, job: dict, progress: MassProgress):
+        job_id = job["job_id"]
+        message = self._progress_message(guild, job)
+
+        async def report():
+            # Sửa embed tối đa mỗi progress_interval_seconds, không theo từng target
+            while not progress.finished:
+                await asyncio.sleep(ROLE_JOB_CONFIG["progress_interval_seconds"])
+                if message is not None and not progress.finished:
+                    with contextlib.suppress(discord.HTTPException):
+                        await message.edit(
+                            embed=self._progress_embed(job, progress, "Đang chạy")
+                        )
+
+        reporter = asyncio.create_task(report())
+        state = "Lỗi"
+        try:
+            status = await run_role_job(
+                self.bot,
+                guild,
+                job,
+                progress,
+                should_stop=lambda: job_id in self._stop_requests,
+            )
+            if status == "done":
+                state = "Hoàn tất"
+            elif status is None:
+                stop = self._stop_requests[job_id]
+                await self.bot.db.set_mod_job_status(job_id, stop)
+                state = "Tạm dừng" if stop == "paused" else "Đã hủy"
+            logger.info(f"Role job #{job_id} ở {guild}: {state}")
+        except Exception as e:
+            logger.error(f"Lỗi khi chạy role job #{job_id}: {e}", exc_info=True)
+            await self.bot.db.set_mod_job_status(job_id, "failed")
+        finally:
+            reporter.cancel()
+            self._running.pop(job_id, None)
+            self._stop_requests.pop(job_id, None)
+        if message is not None:
+            with contextlib.suppress(discord.HTTPException):
+                await message.edit(embed=self._progress_embed(job, progress, state))
+
+    # ---------- tạo job ----------
+    def _check_role(self, interaction: discord.Interaction, role: discord.Role):
+        if role.is_default() or role.managed:
+            return "Không thể gán/gỡ role này (@everyone hoặc role do integration quản lý)."
+        me = interaction.guild.me
+        if role >= me.top_role:
+            return "Role cao hơn hoặc bằng role cao nhất của bot."
+        if (
+            role >= interaction.user.top_role
+            and interaction.user.id != interaction.guild.owner_id
+        ):
+            return "Role cao hơn hoặc bằng highest role của bạn."
+        return None
+
+    async def _create(
+        self,
+        interaction: discord.Interaction,
+        action: str,
+        role: discord.Role,
+        has_role: discord.Role | None,
+        joined_within_days: int | None,
+        kind: str,
+    ):
+        guild = interaction.guild
+        if guild is None or not isinstance(interaction.user, discord.Member):
+            return
+        try:
+            if joined_within_days is not None:
+                validate_number_range(
+                    joined_within_days,
+                    1,
+                    ROLE_JOB_CONFIG["max_join_window_days"],
+                    "Số ngày join",
+                )
+        except ValidationError as e:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", e.user_message), ephemeral=True
+            )
+        if problem := self._check_role(interaction, role):
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", problem), ephemeral=True
+            )
+        db = self.bot.db
+        active = await db.list_active_mod_jobs(guild.id, ROLE_ACTIONS)
+        if len(active) >= ROLE_JOB_CONFIG["max_active_per_guild"]:
+            return await interaction.response.send_message(
+                embed=error_embed(
+                    "Lỗi",
+                    f"Đã có {len(active)} role job chưa xong. Dùng `/role jobs` để xem.",
+                ),
+                ephemeral=True,
+            )
+
+        adding = action == "role_add"
+        user_ids = await select_targets(
+            guild, role, adding, has_role, joined_within_days, kind
+        )
+        if not user_ids:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", "Không có member nào khớp bộ lọc."),
+                ephemeral=True,
+            )
+        if len(user_ids) > ROLE_JOB_CONFIG["max_targets"]:
+            return await interaction.response.send_message(
+                embed=error_embed(
+                    "Lỗi",
+                    f"Tối đa {ROLE_JOB_CONFIG['max_targets']} member mỗi job "
+                    f"(đang có {len(user_ids)}).",
+                ),
+                ephemeral=True,
+            )
+
+        filters = [MEMBER_KINDS[kind]]
+        if has_role is not None:
+            filters.append(f"có {has_role.mention}")
+        if joined_within_days:
+            filters.append(f"join trong {joined_within_days} ngày")
+        view = ConfirmView(interaction.user)
+        await interaction.response.send_message(
+            embed=warning_embed(
+                "Xác nhận role job",
+                f"Sẽ **{'gán' if adding else 'gỡ'}** {role.mention} "
+                f"{'cho' if adding else 'khỏi'} **{len(user_ids)}** member "
+                f"({', '.join(filters)}).",
+            ),
+            view=view,
+            ephemeral=True,
+        )
+        await view.wait()
+        if not view.value:
+            return await interaction.edit_original_response(
+                embed=error_embed("Đã hủy", "Đã hủy role job."), view=None
+            )
+
+        # Tin tiến độ là tin thường (không phải interaction) để sửa được quá 15 phút
+        try:
+            message = await interaction.channel.send(
+                embed=create_embed(
+                    title="🎭 Role job — đang khởi tạo", color=COLORS["info"]
+                )
+            )
+        except discord.HTTPException:
+            message = None
+        job_id = await db.create_mod_job(
+            guild.id,
+            interaction.user.id,
+            action,
+            f"bởi {interaction.user}",
+            {
+                "role_id": role.id,
+                "channel_id": message.channel.id if message else None,
+                "message_id": message.id if message else None,
+            },
+            user_ids,
+        )
+        await self._start(guild, await db.get_mod_job(job_id))
+        logger.info(
+            f"{interaction.user} tạo role job #{job_id} ({action} {role.name}, "
+            f"{len(user_ids)} member) ở {guild}"
+        )
+        await interaction.edit_original_response(
+            embed=success_embed(
+                "Đã bắt đầu",
+                f"Role job `#{job_id}` đang chạy nền. "
+                "Dùng `/role pause`, `/role cancel` để điều khiển.",
+            ),
+            view=None,
+        )
+
+    @role.command(name="all", description="➕ Gán role cho mọi member khớp bộ lọc")
+    @app_commands.describe(
+        role="Role cần gán",
+        has_role="Chỉ member đang có role này",
+        joined_within_days="Chỉ member join trong N ngày gần nhất",
+        members="Người, bot hay tất cả",
+    )
+    @app_commands.choices(
+        members=[app_commands.Choice(name=v, value=k) for k, v in MEMBER_KINDS.items()]
+    )
+    @require_guild_permissions(manage_roles=True)
+    @app_commands.checks.cooldown(
+        1, COMMAND_COOLDOWNS["role_job"], key=lambda i: i.guild_id
+    )
+    async def role_all(
+        self,
+        interaction: discord.Interaction,
+        role: discord.Role,
+        has_role: discord.Role | None = None,
+        joined_within_days: int | None = None,
+        members: app_commands.Choice[str] | None = None,
+    ):
+        await self._create(
+            interaction,
+            "role_add",
+            role,
+            has_role,
+            joined_within_days,
+            members.value if members else "all",
+        )
+
+    @role.command(name="strip", description="➖ Gỡ role khỏi mọi member khớp bộ lọc")
+    @app_commands.describe(
+        role="Role cần gỡ",
+        has_role="Chỉ member đang có thêm role này",
+        joined_within_days="Chỉ member join trong N ngày gần nhất",
+        members="Người, bot hay tất cả",
+    )
+    @app_commands.choices(
+        members=[app_commands.Choice(name=v, value=k) for k, v in MEMBER_KINDS.items()]
+    )
+    @require_guild_permissions(manage_roles=True)
+    @app_commands.checks.cooldown(
+        1, COMMAND_COOLDOWNS["role_job"], key=lambda i: i.guild_id
+    )
+    async def role_strip(
+        self,
+        interaction: discord.Interaction,
+        role: discord.Role,
+        has_role: discord.Role | None = None,
+        joined_within_days: int | None = None,
+        members: app_commands.Choice[str] | None = None,
+    ):
+        await self._create(
+            interaction,
+            "role_remove",
+            role,
+            has_role,
+            joined_within_days,
+            members.value if members else "all",
+        )
+
+    # ---------- điều khiển ----------
+    @role.command(name="jobs", description="Xem các role job chưa xong")
+    @require_guild_permissions(manage_roles=True)
+    async def jobs(self, interaction: discord.Interaction):
+        if interaction.guild is None:
+            return
+        db = self.bot.db
+        active = await db.list_active_mod_jobs(interaction.guild.id, ROLE_ACTIONS)
+        lines = []
+        for job in active:
+            counts = await db.get_job_target_counts(job["job_id"])
+            processed = job["total"] - counts.get("pending", 0)
+            verb = "gán" if job["action"] == "role_add" else "gỡ"
+            lines.append(
+                f"`#{job['job_id']}` {verb} <@&{job['params']['role_id']}> · "
+                f"{processed}/{job['total']} · **{job['status']}**"
+            )
+        await interaction.response.send_message(
+            embed=create_embed(
+                title="🎭 Role jobs",
+                description="\n".join(lines) or "Không có job nào đang chạy.",
+                color=COLORS["info"],
+            ),
+            ephemeral=True,
+        )
+
+    async def _get_job(self, interaction: discord.Interaction, job_id: int):
+        job = await self.bot.db.get_mod_job(job_id)
+        if (
+            job is None
+            or job["guild_id"] != interaction.guild_id
+            or job["action"] not in ROLE_ACTIONS
+        ):
+            await interaction.response.send_message(
+                embed=error_embed("Lỗi", f"Không tìm thấy role job `#{job_id}`."),
+                ephemeral=True,
+            )
+            return None
+        return job
+
+    async def _stop(self, interaction: discord.Interaction, job_id: int, stop: str):
+        job = await self._get_job(interaction, job_id)
+        if job is None:
+            return
+        allowed = UNFINISHED_JOB_STATUSES
+        if stop == "cancelled":
+            allowed += ("paused",)
+        if job["status"] not in allowed:
+            return await interaction.response.send_message(
+                embed=error_embed(
+                    "Lỗi", f"Job `#{job_id}` đang ở trạng thái **{job['status']}**."
+                ),
+                ephemeral=True,
+            )
+        if job_id in self._running:
+            # Runner dừng sau lô hiện tại và tự ghi trạng thái
+            self._stop_requests[job_id] = stop
+        else:
+            await self.bot.db.set_mod_job_status(job_id, stop)
+        await interaction.response.send_message(
+            embed=success_embed(
+                "Đã tạm dừng" if stop == "paused" else "Đã hủy",
+                f"Role job `#{job_id}` sẽ dừng sau lô hiện tại.",
+            ),
+            ephemeral=True,
+        )
+
+    @role.command(name="pause", description="⏸️ Tạm dừng một role job")
+    @app_commands.describe(job_id="ID job (xem `/role jobs`)")
+    @require_guild_permissions(manage_roles=True)
+    async def pause(self, interaction: discord.Interaction, job_id: int):
+        await self._stop(interaction, job_id, "paused")
+
+    @role.command(name="cancel", description="⏹️ Hủy một role job")
+    @app_commands.describe(job_id="ID job (xem `/role jobs`)")
+    @require_guild_permissions(manage_roles=True)
+    async def cancel(self, interaction: discord.Interaction, job_id: int):
+        await self._stop(interaction, job_id, "cancelled")
+
+    @role.command(name="resume", description="▶️ Chạy tiếp role job đang tạm dừng")
+    @app_commands.describe(job_id="ID job (xem `/role jobs`)")
+    @require_guild_permissions(manage_roles=True)
+    async def resume(self, interaction: discord.Interaction, job_id: int):
+        job = await self._get_job(interaction, job_id)
+        if job is None:
+            return
+        if job["status"] != "paused" or job_id in self._running:
+            return await interaction.response.send_message(
+                embed=error_embed(
+                    "Lỗi", f"Job `#{job_id}` không ở trạng thái tạm dừng."
+                ),
+                ephemeral=True,
+            )
+        await self.bot.db.set_mod_job_status(job_id, "pending")
+        await self._start(interaction.guild, job)
+        await interaction.response.send_message(
+            embed=success_embed("Đã chạy tiếp", f"Role job `#{job_id}` đang chạy lại."),
+            ephemeral=True,
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(RoleJobs(bot))
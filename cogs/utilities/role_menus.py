@@ -0,0 +1,360 @@
+"""Role menu tự chọn: nút hoặc select menu, sống qua restart mà không cần view riêng.
+
+Mọi component dùng chung scheme custom_id ``rolemenu:b:<role_id>`` (nút) và
+``rolemenu:s`` (select) đăng ký một lần bằng ``DynamicItem``; cấu hình menu lấy
+theo ``interaction.message.id`` từ index trong bộ nhớ, nạp lười từ DB.
+"""
+
+import contextlib
+import logging
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from cogs.moderation.base import require_guild_permissions
+from cogs.moderation.mass import parse_user_ids
+from utils.constants import COLORS, ROLE_MENU_CONFIG
+from utils.embeds import create_embed, error_embed, success_embed
+
+logger = logging.getLogger("BlastBot.Utilities.RoleMenus")
+
+MODE_LABELS = {
+    "toggle": "Bật/tắt tự do",
+    "unique": "Chỉ giữ một role",
+    "add": "Chỉ nhận, không tự gỡ",
+}
+STYLE_LABELS = {"button": "Nút bấm", "select": "Select menu"}
+
+
+def plan_role_change(
+    owned: set[int],
+    menu_roles: list[int],
+    mode: str,
+    clicked: int | None = None,
+    selected: list[int] | None = None,
+) -> tuple[set[int], set[int]]:
+    """(role cần thêm, role cần gỡ) trong phạm vi menu cho một lần bấm/chọn."""
+    menu = set(menu_roles)
+    current = owned & menu
+    if clicked is not None:
+        if clicked not in menu:
+            return set(), set()
+        if clicked in current:
+            wanted = current if mode == "add" else current - {clicked}
+        elif mode == "unique":
+            wanted = {clicked}
+        else:
+            wanted = current | {clicked}
+    else:
+        # Select persistent không hiện được role member đang có, nên giá trị được
+        # chọn bật/tắt như bấm nút thay vì thay thế các role menu còn lại
+        picked = set(selected or ()) & menu
+        if mode == "add":
+            wanted = current | picked
+        elif mode == "unique":
+            owned_picked = picked & current
+            wanted = current - owned_picked if owned_picked else picked or current
+        else:
+            wanted = current ^ picked
+    return wanted - current, current - wanted
+
+
+async def handle_menu_interaction(
+    interaction: discord.Interaction,
+    clicked: int | None = None,
+    selected: list[int] | None = None,
+):
+    """Áp lựa chọn của member bằng đúng một ``member.edit(roles=...)``."""
+    member = interaction.user
+    if interaction.guild is None or not isinstance(member, discord.Member):
+        return
+    await interaction.response.defer(ephemeral=True)
+    menu = await interaction.client.db.get_role_menu(interaction.message.id)
+    if menu is None:
+        return await interaction.followup.send(
+            embed=error_embed("Lỗi", "Role menu này không còn hoạt động."),
+            ephemeral=True,
+        )
+
+    owned = {r.id for r in member.roles}
+    to_add, to_remove = plan_role_change(
+        owned, menu["role_ids"], menu["mode"], clicked, selected
+    )
+    me = interaction.guild.me
+    added, removed, blocked = [], [], []
+    for role_id in to_add | to_remove:
+        role = interaction.guild.get_role(role_id)
+        if role is None:
+            continue
+        if role.managed or role >= me.top_role:
+            blocked.append(role)
+        elif role_id in to_add:
+            added.append(role)
+        else:
+            removed.append(role)
+
+    if added or removed:
+        roles = [
+            r for r in member.roles if not r.is_default() and r not in removed
+        ] + added
+        try:
+            await member.edit(roles=roles, reason=f"Role menu {interaction.message.id}")
+        except discord.Forbidden:
+            return await interaction.followup.send(
+                embed=error_embed("Lỗi", "Bot không có quyền quản lý các role này."),
+                ephemeral=True,
+            )
+        except discord.HTTPException as e:
+            logger.warning(
+                f"Role menu {interaction.message.id}: edit {member} lỗi: {e}"
+            )
+            return await interaction.followup.send(
+                embed=error_embed("Lỗi", "Không thể cập nhật role, vui lòng thử lại."),
+                ephemeral=True,
+            )
+
+    lines = []
+    if added:
+        lines.append("➕ " + ", ".join(r.mention for r in added))
+    if removed:
+        lines.append("➖ " + ", ".join(r.mention for r in removed))
+    if blocked:
+        lines.append("⚠️ Bot không thể đổi: " + ", ".join(r.mention for r in blocked))
+    await interaction.followup.send(
+        embed=success_embed(
+            "Đã cập nhật role", "\n".join(lines) or "Không có thay đổi."
+        ),
+        ephemeral=True,
+    )
+
+
+class RoleMenuButton(
+    discord.ui.DynamicItem[discord.ui.Button], template=r"rolemenu:b:(?P<role_id>\d+)"
+):
+    def __init__(self, role_id: int, label: str | None = None):
+        super().__init__(
+            discord.ui.Button(
+                label=label,
+                style=discord.ButtonStyle.secondary,
+                custom_id=f"rolemenu:b:{role_id}",
+            )
+        )
+        self.role_id = role_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(int(match["role_id"]), item.label)
+
+    async def callback(self, interaction: discord.Interaction):
+        await handle_menu_interaction(interaction, clicked=self.role_id)
+
+
+class RoleMenuSelect(discord.ui.DynamicItem[discord.ui.Select], template=r"rolemenu:s"):
+    def __init__(self, options: list[discord.SelectOption], max_values: int):
+        super().__init__(
+            discord.ui.Select(
+                custom_id="rolemenu:s",
+                placeholder="Chọn role để nhận hoặc bỏ",
+                min_values=0,
+                max_values=max_values,
+                options=options,
+            )
+        )
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(item.options, item.max_values)
+
+    async def callback(self, interaction: discord.Interaction):
+        await handle_menu_interaction(
+            interaction, selected=[int(v) for v in self.item.values]
+        )
+
+
+def build_menu_view(roles: list[discord.Role], mode: str, style: str):
+    view = discord.ui.View(timeout=None)
+    if style == "select":
+        options = [
+            discord.SelectOption(label=r.name[:100], value=str(r.id)) for r in roles
+        ]
+        view.add_item(RoleMenuSelect(options, 1 if mode == "unique" else len(roles)))
+    else:
+        for role in roles:
+            view.add_item(RoleMenuButton(role.id, role.name[:80]))
+    return view
+
+
+class RoleMenus(commands.Cog):
+    """Role menu cog"""
+
+    rolemenu = app_commands.Group(
+        name="rolemenu",
+        description="Menu tự chọn role bằng nút hoặc select",
+        default_permissions=discord.Permissions(manage_roles=True),
+        guild_only=True,
+    )
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.bot.add_dynamic_items(RoleMenuButton, RoleMenuSelect)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(RoleMenuButton, RoleMenuSelect)
+
+    def _check_roles(
+        self, interaction: discord.Interaction, role_ids: list[int]
+    ) -> tuple[list[discord.Role], str | None]:
+        guild = interaction.guild
+        if not role_ids:
+            return [], "Nhập ít nhất một role (mention hoặc ID)."
+        if len(role_ids) > ROLE_MENU_CONFIG["max_roles"]:
+            return [], f"Tối đa {ROLE_MENU_CONFIG['max_roles']} role mỗi menu."
+        roles = []
+        for role_id in role_ids:
+            role = guild.get_role(role_id)
+            if role is None:
+                return [], f"Không tìm thấy role `{role_id}`."
+            if role.is_default() or role.managed:
+                return [], f"Không thể dùng {role.mention} trong role menu."
+            if role >= guild.me.top_role:
+                return [], f"{role.mention} cao hơn hoặc bằng role cao nhất của bot."
+            if (
+                role >= interaction.user.top_role
+                and interaction.user.id != guild.owner_id
+            ):
+                return [], f"{role.mention} cao hơn hoặc bằng highest role của bạn."
+            roles.append(role)
+        return roles, None
+
+    @rolemenu.command(name="create", description="🎭 Gửi role menu tự chọn")
+    @app_commands.describe(
+        roles="Các role (mention hoặc ID, tối đa 25)",
+        title="Tiêu đề menu",
+        description="Mô tả thêm",
+        style="Nút bấm hay select menu",
+        mode="Cách chọn role",
+        channel="Kênh gửi menu (mặc định kênh hiện tại)",
+    )
+    @app_commands.choices(
+        style=[app_commands.Choice(name=v, value=k) for k, v in STYLE_LABELS.items()],
+        mode=[app_commands.Choice(name=v, value=k) for k, v in MODE_LABELS.items()],
+    )
+    @require_guild_permissions(manage_roles=True)
+    @app_commands.checks.cooldown(1, 10.0, key=lambda i: i.user.id)
+    async def create(
+        self,
+        interaction: discord.Interaction,
+        roles: str,
+        title: app_commands.Range[str, 1, 256],
+        description: app_commands.Range[str, 1, 2000] | None = None,
+        style: app_commands.Choice[str] | None = None,
+        mode: app_commands.Choice[str] | None = None,
+        channel: discord.TextChannel | None = None,
+    ):
+        guild = interaction.guild
+        if guild is None or not isinstance(interaction.user, discord.Member):
+            return
+        role_list, problem = self._check_roles(interaction, parse_user_ids(roles))
+        if problem:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", problem), ephemeral=True
+            )
+        db = self.bot.db
+        if len(await db.list_role_menus(guild.id)) >= ROLE_MENU_CONFIG["max_per_guild"]:
+            return await interaction.response.send_message(
+                embed=error_embed(
+                    "Lỗi",
+                    f"Server đã có tối đa {ROLE_MENU_CONFIG['max_per_guild']} role menu.",
+                ),
+                ephemeral=True,
+            )
+
+        style_value = style.value if style else "button"
+        mode_value = mode.value if mode else "toggle"
+        target = channel or interaction.channel
+        embed = create_embed(
+            title=title,
+            description=(
+                (f"{description}\n\n" if description else "")
+                + "\n".join(f"• {r.mention}" for r in role_list)
+            ),
+            color=COLORS["primary"],
+        )
+        embed.set_footer(text=MODE_LABELS[mode_value])
+        try:
+            message = await target.send(
+                embed=embed, view=build_menu_view(role_list, mode_value, style_value)
+            )
+        except discord.HTTPException:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", f"Không thể gửi menu vào {target.mention}."),
+                ephemeral=True,
+            )
+        await db.create_role_menu(
+            message.id,
+            guild.id,
+            target.id,
+            [r.id for r in role_list],
+            mode_value,
+            style_value,
+        )
+        logger.info(
+            f"{interaction.user} tạo role menu {message.id} ({len(role_list)} role) ở {guild}"
+        )
+        await interaction.response.send_message(
+            embed=success_embed("Đã tạo role menu", message.jump_url), ephemeral=True
+        )
+
+    @rolemenu.command(name="list", description="📋 Xem các role menu của server")
+    @require_guild_permissions(manage_roles=True)
+    async def list_menus(self, interaction: discord.Interaction):
+        if interaction.guild is None:
+            return
+        menus = await self.bot.db.list_role_menus(interaction.guild.id)
+        lines = [
+            f"`{m['message_id']}` https://discord.com/channels/"
+            f"{m['guild_id']}/{m['channel_id']}/{m['message_id']} · "
+            f"{len(m['role_ids'])} role · {MODE_LABELS.get(m['mode'], m['mode'])}"
+            for m in menus
+        ]
+        await interaction.response.send_message(
+            embed=create_embed(
+                title="🎭 Role menus",
+                description="\n".join(lines) or "Chưa có role menu nào.",
+                color=COLORS["info"],
+            ),
+            ephemeral=True,
+        )
+
+    @rolemenu.command(name="delete", description="🗑️ Xóa một role menu")
+    @app_commands.describe(message_id="ID message của menu (xem `/rolemenu list`)")
+    @require_guild_permissions(manage_roles=True)
+    async def delete(self, interaction: discord.Interaction, message_id: str):
+        if interaction.guild is None:
+            return
+        menu = (
+            await self.bot.db.get_role_menu(int(message_id))
+            if message_id.isdigit()
+            else None
+        )
+        if menu is None or menu["guild_id"] != interaction.guild.id:
+            return await interaction.response.send_message(
+                embed=error_embed("Lỗi", f"Không tìm thấy role menu `{message_id}`."),
+                ephemeral=True,
+            )
+        await self.bot.db.delete_role_menu(menu["message_id"])
+        channel = interaction.guild.get_channel(menu["channel_id"])
+        if isinstance(channel, discord.TextChannel):
+            with contextlib.suppress(discord.HTTPException):
+                await channel.get_partial_message(menu["message_id"]).delete()
+        await interaction.response.send_message(
+            embed=success_embed("Đã xóa", f"Đã xóa role menu `{message_id}`."),
+            ephemeral=True,
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(RoleMenus(bot))
@@ -9,6 +9,7 @@ from discord.ext import commands
 from cogs.moderation.base import require_guild_permissions
 from utils.constants import COLORS
 from utils.embeds import create_embed, error_embed, success_embed
+from utils.member_counts import member_counts
 
 
 class RolesCommand(commands.Cog):
@@ -27,7 +28,7 @@ class RolesCommand(commands.Cog):
     async def roleinfo(self, interaction: discord.Interaction, role: discord.Role):
         """Hiển thị thông tin về role"""
         try:
-            member_count = len(role.members)
+            member_count = member_counts.role_members(role)
 
             perms = role.permissions
             key_perms = []
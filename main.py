@@ -64,6 +64,7 @@ class BlastBot(commands.Bot):
 
         self.db = Database()
         await self.db.connect()
+        await self.db.load_panel_registry()
 
         self.tree.on_error = self.on_app_command_error
 
@@ -0,0 +1,106 @@
+import os
+import unittest
+
+from cogs.moderation.antiraid import JoinWindow, name_key
+from utils.database import Database
+
+
+class JoinWindowTests(unittest.TestCase):
+    def test_name_key(self):
+        self.assertEqual(name_key("Raider_123"), "raider")
+        self.assertEqual(name_key("raider456x"), "raider")
+        self.assertEqual(name_key("1234"), "")
+
+    def test_normal_joins_do_not_trigger(self):
+        window = JoinWindow(5)
+        for i in range(20):
+            window.push(i * 1.0, i, False, f"{chr(97 + i)}user")
+        self.assertEqual(window.flagged, 0)
+        self.assertFalse(window.is_raid(30))
+
+    def test_young_accounts_in_burst_trigger(self):
+        window = JoinWindow(5)
+        for i in range(5):
+            window.push(i * 0.5, i, True, "")
+        self.assertTrue(window.is_raid(30))
+        # Cùng số join nhưng trải dài quá cửa sổ thì không tính
+        self.assertFalse(window.is_raid(1))
+        self.assertEqual(window.recent_user_ids(), [0, 1, 2, 3, 4])
+
+    def test_name_clusters_are_counted_and_evicted(self):
+        window = JoinWindow(4)
+        flags = [window.push(i, i, False, "raider") for i in range(4)]
+        self.assertEqual(flags, [False, False, True, True])
+        self.assertEqual(window.name_counts, {"raider": 4})
+        for i in range(4):
+            window.push(10 + i, 100 + i, False, f"{chr(97 + i)}name")
+        self.assertNotIn("raider", window.name_counts)
+        self.assertEqual(window.flagged, 0)
+
+
+class RaidDatabaseTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db_path = "test_antiraid_temp.db"
+        self._cleanup()
+        self.db = Database(self.db_path)
+        await self.db.connect()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self._cleanup()
+
+    def _cleanup(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    async def test_settings_roundtrip_and_cache(self):
+        guild_id = 1301
+        default = await self.db.get_raid_settings(guild_id)
+        self.assertFalse(default["enabled"])
+        await self.db.set_raid_settings(
+            guild_id, enabled=1, join_threshold=8, channels=[11, 12]
+        )
+        settings = await self.db.get_raid_settings(guild_id)
+        self.assertEqual(settings["join_threshold"], 8)
+        self.assertEqual(settings["channels"], [11, 12])
+        self.assertIs(await self.db.get_raid_settings(guild_id), settings)
+
+    async def test_lockdown_lifecycle(self):
+        guild_id = 1302
+        self.assertTrue(
+            await self.db.start_raid_lockdown(guild_id, "raid", "slowmode", {11: 0})
+        )
+        self.assertFalse(
+            await self.db.start_raid_lockdown(guild_id, "raid", "lock", {})
+        )
+        self.assertTrue(self.db.in_raid_lockdown(guild_id))
+        await self.db.add_raid_holds(guild_id, [1, 2, 2, 3])
+        self.assertEqual(await self.db.count_raid_holds(guild_id), 3)
+
+        # Restart: cache được nạp lại từ DB
+        self.db._raid_lockdowns.clear()
+        rows = await self.db.list_raid_lockdowns()
+        self.assertEqual([r["guild_id"] for r in rows], [guild_id])
+        self.assertTrue(self.db.in_raid_lockdown(guild_id))
+
+        lockdown, holds = await self.db.end_raid_lockdown(guild_id)
+        self.assertEqual(lockdown, {"lock_mode": "slowmode", "channels": {11: 0}})
+        self.assertEqual(sorted(holds), [1, 2, 3])
+        self.assertFalse(self.db.in_raid_lockdown(guild_id))
+        self.assertEqual(await self.db.end_raid_lockdown(guild_id), (None, []))
+
+    async def test_lockdown_state_written_after_reservation(self):
+        guild_id = 1303
+        self.assertTrue(
+            await self.db.start_raid_lockdown(guild_id, "raid", "slowmode", {})
+        )
+        self.assertTrue(await self.db.set_raid_lockdown_state(guild_id, {11: 5}))
+        lockdown, _ = await self.db.end_raid_lockdown(guild_id)
+        self.assertEqual(lockdown["channels"], {11: 5})
+        # Lockdown đã gỡ trong lúc khóa: không còn row để ghi
+        self.assertFalse(await self.db.set_raid_lockdown_state(guild_id, {11: 5}))
+
+
+if __name__ == "__main__":
+    unittest.main()
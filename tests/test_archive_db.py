@@ -0,0 +1,106 @@
+import os
+import unittest
+
+from utils.database import Database
+
+
+class ArchiveDatabaseTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db_path = "test_archive_temp.db"
+        self.archive_path = "test_archive_temp_archive.db"
+        self._cleanup()
+        self.db = Database(self.db_path, archive_path=self.archive_path)
+        await self.db.connect()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self._cleanup()
+
+    def _cleanup(self):
+        for path in (self.db_path, self.archive_path):
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    async def _closed_ticket(self, guild_id, number, channel_id, days_ago):
+        await self.db.create_ticket(
+            guild_id, number, channel_id=channel_id, owner_id=1, panel_id=None
+        )
+        await self.db.add_ticket_member(channel_id, 42)
+        await self.db.close_ticket_db(channel_id, "xong")
+        await self.db.conn.execute(
+            "UPDATE tickets SET close_time=datetime('now', ?) WHERE channel_id=?",
+            (f"-{days_ago} days", channel_id),
+        )
+        await self.db.conn.commit()
+
+    async def test_archive_closed_tickets(self):
+        guild_id = 1201
+        await self._closed_ticket(guild_id, 1, 501, days_ago=200)
+        await self._closed_ticket(guild_id, 2, 502, days_ago=5)
+        await self.db.create_ticket(
+            guild_id, 3, channel_id=503, owner_id=1, panel_id=None
+        )
+
+        moved = await self.db.run_retention(budget_seconds=5, batch_size=10)
+        self.assertEqual(moved["tickets"], 1)
+        self.assertIsNone(await self.db.get_ticket_by_channel(501))
+        self.assertEqual(await self.db.get_ticket_members(501), [])
+
+        hot = await self.db.get_ticket_history(guild_id)
+        self.assertEqual([r["number"] for r in hot], [3, 2])
+        full = await self.db.get_ticket_history(guild_id, include_archived=True)
+        self.assertEqual([r["number"] for r in full], [3, 2, 1])
+
+        # Chạy lại không chép trùng
+        self.assertEqual(await self.db.archive_closed_tickets(10), 0)
+
+    async def test_retention_per_guild_and_mod_logs(self):
+        await self._closed_ticket(1301, 1, 601, days_ago=200)
+        await self.db.set_retention(1301, ticket_days=0)
+        await self.db.set_retention(1301, modlog_days=30)
+        self.assertEqual(
+            await self.db.get_retention(1301), {"ticket_days": 0, "modlog_days": 30}
+        )
+
+        await self.db.add_mod_log(1301, 9, "ban", 77, "x", "spam")
+        await self.db.add_mod_log(1301, 9, "kick", 78, "y", None)
+        await self.db.conn.execute(
+            "UPDATE moderation_logs SET created_at=datetime('now', '-60 days') "
+            "WHERE target_id=77"
+        )
+        await self.db.conn.commit()
+
+        moved = await self.db.run_retention(budget_seconds=5, batch_size=10)
+        self.assertEqual(moved, {"tickets": 0, "modlogs": 1, "mod_jobs": 0})
+        logs = await self.db.get_mod_logs(1301, include_archived=True)
+        self.assertEqual([r["target_id"] for r in logs], [78, 77])
+        self.assertEqual(len(await self.db.get_mod_logs(1301, target_id=77)), 0)
+
+    async def test_prune_finished_mod_jobs(self):
+        old = await self.db.create_mod_job(1, 9, "ban", None, {}, list(range(25)))
+        recent = await self.db.create_mod_job(1, 9, "ban", None, {}, [1, 2])
+        running = await self.db.create_mod_job(1, 9, "kick", None, {}, [3])
+        for job_id in (old, recent):
+            await self.db.set_mod_job_status(job_id, "done")
+        await self.db.set_mod_job_status(running, "running")
+        await self.db.conn.execute(
+            "UPDATE moderation_jobs SET finished_at=datetime('now', '-60 days') "
+            "WHERE job_id=?",
+            (old,),
+        )
+        await self.db.conn.commit()
+
+        moved = await self.db.run_retention(budget_seconds=5, batch_size=10)
+        self.assertEqual(moved["mod_jobs"], 26)
+        self.assertIsNone(await self.db.get_mod_job(old))
+        self.assertIsNotNone(await self.db.get_mod_job(recent))
+        self.assertIsNotNone(await self.db.get_mod_job(running))
+        async with self.db.conn.execute(
+            "SELECT COUNT(*) FROM moderation_job_targets"
+        ) as cur:
+            self.assertEqual((await cur.fetchone())[0], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from cogs.automation.greeting_batch import GreetingCoalescer, build_digest_chunks
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _member(i, guild):
+    return SimpleNamespace(id=i, guild=guild, mention=f"<@{i}>")
+
+
+class DigestChunkTests(unittest.TestCase):
+    def test_all_names_fit(self):
+        chunks = build_digest_chunks("Chào:", ["a", "b", "c"], 100, 3)
+        self.assertEqual(chunks, ["Chào: a, b, c"])
+
+    def test_respects_limit_and_message_cap(self):
+        names = [f"<@{i:018d}>" for i in range(500)]
+        chunks = build_digest_chunks("Chào mừng 500 thành viên:", names, 2000, 3)
+        self.assertEqual(len(chunks), 3)
+        self.assertTrue(all(len(c) <= 2000 for c in chunks))
+        self.assertIn("người khác", chunks[-1])
+        shown = sum(c.count("<@") for c in chunks)
+        hidden = int(chunks[-1].rsplit("và ", 1)[1].split()[0])
+        self.assertEqual(shown + hidden, 500)
+
+
+class CoalescerTests(unittest.IsolatedAsyncioTestCase):
+    def _coalescer(self, clock):
+        single, batch = AsyncMock(), AsyncMock()
+        coalescer = GreetingCoalescer(
+            single, batch, threshold=3, window_seconds=10, batch_delay=0.01, clock=clock
+        )
+        return coalescer, single, batch
+
+    async def test_normal_rate_sends_individually(self):
+        clock = _Clock()
+        coalescer, single, batch = self._coalescer(clock)
+        guild = SimpleNamespace(id=1)
+        for i in range(6):
+            clock.now = i * 5.0  # tối đa 3 sự kiện trong 10 giây
+            await coalescer.push(_member(i, guild), "welcome")
+        self.assertEqual(single.await_count, 6)
+        batch.assert_not_awaited()
+
+    async def test_burst_is_batched(self):
+        clock = _Clock()
+        coalescer, single, batch = self._coalescer(clock)
+        guild = SimpleNamespace(id=1)
+        for i in range(40):
+            await coalescer.push(_member(i, guild), "welcome")
+        self.assertEqual(single.await_count, 3)
+        self.assertTrue(coalescer.batching(1, "welcome"))
+        await asyncio.sleep(0.05)
+        batch.assert_awaited_once()
+        _, kind, members = batch.await_args.args
+        self.assertEqual(kind, "welcome")
+        self.assertEqual([m.id for m in members], list(range(3, 40)))
+        self.assertFalse(coalescer.batching(1, "welcome"))
+
+    async def test_idle_entries_are_pruned(self):
+        clock = _Clock()
+        coalescer, single, batch = self._coalescer(clock)
+        for gid in range(5):
+            await coalescer.push(_member(gid, SimpleNamespace(id=gid)), "welcome")
+        self.assertEqual(len(coalescer._bursts), 5)
+        clock.now = 30.0
+        await coalescer.push(_member(99, SimpleNamespace(id=99)), "welcome")
+        self.assertEqual(list(coalescer._bursts), [(99, "welcome")])
+
+    async def test_guilds_and_kinds_are_independent(self):
+        clock = _Clock()
+        coalescer, single, batch = self._coalescer(clock)
+        g1, g2 = SimpleNamespace(id=1), SimpleNamespace(id=2)
+        for i in range(10):
+            await coalescer.push(_member(i, g1), "welcome")
+        await coalescer.push(_member(99, g2), "welcome")
+        await coalescer.push(_member(98, g1), "goodbye")
+        self.assertEqual(single.await_count, 5)
+        coalescer.close()
+        batch.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
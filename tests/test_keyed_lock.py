@@ -0,0 +1,63 @@
+import asyncio
+import tracemalloc
+import unittest
+
+from utils.keyed_lock import KeyedLock, LockTimeout
+
+
+class KeyedLockTests(unittest.IsolatedAsyncioTestCase):
+    async def test_serializes_same_key(self):
+        locks = KeyedLock()
+        inside = 0
+        peak = 0
+
+        async def worker():
+            nonlocal inside, peak
+            async with locks.acquire("member"):
+                inside += 1
+                peak = max(peak, inside)
+                await asyncio.sleep(0)
+                inside -= 1
+
+        await asyncio.gather(*(worker() for _ in range(10)))
+        self.assertEqual(peak, 1)
+        self.assertEqual(locks.stats()["acquisitions"], 10)
+        self.assertGreater(locks.stats()["contended"], 0)
+        self.assertEqual(len(locks), 0)
+
+    async def test_timeout_releases_waiter(self):
+        locks = KeyedLock()
+        async with locks.acquire("k"):
+            with self.assertRaises(LockTimeout):
+                async with locks.acquire("k", max_wait=0.01):
+                    pass
+            self.assertEqual(locks.stats()["timeouts"], 1)
+            self.assertTrue(locks.locked("k"))
+        self.assertFalse(locks.locked("k"))
+        self.assertEqual(len(locks), 0)
+
+    async def test_timeout_inside_body_is_not_lock_timeout(self):
+        locks = KeyedLock()
+        with self.assertRaises(TimeoutError) as ctx:
+            async with locks.acquire("k", max_wait=0.01):
+                raise TimeoutError("request timeout")
+        self.assertNotIsInstance(ctx.exception, LockTimeout)
+        self.assertEqual(locks.stats()["timeouts"], 0)
+
+    async def test_memory_returns_to_baseline(self):
+        locks = KeyedLock()
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            for i in range(100_000):
+                async with locks.acquire((1, i)):
+                    pass
+            self.assertEqual(len(locks), 0)
+            # Dict thu nhỏ không hết về kích thước ban đầu; vài KB dư là chấp nhận được
+            self.assertLess(tracemalloc.get_traced_memory()[0] - baseline, 64 * 1024)
+        finally:
+            tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
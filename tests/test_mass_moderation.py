@@ -0,0 +1,81 @@
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import discord
+
+from cogs.moderation.mass import parse_user_ids, run_mass_job
+from utils.database import Database
+
+
+class _FakeGuild:
+    def __init__(self, members):
+        self.id = 1
+        self._members = {m.id: m for m in members}
+        self.bulk_ban = AsyncMock(
+            side_effect=lambda users, **kw: SimpleNamespace(banned=users, failed=[])
+        )
+
+    def get_member(self, user_id):
+        return self._members.get(user_id)
+
+
+class MassModerationTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.db_path = "test_mass_temp.db"
+        self._cleanup()
+
+    def tearDown(self):
+        self._cleanup()
+
+    def _cleanup(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    async def asyncSetUp(self):
+        self.db = Database(self.db_path)
+        await self.db.connect()
+        self.bot = SimpleNamespace(db=self.db)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+
+    def test_parse_user_ids(self):
+        text = "<@123456789012345678> 123456789012345678, 223456789012345678 abc 12"
+        self.assertEqual(parse_user_ids(text), [123456789012345678, 223456789012345678])
+
+    async def test_bulk_ban_in_chunks(self):
+        user_ids = list(range(10**17, 10**17 + 250))
+        job_id = await self.db.create_mod_job(
+            1, 9, "ban", "raid", {"delete_message_seconds": 0}, user_ids
+        )
+        guild = _FakeGuild([])
+        counts = await run_mass_job(self.bot, guild, await self.db.get_mod_job(job_id))
+        self.assertEqual(counts, {"done": 250})
+        sizes = [len(c.args[0]) for c in guild.bulk_ban.await_args_list]
+        self.assertEqual(sizes, [200, 50])
+        self.assertEqual((await self.db.get_mod_job(job_id))["status"], "done")
+        self.assertEqual(await self.db.list_unfinished_mod_jobs(), [])
+
+    async def test_resume_only_runs_pending_targets(self):
+        members = [SimpleNamespace(id=i, kick=AsyncMock()) for i in (1, 2, 3)]
+        job_id = await self.db.create_mod_job(1, 9, "kick", "raid", {}, [1, 2, 3, 4])
+        # Giả lập restart sau khi đã kick xong user 1
+        await self.db.set_mod_job_status(job_id, "running")
+        await self.db.mark_job_targets(job_id, {1: ("done", None)})
+        jobs = await self.db.list_unfinished_mod_jobs()
+        self.assertEqual([j["job_id"] for j in jobs], [job_id])
+
+        members[1].kick.side_effect = discord.Forbidden(
+            SimpleNamespace(status=403, reason="Forbidden"), "no"
+        )
+        counts = await run_mass_job(self.bot, _FakeGuild(members), jobs[0])
+        members[0].kick.assert_not_awaited()
+        members[2].kick.assert_awaited_once()
+        self.assertEqual(counts, {"done": 2, "failed": 1, "skipped": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from utils.member_counts import MemberCounter
+
+
+class _Role(SimpleNamespace):
+    def is_default(self):
+        return self.id == 0
+
+
+def _guild(member_roles):
+    guild = SimpleNamespace(id=1, member_count=None, members=[])
+    everyone = _Role(id=0, guild=guild)
+    for i, role_ids in enumerate(member_roles):
+        guild.members.append(_member(guild, i, role_ids, everyone))
+    guild.everyone = everyone
+    return guild
+
+
+def _member(guild, user_id, role_ids, everyone=None):
+    everyone = everyone or guild.everyone
+    roles = [everyone] + [_Role(id=r, guild=guild) for r in role_ids]
+    return SimpleNamespace(id=user_id, guild=guild, roles=roles)
+
+
+class MemberCounterTests(unittest.IsolatedAsyncioTestCase):
+    async def test_seed_and_incremental_updates(self):
+        guild = _guild([[10], [10, 20], []])
+        counter = MemberCounter()
+        # Chưa seed: đọc thẳng từ cache
+        self.assertEqual(counter.members(guild), 3)
+        self.assertEqual(await counter.reconcile(guild, chunk_size=2), 0)
+        role10 = _Role(id=10, guild=guild)
+        self.assertEqual(counter.role_members(role10), 2)
+
+        new = _member(guild, 3, [20])
+        counter.member_joined(new)
+        self.assertEqual(counter.members(guild), 4)
+        self.assertEqual(counter.role_members(_Role(id=20, guild=guild)), 2)
+
+        counter.roles_changed(guild.members[0], _member(guild, 0, [20]))
+        self.assertEqual(counter.role_members(role10), 1)
+        self.assertEqual(counter.role_members(_Role(id=20, guild=guild)), 3)
+
+        counter.member_removed(guild.members[1])
+        self.assertEqual(counter.members(guild), 3)
+        self.assertEqual(counter.role_members(role10), 0)
+        self.assertEqual(counter.role_members(guild.everyone), 3)
+
+        counter.role_deleted(_Role(id=20, guild=guild))
+        self.assertEqual(counter.role_members(_Role(id=20, guild=guild)), 0)
+
+    async def test_discord_member_count_wins(self):
+        guild = _guild([[], []])
+        guild.member_count = 5000
+        self.assertEqual(MemberCounter().members(guild), 5000)
+
+    async def test_reconcile_fixes_drift_and_keeps_concurrent_events(self):
+        guild = _guild([[10]] * 10)
+        counter = MemberCounter()
+        await counter.reconcile(guild)
+        # Mất một event: cache có thêm member mà counter không biết
+        guild.members.append(_member(guild, 99, [10]))
+
+        task = asyncio.create_task(counter.reconcile(guild, chunk_size=3))
+        await asyncio.sleep(0)  # đang đếm dở, event mới đến giữa chừng
+        counter.member_joined(_member(guild, 100, [10]))
+        drift = await task
+        self.assertEqual(drift, 2)  # 1 member + 1 lượt role
+        self.assertEqual(counter.members(guild), 12)
+        self.assertEqual(counter.role_members(_Role(id=10, guild=guild)), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import discord
+
+from utils.member_resolver import MemberResolver
+
+
+class _FakeGuild:
+    def __init__(self, cached=(), remote=()):
+        self.id = 1
+        self._cached = {m.id: m for m in cached}
+        self._remote = {m.id: m for m in remote}
+        self.fetch_member = AsyncMock(side_effect=self._fetch)
+
+    def get_member(self, user_id):
+        return self._cached.get(user_id)
+
+    async def _fetch(self, user_id):
+        await asyncio.sleep(0)
+        if user_id not in self._remote:
+            raise discord.NotFound(SimpleNamespace(status=404, reason="nf"), "")
+        return self._remote[user_id]
+
+
+class MemberResolverTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.resolver = MemberResolver(
+            ttl_seconds=60, negative_ttl_seconds=10, maxsize=2, clock=lambda: self.now
+        )
+
+    async def test_gateway_cache_first(self):
+        member = SimpleNamespace(id=5)
+        guild = _FakeGuild(cached=[member])
+        self.assertIs(await self.resolver.resolve(guild, 5), member)
+        guild.fetch_member.assert_not_awaited()
+        self.assertEqual(self.resolver.stats["gateway"], 1)
+
+    async def test_fetched_member_cached_until_ttl(self):
+        member = SimpleNamespace(id=5)
+        guild = _FakeGuild(remote=[member])
+        self.assertIs(await self.resolver.resolve(guild, 5), member)
+        self.now = 59
+        self.assertIs(await self.resolver.resolve(guild, 5), member)
+        self.assertEqual(guild.fetch_member.await_count, 1)
+        self.now = 61
+        await self.resolver.resolve(guild, 5)
+        self.assertEqual(guild.fetch_member.await_count, 2)
+
+    async def test_concurrent_requests_share_one_fetch(self):
+        member = SimpleNamespace(id=5)
+        guild = _FakeGuild(remote=[member])
+        results = await asyncio.gather(
+            *(self.resolver.resolve(guild, 5) for _ in range(5))
+        )
+        self.assertTrue(all(r is member for r in results))
+        self.assertEqual(guild.fetch_member.await_count, 1)
+        self.assertEqual(self.resolver.stats["shared"], 4)
+        self.assertEqual(self.resolver.hit_rate(), 0.8)
+
+    async def test_not_found_is_cached_briefly(self):
+        guild = _FakeGuild()
+        self.assertIsNone(await self.resolver.resolve(guild, 7))
+        self.assertIsNone(await self.resolver.resolve(guild, 7))
+        self.assertEqual(guild.fetch_member.await_count, 1)
+        self.now = 11
+        await self.resolver.resolve(guild, 7)
+        self.assertEqual(guild.fetch_member.await_count, 2)
+
+    async def test_http_errors_are_not_cached(self):
+        guild = _FakeGuild()
+        guild.fetch_member.side_effect = discord.HTTPException(
+            SimpleNamespace(status=500, reason="err"), "boom"
+        )
+        for _ in range(2):
+            with self.assertRaises(discord.HTTPException):
+                await self.resolver.resolve(guild, 7)
+        self.assertEqual(guild.fetch_member.await_count, 2)
+        self.assertEqual(self.resolver._inflight, {})
+
+    async def test_cache_is_bounded(self):
+        guild = _FakeGuild(remote=[SimpleNamespace(id=i) for i in range(3)])
+        for i in range(3):
+            await self.resolver.resolve(guild, i)
+        self.assertEqual(list(self.resolver._cache), [(1, 1), (1, 2)])
+
+    async def test_invalidate_forces_refetch(self):
+        member = SimpleNamespace(id=5)
+        guild = _FakeGuild(remote=[member])
+        await self.resolver.resolve(guild, 5)
+        self.resolver.invalidate(1, 5)
+        await self.resolver.resolve(guild, 5)
+        self.assertEqual(guild.fetch_member.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from utils.metrics import LatencyTracker, MetricsRegistry
+
+
+class MetricsTests(unittest.TestCase):
+    def test_latency_percentiles(self):
+        tracker = LatencyTracker(maxlen=1000)
+        for ms in range(1, 101):
+            tracker.record(float(ms))
+
+        snap = tracker.snapshot()
+        self.assertEqual(snap["count"], 100)
+        self.assertEqual(snap["p50"], 50.0)
+        self.assertEqual(snap["p99"], 99.0)
+        self.assertEqual(snap["max"], 100.0)
+
+    def test_latency_window_is_bounded(self):
+        tracker = LatencyTracker(maxlen=10)
+        for ms in range(100):
+            tracker.record(float(ms))
+        self.assertEqual(len(tracker.samples), 10)
+        self.assertEqual(tracker.count, 100)
+        self.assertEqual(tracker.percentile(50), 94.0)
+
+    def test_registry_snapshot(self):
+        registry = MetricsRegistry()
+        registry.incr("hits")
+        registry.incr("hits", 2)
+        with registry.timer("work"):
+            pass
+        registry.register_gauge("depth", lambda: 7)
+        registry.register_gauge("broken", lambda: 1 / 0)
+
+        snap = registry.snapshot()
+        self.assertEqual(snap["counters"]["hits"], 3)
+        self.assertEqual(snap["latencies"]["work"]["count"], 1)
+        self.assertEqual(snap["gauges"]["depth"], 7)
+        self.assertTrue(str(snap["gauges"]["broken"]).startswith("error"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, MagicMock
 import discord
 from cogs.tickets.helpers import is_blacklisted, is_ticket_staff
 from cogs.tickets.views import ConfirmCloseView
+from utils.ticket_db import TicketPermissionIndex
 from utils.error_handler import normalize_channel_name, validate_member_hierarchy
 
 
@@ -30,10 +31,13 @@ class PermissionTests(unittest.IsolatedAsyncioTestCase):
         db = AsyncMock()
         bot.db = db
 
-        db.get_staff.return_value = [
-            {"is_role": True, "entity_id": 100},
-            {"is_role": False, "entity_id": 999},
-        ]
+        db.get_ticket_permission_index.return_value = TicketPermissionIndex.from_rows(
+            staff=[
+                {"is_role": True, "entity_id": 100, "type": "support"},
+                {"is_role": False, "entity_id": 999, "type": "support"},
+            ],
+            blacklist=[],
+        )
 
         role1 = MagicMock()
         role1.id = 100
@@ -68,7 +72,9 @@ class PermissionTests(unittest.IsolatedAsyncioTestCase):
         bot = MagicMock()
         db = AsyncMock()
         bot.db = db
-        db.get_blacklist.return_value = [{"is_role": False, "entity_id": 777}]
+        db.get_ticket_permission_index.return_value = TicketPermissionIndex.from_rows(
+            staff=[], blacklist=[{"is_role": False, "entity_id": 777}]
+        )
 
         bad_member = MagicMock(spec=discord.Member)
         bad_member.id = 777
@@ -120,7 +126,7 @@ class PermissionTests(unittest.IsolatedAsyncioTestCase):
             "owner_id": 99,
             "number": 1,
         }
-        db.get_staff.return_value = []
+        db.get_ticket_permission_index.return_value = TicketPermissionIndex()
 
         view = ConfirmCloseView(bot=bot, requester_id=55)
         # Allowed because user is requester (55)
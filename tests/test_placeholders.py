@@ -0,0 +1,89 @@
+import unittest
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from utils.placeholders import (
+    _JoinOrder,
+    compile_template,
+    join_order,
+    render_placeholders,
+)
+
+
+class _Member(SimpleNamespace):
+    def __str__(self):
+        return self.name
+
+
+def _guild(joined):
+    guild = SimpleNamespace(id=1, name="Blast", member_count=None, members=[])
+    for i, day in enumerate(joined):
+        guild.members.append(
+            _Member(
+                name=f"user{i}",
+                guild=guild,
+                mention=f"<@{i}>",
+                display_name=f"User {i}",
+                created_at=datetime(2020, 1, 1, tzinfo=UTC),
+                joined_at=datetime(2024, 1, day, tzinfo=UTC),
+            )
+        )
+    return guild
+
+
+class PlaceholderTests(unittest.TestCase):
+    def test_compile_is_cached_and_keeps_unknown(self):
+        text = "Hi {user_mention}, {unknown} {server}!"
+        template = compile_template(text)
+        self.assertIs(compile_template(text), template)
+        self.assertEqual(
+            template.segments, ("Hi ", "user_mention", ", {unknown} ", "server", "!")
+        )
+
+    def test_render_member_placeholders(self):
+        join_order.forget(1)
+        guild = _guild([3, 1, 2])
+        member = guild.members[0]
+        channel = SimpleNamespace(mention="<#9>")
+        text = (
+            "{user} {user_mention} {user_name} {server} {member_count} "
+            "#{join_position} {channel} {created_at}"
+        )
+        self.assertEqual(
+            render_placeholders(text, member, channel),
+            "user0 <@0> User 0 Blast 3 #3 <#9> <t:1577836800:D>",
+        )
+        # Lặp placeholder và không có placeholder
+        self.assertEqual(render_placeholders("{server}{server}", member), "BlastBlast")
+        self.assertEqual(render_placeholders("{{}}", member), "{{}}")
+        self.assertEqual(render_placeholders("", member), "")
+
+    def test_render_without_member(self):
+        guild = _guild([1, 2])
+        channel = SimpleNamespace(mention="<#9>")
+        rendered = compile_template("{server} có {member_count} người, {user}").render(
+            guild, channel=channel
+        )
+        self.assertEqual(rendered, "Blast có 2 người, {user}")
+
+    def test_join_position_reuses_sorted_order(self):
+        order = _JoinOrder(ttl=300, recent=60)
+        guild = _guild([3, 1, 2])
+        self.assertEqual(order.position(guild.members[0]), 3)
+        # Cache còn hạn: không duyệt lại guild.members
+        guild.members = []
+        later = _Member(guild=guild, joined_at=datetime(2024, 1, 2, 12, tzinfo=UTC))
+        self.assertEqual(order.position(later), 2)
+
+    def test_join_position_of_new_member_uses_member_count(self):
+        order = _JoinOrder(ttl=300, recent=60)
+        guild = SimpleNamespace(id=2, member_count=5000, members=[])
+        member = _Member(
+            guild=guild, joined_at=datetime.now(UTC) - timedelta(seconds=5)
+        )
+        self.assertEqual(order.position(member), 5000)
+        self.assertNotIn(2, order._orders)
+
+
+if __name__ == "__main__":
+    unittest.main()
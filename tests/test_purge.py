@@ -0,0 +1,94 @@
+import re
+import unittest
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import discord
+
+from cogs.moderation.purge import PurgeFilter, purge_channel
+
+
+def _message(i, *, days_old=0, author_id=1, bot=False, content="", files=()):
+    return SimpleNamespace(
+        id=i,
+        pinned=False,
+        author=SimpleNamespace(id=author_id, bot=bot),
+        content=content,
+        attachments=list(files),
+        created_at=discord.utils.utcnow() - timedelta(days=days_old),
+        delete=AsyncMock(),
+    )
+
+
+class _FakeChannel:
+    def __init__(self, messages):
+        self.messages = messages
+        self.delete_messages = AsyncMock()
+
+    async def history(self, limit):
+        for message in self.messages[:limit]:
+            yield message
+
+
+class PurgeFilterTests(unittest.TestCase):
+    def test_filters_are_combined(self):
+        flt = PurgeFilter(user_id=1, links=True)
+        self.assertTrue(flt.matches(_message(1, content="xem https://x.y")))
+        self.assertFalse(flt.matches(_message(2, content="không có link")))
+        self.assertFalse(flt.matches(_message(3, author_id=2, content="https://x")))
+
+    def test_contains_bots_attachments_and_pins(self):
+        self.assertTrue(
+            PurgeFilter(contains="free nitro").matches(
+                _message(1, content="FREE NITRO here")
+            )
+        )
+        self.assertFalse(
+            PurgeFilter(contains="free nitro").matches(_message(5, content="nitro"))
+        )
+        self.assertTrue(
+            PurgeFilter(pattern=re.compile(r"nitro\s+\d+", re.I)).matches(
+                _message(6, content="Free NITRO 100")
+            )
+        )
+        self.assertFalse(
+            PurgeFilter(pattern=re.compile("nitro"), contains="steam").matches(
+                _message(7, content="nitro")
+            )
+        )
+        self.assertFalse(PurgeFilter(bots=True).matches(_message(2)))
+        self.assertTrue(PurgeFilter(attachments=True).matches(_message(3, files=[1])))
+        pinned = _message(4)
+        pinned.pinned = True
+        self.assertFalse(PurgeFilter().matches(pinned))
+
+
+class PurgeChannelTests(unittest.IsolatedAsyncioTestCase):
+    async def test_bulk_and_old_paths(self):
+        fresh = [_message(i, author_id=i % 2) for i in range(250)]
+        old = [_message(1000 + i, days_old=30, author_id=0) for i in range(3)]
+        channel = _FakeChannel(fresh + old)
+
+        progress = await purge_channel(channel, 10000, PurgeFilter(user_id=0))
+        self.assertEqual(progress.scanned, 253)
+        self.assertEqual(progress.matched, 128)
+        self.assertEqual(progress.deleted, 128)
+        self.assertTrue(progress.done)
+        # 125 tin mới → lô 100 + lô 25; tin cũ xóa lẻ
+        sizes = [len(c.args[0]) for c in channel.delete_messages.await_args_list]
+        self.assertEqual(sizes, [100, 25])
+        for message in old:
+            message.delete.assert_awaited_once()
+
+    async def test_failures_are_counted(self):
+        channel = _FakeChannel([_message(i) for i in range(5)])
+        response = SimpleNamespace(status=500, reason="err")
+        channel.delete_messages.side_effect = discord.HTTPException(response, "boom")
+        progress = await purge_channel(channel, 5, PurgeFilter())
+        self.assertEqual(progress.failed, 5)
+        self.assertEqual(progress.deleted, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
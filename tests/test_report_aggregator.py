@@ -0,0 +1,116 @@
+import asyncio
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import discord
+
+from utils.database import Database
+from utils.report_aggregator import ReportAggregator
+
+
+class _FakeChannel:
+    def __init__(self):
+        self.message = SimpleNamespace(edit=AsyncMock())
+        self.send = AsyncMock(return_value=self.message)
+
+
+def _cleanup(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+class ReportAggregatorTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.agg = ReportAggregator(
+            window_seconds=100,
+            debounce_seconds=0.01,
+            user_limit=2,
+            user_window_seconds=60,
+            clock=lambda: self.now,
+        )
+
+    async def _submit(self, channel, reporter, reason="spam", target=500):
+        return await self.agg.submit(
+            channel, 1, target, reporter, reason, discord.Embed(title="📢 Báo cáo")
+        )
+
+    async def test_burst_posts_once_and_edits_debounced(self):
+        channel = _FakeChannel()
+        results = [await self._submit(channel, uid) for uid in range(40)]
+        self.assertEqual(results, [True] + [False] * 39)
+        await asyncio.sleep(0.05)
+
+        channel.send.assert_awaited_once()
+        channel.message.edit.assert_awaited_once()
+        embed = channel.message.edit.await_args.kwargs["embed"]
+        self.assertEqual(embed.title, "📢 Báo cáo (×40)")
+        self.assertIn("**40** báo cáo từ **40** người", embed.fields[0].value)
+
+    async def test_new_window_posts_again(self):
+        channel = _FakeChannel()
+        await self._submit(channel, 1)
+        self.assertTrue(self.agg.already_reported(1, 500, 1))
+        self.assertFalse(self.agg.already_reported(1, 500, 2))
+        self.now = 101
+        self.assertFalse(self.agg.already_reported(1, 500, 1))
+        self.assertTrue(await self._submit(channel, 1))
+        self.assertEqual(channel.send.await_count, 2)
+
+    async def test_without_log_channel_opens_no_group(self):
+        self.assertFalse(await self._submit(None, 1))
+        self.assertFalse(self.agg.already_reported(1, 500, 1))
+        # Log channel được cấu hình sau đó: báo cáo kế tiếp gửi embed mới
+        channel = _FakeChannel()
+        self.assertTrue(await self._submit(channel, 2))
+        channel.send.assert_awaited_once()
+
+    async def test_failed_send_drops_group(self):
+        broken = _FakeChannel()
+        broken.send.side_effect = discord.HTTPException(
+            SimpleNamespace(status=500, reason="boom"), "boom"
+        )
+        with self.assertRaises(discord.HTTPException):
+            await self._submit(broken, 1)
+        self.assertFalse(self.agg.already_reported(1, 500, 1))
+        channel = _FakeChannel()
+        self.assertTrue(await self._submit(channel, 2))
+        channel.send.assert_awaited_once()
+
+    def test_per_user_rate_limit(self):
+        self.assertTrue(self.agg.allow(1, 7))
+        self.assertTrue(self.agg.allow(1, 7))
+        self.assertFalse(self.agg.allow(1, 7))
+        self.assertTrue(self.agg.allow(2, 7))
+        self.now = 60
+        self.assertTrue(self.agg.allow(1, 7))
+
+
+class ReportDBTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db_path = "test_reports_temp.db"
+        _cleanup(self.db_path)
+        self.db = Database(self.db_path)
+        await self.db.connect()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        _cleanup(self.db_path)
+
+    async def test_reports_are_queryable(self):
+        for reporter in (1, 2, 2):
+            await self.db.add_report(1, "message", 500, reporter, "spam", "raid")
+        await self.db.add_report(1, "user", 600, 3, "scam", "")
+
+        rows = await self.db.list_reports(1, 500)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["reporter_id"], 2)
+        self.assertEqual(len(await self.db.list_reports(1, limit=2)), 2)
+        self.assertEqual(await self.db.count_reports(1, 500), (3, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import os
+import unittest
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import discord
+
+from cogs.utilities.role_jobs import ROLE_ACTIONS, run_role_job, select_targets
+from utils.database import Database
+
+
+class _FakeMember:
+    def __init__(self, member_id, role_ids=(), bot=False, joined_days_ago=30):
+        self.id = member_id
+        self.bot = bot
+        self.role_ids = set(role_ids)
+        self.joined_at = discord.utils.utcnow() - timedelta(days=joined_days_ago)
+        self.add_roles = AsyncMock(side_effect=lambda r, **kw: self.role_ids.add(r.id))
+        self.remove_roles = AsyncMock(
+            side_effect=lambda r, **kw: self.role_ids.discard(r.id)
+        )
+
+    def get_role(self, role_id):
+        return SimpleNamespace(id=role_id) if role_id in self.role_ids else None
+
+
+class _FakeGuild:
+    def __init__(self, members, role_ids=(10,)):
+        self.id = 1
+        self.members = members
+        self._members = {m.id: m for m in members}
+        self._roles = {rid: SimpleNamespace(id=rid) for rid in role_ids}
+
+    def get_member(self, user_id):
+        return self._members.get(user_id)
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+
+def _cleanup(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+class SelectTargetsTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.members = [
+            _FakeMember(1),
+            _FakeMember(2, role_ids=(10,)),
+            _FakeMember(3, bot=True),
+            _FakeMember(4, role_ids=(20,), joined_days_ago=2),
+        ]
+        self.guild = _FakeGuild(self.members, role_ids=(10, 20))
+        self.role = SimpleNamespace(id=10)
+
+    async def test_add_skips_members_with_role(self):
+        self.assertEqual(await select_targets(self.guild, self.role, True), [1, 3, 4])
+
+    async def test_remove_only_members_with_role(self):
+        self.assertEqual(await select_targets(self.guild, self.role, False), [2])
+
+    async def test_filters(self):
+        has_role = SimpleNamespace(id=20)
+        self.assertEqual(
+            await select_targets(self.guild, self.role, True, kind="humans"), [1, 4]
+        )
+        self.assertEqual(
+            await select_targets(self.guild, self.role, True, kind="bots"), [3]
+        )
+        self.assertEqual(
+            await select_targets(self.guild, self.role, True, has_role=has_role), [4]
+        )
+        self.assertEqual(
+            await select_targets(self.guild, self.role, True, joined_within_days=7), [4]
+        )
+        # Lô nhỏ hơn số member: kết quả không đổi
+        self.assertEqual(
+            await select_targets(self.guild, self.role, True, chunk_size=1), [1, 3, 4]
+        )
+
+
+class RoleJobTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db_path = "test_role_jobs_temp.db"
+        _cleanup(self.db_path)
+        self.db = Database(self.db_path)
+        await self.db.connect()
+        self.bot = SimpleNamespace(db=self.db)
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        _cleanup(self.db_path)
+
+    async def test_resume_only_runs_pending_targets(self):
+        members = [_FakeMember(i) for i in (1, 2, 3)]
+        guild = _FakeGuild(members)
+        job_id = await self.db.create_mod_job(
+            1, 9, "role_add", "", {"role_id": 10}, [1, 2, 3, 4]
+        )
+        # Giả lập restart sau khi đã gán xong user 1
+        await self.db.set_mod_job_status(job_id, "running")
+        await self.db.mark_job_targets(job_id, {1: ("done", None)})
+        members[0].role_ids.add(10)
+
+        status = await run_role_job(self.bot, guild, await self.db.get_mod_job(job_id))
+        self.assertEqual(status, "done")
+        members[0].add_roles.assert_not_awaited()
+        members[1].add_roles.assert_awaited_once()
+        counts = await self.db.get_job_target_counts(job_id)
+        self.assertEqual(counts, {"done": 3, "skipped": 1})
+        self.assertEqual((await self.db.get_mod_job(job_id))["status"], "done")
+
+    async def test_stop_leaves_targets_pending(self):
+        guild = _FakeGuild([_FakeMember(1, role_ids=(10,))])
+        job_id = await self.db.create_mod_job(
+            1, 9, "role_remove", "", {"role_id": 10}, [1]
+        )
+        status = await run_role_job(
+            self.bot, guild, await self.db.get_mod_job(job_id), should_stop=lambda: True
+        )
+        self.assertIsNone(status)
+        self.assertEqual(await self.db.get_pending_job_targets(job_id), [1])
+
+    async def test_missing_role_fails_job(self):
+        guild = _FakeGuild([_FakeMember(1)], role_ids=())
+        job_id = await self.db.create_mod_job(
+            1, 9, "role_add", "", {"role_id": 10}, [1]
+        )
+        status = await run_role_job(self.bot, guild, await self.db.get_mod_job(job_id))
+        self.assertEqual(status, "failed")
+        self.assertEqual((await self.db.get_mod_job(job_id))["status"], "failed")
+
+    async def test_paused_jobs_are_active_but_not_resumed(self):
+        job_id = await self.db.create_mod_job(
+            1, 9, "role_add", "", {"role_id": 10}, [1]
+        )
+        kick_id = await self.db.create_mod_job(1, 9, "kick", "", {}, [2])
+        await self.db.set_mod_job_status(job_id, "paused")
+
+        self.assertEqual(await self.db.list_unfinished_mod_jobs(ROLE_ACTIONS), [])
+        unfinished = await self.db.list_unfinished_mod_jobs(("kick",))
+        self.assertEqual([j["job_id"] for j in unfinished], [kick_id])
+        active = await self.db.list_active_mod_jobs(1, ROLE_ACTIONS)
+        self.assertEqual([j["job_id"] for j in active], [job_id])
+        self.assertIsNone((await self.db.get_mod_job(job_id))["finished_at"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import unittest
+
+from cogs.utilities.role_menus import plan_role_change
+from utils.database import Database
+
+
+def _cleanup(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+class PlanRoleChangeTests(unittest.TestCase):
+    MENU = [1, 2, 3]
+
+    def test_toggle_button(self):
+        self.assertEqual(
+            plan_role_change({9}, self.MENU, "toggle", clicked=1), ({1}, set())
+        )
+        self.assertEqual(
+            plan_role_change({1, 9}, self.MENU, "toggle", clicked=1), (set(), {1})
+        )
+
+    def test_unique_button_swaps_role(self):
+        self.assertEqual(
+            plan_role_change({1, 2, 9}, self.MENU, "unique", clicked=3), ({3}, {1, 2})
+        )
+
+    def test_add_mode_never_removes(self):
+        self.assertEqual(
+            plan_role_change({1}, self.MENU, "add", clicked=1), (set(), set())
+        )
+        self.assertEqual(
+            plan_role_change({1}, self.MENU, "add", selected=[2]), ({2}, set())
+        )
+
+    def test_select_toggles_picked_roles_only(self):
+        self.assertEqual(
+            plan_role_change({1, 9}, self.MENU, "toggle", selected=[2, 3]),
+            ({2, 3}, set()),
+        )
+        self.assertEqual(
+            plan_role_change({1, 2}, self.MENU, "toggle", selected=[1]),
+            (set(), {1}),
+        )
+
+    def test_unique_select(self):
+        self.assertEqual(
+            plan_role_change({1, 9}, self.MENU, "unique", selected=[2]), ({2}, {1})
+        )
+        self.assertEqual(
+            plan_role_change({1}, self.MENU, "unique", selected=[1]), (set(), {1})
+        )
+        self.assertEqual(
+            plan_role_change({1}, self.MENU, "unique", selected=[]), (set(), set())
+        )
+
+    def test_foreign_roles_ignored(self):
+        self.assertEqual(
+            plan_role_change(set(), self.MENU, "toggle", clicked=9), (set(), set())
+        )
+        self.assertEqual(
+            plan_role_change(set(), self.MENU, "toggle", selected=[9]), (set(), set())
+        )
+
+
+class RoleMenuDBTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db_path = "test_role_menus_temp.db"
+        _cleanup(self.db_path)
+        self.db = Database(self.db_path)
+        await self.db.connect()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        _cleanup(self.db_path)
+
+    async def test_index_is_filled_lazily(self):
+        await self.db.create_role_menu(100, 1, 5, [10, 11], "unique", "select")
+        self.assertNotIn(100, self.db._role_menu_index)
+
+        menu = await self.db.get_role_menu(100)
+        self.assertEqual(menu["role_ids"], [10, 11])
+        self.assertEqual((menu["mode"], menu["style"]), ("unique", "select"))
+        self.assertIn(100, self.db._role_menu_index)
+        # Bản trả về là bản sao, sửa không ảnh hưởng index
+        menu["role_ids"].append(12)
+        self.assertEqual((await self.db.get_role_menu(100))["role_ids"], [10, 11])
+
+    async def test_unknown_and_deleted_messages_are_cached(self):
+        self.assertIsNone(await self.db.get_role_menu(200))
+        self.assertIn(200, self.db._role_menu_index)
+
+        await self.db.create_role_menu(300, 1, 5, [10])
+        await self.db.get_role_menu(300)
+        self.assertTrue(await self.db.delete_role_menu(300))
+        self.assertIsNone(await self.db.get_role_menu(300))
+        self.assertEqual(await self.db.list_role_menus(1), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
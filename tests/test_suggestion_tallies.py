@@ -0,0 +1,111 @@
+import asyncio
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from utils.database import Database
+from utils.modals import SuggestionVotingView, _VoteLabelUpdater
+
+
+def _cleanup(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+class SuggestionTallyTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db_path = "test_suggestion_temp.db"
+        _cleanup(self.db_path)
+        self.db = Database(self.db_path)
+        await self.db.connect()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        _cleanup(self.db_path)
+
+    async def _group_by_counts(self, message_id):
+        async with self.db.conn.execute(
+            "SELECT SUM(vote = 1), SUM(vote = -1) FROM suggestion_votes WHERE message_id=?",
+            (message_id,),
+        ) as cur:
+            up, down = await cur.fetchone()
+        return (up or 0, down or 0)
+
+    async def test_cast_vote_toggles_and_keeps_table_in_sync(self):
+        self.assertEqual(await self.db.cast_vote(1, 10, 1), (1, (1, 0)))
+        self.assertEqual(await self.db.cast_vote(1, 11, 1), (1, (2, 0)))
+        self.assertEqual(await self.db.cast_vote(1, 11, -1), (-1, (1, 1)))
+        self.assertEqual(await self.db.cast_vote(1, 10, 1), (None, (0, 1)))
+
+        self.db._suggestion_tallies.clear()
+        self.assertEqual(await self.db.get_vote_counts(1), (0, 1))
+        self.assertEqual(await self._group_by_counts(1), (0, 1))
+
+    async def test_tally_cache_is_bounded(self):
+        self.db._suggestion_tallies.maxsize = 2
+        for message_id in (1, 2, 3):
+            await self.db.cast_vote(message_id, 10, 1)
+        self.assertEqual(len(self.db._suggestion_tallies.cache), 2)
+        # Entry bị đẩy ra được đọc lại từ bảng tally
+        self.assertEqual(await self.db.get_vote_counts(1), (1, 0))
+
+    async def test_legacy_writers_update_tally_via_triggers(self):
+        await self.db.get_vote_counts(2)
+        await self.db.set_vote(2, 10, 1)
+        await self.db.set_vote(2, 11, -1)
+        await self.db.remove_vote(2, 11)
+        self.assertEqual(await self.db.get_vote_counts(2), (1, 0))
+
+    async def test_migration_backfills_existing_votes(self):
+        await self.db.conn.execute("DROP TABLE suggestion_tallies")
+        for name in ("ai", "au", "ad"):
+            await self.db.conn.execute(f"DROP TRIGGER suggestion_votes_{name}")
+        await self.db.conn.executemany(
+            "INSERT INTO suggestion_votes (message_id, user_id, vote) VALUES (?,?,?)",
+            [(3, 1, 1), (3, 2, 1), (3, 3, -1)],
+        )
+        await self.db.conn.execute("PRAGMA user_version = 14")
+        await self.db.conn.commit()
+
+        await self.db.run_migrations()
+        self.assertEqual(await self.db.get_vote_counts(3), (2, 1))
+        self.assertEqual(await self.db.cast_vote(3, 3, -1), (None, (2, 0)))
+
+
+class VoteLabelUpdaterTests(unittest.IsolatedAsyncioTestCase):
+    async def test_edits_are_coalesced_per_message(self):
+        tally = {"value": (0, 0)}
+        db = SimpleNamespace(
+            get_vote_counts=AsyncMock(side_effect=lambda _: tally["value"])
+        )
+        message = SimpleNamespace(id=1, edit=AsyncMock())
+        view = SuggestionVotingView(db)
+        updater = _VoteLabelUpdater(interval=0.05)
+
+        updater.schedule(view, db, message)
+        await asyncio.sleep(0)
+        self.assertEqual(message.edit.await_count, 1)
+
+        for i in range(1, 20):
+            tally["value"] = (i, 0)
+            updater.schedule(view, db, message)
+        await asyncio.sleep(0.01)
+        self.assertEqual(message.edit.await_count, 1)
+        await asyncio.sleep(0.08)
+        self.assertEqual(message.edit.await_count, 2)
+        labels = [c.label for c in view.children]
+        self.assertIn("👍 19", labels)
+
+    async def test_db_error_is_logged_not_raised(self):
+        db = SimpleNamespace(get_vote_counts=AsyncMock(side_effect=RuntimeError("db")))
+        message = SimpleNamespace(id=2, edit=AsyncMock())
+        updater = _VoteLabelUpdater(interval=0.05)
+        with self.assertLogs("BlastBot.Modals", level="WARNING"):
+            await updater._edit(SuggestionVotingView(db), db, message, 0)
+        message.edit.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
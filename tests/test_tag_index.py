@@ -0,0 +1,33 @@
+import unittest
+
+from utils.tag_index import TagIndex
+
+
+class TagIndexTests(unittest.TestCase):
+    def test_prefix_ranked_by_usage(self):
+        index = TagIndex([("refund", "a", 1), ("rules", "b", 5), ("report", "c", 0)])
+        self.assertEqual(index.complete("r"), ["rules", "refund", "report"])
+        self.assertEqual(index.complete("re"), ["refund", "report"])
+        self.assertEqual(index.complete("RU "), ["rules"])
+        self.assertEqual(index.complete("x"), [])
+
+    def test_put_remove_keep_order(self):
+        index = TagIndex()
+        for tag_id in ("b", "a", "c"):
+            index.put(tag_id, tag_id.upper())
+        self.assertEqual(index.keys(), ["a", "b", "c"])
+        self.assertTrue(index.remove("b"))
+        self.assertFalse(index.remove("b"))
+        self.assertEqual(index.keys(), ["a", "c"])
+        self.assertIsNone(index.get("b"))
+
+    def test_limit_on_large_match(self):
+        index = TagIndex((f"tag{i:04d}", "", i % 7) for i in range(2000))
+        result = index.complete("tag", limit=25)
+        self.assertEqual(len(result), 25)
+        self.assertTrue(all(index.uses[t] == 6 for t in result))
+        self.assertEqual(result, sorted(result))
+
+
+if __name__ == "__main__":
+    unittest.main()
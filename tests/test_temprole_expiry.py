@@ -0,0 +1,140 @@
+import os
+import unittest
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import discord
+
+from cogs.moderation.temprole import TempRoleCommand
+from utils.database import Database
+
+
+class _Role(SimpleNamespace):
+    def __ge__(self, other):
+        return self.position >= other.position
+
+
+def _role(role_id, default=False, position=1, managed=False):
+    return _Role(
+        id=role_id,
+        name=f"r{role_id}",
+        position=position,
+        managed=managed,
+        is_default=lambda: default,
+    )
+
+
+def _cleanup(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+class TempRoleExpiryTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db_path = "test_temprole_temp.db"
+        _cleanup(self.db_path)
+        self.db = Database(self.db_path)
+        await self.db.connect()
+
+        self.guild = SimpleNamespace(
+            id=1,
+            unavailable=False,
+            chunked=True,
+            me=SimpleNamespace(top_role=_role(999, position=50)),
+            get_member=lambda uid: self.members.get(uid),
+        )
+        self.members = {}
+        bot = SimpleNamespace(
+            db=self.db,
+            get_guild=lambda gid: self.guild if gid == 1 else None,
+            wait_until_ready=AsyncMock(),
+        )
+        self.cog = TempRoleCommand(bot)
+        self.cog.check_expired_roles.cancel()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        _cleanup(self.db_path)
+
+    def _member(self, user_id, role_ids, extra_roles=()):
+        member = SimpleNamespace(
+            id=user_id,
+            guild=self.guild,
+            roles=[_role(1, default=True)]
+            + [_role(r) for r in role_ids]
+            + list(extra_roles),
+            edit=AsyncMock(),
+        )
+        self.members[user_id] = member
+        return member
+
+    async def _rows(self) -> set[tuple[int, int, int]]:
+        async with self.db.conn.execute(
+            "SELECT guild_id, user_id, role_id FROM temp_roles"
+        ) as cur:
+            return {tuple(r) for r in await cur.fetchall()}
+
+    async def test_one_edit_per_member_and_bulk_purge(self):
+        past = datetime.now(UTC) - timedelta(minutes=1)
+        future = datetime.now(UTC) + timedelta(days=1)
+        member = self._member(10, [100, 101, 102, 200])
+        for role_id in (100, 101, 102):
+            await self.db.add_temp_role(1, 10, role_id, past)
+        await self.db.add_temp_role(1, 10, 200, future)
+        # Member đã rời server và guild bot không còn ở: xóa hết, kể cả chưa hết hạn
+        await self.db.add_temp_role(1, 11, 100, past)
+        await self.db.add_temp_role(1, 11, 101, future)
+        await self.db.add_temp_role(2, 12, 100, past)
+
+        await self.cog.check_expired_roles()
+
+        member.edit.assert_awaited_once()
+        kept = [r.id for r in member.edit.await_args.kwargs["roles"]]
+        self.assertEqual(kept, [200])
+        self.assertEqual(await self._rows(), {(1, 10, 200)})
+
+    async def test_failed_edit_keeps_rows_for_retry(self):
+        past = datetime.now(UTC) - timedelta(minutes=1)
+        member = self._member(10, [100])
+        member.edit.side_effect = discord.HTTPException(
+            SimpleNamespace(status=500, reason="err"), "boom"
+        )
+        await self.db.add_temp_role(1, 10, 100, past)
+
+        await self.cog.check_expired_roles()
+        self.assertEqual(await self._rows(), {(1, 10, 100)})
+
+    async def test_unmanageable_role_does_not_block_the_rest(self):
+        past = datetime.now(UTC) - timedelta(minutes=1)
+        member = self._member(10, [100], extra_roles=[_role(300, position=60)])
+        for role_id in (100, 300):
+            await self.db.add_temp_role(1, 10, role_id, past)
+
+        await self.cog.check_expired_roles()
+
+        member.edit.assert_awaited_once()
+        kept = [r.id for r in member.edit.await_args.kwargs["roles"]]
+        self.assertEqual(kept, [300])
+        self.assertEqual(await self._rows(), set())
+
+    async def test_unavailable_or_unchunked_guild_keeps_unexpired_rows(self):
+        past = datetime.now(UTC) - timedelta(minutes=1)
+        future = datetime.now(UTC) + timedelta(days=1)
+        await self.db.add_temp_role(1, 11, 100, past)
+        await self.db.add_temp_role(1, 11, 101, future)
+
+        self.guild.unavailable = True
+        await self.cog.check_expired_roles()
+        self.assertEqual(await self._rows(), {(1, 11, 100), (1, 11, 101)})
+
+        # Member không có trong cache chưa chunk đủ: chỉ xóa dòng đã hết hạn
+        self.guild.unavailable = False
+        self.guild.chunked = False
+        await self.cog.check_expired_roles()
+        self.assertEqual(await self._rows(), {(1, 11, 101)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -61,6 +61,30 @@ class TicketDatabaseTests(unittest.IsolatedAsyncioTestCase):
         bl = await self.db.get_blacklist(guild_id)
         self.assertEqual(len(bl), 1)
 
+    async def test_permission_index_invalidation(self):
+        guild_id = 3004
+        index = await self.db.get_ticket_permission_index(guild_id)
+        self.assertFalse(index.is_staff(888, {10}))
+        # Index được cache: gọi lại trả đúng object cũ
+        self.assertIs(await self.db.get_ticket_permission_index(guild_id), index)
+
+        await self.db.add_staff(guild_id, entity_id=10, is_role=True, type_="support")
+        await self.db.add_staff(guild_id, entity_id=888, is_role=False, type_="admin")
+        index = await self.db.get_ticket_permission_index(guild_id)
+        self.assertTrue(index.is_staff(1, {10, 11}))
+        self.assertTrue(index.is_admin_staff(888, set()))
+        self.assertFalse(index.is_admin_staff(1, {10}))
+
+        await self.db.set_blacklist(
+            guild_id, entity_id=20, is_role=True, blacklisted=True
+        )
+        index = await self.db.get_ticket_permission_index(guild_id)
+        self.assertTrue(index.is_blacklisted(5, {20}))
+
+        await self.db.remove_staff(guild_id, 10, "support")
+        index = await self.db.get_ticket_permission_index(guild_id)
+        self.assertFalse(index.is_staff(1, {10}))
+
     async def test_tags(self):
         guild_id = 4004
         await self.db.add_tag(guild_id, "rules", "Be nice!")
@@ -70,6 +94,209 @@ class TicketDatabaseTests(unittest.IsolatedAsyncioTestCase):
         tags_list = await self.db.list_tags(guild_id)
         self.assertIn("rules", tags_list)
 
+    async def test_tag_usage_flush(self):
+        guild_id = 4005
+        await self.db.add_tag(guild_id, "rules", "Be nice!")
+        index = await self.db.get_tag_index(guild_id)
+        await self.db.add_tag(guild_id, "refund", "...")
+        self.assertEqual(index.complete("r"), ["refund", "rules"])
+
+        for _ in range(3):
+            self.db.record_tag_use(guild_id, "rules")
+        self.assertEqual(index.complete("r"), ["rules", "refund"])
+        self.assertEqual(await self.db.flush_tag_usage(), 1)
+        self.assertEqual(await self.db.flush_tag_usage(), 0)
+
+        # Sửa nội dung không làm mất lượt dùng đã ghi
+        await self.db.add_tag(guild_id, "rules", "Be kind!")
+        async with self.db.conn.execute(
+            "SELECT uses FROM ticket_tags WHERE guild_id=? AND tag_id='rules'",
+            (guild_id,),
+        ) as cur:
+            self.assertEqual((await cur.fetchone())[0], 3)
+
+        self.assertTrue(await self.db.delete_tag(guild_id, "rules"))
+        self.assertEqual(index.complete("r"), ["refund"])
+        self.assertIsNone(await self.db.get_tag(guild_id, "rules"))
+
+    async def test_panel_pool(self):
+        guild_id = 5005
+        panel_id = await self.db.create_panel(
+            guild_id,
+            title="Support",
+            content="Click",
+            color=0,
+            category_id=1,
+            button_label="Open",
+        )
+        self.assertEqual(await self.db.list_pooled_panels(), [])
+
+        await self.db.update_panel(panel_id, pool_size=2, pool_fallback=0)
+        pooled = await self.db.list_pooled_panels()
+        self.assertEqual(len(pooled), 1)
+        self.assertEqual(pooled[0]["pool_fallback"], 0)
+
+        await self.db.add_pool_channel(guild_id, panel_id, 101)
+        await self.db.add_pool_channel(guild_id, panel_id, 102)
+        self.assertEqual(await self.db.list_pool_channels(panel_id), [101, 102])
+
+        # Lấy ra theo thứ tự cũ nhất trước, và không trả lại lần hai
+        self.assertEqual(await self.db.take_pool_channel(panel_id), 101)
+        self.assertEqual(await self.db.list_pool_channels(panel_id), [102])
+
+        # Tắt pool nhưng còn kênh dựng sẵn → panel vẫn vào vòng dọn
+        await self.db.update_panel(panel_id, pool_size=0)
+        self.assertEqual(len(await self.db.list_pooled_panels()), 1)
+
+        await self.db.delete_panel(panel_id)
+        self.assertIsNone(await self.db.take_pool_channel(panel_id))
+
+    async def test_panel_thread_mode(self):
+        panel_id = await self.db.create_panel(
+            6006,
+            title="Support",
+            content="Click",
+            color=0,
+            category_id=1,
+            button_label="Open",
+        )
+        self.assertEqual((await self.db.get_panel(panel_id))["mode"], "channel")
+
+        await self.db.update_panel(panel_id, mode="thread", pool_size=3)
+        self.assertEqual((await self.db.get_panel(panel_id))["mode"], "thread")
+        # Panel dạng thread không dùng pool kênh dựng sẵn
+        self.assertEqual(await self.db.list_pooled_panels(), [])
+
+    async def test_overflow_categories(self):
+        await self.db.add_overflow_category(7007, 500, 503, 3)
+        await self.db.add_overflow_category(7007, 500, 502, 2)
+        rows = await self.db.list_overflow_categories(500)
+        self.assertEqual([r["category_id"] for r in rows], [502, 503])
+        self.assertEqual((await self.db.get_overflow_category(503))["idx"], 3)
+
+        self.assertTrue(await self.db.remove_overflow_category(502))
+        self.assertIsNone(await self.db.get_overflow_category(502))
+        self.assertFalse(await self.db.remove_overflow_category(502))
+
+    async def test_panel_registry(self):
+        panel_id = await self.db.create_panel(
+            8008,
+            title="Support",
+            content="Click",
+            color=0,
+            category_id=1,
+            button_label="Open",
+            mention_on_open=[42],
+        )
+        # Chưa nạp registry → tra bằng index SQL
+        await self.db.set_panel_message(panel_id, 10, 900)
+        panel = await self.db.get_panel_by_message(900)
+        self.assertEqual(panel["panel_id"], panel_id)
+
+        await self.db.load_panel_registry()
+        panel = await self.db.get_panel_by_message(900)
+        self.assertEqual(panel["mention_on_open"], [42])
+        # Bản trả về là copy, sửa không ảnh hưởng registry
+        panel["mention_on_open"].append(1)
+        self.assertEqual(
+            (await self.db.get_panel_by_message(900))["mention_on_open"], [42]
+        )
+
+        await self.db.update_panel(panel_id, title="Hỗ trợ")
+        self.assertEqual((await self.db.get_panel_by_message(900))["title"], "Hỗ trợ")
+
+        await self.db.set_panel_message(panel_id, 10, 901)
+        self.assertIsNone(await self.db.get_panel_by_message(900))
+        self.assertIsNotNone(await self.db.get_panel_by_message(901))
+
+        await self.db.delete_panel(panel_id)
+        self.assertIsNone(await self.db.get_panel_by_message(901))
+
+    async def test_ticket_stats_rollups(self):
+        guild_id = 7007
+        await self.db.create_ticket(
+            guild_id, 1, channel_id=71, owner_id=1, panel_id=None
+        )
+        await self.db.set_claim(71, 500)
+        self.assertTrue(await self.db.record_first_response(71, 500))
+        self.assertFalse(await self.db.record_first_response(71, 501))
+        self.assertTrue(await self.db.close_ticket_db(71, "xong"))
+
+        stats = await self.db.get_ticket_stats(guild_id, 7)
+        self.assertEqual(stats["opened"], 1)
+        self.assertEqual(stats["closed"], 1)
+        self.assertEqual(stats["responded"], 1)
+        staff = await self.db.get_staff_stats(guild_id, 7)
+        self.assertEqual(len(staff), 1)
+        self.assertEqual(staff[0]["staff_id"], 500)
+        self.assertEqual(staff[0]["claims"], 1)
+        self.assertEqual(staff[0]["closes"], 1)
+
+        # Ticket đã đóng trước khi có rollup → backfill cộng cả lượt mở lẫn đóng
+        await self.db.create_ticket(
+            guild_id, 2, channel_id=72, owner_id=2, panel_id=None
+        )
+        await self.db.close_ticket_db(72, None)
+        await self.db.conn.execute(
+            "UPDATE tickets SET stats_rolled=0 WHERE channel_id=72"
+        )
+        await self.db.conn.execute("DELETE FROM ticket_stats_daily")
+        await self.db.conn.commit()
+
+        self.assertEqual(await self.db.backfill_ticket_stats(100), 1)
+        self.assertEqual(await self.db.backfill_ticket_stats(100), 0)
+        stats = await self.db.get_ticket_stats(guild_id, 7)
+        self.assertEqual(stats["opened"], 1)
+        self.assertEqual(stats["closed"], 1)
+
+    async def test_auto_assign_workload(self):
+        guild_id = 8008
+        await self.db.create_ticket(
+            guild_id, 1, channel_id=81, owner_id=1, panel_id=None
+        )
+        await self.db.set_claim(81, 500)
+
+        workload = await self.db.get_staff_workload(guild_id)
+        workload.ensure([500, 600])
+        self.assertEqual(workload.count(500), 1)
+
+        await self.db.create_ticket(
+            guild_id, 2, channel_id=82, owner_id=2, panel_id=None
+        )
+        self.assertEqual(
+            await self.db.assign_least_loaded(guild_id, 82, lambda _: True), 600
+        )
+        ticket = await self.db.get_ticket_by_channel(82)
+        self.assertEqual(ticket["claimed_by"], 600)
+        self.assertEqual(workload.count(600), 1)
+
+        # Chuyển claim và đóng ticket cập nhật heap mà không đọc lại DB
+        await self.db.set_claim(82, 500)
+        self.assertEqual(workload.count(500), 2)
+        self.assertEqual(workload.count(600), 0)
+        await self.db.close_ticket_db(81, None)
+        self.assertEqual(workload.count(500), 1)
+
+        self.db.invalidate_ticket_permissions(guild_id)
+        self.assertFalse(workload.seeded)
+
+    async def test_close_orphan_tickets(self):
+        guild_id = 9009
+        for number, channel_id in enumerate((91, 92, 93), start=1):
+            await self.db.create_ticket(
+                guild_id, number, channel_id=channel_id, owner_id=1, panel_id=None
+            )
+        open_channels = await self.db.list_open_ticket_channels()
+        self.assertEqual(sorted(open_channels[guild_id]), [91, 92, 93])
+
+        closed = await self.db.close_orphan_tickets([91, 93, 404], "Channel đã bị xóa")
+        self.assertEqual(closed, 2)
+        self.assertEqual(await self.db.count_open_tickets(guild_id, 1), 1)
+        ticket = await self.db.get_ticket_by_channel(91)
+        self.assertEqual(ticket["close_reason"], "Channel đã bị xóa")
+        self.assertEqual(ticket["stats_rolled"], 2)
+        self.assertEqual(await self.db.close_orphan_tickets([91], None), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
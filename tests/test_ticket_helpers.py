@@ -0,0 +1,63 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+
+from cogs.tickets.helpers import create_ticket_thread, plan_overwrites
+
+
+class OverwritePlannerTests(unittest.TestCase):
+    def setUp(self):
+        self.read_only = discord.PermissionOverwrite(
+            view_channel=True, send_messages=False
+        )
+        self.full = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+
+    def test_no_change_skips_request(self):
+        current = {"role": self.read_only, "owner": self.full}
+        changes = {
+            "role": discord.PermissionOverwrite(view_channel=True, send_messages=False),
+            "ghost": None,
+        }
+        self.assertIsNone(plan_overwrites(current, changes))
+
+    def test_merges_all_changes_into_one_map(self):
+        current = {"role": self.full, "staff": self.full, "guest": self.full}
+        target = plan_overwrites(
+            current,
+            {"role": self.read_only, "staff": self.read_only, "guest": None},
+        )
+        self.assertEqual(target, {"role": self.read_only, "staff": self.read_only})
+        # Map hiện tại không bị sửa tại chỗ
+        self.assertIn("guest", current)
+
+
+class TicketThreadTests(unittest.IsolatedAsyncioTestCase):
+    async def test_thread_deleted_when_owner_cannot_be_added(self):
+        thread = SimpleNamespace(
+            add_user=AsyncMock(
+                side_effect=discord.HTTPException(
+                    SimpleNamespace(status=500, reason="err"), "boom"
+                )
+            ),
+            delete=AsyncMock(),
+        )
+        parent = MagicMock(spec=discord.TextChannel)
+        parent.create_thread = AsyncMock(return_value=thread)
+        guild = SimpleNamespace(get_channel=lambda cid: parent)
+
+        with self.assertRaises(discord.HTTPException):
+            await create_ticket_thread(
+                guild,
+                {"channel_id": 5},
+                SimpleNamespace(id=1),
+                [],
+                name="ticket-0001",
+                reason="test",
+            )
+        thread.delete.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
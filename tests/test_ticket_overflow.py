@@ -0,0 +1,65 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+
+from cogs.tickets.overflow import CategoryCounter, TicketOverflow
+from utils.constants import TICKET_CONFIG
+
+
+class CategoryCounterTests(unittest.TestCase):
+    def test_counts_children_and_reservations(self):
+        limit = TICKET_CONFIG["category_channel_limit"]
+        category = SimpleNamespace(
+            id=1, channels=[SimpleNamespace(id=i) for i in range(limit - 1)]
+        )
+        counter = CategoryCounter()
+        self.assertTrue(counter.has_room(category))
+
+        # Slot đang tạo dở cũng chiếm chỗ
+        counter.reserve(category.id)
+        self.assertFalse(counter.has_room(category))
+
+        # Event create tới trước hay sau khi tạo xong đều không đếm trùng
+        counter.add(category.id, 999)
+        counter.add(category.id, 999)
+        counter.release(category.id)
+        self.assertEqual(counter.count(category), limit)
+
+        counter.discard(category.id, 999)
+        self.assertTrue(counter.has_room(category))
+
+    def test_forget_reloads_from_cache(self):
+        category = SimpleNamespace(id=2, channels=[SimpleNamespace(id=10)])
+        counter = CategoryCounter()
+        self.assertEqual(counter.count(category), 1)
+        category.channels = []
+        self.assertEqual(counter.count(category), 1)
+        counter.forget(category.id)
+        self.assertEqual(counter.count(category), 0)
+
+
+class OverflowListenerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_manual_delete_cleans_empty_overflow_category(self):
+        category = MagicMock(spec=discord.CategoryChannel)
+        category.id, category.channels = 50, []
+        category.delete = AsyncMock()
+        guild = SimpleNamespace(get_channel=lambda cid: category)
+        db = SimpleNamespace(
+            get_overflow_category=AsyncMock(
+                return_value={"category_id": 50, "primary_id": 5}
+            ),
+            remove_overflow_category=AsyncMock(),
+        )
+        cog = TicketOverflow(SimpleNamespace(db=db))
+        channel = SimpleNamespace(id=7, category_id=50, guild=guild)
+
+        await cog.on_guild_channel_delete(channel)
+
+        category.delete.assert_awaited_once()
+        db.remove_overflow_category.assert_awaited_once_with(50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from cogs.tickets.queue import TicketOpenQueue
+
+
+def _interaction(guild_id: int, user_id: int):
+    return SimpleNamespace(
+        guild=SimpleNamespace(id=guild_id),
+        user=SimpleNamespace(id=user_id),
+        followup=SimpleNamespace(send=AsyncMock(return_value=None)),
+    )
+
+
+class TicketQueueTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.bot = SimpleNamespace(
+            db=SimpleNamespace(
+                get_ticket_settings=AsyncMock(return_value={"open_concurrency": 2})
+            )
+        )
+        self.queue = TicketOpenQueue()
+
+    async def test_limits_concurrency_in_fifo_order(self):
+        release = asyncio.Event()
+        running = 0
+        peak = 0
+        order = []
+
+        async def work(user_id):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            order.append(user_id)
+            await release.wait()
+            running -= 1
+
+        tasks = [
+            asyncio.create_task(
+                self.queue.submit(
+                    self.bot, _interaction(1, uid), lambda uid=uid: work(uid)
+                )
+            )
+            for uid in range(5)
+        ]
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.queue.stats()["active"], 2)
+        self.assertEqual(self.queue.stats()["waiting"], 3)
+        self.assertEqual(self.queue.position(1, 2), 1)
+        self.assertEqual(self.queue.position(1, 4), 3)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(peak, 2)
+        self.assertEqual(order, [0, 1, 2, 3, 4])
+        # Hàng của guild được dọn khi trống
+        self.assertEqual(self.queue.stats()["guilds"], 0)
+
+    async def test_duplicate_click_collapses(self):
+        release = asyncio.Event()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+
+        first = asyncio.create_task(
+            self.queue.submit(self.bot, _interaction(1, 42), work)
+        )
+        await asyncio.sleep(0.01)
+        duplicate = _interaction(1, 42)
+        await self.queue.submit(self.bot, duplicate, work)
+        duplicate.followup.send.assert_awaited_once()
+
+        release.set()
+        await first
+        self.assertEqual(calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
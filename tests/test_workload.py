@@ -0,0 +1,35 @@
+import unittest
+
+from utils.workload import WorkloadHeap
+
+
+class WorkloadHeapTests(unittest.TestCase):
+    def test_picks_least_loaded(self):
+        heap = WorkloadHeap({1: 3, 2: 1, 3: 2})
+        self.assertEqual(heap.pick(lambda _: True), 2)
+        heap.adjust(2, 5)
+        self.assertEqual(heap.pick(lambda _: True), 3)
+
+    def test_skips_ineligible_and_keeps_them(self):
+        heap = WorkloadHeap({1: 0, 2: 1})
+        self.assertEqual(heap.pick(lambda s: s != 1), 2)
+        self.assertEqual(heap.pick(lambda _: True), 1)
+        self.assertIsNone(heap.pick(lambda _: False))
+        self.assertEqual(len(heap), 2)
+
+    def test_stale_entries_ignored(self):
+        heap = WorkloadHeap()
+        heap.ensure([10, 20])
+        for _ in range(500):
+            heap.adjust(10, 1)
+            heap.adjust(10, -1)
+        heap.adjust(10, 1)
+        self.assertEqual(heap.pick(lambda _: True), 20)
+        heap.discard(20)
+        self.assertEqual(heap.pick(lambda _: True), 10)
+        # Heap được dựng lại thay vì giữ hết entry stale
+        self.assertLess(len(heap._heap), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,263 @@
+"""Database mixin lưu trữ lạnh: chuyển ticket đã đóng và mod log cũ sang file archive.
+
+File archive được ``ATTACH`` lười (lần đầu job chạy hoặc khi đọc lịch sử có
+``include_archived``) dưới schema ``archive``. Mỗi lô chép bằng ``INSERT OR IGNORE``
+theo id rồi mới xóa ở bảng nóng, nên chạy lại sau crash giữa chừng vẫn an toàn
+(WAL không đảm bảo atomic giữa hai file).
+"""
+
+import time
+
+from utils.constants import RETENTION_CONFIG
+
+_TICKET_COLUMNS = (
+    "id, guild_id, number, channel_id, owner_id, panel_id, claimed_by, "
+    "open_time, close_time, close_reason, first_response_time, claim_time"
+)
+_MODLOG_COLUMNS = (
+    "id, guild_id, moderator_id, action, target_id, target_str, reason, "
+    "extra_json, created_at"
+)
+
+
+class ArchiveDBMixin:
+    # ---------- bảng ----------
+    async def migrate_retention(self):
+        """v10: thời gian giữ dữ liệu nóng theo guild (NULL = mặc định)."""
+        if not self.conn:
+            return
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS retention_settings (
+                guild_id INTEGER PRIMARY KEY,
+                ticket_days INTEGER, modlog_days INTEGER)""")
+        await self._commit_if_not_in_tx()
+
+    async def ensure_archive(self) -> bool:
+        """ATTACH file archive và tạo bảng nếu chưa có. Không gọi trong transaction."""
+        async with self._lock:
+            if not self.conn:
+                return False
+            if self._archive_attached:
+                return True
+            c = self.conn
+            await c.execute("ATTACH DATABASE ? AS archive", (self.archive_path,))
+            await c.execute("PRAGMA archive.journal_mode = WAL")
+            await c.execute("""
+                CREATE TABLE IF NOT EXISTS archive.tickets (
+                    id INTEGER PRIMARY KEY, guild_id INTEGER NOT NULL,
+                    number INTEGER NOT NULL, channel_id INTEGER,
+                    owner_id INTEGER NOT NULL, panel_id INTEGER, claimed_by INTEGER,
+                    open_time TIMESTAMP, close_time TIMESTAMP, close_reason TEXT,
+                    first_response_time TIMESTAMP, claim_time TIMESTAMP)""")
+            await c.execute(
+                "CREATE INDEX IF NOT EXISTS archive.idx_archive_tickets_owner "
+                "ON tickets(guild_id, owner_id)"
+            )
+            await c.execute("""
+                CREATE TABLE IF NOT EXISTS archive.ticket_members (
+                    channel_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+                    PRIMARY KEY (channel_id, user_id))""")
+            await c.execute("""
+                CREATE TABLE IF NOT EXISTS archive.moderation_logs (
+                    id INTEGER PRIMARY KEY, guild_id INTEGER NOT NULL,
+                    moderator_id INTEGER NOT NULL, action TEXT NOT NULL,
+                    target_id INTEGER NOT NULL, target_str TEXT, reason TEXT,
+                    extra_json TEXT, created_at TIMESTAMP)""")
+            await c.execute(
+                "CREATE INDEX IF NOT EXISTS archive.idx_archive_modlogs_target "
+                "ON moderation_logs(guild_id, target_id)"
+            )
+            await c.commit()
+            self._archive_attached = True
+            return True
+
+    # ---------- cấu hình ----------
+    async def get_retention(self, guild_id: int) -> dict:
+        """Số ngày giữ ticket đã đóng / mod log ở bảng nóng (0 = không bao giờ chuyển)."""
+        async with self._lock:
+            result = {
+                "ticket_days": RETENTION_CONFIG["ticket_days_default"],
+                "modlog_days": RETENTION_CONFIG["modlog_days_default"],
+            }
+            if not self.conn:
+                return result
+            async with self.conn.execute(
+                "SELECT ticket_days, modlog_days FROM retention_settings WHERE guild_id=?",
+                (guild_id,),
+            ) as cur:
+                row = await cur.fetchone()
+            if row:
+                result.update({k: row[k] for k in result if row[k] is not None})
+            return result
+
+    async def set_retention(
+        self,
+        guild_id: int,
+        ticket_days: int | None = None,
+        modlog_days: int | None = None,
+    ):
+        async with self._lock:
+            if not self.conn:
+                return
+            await self.conn.execute(
+                """INSERT INTO retention_settings (guild_id, ticket_days, modlog_days)
+                   VALUES (?,?,?)
+                   ON CONFLICT(guild_id) DO UPDATE SET
+                     ticket_days=COALESCE(excluded.ticket_days, ticket_days),
+                     modlog_days=COALESCE(excluded.modlog_days, modlog_days)""",
+                (guild_id, ticket_days, modlog_days),
+            )
+            await self._commit_if_not_in_tx()
+
+    # ---------- chuyển dữ liệu ----------
+    async def archive_closed_tickets(self, batch_size: int) -> int:
+        """Chuyển một lô ticket đã đóng quá hạn (kèm ticket_members). Trả số ticket."""
+        if not await self.ensure_archive():
+            return 0
+        async with self.transaction():
+            # Chỉ lấy ticket đã cộng rollup để backfill thống kê không bỏ sót
+            async with self.conn.execute(
+                """SELECT t.id, t.channel_id FROM tickets t
+                   LEFT JOIN retention_settings r ON r.guild_id = t.guild_id
+                   WHERE t.open=0 AND t.stats_rolled=2
+                     AND COALESCE(r.ticket_days, ?) > 0
+                     AND julianday('now') - julianday(t.close_time)
+                         > COALESCE(r.ticket_days, ?)
+                   LIMIT ?""",
+                (
+                    RETENTION_CONFIG["ticket_days_default"],
+                    RETENTION_CONFIG["ticket_days_default"],
+                    batch_size,
+                ),
+            ) as cur:
+                rows = await cur.fetchall()
+            if not rows:
+                return 0
+            ids = [r["id"] for r in rows]
+            channels = [r["channel_id"] for r in rows if r["channel_id"] is not None]
+            id_marks = ",".join("?" * len(ids))
+            await self.conn.execute(
+                f"INSERT OR IGNORE INTO archive.tickets ({_TICKET_COLUMNS}) "
+                f"SELECT {_TICKET_COLUMNS} FROM main.tickets WHERE id IN ({id_marks})",
+                ids,
+            )
+            if channels:
+                ch_marks = ",".join("?" * len(channels))
+                await self.conn.execute(
+                    "INSERT OR IGNORE INTO archive.ticket_members (channel_id, user_id) "
+                    "SELECT channel_id, user_id FROM main.ticket_members "
+                    f"WHERE channel_id IN ({ch_marks})",
+                    channels,
+                )
+                await self.conn.execute(
+                    f"DELETE FROM main.ticket_members WHERE channel_id IN ({ch_marks})",
+                    channels,
+                )
+            await self.conn.execute(
+                f"DELETE FROM main.tickets WHERE id IN ({id_marks})", ids
+            )
+            return len(ids)
+
+    async def archive_mod_logs(self, batch_size: int) -> int:
+        """Chuyển một lô mod log quá hạn sang archive. Trả số dòng."""
+        if not await self.ensure_archive():
+            return 0
+        async with self.transaction():
+            async with self.conn.execute(
+                """SELECT m.id FROM moderation_logs m
+                   LEFT JOIN retention_settings r ON r.guild_id = m.guild_id
+                   WHERE COALESCE(r.modlog_days, ?) > 0
+                     AND julianday('now') - julianday(m.created_at)
+                         > COALESCE(r.modlog_days, ?)
+                   ORDER BY m.id LIMIT ?""",
+                (
+                    RETENTION_CONFIG["modlog_days_default"],
+                    RETENTION_CONFIG["modlog_days_default"],
+                    batch_size,
+                ),
+            ) as cur:
+                ids = [r[0] for r in await cur.fetchall()]
+            if not ids:
+                return 0
+            marks = ",".join("?" * len(ids))
+            await self.conn.execute(
+                f"INSERT OR IGNORE INTO archive.moderation_logs ({_MODLOG_COLUMNS}) "
+                f"SELECT {_MODLOG_COLUMNS} FROM main.moderation_logs WHERE id IN ({marks})",
+                ids,
+            )
+            await self.conn.execute(
+                f"DELETE FROM main.moderation_logs WHERE id IN ({marks})", ids
+            )
+            return len(ids)
+
+    async def run_retention(self, budget_seconds: float, batch_size: int) -> dict:
+        """Chạy từng lô cho tới khi hết việc hoặc hết ``budget_seconds``.
+
+        Mỗi lô là một transaction riêng nên lệnh khác vẫn chen vào được giữa các lô.
+        """
+        deadline = time.monotonic() + budget_seconds
+        moved = {"tickets": 0, "modlogs": 0, "mod_jobs": 0}
+        for key, step in (
+            ("tickets", self.archive_closed_tickets),
+            ("modlogs", self.archive_mod_logs),
+            ("mod_jobs", self.prune_finished_mod_jobs),
+        ):
+            while time.monotonic() < deadline:
+                n = await step(batch_size)
+                moved[key] += n
+                if n < batch_size:
+                    break
+        return moved
+
+    # ---------- đọc lịch sử ----------
+    async def get_ticket_history(
+        self,
+        guild_id: int,
+        owner_id: int | None = None,
+        limit: int = 25,
+        include_archived: bool = False,
+    ) -> list[dict]:
+        """Ticket gần nhất của guild (hoặc của một user), mới nhất trước."""
+        if include_archived:
+            include_archived = await self.ensure_archive()
+        where = "guild_id=?" + (" AND owner_id=?" if owner_id is not None else "")
+        params = [guild_id] + ([owner_id] if owner_id is not None else [])
+        sql = f"SELECT {_TICKET_COLUMNS}, open FROM main.tickets WHERE {where}"
+        if include_archived:
+            sql += (
+                f" UNION ALL SELECT {_TICKET_COLUMNS}, 0 AS open "
+                f"FROM archive.tickets WHERE {where}"
+            )
+            params += params
+        sql += " ORDER BY id DESC LIMIT ?"
+        async with self._lock:
+            if not self.conn:
+                return []
+            async with self.conn.execute(sql, [*params, limit]) as cur:
+                return [dict(r) for r in await cur.fetchall()]
+
+    async def get_mod_logs(
+        self,
+        guild_id: int,
+        target_id: int | None = None,
+        limit: int = 25,
+        include_archived: bool = False,
+    ) -> list[dict]:
+        """Mod log gần nhất của guild (hoặc của một member), mới nhất trước."""
+        if include_archived:
+            include_archived = await self.ensure_archive()
+        where = "guild_id=?" + (" AND target_id=?" if target_id is not None else "")
+        params = [guild_id] + ([target_id] if target_id is not None else [])
+        sql = f"SELECT {_MODLOG_COLUMNS} FROM main.moderation_logs WHERE {where}"
+        if include_archived:
+            sql += (
+                f" UNION ALL SELECT {_MODLOG_COLUMNS} "
+                f"FROM archive.moderation_logs WHERE {where}"
+            )
+            params += params
+        sql += " ORDER BY id DESC LIMIT ?"
+        async with self._lock:
+            if not self.conn:
+                return []
+            async with self.conn.execute(sql, [*params, limit]) as cur:
+                return [dict(r) for r in await cur.fetchall()]
@@ -11,6 +11,7 @@ class Config:
     TOKEN: str | None = os.getenv("DISCORD_TOKEN")
     DEFAULT_PREFIX: str = os.getenv("BOT_PREFIX", "!")
     DB_PATH: str = os.getenv("DB_PATH", "./data/bot.db")
+    ARCHIVE_DB_PATH: str | None = os.getenv("ARCHIVE_DB_PATH") or None
     GUILD_ID: str | None = os.getenv("GUILD_ID") or None
     OWNER_ID: str | None = os.getenv("OWNER_ID") or None
 
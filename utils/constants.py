@@ -66,16 +66,129 @@ BOT_CONFIG = {
 CACHE_CONFIG = {
     "guild_config_ttl_seconds": 300,  # 5 minutes
     "guild_config_maxsize": 128,
+    "suggestion_tally_ttl_seconds": 3600,
+    "suggestion_tally_maxsize": 2048,  # suggestion đang được vote gần đây
 }
 
 # Clear command configuration
 CLEAR_CONFIG = {
-    "max_messages": 100,
+    "max_messages": 10000,
     "min_messages": 1,
-    "batch_size": 50,
-    "batch_delay_seconds": 1,
-    "old_message_delete_delay_seconds": 1,
     "message_age_limit_days": 14,
+    # Tin gần mốc 14 ngày được xóa lẻ cho chắc (bulk delete từ chối tin quá 14 ngày)
+    "bulk_age_margin_minutes": 10,
+    "pipeline_depth": 3,  # số lô bulk delete được fetch trước
+    "progress_interval_seconds": 3,
+    "regex_max_length": 100,
+    "contains_max_length": 100,
+}
+
+# Moderation configuration
+MODERATION_CONFIG = {
+    # Chờ tối đa N giây khi moderator khác đang thao tác trên cùng member
+    "target_lock_timeout_seconds": 10,
+    # Lệnh slash giữ lock trước khi trả lời interaction (hạn 3 giây) nên chờ ngắn hơn
+    "target_lock_command_wait_seconds": 2,
+}
+
+# Lưu trữ lạnh: ticket đã đóng / mod log cũ chuyển sang file archive
+RETENTION_CONFIG = {
+    "ticket_days_default": 90,  # 0 = giữ mãi ở bảng nóng
+    "modlog_days_default": 365,
+    "max_days": 3650,
+    "job_interval_minutes": 30,
+    "job_budget_seconds": 2.0,  # thời gian tối đa mỗi lượt job
+    "batch_size": 200,
+    "history_limit": 15,
+    "mod_job_days": 30,  # xóa job /mass, /role đã kết thúc sau số ngày này
+}
+
+# Moderation hàng loạt (/mass)
+MASS_CONFIG = {
+    "max_targets": 1000,
+    "max_join_window_minutes": 1440,
+    "bulk_ban_chunk": 200,  # giới hạn của endpoint bulk ban
+    "concurrency": 5,  # số kick/timeout chạy song song
+    "progress_interval_seconds": 3,
+    "preview_mentions": 20,
+}
+
+# Bộ đếm member/role tăng dần
+MEMBER_COUNT_CONFIG = {
+    "reconcile_minutes": 30,  # chu kỳ đếm lại từ cache để sửa lệch
+    "reconcile_chunk": 5000,  # số member mỗi lô trước khi nhường event loop
+}
+
+# Gom báo cáo (report modal) theo target và chống spam
+REPORT_CONFIG = {
+    "window_seconds": 900,  # báo cáo cùng target trong khoảng này gộp vào một embed
+    "debounce_seconds": 5,  # tối thiểu giữa hai lần sửa embed tổng hợp
+    "user_limit": 5,  # số báo cáo tối đa mỗi người trong user_window_seconds
+    "user_window_seconds": 600,
+    "top_reasons": 3,
+    "list_limit": 15,
+}
+
+# Vote suggestion
+SUGGESTION_CONFIG = {
+    "label_edit_interval_seconds": 3,  # tối thiểu giữa hai lần sửa nhãn nút vote
+}
+
+# Resolver member dùng chung: gateway cache → cache TTL → REST
+MEMBER_RESOLVER_CONFIG = {
+    "ttl_seconds": 60,  # thời gian giữ member đã fetch qua REST
+    "negative_ttl_seconds": 15,  # thời gian nhớ user không còn trong server
+    "maxsize": 2000,
+}
+
+# Template placeholder (greeting, auto-message)
+PLACEHOLDER_CONFIG = {
+    "template_cache_size": 512,  # số template đã parse giữ trong cache
+    "recent_join_seconds": 60,  # join gần đây → {join_position} = số member
+    "join_order_ttl_seconds": 300,  # thời gian giữ thứ tự join đã sắp xếp
+}
+
+# Chống raid (detector theo tốc độ join + lockdown tự động)
+RAID_CONFIG = {
+    "join_threshold_default": 10,  # số join trong cửa sổ để xét là raid
+    "window_seconds_default": 30,
+    "min_account_age_days_default": 7,  # account trẻ hơn được tính là đáng ngờ
+    "suspicious_ratio": 0.6,  # tỉ lệ join đáng ngờ trong cửa sổ để kích hoạt
+    "name_key_length": 6,  # số chữ cái đầu của tên dùng để gom cụm tên giống nhau
+    "name_cluster_min": 3,  # cùng key từ lần thứ N trở đi thì tính là đáng ngờ
+    "slowmode_seconds_default": 30,
+    "hold_minutes_default": 60,  # timeout giữ member chờ xét (0 = không giữ)
+    "hold_batch_delay_seconds": 5,  # gom member join trong lúc lockdown rồi giữ theo lô
+    "min_join_threshold": 3,
+    "max_join_threshold": 100,
+    "max_window_seconds": 600,
+    "max_account_age_days": 365,
+    "max_slowmode_seconds": 21600,  # giới hạn slowmode của Discord
+    "max_hold_minutes": 40320,  # timeout tối đa 28 ngày
+    "max_lockdown_channels": 25,
+}
+
+# Job gán/gỡ role hàng loạt (/role all, /role strip)
+ROLE_JOB_CONFIG = {
+    "concurrency": 3,  # số request role chạy song song; nhịp do rate limit header quyết định
+    "chunk": 50,  # số target mỗi lô trước khi ghi tiến độ và kiểm tra pause/cancel
+    "select_chunk": 2000,  # số member lọc mỗi lô trước khi nhường event loop
+    "max_targets": 200000,
+    "max_active_per_guild": 2,
+    "max_join_window_days": 3650,
+    "progress_interval_seconds": 5,  # tối thiểu giữa hai lần sửa embed tiến độ
+}
+
+# Role menu tự chọn
+ROLE_MENU_CONFIG = {
+    "max_roles": 25,  # giới hạn option của select / số nút trên một message
+    "index_size": 2048,  # số message_id giữ trong index LRU (kể cả cache âm)
+    "max_per_guild": 50,
+}
+
+# Metrics in-memory
+METRICS_CONFIG = {
+    "latency_samples": 1024,  # số mẫu gần nhất giữ cho mỗi latency tracker
 }
 
 # Pagination configuration
@@ -96,6 +209,8 @@ COMMAND_COOLDOWNS = {
     "kick": 10.0,
     "ban": 15.0,
     "timeout": 10.0,
+    "mass": 30.0,
+    "role_job": 30.0,
 }
 
 # Validation limits
@@ -111,6 +226,26 @@ TICKET_CONFIG = {
     "max_limit": 50,
     "autoclose_check_minutes": 30,
     "default_color": 0x5865F2,
+    # Pool kênh dựng sẵn (pre-warm) cho panel
+    "pool_refill_seconds": 30,
+    "pool_max_size": 20,
+    "pool_max_refill": 5,
+    "pool_channel_name": "ticket-pool",
+    # Ticket dạng private thread: tự archive sau 7 ngày im lặng (vẫn giữ DB mở)
+    "thread_auto_archive_minutes": 10080,
+    # Discord giới hạn 50 kênh/category → tạo category tràn đánh số khi đầy
+    "category_channel_limit": 50,
+    # Hàng đợi tạo ticket theo guild
+    "open_concurrency_default": 2,
+    "max_open_concurrency": 10,
+    "queue_update_seconds": 3,
+    # Backfill rollup thống kê cho ticket đóng trước khi có rollup
+    "stats_backfill_minutes": 5,
+    "stats_backfill_batch": 500,
+    "stats_max_days": 90,
+    "orphan_close_reason": "Channel đã bị xóa",
+    # Lượt dùng tag được gom trong bộ nhớ rồi ghi DB mỗi chu kỳ này
+    "tag_usage_flush_seconds": 60,
 }
 
 # Automation configuration
@@ -120,4 +255,9 @@ AUTOMATION_CONFIG = {
     "max_interval_minutes": 10080,  # 7 ngày
     "max_auto_messages": 20,
     "default_color": 0x5865F2,
+    # Gộp lời chào khi join/leave dồn dập (raid, mass-invite)
+    "greeting_burst_threshold": 5,  # số sự kiện trong cửa sổ trước khi chuyển sang gộp
+    "greeting_burst_window_seconds": 10,
+    "greeting_batch_delay_seconds": 5,
+    "greeting_digest_max_messages": 3,  # số tin tổng hợp tối đa mỗi lô
 }
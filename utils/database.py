@@ -3,17 +3,26 @@
 import asyncio
 import json
 import logging
+import os
 from collections import OrderedDict
 from contextlib import asynccontextmanager
 from datetime import UTC, datetime, timedelta
 
 import aiosqlite
 
+from utils.archive_db import ArchiveDBMixin
 from utils.automation_db import AutomationDBMixin
 from utils.config import Config
 from utils.constants import CACHE_CONFIG
 from utils.error_handler import DatabaseError
-from utils.ticket_db import TicketDBMixin
+from utils.mod_jobs_db import ModJobDBMixin
+from utils.raid_db import RaidDBMixin
+from utils.report_db import ReportDBMixin
+from utils.role_menu_db import RoleMenuDBMixin
+from utils.tag_index import TagIndex
+from utils.ticket_db import TicketDBMixin, TicketPermissionIndex
+from utils.ticket_stats_db import TicketStatsDBMixin
+from utils.workload import WorkloadHeap
 
 logger = logging.getLogger("BlastBot.Database")
 if not logger.handlers:
@@ -134,11 +143,27 @@ class LRUCache:
         }
 
 
-class Database(TicketDBMixin, AutomationDBMixin):
+class Database(
+    TicketDBMixin,
+    TicketStatsDBMixin,
+    ArchiveDBMixin,
+    ModJobDBMixin,
+    RaidDBMixin,
+    RoleMenuDBMixin,
+    ReportDBMixin,
+    AutomationDBMixin,
+):
     """Wrapper cho aiosqlite database operations với caching và thread safety"""
 
-    def __init__(self, db_path: str | None = None):
+    def __init__(self, db_path: str | None = None, archive_path: str | None = None):
         self.db_path = db_path or Config.DB_PATH
+        # File lưu trữ lạnh, mặc định nằm cạnh DB chính: bot.db → bot_archive.db
+        self.archive_path = (
+            archive_path
+            or Config.ARCHIVE_DB_PATH
+            or f"{os.path.splitext(self.db_path)[0]}_archive.db"
+        )
+        self._archive_attached = False
         self.conn: aiosqlite.Connection | None = None
         self._lock = AsyncRLock()
         self._in_transaction = False
@@ -146,6 +171,25 @@ class Database(TicketDBMixin, AutomationDBMixin):
             maxsize=CACHE_CONFIG["guild_config_maxsize"],
             ttl_seconds=CACHE_CONFIG["guild_config_ttl_seconds"],
         )
+        self._ticket_perm_index: dict[int, TicketPermissionIndex] = {}
+        # message_id → panel; None cho tới khi load_panel_registry() chạy
+        self._panel_registry: dict[int, dict] | None = None
+        self._panel_registry_ids: dict[int, int] = {}
+        # guild_id → heap tải staff, nạp lười khi panel auto-assign mở ticket
+        self._workloads: dict[int, WorkloadHeap] = {}
+        # guild_id → index tag cho autocomplete; lượt dùng chờ flush theo (guild, tag)
+        self._tag_index: dict[int, TagIndex] = {}
+        self._tag_usage_pending: dict[tuple[int, str], int] = {}
+        # Cấu hình chống raid theo guild và tập guild đang lockdown (tra đồng bộ)
+        self._raid_settings: dict[int, dict] = {}
+        self._raid_lockdowns: set[int] = set()
+        # message_id → role menu (None = không phải menu), nạp lười theo interaction
+        self._role_menu_index: OrderedDict[int, dict | None] = OrderedDict()
+        # message_id → {"up", "down"} của suggestion, nạp từ suggestion_tallies khi cần
+        self._suggestion_tallies = LRUCache(
+            maxsize=CACHE_CONFIG["suggestion_tally_maxsize"],
+            ttl_seconds=CACHE_CONFIG["suggestion_tally_ttl_seconds"],
+        )
 
     @asynccontextmanager
     async def transaction(self):
@@ -197,8 +241,10 @@ class Database(TicketDBMixin, AutomationDBMixin):
         async with self._lock:
             if self.conn:
                 try:
+                    await self.flush_tag_usage()
                     await self.conn.close()
                     self.conn = None
+                    self._archive_attached = False
                     logger.info("Database connection closed")
                 except aiosqlite.Error as e:
                     logger.error(f"Error closing database: {e}")
@@ -304,6 +350,76 @@ class Database(TicketDBMixin, AutomationDBMixin):
                 version = 1
                 await self._set_schema_version(version)
 
+            if version < 2:
+                await self.migrate_ticket_pool()
+                version = 2
+                await self._set_schema_version(version)
+
+            if version < 3:
+                await self.migrate_ticket_thread_mode()
+                version = 3
+                await self._set_schema_version(version)
+
+            if version < 4:
+                await self.migrate_ticket_overflow()
+                version = 4
+                await self._set_schema_version(version)
+
+            if version < 5:
+                await self.migrate_ticket_queue()
+                version = 5
+                await self._set_schema_version(version)
+
+            if version < 6:
+                await self.migrate_ticket_panel_message_index()
+                version = 6
+                await self._set_schema_version(version)
+
+            if version < 7:
+                await self.migrate_ticket_stats()
+                version = 7
+                await self._set_schema_version(version)
+
+            if version < 8:
+                await self.migrate_ticket_auto_assign()
+                version = 8
+                await self._set_schema_version(version)
+
+            if version < 9:
+                await self.migrate_ticket_tag_usage()
+                version = 9
+                await self._set_schema_version(version)
+
+            if version < 10:
+                await self.migrate_retention()
+                version = 10
+                await self._set_schema_version(version)
+
+            if version < 11:
+                await self.migrate_mod_jobs()
+                version = 11
+                await self._set_schema_version(version)
+
+            if version < 12:
+                await self.migrate_raid()
+                version = 12
+                await self._set_schema_version(version)
+
+            if version < 13:
+                await self.migrate_role_menus()
+                version = 13
+                await self._set_schema_version(version)
+
+            if version < 14:
+                await self.migrate_reports()
+                version = 14
+                await self._set_schema_version(version)
+
+            if version < 15:
+                await self.migrate_suggestion_tallies()
+                version = 15
+                await self._set_schema_version(version)
+
             await self._commit_if_not_in_tx()
             logger.info(f"Database schema up to date (version {version})")
         except aiosqlite.Error as e:
@@ -335,6 +451,45 @@ class Database(TicketDBMixin, AutomationDBMixin):
                 rows = await cursor.fetchall()
             return [row["message_id"] for row in rows]
 
+    async def migrate_suggestion_tallies(self):
+        """v15: bộ đếm vote mỗi suggestion, giữ khớp với suggestion_votes bằng trigger."""
+        if not self.conn:
+            return
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS suggestion_tallies (
+                message_id INTEGER PRIMARY KEY,
+                up INTEGER NOT NULL DEFAULT 0,
+                down INTEGER NOT NULL DEFAULT 0)""")
+        await self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS suggestion_votes_ai
+            AFTER INSERT ON suggestion_votes BEGIN
+                INSERT INTO suggestion_tallies (message_id, up, down)
+                VALUES (NEW.message_id, NEW.vote = 1, NEW.vote = -1)
+                ON CONFLICT(message_id) DO UPDATE SET
+                    up = up + (NEW.vote = 1), down = down + (NEW.vote = -1);
+            END""")
+        # Upsert đi nhánh DO UPDATE chỉ kích hoạt trigger UPDATE
+        await self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS suggestion_votes_au
+            AFTER UPDATE OF vote ON suggestion_votes BEGIN
+                UPDATE suggestion_tallies SET
+                    up = up - (OLD.vote = 1) + (NEW.vote = 1),
+                    down = down - (OLD.vote = -1) + (NEW.vote = -1)
+                WHERE message_id = NEW.message_id;
+            END""")
+        await self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS suggestion_votes_ad
+            AFTER DELETE ON suggestion_votes BEGIN
+                UPDATE suggestion_tallies SET
+                    up = up - (OLD.vote = 1), down = down - (OLD.vote = -1)
+                WHERE message_id = OLD.message_id;
+            END""")
+        await self.conn.execute("""
+            INSERT OR REPLACE INTO suggestion_tallies (message_id, up, down)
+            SELECT message_id, SUM(vote = 1), SUM(vote = -1)
+            FROM suggestion_votes GROUP BY message_id""")
+        await self._commit_if_not_in_tx()
+
     async def set_vote(self, message_id: int, user_id: int, vote: int):
         async with self._lock:
             if not self.conn:
@@ -348,6 +503,7 @@ class Database(TicketDBMixin, AutomationDBMixin):
                 (message_id, user_id, vote),
             )
             await self._commit_if_not_in_tx()
+            self._suggestion_tallies.delete(message_id)
 
     async def remove_vote(self, message_id: int, user_id: int):
         async with self._lock:
@@ -358,23 +514,68 @@ class Database(TicketDBMixin, AutomationDBMixin):
                 (message_id, user_id),
             )
             await self._commit_if_not_in_tx()
+            self._suggestion_tallies.delete(message_id)
+
+    async def cast_vote(
+        self, message_id: int, user_id: int, vote: int
+    ) -> tuple[int | None, tuple[int, int]]:
+        """Bấm lại cùng lựa chọn thì bỏ vote. Trả (vote hiện tại của user, (up, down)).
+
+        Bộ đếm lấy từ cache, chỉ đọc suggestion_tallies (theo khóa chính) khi cache
+        chưa có; trigger giữ bảng khớp còn cache được cộng trừ theo chênh lệch.
+        """
+        async with self.transaction():
+            if not self.conn:
+                return None, (0, 0)
+            async with self.conn.execute(
+                "SELECT vote FROM suggestion_votes WHERE message_id = ? AND user_id = ?",
+                (message_id, user_id),
+            ) as cursor:
+                row = await cursor.fetchone()
+            old = row["vote"] if row else None
+            cached = self._suggestion_tallies.get(message_id)
+            if cached is not None:
+                tally = (cached["up"], cached["down"])
+            else:
+                tally = await self._read_suggestion_tally(message_id)
+            new = None if old == vote else vote
+            if new is None:
+                await self.conn.execute(
+                    "DELETE FROM suggestion_votes WHERE message_id = ? AND user_id = ?",
+                    (message_id, user_id),
+                )
+            else:
+                await self.conn.execute(
+                    """
+                    INSERT INTO suggestion_votes (message_id, user_id, vote)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(message_id, user_id) DO UPDATE SET vote = excluded.vote
+                    """,
+                    (message_id, user_id, new),
+                )
+        up = tally[0] - (old == 1) + (new == 1)
+        down = tally[1] - (old == -1) + (new == -1)
+        self._suggestion_tallies.set(message_id, {"up": up, "down": down})
+        return new, (up, down)
+
+    async def _read_suggestion_tally(self, message_id: int) -> tuple[int, int]:
+        async with self.conn.execute(
+            "SELECT up, down FROM suggestion_tallies WHERE message_id = ?",
+            (message_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+        return (row["up"], row["down"]) if row else (0, 0)
 
     async def get_vote_counts(self, message_id: int) -> tuple[int, int]:
+        cached = self._suggestion_tallies.get(message_id)
+        if cached is not None:
+            return cached["up"], cached["down"]
         async with self._lock:
             if not self.conn:
                 return (0, 0)
-            async with self.conn.execute(
-                "SELECT vote, COUNT(*) AS c FROM suggestion_votes WHERE message_id = ? GROUP BY vote",
-                (message_id,),
-            ) as cursor:
-                rows = await cursor.fetchall()
-            up = down = 0
-            for row in rows:
-                if row["vote"] == 1:
-                    up = row["c"]
-                elif row["vote"] == -1:
-                    down = row["c"]
-            return (up, down)
+            up, down = await self._read_suggestion_tally(message_id)
+            self._suggestion_tallies.set(message_id, {"up": up, "down": down})
+            return up, down
 
     async def get_user_vote(self, message_id: int, user_id: int) -> int | None:
         async with self._lock:
@@ -626,6 +827,32 @@ class Database(TicketDBMixin, AutomationDBMixin):
             )
             await self._commit_if_not_in_tx()
 
+    async def clear_temp_roles(
+        self,
+        expired: list[tuple[int, int, int]],
+        departed: list[tuple[int, int]] = (),
+    ):
+        """Xóa các dòng temp role đã xử lý trong một transaction.
+
+        ``expired``: (guild_id, user_id, role_id) đã gỡ xong. ``departed``:
+        (guild_id, user_id) của member đã rời server, xóa mọi temp role còn lại.
+        """
+        if not expired and not departed:
+            return
+        async with self.transaction():
+            if not self.conn:
+                return
+            if expired:
+                await self.conn.executemany(
+                    "DELETE FROM temp_roles WHERE guild_id = ? AND user_id = ? AND role_id = ?",
+                    expired,
+                )
+            if departed:
+                await self.conn.executemany(
+                    "DELETE FROM temp_roles WHERE guild_id = ? AND user_id = ?",
+                    departed,
+                )
+
     async def get_expired_temp_roles(self) -> list[dict]:
         async with self._lock:
             if not self.conn:
@@ -0,0 +1,77 @@
+"""Lock theo key có đếm tham chiếu: entry tự bị xóa khi không còn ai giữ/chờ."""
+
+import asyncio
+from collections.abc import AsyncIterator, Hashable
+from contextlib import asynccontextmanager
+
+from utils.metrics import metrics
+
+
+class LockTimeout(TimeoutError):
+    """Chờ lock quá ``max_wait``. Tách khỏi ``TimeoutError`` của request mạng."""
+
+
+class _Slot:
+    __slots__ = ("lock", "refs")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.refs = 0
+
+
+class KeyedLock:
+    """Thay cho ``defaultdict(asyncio.Lock)``: bộ nhớ chỉ tỉ lệ với số key đang dùng.
+
+    ``name`` (tuỳ chọn) đăng ký gauge ``lock.<name>`` để xem số key và độ tranh chấp
+    qua /metrics.
+    """
+
+    def __init__(self, name: str | None = None):
+        self._slots: dict[Hashable, _Slot] = {}
+        self.acquisitions = 0
+        self.contended = 0
+        self.timeouts = 0
+        if name:
+            metrics.register_gauge(f"lock.{name}", self.stats)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def locked(self, key: Hashable) -> bool:
+        slot = self._slots.get(key)
+        return slot is not None and slot.lock.locked()
+
+    @asynccontextmanager
+    async def acquire(
+        self, key: Hashable, max_wait: float | None = None
+    ) -> AsyncIterator[None]:
+        """Giữ lock của ``key``; ném ``LockTimeout`` nếu chờ quá ``max_wait`` giây."""
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _Slot()
+        slot.refs += 1
+        try:
+            if slot.lock.locked():
+                self.contended += 1
+            try:
+                await asyncio.wait_for(slot.lock.acquire(), max_wait)
+            except TimeoutError:
+                self.timeouts += 1
+                raise LockTimeout(f"Chờ lock {key!r} quá {max_wait}s") from None
+            self.acquisitions += 1
+            try:
+                yield
+            finally:
+                slot.lock.release()
+        finally:
+            slot.refs -= 1
+            if slot.refs == 0:
+                del self._slots[key]
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._slots),
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "timeouts": self.timeouts,
+        }
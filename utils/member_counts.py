@@ -0,0 +1,148 @@
+"""Đếm member và member theo role, cập nhật tăng dần từ event thay vì duyệt cache.
+
+``len(guild.members)`` / ``len(role.members)`` duyệt toàn bộ member cache (role.members
+còn kiểm tra role của từng người) — vài chục ms trên guild 200k member. Counter được
+seed một lần cho mỗi guild, sau đó join/leave/đổi role chỉ cộng trừ O(số role đổi).
+Job đối soát định kỳ đếm lại từ cache theo từng lô để sửa lệch nếu có event bị lỡ.
+"""
+
+import asyncio
+
+import discord
+
+from utils.constants import MEMBER_COUNT_CONFIG
+from utils.metrics import metrics
+
+
+def _role_ids(member: discord.Member) -> list[int]:
+    return [r.id for r in member.roles if not r.is_default()]
+
+
+class GuildCounts:
+    """Số member và số member của từng role (không tính @everyone) của một guild."""
+
+    __slots__ = ("members", "roles", "ready", "_deltas")
+
+    def __init__(self, members: int = 0, roles: dict[int, int] | None = None):
+        self.members = members
+        self.roles: dict[int, int] = roles or {}
+        # False cho tới khi lượt đếm đầu tiên xong; lúc đó đọc trực tiếp từ cache
+        self.ready = False
+        # Khác None khi đang đếm lại: ghi lại thay đổi để áp lên kết quả mới
+        self._deltas: list[tuple[int, dict[int, int]]] | None = None
+
+    def apply(self, member_delta: int, role_deltas: dict[int, int]) -> None:
+        self.members += member_delta
+        for role_id, delta in role_deltas.items():
+            count = self.roles.get(role_id, 0) + delta
+            if count > 0:
+                self.roles[role_id] = count
+            else:
+                self.roles.pop(role_id, None)
+        if self._deltas is not None:
+            self._deltas.append((member_delta, role_deltas))
+
+
+class MemberCounter:
+    """Registry dùng chung toàn process, giống ``metrics``. Không lưu DB.
+
+    Chỉ ``reconcile`` mới seed một guild: seed lười lúc đọc sẽ đếm trùng member
+    mà cache đã có nhưng listener ``on_member_join`` của counter chưa chạy tới.
+    """
+
+    def __init__(self):
+        self._guilds: dict[int, GuildCounts] = {}
+
+    # ---------- đọc ----------
+    def members(self, guild: discord.Guild) -> int:
+        if guild.member_count is not None:
+            return guild.member_count
+        counts = self._guilds.get(guild.id)
+        if counts is not None and counts.ready:
+            return counts.members
+        return len(guild.members)
+
+    def role_members(self, role: discord.Role) -> int:
+        if role.is_default():
+            return self.members(role.guild)
+        counts = self._guilds.get(role.guild.id)
+        if counts is not None and counts.ready:
+            return counts.roles.get(role.id, 0)
+        return len(role.members)
+
+    def tracked_guilds(self) -> int:
+        return sum(1 for c in self._guilds.values() if c.ready)
+
+    # ---------- event ----------
+    def member_joined(self, member: discord.Member) -> None:
+        counts = self._guilds.get(member.guild.id)
+        if counts is not None:
+            counts.apply(1, dict.fromkeys(_role_ids(member), 1))
+
+    def member_removed(self, member: discord.Member) -> None:
+        counts = self._guilds.get(member.guild.id)
+        if counts is not None:
+            counts.apply(-1, dict.fromkeys(_role_ids(member), -1))
+
+    def roles_changed(self, before: discord.Member, after: discord.Member) -> None:
+        counts = self._guilds.get(after.guild.id)
+        if counts is None:
+            return
+        old, new = set(_role_ids(before)), set(_role_ids(after))
+        if old == new:
+            return
+        deltas = dict.fromkeys(new - old, 1)
+        deltas.update(dict.fromkeys(old - new, -1))
+        counts.apply(0, deltas)
+
+    def role_deleted(self, role: discord.Role) -> None:
+        counts = self._guilds.get(role.guild.id)
+        if counts is not None:
+            counts.roles.pop(role.id, None)
+
+    def forget(self, guild_id: int) -> None:
+        self._guilds.pop(guild_id, None)
+
+    # ---------- seed & đối soát ----------
+    async def reconcile(
+        self,
+        guild: discord.Guild,
+        chunk_size: int = MEMBER_COUNT_CONFIG["reconcile_chunk"],
+    ) -> int:
+        """Đếm lại từ cache theo lô, nhường event loop giữa các lô.
+
+        Thay đổi đến trong lúc đếm được ghi lại rồi áp lên kết quả nên không mất
+        event nào. Lần đầu với một guild chính là seed. Trả về tổng độ lệch
+        (member + role) đã sửa; 0 nếu vừa seed.
+        """
+        counts = self._guilds.get(guild.id)
+        if counts is None:
+            counts = self._guilds[guild.id] = GuildCounts()
+        if counts._deltas is not None:
+            return 0  # đang có lượt đếm khác cho guild này
+        snapshot = list(guild.members)
+        counts._deltas = []
+        try:
+            roles: dict[int, int] = {}
+            for i, member in enumerate(snapshot):
+                for role_id in _role_ids(member):
+                    roles[role_id] = roles.get(role_id, 0) + 1
+                if (i + 1) % chunk_size == 0:
+                    await asyncio.sleep(0)
+            fresh = GuildCounts(len(snapshot), roles)
+            for member_delta, role_deltas in counts._deltas:
+                fresh.apply(member_delta, role_deltas)
+        finally:
+            counts._deltas = None
+        drift = 0
+        if counts.ready:
+            drift = abs(fresh.members - counts.members) + sum(
+                abs(fresh.roles.get(r, 0) - counts.roles.get(r, 0))
+                for r in fresh.roles.keys() | counts.roles.keys()
+            )
+        counts.members, counts.roles, counts.ready = fresh.members, fresh.roles, True
+        return drift
+
+
+member_counts = MemberCounter()
+metrics.register_gauge("member_counts.guilds", member_counts.tracked_guilds)
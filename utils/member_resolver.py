@@ -0,0 +1,105 @@
+"""Lấy ``discord.Member`` theo ID với thứ tự: gateway cache → cache TTL → REST.
+
+``guild.fetch_member`` là một round trip REST và tính vào rate limit; khi nhiều
+người cùng bấm xem một user (vd. lúc có sự cố), các lượt trùng key dùng chung
+một request đang bay và kết quả được giữ ngắn hạn để lượt bấm sau khỏi gọi lại.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+import discord
+
+from utils.constants import MEMBER_RESOLVER_CONFIG
+from utils.metrics import metrics
+
+_Key = tuple[int, int]
+
+
+class MemberResolver:
+    """Registry dùng chung toàn process, giống ``member_counts``."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = MEMBER_RESOLVER_CONFIG["ttl_seconds"],
+        negative_ttl_seconds: float = MEMBER_RESOLVER_CONFIG["negative_ttl_seconds"],
+        maxsize: int = MEMBER_RESOLVER_CONFIG["maxsize"],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl_seconds
+        self.negative_ttl = negative_ttl_seconds
+        self.maxsize = maxsize
+        self._clock = clock
+        # (guild_id, user_id) → (hết hạn lúc, member | None nếu không còn trong server)
+        self._cache: OrderedDict[_Key, tuple[float, discord.Member | None]] = (
+            OrderedDict()
+        )
+        self._inflight: dict[_Key, asyncio.Task] = {}
+        self.stats = {"gateway": 0, "cache": 0, "shared": 0, "fetch": 0}
+
+    async def resolve(
+        self, guild: discord.Guild, user_id: int
+    ) -> discord.Member | None:
+        """Member của ``guild``, hoặc None nếu user không ở trong server.
+
+        Lỗi REST khác NotFound (5xx, rate limit...) được ném lại và không cache.
+        """
+        member = guild.get_member(user_id)
+        if member is not None:
+            self._hit("gateway")
+            return member
+
+        key = (guild.id, user_id)
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry[0] > self._clock():
+                self._cache.move_to_end(key)
+                self._hit("cache")
+                return entry[1]
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._hit("shared")
+        else:
+            self._hit("fetch")
+            task = self._inflight[key] = asyncio.create_task(self._fetch(guild, key))
+        # shield: caller bị hủy không được hủy request mà người khác đang chờ
+        return await asyncio.shield(task)
+
+    async def _fetch(self, guild: discord.Guild, key: _Key) -> discord.Member | None:
+        try:
+            with metrics.timer("member_resolver.fetch"):
+                try:
+                    member = await guild.fetch_member(key[1])
+                except discord.NotFound:
+                    member = None
+            ttl = self.ttl if member is not None else self.negative_ttl
+            self._cache[key] = (self._clock() + ttl, member)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return member
+        finally:
+            self._inflight.pop(key, None)
+
+    def _hit(self, source: str) -> None:
+        self.stats[source] += 1
+        metrics.incr(f"member_resolver.{source}")
+
+    def invalidate(self, guild_id: int, user_id: int) -> None:
+        self._cache.pop((guild_id, user_id), None)
+
+    def hit_rate(self) -> float | None:
+        """Tỉ lệ lượt resolve không phải gọi REST mới (gateway, cache, dùng chung)."""
+        total = sum(self.stats.values())
+        if not total:
+            return None
+        return round(1 - self.stats["fetch"] / total, 4)
+
+
+member_resolver = MemberResolver()
+metrics.register_gauge("member_resolver.hit_rate", member_resolver.hit_rate)
+metrics.register_gauge("member_resolver.cached", lambda: len(member_resolver._cache))
@@ -0,0 +1,94 @@
+"""Metrics in-memory: counter, latency percentile và gauge cho các luồng nóng."""
+
+import math
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from utils.constants import METRICS_CONFIG
+
+
+def _nearest_rank(ordered: list[float], p: float) -> float:
+    return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1]
+
+
+class LatencyTracker:
+    """Giữ N mẫu gần nhất (ms) để tính p50/p99 mà không tăng bộ nhớ theo thời gian."""
+
+    def __init__(self, maxlen: int = METRICS_CONFIG["latency_samples"]):
+        self.samples: deque[float] = deque(maxlen=maxlen)
+        self.count = 0
+
+    def record(self, ms: float) -> None:
+        self.samples.append(ms)
+        self.count += 1
+
+    def percentile(self, p: float) -> float | None:
+        """Nearest-rank percentile trên cửa sổ mẫu hiện tại."""
+        if not self.samples:
+            return None
+        return _nearest_rank(sorted(self.samples), p)
+
+    def snapshot(self) -> dict:
+        if not self.samples:
+            return {"count": self.count, "p50": None, "p99": None, "max": None}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "p50": _nearest_rank(ordered, 50),
+            "p99": _nearest_rank(ordered, 99),
+            "max": ordered[-1],
+        }
+
+
+class MetricsRegistry:
+    """Registry dùng chung toàn process. Không lưu DB — reset khi restart."""
+
+    def __init__(self):
+        self.counters: dict[str, int] = {}
+        self.latencies: dict[str, LatencyTracker] = {}
+        self._gauges: dict[str, Callable[[], Any]] = {}
+
+    def incr(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, ms: float) -> None:
+        tracker = self.latencies.get(name)
+        if tracker is None:
+            tracker = self.latencies[name] = LatencyTracker()
+        tracker.record(ms)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Đo thời gian một khối code (dùng được cả trong coroutine)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def register_gauge(self, name: str, provider: Callable[[], Any]) -> None:
+        """Gauge được tính lười lúc snapshot (vd: độ dài hàng đợi, số key đang giữ)."""
+        self._gauges[name] = provider
+
+    def snapshot(self) -> dict:
+        gauges = {}
+        for name, provider in self._gauges.items():
+            try:
+                gauges[name] = provider()
+            except Exception as e:  # gauge lỗi không được làm hỏng cả snapshot
+                gauges[name] = f"error: {e}"
+        return {
+            "counters": dict(self.counters),
+            "latencies": {k: v.snapshot() for k, v in self.latencies.items()},
+            "gauges": gauges,
+        }
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.latencies.clear()
+
+
+metrics = MetricsRegistry()
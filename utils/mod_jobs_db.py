@@ -0,0 +1,203 @@
+"""Database mixin cho job hàng loạt (/mass, /role), có thể chạy tiếp sau khi restart."""
+
+import json
+
+from utils.constants import RETENTION_CONFIG
+
+# Trạng thái job: pending → running (⇄ paused) → done | failed | cancelled
+UNFINISHED_JOB_STATUSES = ("pending", "running")
+FINISHED_JOB_STATUSES = ("done", "failed", "cancelled")
+
+
+class ModJobDBMixin:
+    # ---------- bảng ----------
+    async def migrate_mod_jobs(self):
+        """v11: job moderation hàng loạt và trạng thái từng target."""
+        if not self.conn:
+            return
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS moderation_jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL, moderator_id INTEGER NOT NULL,
+                action TEXT NOT NULL, reason TEXT,
+                params_json TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL DEFAULT 'pending',
+                total INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP)""")
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS moderation_job_targets (
+                job_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending', error TEXT,
+                PRIMARY KEY (job_id, user_id))""")
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_moderation_jobs_status "
+            "ON moderation_jobs(status)"
+        )
+        await self._commit_if_not_in_tx()
+
+    # ---------- job ----------
+    async def prune_finished_mod_jobs(self, batch_size: int) -> int:
+        """Xóa một lô target của job đã kết thúc quá hạn, rồi tới chính các job đó.
+
+        Một job có thể có tới 200k target nên xóa theo lô dòng target, không theo job.
+        Trả số dòng đã xóa (target + job).
+        """
+        marks = ",".join("?" * len(FINISHED_JOB_STATUSES))
+        expired = (
+            f"SELECT job_id FROM moderation_jobs WHERE status IN ({marks}) "
+            "AND julianday('now') - julianday(finished_at) > ?"
+        )
+        params = (*FINISHED_JOB_STATUSES, RETENTION_CONFIG["mod_job_days"])
+        async with self.transaction():
+            if not self.conn:
+                return 0
+            cur = await self.conn.execute(
+                f"""DELETE FROM moderation_job_targets WHERE rowid IN (
+                       SELECT rowid FROM moderation_job_targets
+                       WHERE job_id IN ({expired}) LIMIT ?)""",
+                (*params, batch_size),
+            )
+            deleted = cur.rowcount
+            if deleted < batch_size:
+                cur = await self.conn.execute(
+                    f"""DELETE FROM moderation_jobs WHERE job_id IN (
+                           {expired} AND NOT EXISTS (
+                               SELECT 1 FROM moderation_job_targets t
+                               WHERE t.job_id = moderation_jobs.job_id)
+                           LIMIT ?)""",
+                    (*params, batch_size - deleted),
+                )
+                deleted += cur.rowcount
+            return deleted
+
+    async def create_mod_job(
+        self,
+        guild_id: int,
+        moderator_id: int,
+        action: str,
+        reason: str | None,
+        params: dict,
+        user_ids: list[int],
+    ) -> int:
+        async with self.transaction():
+            if not self.conn:
+                return 0
+            cur = await self.conn.execute(
+                """INSERT INTO moderation_jobs
+                   (guild_id, moderator_id, action, reason, params_json, total)
+                   VALUES (?,?,?,?,?,?)""",
+                (
+                    guild_id,
+                    moderator_id,
+                    action,
+                    reason,
+                    json.dumps(params),
+                    len(user_ids),
+                ),
+            )
+            job_id = cur.lastrowid or 0
+            await self.conn.executemany(
+                "INSERT OR IGNORE INTO moderation_job_targets (job_id, user_id) VALUES (?,?)",
+                [(job_id, uid) for uid in user_ids],
+            )
+            return job_id
+
+    @staticmethod
+    def _job_row(row) -> dict:
+        d = dict(row)
+        d["params"] = json.loads(d.pop("params_json") or "{}")
+        return d
+
+    async def get_mod_job(self, job_id: int) -> dict | None:
+        async with self._lock:
+            if not self.conn:
+                return None
+            async with self.conn.execute(
+                "SELECT * FROM moderation_jobs WHERE job_id=?", (job_id,)
+            ) as cur:
+                row = await cur.fetchone()
+            return self._job_row(row) if row else None
+
+    async def list_unfinished_mod_jobs(
+        self, actions: tuple[str, ...] | None = None
+    ) -> list[dict]:
+        """Job pending/running (không gồm paused), lọc theo ``actions`` nếu có."""
+        async with self._lock:
+            if not self.conn:
+                return []
+            marks = ",".join("?" * len(UNFINISHED_JOB_STATUSES))
+            sql = f"SELECT * FROM moderation_jobs WHERE status IN ({marks})"
+            params: list = list(UNFINISHED_JOB_STATUSES)
+            if actions:
+                sql += f" AND action IN ({','.join('?' * len(actions))})"
+                params += actions
+            async with self.conn.execute(sql + " ORDER BY job_id", params) as cur:
+                return [self._job_row(r) for r in await cur.fetchall()]
+
+    async def list_active_mod_jobs(
+        self, guild_id: int, actions: tuple[str, ...]
+    ) -> list[dict]:
+        """Job chưa kết thúc (kể cả paused) của guild."""
+        async with self._lock:
+            if not self.conn:
+                return []
+            marks = ",".join("?" * len(actions))
+            done_marks = ",".join("?" * len(FINISHED_JOB_STATUSES))
+            async with self.conn.execute(
+                f"""SELECT * FROM moderation_jobs
+                    WHERE guild_id=? AND action IN ({marks})
+                      AND status NOT IN ({done_marks})
+                    ORDER BY job_id""",
+                (guild_id, *actions, *FINISHED_JOB_STATUSES),
+            ) as cur:
+                return [self._job_row(r) for r in await cur.fetchall()]
+
+    async def set_mod_job_status(self, job_id: int, status: str):
+        async with self._lock:
+            if not self.conn:
+                return
+            finished = status in FINISHED_JOB_STATUSES
+            await self.conn.execute(
+                """UPDATE moderation_jobs SET status=?,
+                   finished_at=CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE finished_at END
+                   WHERE job_id=?""",
+                (status, finished, job_id),
+            )
+            await self._commit_if_not_in_tx()
+
+    # ---------- target ----------
+    async def get_pending_job_targets(self, job_id: int) -> list[int]:
+        async with self._lock:
+            if not self.conn:
+                return []
+            async with self.conn.execute(
+                "SELECT user_id FROM moderation_job_targets WHERE job_id=? AND status='pending'",
+                (job_id,),
+            ) as cur:
+                return [r[0] for r in await cur.fetchall()]
+
+    async def mark_job_targets(
+        self, job_id: int, results: dict[int, tuple[str, str | None]]
+    ):
+        """Ghi kết quả một lô target: user_id → (status, lỗi)."""
+        if not results:
+            return
+        async with self._lock:
+            if not self.conn:
+                return
+            await self.conn.executemany(
+                "UPDATE moderation_job_targets SET status=?, error=? WHERE job_id=? AND user_id=?",
+                [(st, err, job_id, uid) for uid, (st, err) in results.items()],
+            )
+            await self._commit_if_not_in_tx()
+
+    async def get_job_target_counts(self, job_id: int) -> dict[str, int]:
+        async with self._lock:
+            if not self.conn:
+                return {}
+            async with self.conn.execute(
+                "SELECT status, COUNT(*) FROM moderation_job_targets WHERE job_id=? GROUP BY status",
+                (job_id,),
+            ) as cur:
+                return {r[0]: r[1] for r in await cur.fetchall()}
@@ -1,9 +1,13 @@
 """Modal forms cho input phức tạp"""
 
+import asyncio
 import logging
+import time
 
 import discord
 
+from utils.constants import SUGGESTION_CONFIG
+
 logger = logging.getLogger("BlastBot.Modals")
 
 
@@ -41,7 +45,30 @@ class ReportModal(discord.ui.Modal, title="Báo cáo người dùng/tin nhắn")
     async def on_submit(self, interaction: discord.Interaction) -> None:
         """Xử lý khi submit report"""
         from utils.constants import COLORS
-        from utils.embeds import create_embed, success_embed
+        from utils.embeds import create_embed, error_embed, success_embed
+        from utils.report_aggregator import report_aggregator
+
+        guild = interaction.guild
+        if guild is not None:
+            if report_aggregator.already_reported(
+                guild.id, self.target_id, interaction.user.id
+            ):
+                await interaction.response.send_message(
+                    embed=success_embed(
+                        "Đã ghi nhận",
+                        "Bạn đã báo cáo mục này rồi, đội ngũ quản lý đã nhận được.",
+                    ),
+                    ephemeral=True,
+                )
+                return
+            if not report_aggregator.allow(guild.id, interaction.user.id):
+                await interaction.response.send_message(
+                    embed=error_embed(
+                        "Báo cáo quá nhanh", "Vui lòng thử lại sau ít phút."
+                    ),
+                    ephemeral=True,
+                )
+                return
 
         description_lines = [
             f"**Người báo cáo:** {interaction.user.mention} (`{interaction.user.id}`)",
@@ -78,21 +105,32 @@ class ReportModal(discord.ui.Modal, title="Báo cáo người dùng/tin nhắn")
 
         report_embed.set_footer(text=f"Report ID: {interaction.id}")
 
-        # Gửi vào log channel nếu có (dùng connection dùng chung của bot)
-        if interaction.guild:
-            db = getattr(interaction.client, "db", None)
-            if db is not None:
-                try:
-                    config = await db.get_guild_config(interaction.guild.id)
-                    log_channel_id = config.get("log_channel_id")
-                    if log_channel_id:
-                        log_channel = interaction.guild.get_channel(log_channel_id)
-                        if isinstance(
-                            log_channel, (discord.TextChannel, discord.Thread)
-                        ):
-                            await log_channel.send(embed=report_embed)
-                except Exception as e:
-                    logger.error(f"Failed to send report to log channel: {e}")
+        # Lưu DB rồi gửi/gộp vào log channel (báo cáo trùng target chỉ tăng bộ đếm)
+        db = getattr(interaction.client, "db", None)
+        if guild is not None and db is not None:
+            try:
+                await db.add_report(
+                    guild.id,
+                    self.target_type,
+                    self.target_id,
+                    interaction.user.id,
+                    self.reason.value,
+                    self.details.value,
+                )
+                config = await db.get_guild_config(guild.id)
+                log_channel = guild.get_channel(config.get("log_channel_id") or 0)
+                if not isinstance(log_channel, (discord.TextChannel, discord.Thread)):
+                    log_channel = None
+                await report_aggregator.submit(
+                    log_channel,
+                    guild.id,
+                    self.target_id,
+                    interaction.user.id,
+                    self.reason.value,
+                    report_embed,
+                )
+            except Exception as e:
+                logger.error(f"Failed to send report to log channel: {e}")
 
         # Xác nhận với user
         await interaction.response.send_message(
@@ -148,6 +186,49 @@ class SuggestionModal(discord.ui.Modal, title="Gửi góp ý"):
         logger.info(f"Suggestion posted by {interaction.user}: {self.suggestion.value}")
 
 
+class _VoteLabelUpdater:
+    """Gộp việc sửa nhãn nút vote: tối đa một lần edit mỗi message mỗi ``interval``.
+
+    Dùng chung cho mọi instance ``SuggestionVotingView`` (view persistent đăng ký lúc
+    khởi động và view gắn với từng message là các object khác nhau).
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._pending: dict[int, asyncio.Task] = {}
+        self._last_edit: dict[int, float] = {}
+
+    def schedule(self, view: "SuggestionVotingView", db, message: discord.Message):
+        if message.id in self._pending:
+            return  # lần edit đang chờ sẽ đọc tally mới nhất
+        now = time.monotonic()
+        if len(self._last_edit) > 1000:
+            self._last_edit = {
+                k: t for k, t in self._last_edit.items() if now - t < self.interval
+            }
+        last = self._last_edit.get(message.id)
+        delay = 0.0 if last is None else max(0.0, last + self.interval - now)
+        self._pending[message.id] = asyncio.create_task(
+            self._edit(view, db, message, delay)
+        )
+
+    async def _edit(self, view, db, message: discord.Message, delay: float):
+        if delay:
+            await asyncio.sleep(delay)
+        # Vote đến trong lúc đang edit sẽ hẹn lần kế tiếp sau interval
+        self._pending.pop(message.id, None)
+        self._last_edit[message.id] = time.monotonic()
+        try:
+            up, down = await db.get_vote_counts(message.id)
+            view._update_labels(up, down)
+            await message.edit(view=view)
+        except Exception as e:
+            logger.warning(f"Failed to update suggestion labels {message.id}: {e}")
+
+
+_label_updater = _VoteLabelUpdater(SUGGESTION_CONFIG["label_edit_interval_seconds"])
+
+
 class SuggestionVotingView(discord.ui.View):
     """Persistent view voting suggestion, lưu vote vào DB."""
 
@@ -177,20 +258,18 @@ class SuggestionVotingView(discord.ui.View):
             )
             return
 
-        message_id = interaction.message.id
-        user_id = interaction.user.id
-        current = await db.get_user_vote(message_id, user_id)
-
-        if current == vote:
-            await db.remove_vote(message_id, user_id)
-        else:
-            await db.set_vote(message_id, user_id, vote)
-
-        up, down = await db.get_vote_counts(message_id)
-
-        self._update_labels(up, down)
-
-        await interaction.response.edit_message(view=self)
+        # Ack ngay; nhãn nút được cập nhật gộp bởi _label_updater
+        await interaction.response.defer()
+        current, _ = await db.cast_vote(
+            interaction.message.id, interaction.user.id, vote
+        )
+        _label_updater.schedule(self, db, interaction.message)
+        await interaction.followup.send(
+            "✅ Đã bỏ vote."
+            if current is None
+            else f"✅ Đã vote {'👍' if current == 1 else '👎'}.",
+            ephemeral=True,
+        )
 
     @discord.ui.button(
         label="👍 0",
@@ -1,20 +1,138 @@
-"""Thay thế placeholder trong message greeting."""
+"""Thay thế placeholder trong message greeting và auto-message.
+
+Template được parse một lần thành các đoạn literal/placeholder và cache theo nội
+dung, nên mỗi lần render chỉ còn tính giá trị các placeholder thực sự có mặt rồi
+``join`` một lượt.
+"""
+
+import re
+import time
+from bisect import bisect_right
+from collections.abc import Callable
+from functools import lru_cache
 
 import discord
 
+from utils.constants import PLACEHOLDER_CONFIG
+from utils.member_counts import member_counts
+
+PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+class _JoinOrder:
+    """Thứ tự join theo guild: sắp xếp một lần mỗi ``ttl`` giây rồi tra bằng bisect.
+
+    Member vừa join (trường hợp greeting) luôn là người mới nhất nên lấy thẳng số
+    member từ ``member_counts``, không cần đụng tới cache.
+    """
+
+    def __init__(
+        self,
+        ttl: float = PLACEHOLDER_CONFIG["join_order_ttl_seconds"],
+        recent: float = PLACEHOLDER_CONFIG["recent_join_seconds"],
+    ):
+        self.ttl = ttl
+        self.recent = recent
+        # guild_id → (thời điểm build, timestamp join đã sắp xếp)
+        self._orders: dict[int, tuple[float, list[float]]] = {}
+
+    def position(self, member: discord.Member) -> int:
+        """Thứ tự join của member (1 = người join sớm nhất còn trong server)."""
+        guild = member.guild
+        joined_at = member.joined_at
+        if (
+            joined_at is None
+            or (discord.utils.utcnow() - joined_at).total_seconds() < self.recent
+        ):
+            return member_counts.members(guild)
+        now = time.monotonic()
+        cached = self._orders.get(guild.id)
+        if cached is None or now - cached[0] >= self.ttl:
+            cached = self._orders[guild.id] = (
+                now,
+                sorted(
+                    m.joined_at.timestamp()
+                    for m in guild.members
+                    if m.joined_at is not None
+                ),
+            )
+        return bisect_right(cached[1], joined_at.timestamp())
+
+    def forget(self, guild_id: int) -> None:
+        self._orders.pop(guild_id, None)
+
+
+join_order = _JoinOrder()
+
+
+# name → (cần member?, hàm lấy giá trị)
+_Resolver = Callable[
+    [discord.Guild, discord.Member | None, discord.abc.GuildChannel | None], str
+]
+PLACEHOLDERS: dict[str, tuple[bool, _Resolver]] = {
+    "user": (True, lambda g, m, c: str(m)),
+    "user_mention": (True, lambda g, m, c: m.mention),
+    "user_name": (True, lambda g, m, c: m.display_name),
+    "created_at": (True, lambda g, m, c: discord.utils.format_dt(m.created_at, "D")),
+    "join_position": (True, lambda g, m, c: str(join_order.position(m))),
+    "server": (False, lambda g, m, c: g.name),
+    "member_count": (False, lambda g, m, c: str(member_counts.members(g))),
+    "channel": (False, lambda g, m, c: c.mention if c is not None else ""),
+}
+
+
+class CompiledTemplate:
+    """Template đã parse: ``segments`` xen kẽ literal (chẵn) và tên placeholder (lẻ)."""
+
+    __slots__ = ("segments", "names", "_slots")
+
+    def __init__(self, segments: tuple[str, ...]):
+        self.segments = segments
+        self.names = frozenset(segments[1::2])
+        # (vị trí, cần member?, resolver) tra sẵn lúc compile
+        self._slots = tuple(
+            (i, *PLACEHOLDERS[segments[i]]) for i in range(1, len(segments), 2)
+        )
+
+    def render(
+        self,
+        guild: discord.Guild,
+        member: discord.Member | None = None,
+        channel: discord.abc.GuildChannel | None = None,
+    ) -> str:
+        if not self._slots:
+            return self.segments[0]
+        parts = list(self.segments)
+        for i, needs_member, resolve in self._slots:
+            # Thiếu ngữ cảnh (vd. auto-message không có member) → giữ nguyên chữ
+            if needs_member and member is None:
+                parts[i] = "{" + parts[i] + "}"
+            else:
+                parts[i] = resolve(guild, member, channel)
+        return "".join(parts)
+
+
+@lru_cache(maxsize=PLACEHOLDER_CONFIG["template_cache_size"])
+def compile_template(text: str) -> CompiledTemplate:
+    """Parse ``text`` một lần; placeholder không hỗ trợ được giữ như literal."""
+    segments: list[str] = []
+    pos = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        if match.group(1) not in PLACEHOLDERS:
+            continue
+        segments += (text[pos : match.start()], match.group(1))
+        pos = match.end()
+    segments.append(text[pos:])
+    return CompiledTemplate(tuple(segments))
+
 
-def render_placeholders(text: str, member: discord.Member) -> str:
-    """Hỗ trợ: {user}, {user_mention}, {user_name}, {server}, {member_count}."""
+def render_placeholders(
+    text: str,
+    member: discord.Member,
+    channel: discord.abc.GuildChannel | None = None,
+) -> str:
+    """Hỗ trợ: {user}, {user_mention}, {user_name}, {server}, {member_count},
+    {created_at}, {join_position}, {channel}."""
     if not text:
         return text
-    guild = member.guild
-    replacements = {
-        "{user}": str(member),
-        "{user_mention}": member.mention,
-        "{user_name}": member.display_name,
-        "{server}": guild.name,
-        "{member_count}": str(guild.member_count or len(guild.members)),
-    }
-    for key, value in replacements.items():
-        text = text.replace(key, value)
-    return text
+    return compile_template(text).render(member.guild, member, channel)
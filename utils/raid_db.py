@@ -0,0 +1,198 @@
+"""Database mixin cho chống raid: cấu hình detector, trạng thái lockdown, member bị giữ."""
+
+import json
+
+from utils.constants import RAID_CONFIG
+
+_SETTING_FIELDS = (
+    "enabled",
+    "join_threshold",
+    "window_seconds",
+    "min_account_age_days",
+    "lock_mode",
+    "slowmode_seconds",
+    "hold_minutes",
+    "channels",
+)
+
+
+class RaidDBMixin:
+    # ---------- bảng ----------
+    async def migrate_raid(self):
+        """v12: cấu hình chống raid, lockdown đang bật và member bị giữ chờ xét."""
+        if not self.conn:
+            return
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS raid_settings (
+                guild_id INTEGER PRIMARY KEY,
+                enabled INTEGER NOT NULL DEFAULT 0,
+                join_threshold INTEGER, window_seconds INTEGER,
+                min_account_age_days INTEGER, lock_mode TEXT,
+                slowmode_seconds INTEGER, hold_minutes INTEGER,
+                channels_json TEXT NOT NULL DEFAULT '[]')""")
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS raid_lockdowns (
+                guild_id INTEGER PRIMARY KEY, reason TEXT,
+                lock_mode TEXT NOT NULL DEFAULT 'slowmode',
+                channel_state_json TEXT NOT NULL DEFAULT '{}',
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS raid_holds (
+                guild_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+                PRIMARY KEY (guild_id, user_id))""")
+        await self._commit_if_not_in_tx()
+
+    # ---------- cấu hình ----------
+    async def get_raid_settings(self, guild_id: int) -> dict:
+        """Cấu hình detector của guild (đọc DB một lần, sau đó lấy từ cache)."""
+        cached = self._raid_settings.get(guild_id)
+        if cached is not None:
+            return cached
+        async with self._lock:
+            result = {
+                "enabled": 0,
+                "join_threshold": RAID_CONFIG["join_threshold_default"],
+                "window_seconds": RAID_CONFIG["window_seconds_default"],
+                "min_account_age_days": RAID_CONFIG["min_account_age_days_default"],
+                "lock_mode": "slowmode",
+                "slowmode_seconds": RAID_CONFIG["slowmode_seconds_default"],
+                "hold_minutes": RAID_CONFIG["hold_minutes_default"],
+                "channels": [],
+            }
+            if not self.conn:
+                return result
+            async with self.conn.execute(
+                "SELECT * FROM raid_settings WHERE guild_id=?", (guild_id,)
+            ) as cur:
+                row = await cur.fetchone()
+            if row:
+                row = dict(row)
+                row["channels"] = json.loads(row.pop("channels_json") or "[]")
+                result.update(
+                    {k: row[k] for k in _SETTING_FIELDS if row[k] is not None}
+                )
+            self._raid_settings[guild_id] = result
+            return result
+
+    async def set_raid_settings(self, guild_id: int, **kwargs):
+        updates = {k: v for k, v in kwargs.items() if k in _SETTING_FIELDS}
+        if not updates:
+            return
+        if "channels" in updates:
+            updates["channels_json"] = json.dumps(updates.pop("channels"))
+        async with self._lock:
+            if not self.conn:
+                return
+            cols = ", ".join(updates)
+            marks = ",".join("?" * len(updates))
+            sets = ", ".join(f"{k}=excluded.{k}" for k in updates)
+            await self.conn.execute(
+                f"INSERT INTO raid_settings (guild_id, {cols}) VALUES (?,{marks}) "
+                f"ON CONFLICT(guild_id) DO UPDATE SET {sets}",
+                (guild_id, *updates.values()),
+            )
+            await self._commit_if_not_in_tx()
+            self._raid_settings.pop(guild_id, None)
+
+    # ---------- lockdown ----------
+    def in_raid_lockdown(self, guild_id: int) -> bool:
+        """Tra cứu đồng bộ, không chạm DB (dùng trong on_member_join)."""
+        return guild_id in self._raid_lockdowns
+
+    async def list_raid_lockdowns(self) -> list[dict]:
+        """Lockdown còn hiệu lực (sau restart) và nạp lại cache tra cứu nhanh."""
+        async with self._lock:
+            if not self.conn:
+                return []
+            async with self.conn.execute("SELECT * FROM raid_lockdowns") as cur:
+                rows = [dict(r) for r in await cur.fetchall()]
+            self._raid_lockdowns = {r["guild_id"] for r in rows}
+            return rows
+
+    async def start_raid_lockdown(
+        self,
+        guild_id: int,
+        reason: str,
+        lock_mode: str,
+        channel_state: dict[int, object],
+    ) -> bool:
+        """Ghi lockdown cùng trạng thái channel cũ để khôi phục. False nếu đã có."""
+        async with self._lock:
+            if not self.conn:
+                return False
+            cur = await self.conn.execute(
+                """INSERT OR IGNORE INTO raid_lockdowns
+                   (guild_id, reason, lock_mode, channel_state_json) VALUES (?,?,?,?)""",
+                (guild_id, reason, lock_mode, json.dumps(channel_state)),
+            )
+            await self._commit_if_not_in_tx()
+            if cur.rowcount == 0:
+                return False
+            self._raid_lockdowns.add(guild_id)
+            return True
+
+    async def set_raid_lockdown_state(
+        self, guild_id: int, channel_state: dict[int, object]
+    ) -> bool:
+        """Ghi trạng thái channel cũ sau khi khóa. False nếu lockdown đã bị gỡ."""
+        async with self._lock:
+            if not self.conn:
+                return False
+            cur = await self.conn.execute(
+                "UPDATE raid_lockdowns SET channel_state_json=? WHERE guild_id=?",
+                (json.dumps(channel_state), guild_id),
+            )
+            await self._commit_if_not_in_tx()
+            return cur.rowcount > 0
+
+    async def end_raid_lockdown(self, guild_id: int) -> tuple[dict | None, list[int]]:
+        """Xóa lockdown; trả ({lock_mode, channels: trạng thái cũ}, member đang bị giữ)."""
+        async with self.transaction():
+            self._raid_lockdowns.discard(guild_id)
+            if not self.conn:
+                return None, []
+            async with self.conn.execute(
+                "SELECT lock_mode, channel_state_json FROM raid_lockdowns WHERE guild_id=?",
+                (guild_id,),
+            ) as cur:
+                row = await cur.fetchone()
+            if row is None:
+                return None, []
+            async with self.conn.execute(
+                "SELECT user_id FROM raid_holds WHERE guild_id=?", (guild_id,)
+            ) as cur:
+                holds = [r[0] for r in await cur.fetchall()]
+            await self.conn.execute(
+                "DELETE FROM raid_lockdowns WHERE guild_id=?", (guild_id,)
+            )
+            await self.conn.execute(
+                "DELETE FROM raid_holds WHERE guild_id=?", (guild_id,)
+            )
+            channels = json.loads(row["channel_state_json"] or "{}")
+            return {
+                "lock_mode": row["lock_mode"],
+                "channels": {int(k): v for k, v in channels.items()},
+            }, holds
+
+    # ---------- member bị giữ ----------
+    async def add_raid_holds(self, guild_id: int, user_ids: list[int]):
+        if not user_ids:
+            return
+        async with self._lock:
+            if not self.conn:
+                return
+            await self.conn.executemany(
+                "INSERT OR IGNORE INTO raid_holds (guild_id, user_id) VALUES (?,?)",
+                [(guild_id, uid) for uid in user_ids],
+            )
+            await self._commit_if_not_in_tx()
+
+    async def count_raid_holds(self, guild_id: int) -> int:
+        async with self._lock:
+            if not self.conn:
+                return 0
+            async with self.conn.execute(
+                "SELECT COUNT(*) FROM raid_holds WHERE guild_id=?", (guild_id,)
+            ) as cur:
+                row = await cur.fetchone()
+            return row[0] if row else 0
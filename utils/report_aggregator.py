@@ -0,0 +1,170 @@
+"""Gom báo cáo theo target: báo cáo đầu gửi một embed, các báo cáo sau chỉ tăng bộ đếm.
+
+Khi hàng chục người cùng báo cáo một tin nhắn raid, log channel chỉ nhận một
+embed; bộ đếm trên embed được sửa tối đa mỗi ``debounce_seconds``. Giới hạn số
+báo cáo mỗi người giữ trong bộ nhớ (reset khi restart), bản ghi đầy đủ nằm ở DB.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from collections.abc import Callable
+
+import discord
+
+from utils.constants import REPORT_CONFIG
+
+logger = logging.getLogger("BlastBot.Reports")
+
+_Key = tuple[int, int]
+
+
+class _ReportGroup:
+    __slots__ = (
+        "embed",
+        "message_task",
+        "count",
+        "reporters",
+        "reasons",
+        "first_at",
+        "edit_task",
+    )
+
+    def __init__(self, embed: discord.Embed, reporter_id: int, reason: str, now: float):
+        self.embed = embed
+        self.message_task: asyncio.Task | None = None
+        self.count = 1
+        self.reporters = {reporter_id}
+        self.reasons = Counter({reason: 1})
+        self.first_at = now
+        self.edit_task: asyncio.Task | None = None
+
+
+class ReportAggregator:
+    """Registry dùng chung toàn process, giống ``member_resolver``."""
+
+    def __init__(
+        self,
+        window_seconds: float = REPORT_CONFIG["window_seconds"],
+        debounce_seconds: float = REPORT_CONFIG["debounce_seconds"],
+        user_limit: int = REPORT_CONFIG["user_limit"],
+        user_window_seconds: float = REPORT_CONFIG["user_window_seconds"],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window = window_seconds
+        self.debounce = debounce_seconds
+        self.user_limit = user_limit
+        self.user_window = user_window_seconds
+        self._clock = clock
+        # (guild_id, target_id) → nhóm báo cáo đang mở
+        self._groups: dict[_Key, _ReportGroup] = {}
+        # (guild_id, user_id) → thời điểm các báo cáo gần đây của người đó
+        self._user_hits: dict[_Key, deque[float]] = {}
+
+    # ---------- kiểm tra trước khi nhận ----------
+    def already_reported(self, guild_id: int, target_id: int, user_id: int) -> bool:
+        group = self._groups.get((guild_id, target_id))
+        return (
+            group is not None
+            and self._clock() - group.first_at < self.window
+            and user_id in group.reporters
+        )
+
+    def allow(self, guild_id: int, user_id: int) -> bool:
+        """Ghi nhận một lượt báo cáo của user; False nếu vượt giới hạn."""
+        now = self._clock()
+        hits = self._user_hits.setdefault((guild_id, user_id), deque())
+        while hits and now - hits[0] >= self.user_window:
+            hits.popleft()
+        if len(hits) >= self.user_limit:
+            return False
+        hits.append(now)
+        return True
+
+    # ---------- gửi / gộp ----------
+    async def submit(
+        self,
+        channel: discord.abc.Messageable | None,
+        guild_id: int,
+        target_id: int,
+        reporter_id: int,
+        reason: str,
+        embed: discord.Embed,
+    ) -> bool:
+        """True nếu mở nhóm mới (đã gửi embed), False nếu gộp vào nhóm đang mở.
+
+        Không có log channel thì không mở nhóm (báo cáo vẫn nằm trong DB); gửi lỗi
+        thì bỏ nhóm rồi raise, để báo cáo sau mở embed mới thay vì gộp vào nhóm
+        không có message.
+        """
+        now = self._clock()
+        key = (guild_id, target_id)
+        group = self._groups.get(key)
+        if group is None or now - group.first_at >= self.window:
+            if channel is None:
+                return False
+            self._prune(now)
+            group = self._groups[key] = _ReportGroup(embed, reporter_id, reason, now)
+            # Báo cáo đến trong lúc đang gửi sẽ chờ task này rồi mới sửa
+            group.message_task = asyncio.create_task(channel.send(embed=embed))
+            try:
+                await group.message_task
+            except Exception:
+                if self._groups.get(key) is group:
+                    del self._groups[key]
+                raise
+            return True
+
+        group.count += 1
+        group.reporters.add(reporter_id)
+        group.reasons[reason] += 1
+        if group.edit_task is None:
+            group.edit_task = asyncio.create_task(self._flush(group))
+        return False
+
+    async def _flush(self, group: _ReportGroup):
+        await asyncio.sleep(self.debounce)
+        # Báo cáo đến sau thời điểm này sẽ hẹn một lần sửa mới
+        group.edit_task = None
+        try:
+            message = await group.message_task
+            await message.edit(embed=self.render(group))
+        except Exception as e:
+            logger.warning(f"Không thể cập nhật embed báo cáo tổng hợp: {e}")
+
+    def render(self, group: _ReportGroup) -> discord.Embed:
+        embed = group.embed.copy()
+        embed.title = f"{group.embed.title} (×{group.count})"
+        reasons = ", ".join(
+            f"{reason} ({n})"
+            for reason, n in group.reasons.most_common(REPORT_CONFIG["top_reasons"])
+        )
+        embed.add_field(
+            name="📊 Tổng hợp",
+            value=(
+                f"**{group.count}** báo cáo từ **{len(group.reporters)}** người · "
+                f"gần nhất {discord.utils.format_dt(discord.utils.utcnow(), 'R')}\n"
+                f"**Lý do:** {reasons}"
+            )[:1024],
+            inline=False,
+        )
+        return embed
+
+    def _prune(self, now: float) -> None:
+        """Bỏ nhóm đã hết cửa sổ và bộ đếm user đã nguội (chạy khi mở nhóm mới)."""
+        for key in [
+            k
+            for k, g in self._groups.items()
+            if now - g.first_at >= self.window and g.edit_task is None
+        ]:
+            del self._groups[key]
+        for key in [
+            k
+            for k, hits in self._user_hits.items()
+            if not hits or now - hits[-1] >= self.user_window
+        ]:
+            del self._user_hits[key]
+
+
+report_aggregator = ReportAggregator()
@@ -0,0 +1,72 @@
+"""Database mixin lưu báo cáo từ report modal để tra cứu lại."""
+
+
+class ReportDBMixin:
+    async def migrate_reports(self):
+        """v14: bảng báo cáo user/tin nhắn."""
+        if not self.conn:
+            return
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS reports (
+                report_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                target_type TEXT NOT NULL,
+                target_id INTEGER NOT NULL,
+                reporter_id INTEGER NOT NULL,
+                reason TEXT, details TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_reports_target ON reports(guild_id, target_id)"
+        )
+        await self._commit_if_not_in_tx()
+
+    async def add_report(
+        self,
+        guild_id: int,
+        target_type: str,
+        target_id: int,
+        reporter_id: int,
+        reason: str,
+        details: str,
+    ) -> int | None:
+        async with self._lock:
+            if not self.conn:
+                return None
+            cur = await self.conn.execute(
+                """INSERT INTO reports
+                   (guild_id, target_type, target_id, reporter_id, reason, details)
+                   VALUES (?,?,?,?,?,?)""",
+                (guild_id, target_type, target_id, reporter_id, reason, details),
+            )
+            await self._commit_if_not_in_tx()
+            return cur.lastrowid
+
+    async def list_reports(
+        self, guild_id: int, target_id: int | None = None, limit: int = 15
+    ) -> list[dict]:
+        """Báo cáo mới nhất của guild, lọc theo target nếu có."""
+        async with self._lock:
+            if not self.conn:
+                return []
+            sql = "SELECT * FROM reports WHERE guild_id=?"
+            params: list = [guild_id]
+            if target_id is not None:
+                sql += " AND target_id=?"
+                params.append(target_id)
+            async with self.conn.execute(
+                sql + " ORDER BY report_id DESC LIMIT ?", (*params, limit)
+            ) as cur:
+                return [dict(r) for r in await cur.fetchall()]
+
+    async def count_reports(self, guild_id: int, target_id: int) -> tuple[int, int]:
+        """(tổng số báo cáo, số người báo cáo khác nhau) cho một target."""
+        async with self._lock:
+            if not self.conn:
+                return 0, 0
+            async with self.conn.execute(
+                """SELECT COUNT(*), COUNT(DISTINCT reporter_id) FROM reports
+                   WHERE guild_id=? AND target_id=?""",
+                (guild_id, target_id),
+            ) as cur:
+                row = await cur.fetchone()
+            return (row[0], row[1]) if row else (0, 0)
@@ -0,0 +1,111 @@
+"""Database mixin cho role menu tự chọn (nút / select) trên bảng ``role_menus``."""
+
+import json
+
+from utils.constants import ROLE_MENU_CONFIG
+
+ROLE_MENU_MODES = ("toggle", "unique", "add")
+ROLE_MENU_STYLES = ("button", "select")
+
+
+class RoleMenuDBMixin:
+    # ---------- bảng ----------
+    async def migrate_role_menus(self):
+        """v13: kiểu hiển thị của role menu và index theo guild."""
+        if not self.conn:
+            return
+        async with self.conn.execute("PRAGMA table_info(role_menus)") as cur:
+            columns = {r["name"] for r in await cur.fetchall()}
+        if "style" not in columns:
+            await self.conn.execute(
+                "ALTER TABLE role_menus ADD COLUMN style TEXT NOT NULL DEFAULT 'button'"
+            )
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_role_menus_guild ON role_menus(guild_id)"
+        )
+        await self._commit_if_not_in_tx()
+
+    @staticmethod
+    def _role_menu_row(row) -> dict:
+        d = dict(row)
+        d["role_ids"] = json.loads(d["role_ids"] or "[]")
+        return d
+
+    # ---------- index message_id → menu ----------
+    def _role_menu_index_put(self, message_id: int, menu: dict | None):
+        """Ghi vào index LRU; ``None`` = message không phải menu (cache âm)."""
+        index = self._role_menu_index
+        index[message_id] = menu
+        index.move_to_end(message_id)
+        if len(index) > ROLE_MENU_CONFIG["index_size"]:
+            index.popitem(last=False)
+
+    async def get_role_menu(self, message_id: int) -> dict | None:
+        """Menu gắn với message: O(1) từ index, chỉ đọc DB ở lần đầu gặp message.
+
+        Không nạp cả bảng lúc khởi động; menu ít dùng tự rơi khỏi index.
+        """
+        if message_id in self._role_menu_index:
+            self._role_menu_index.move_to_end(message_id)
+            menu = self._role_menu_index[message_id]
+            return (
+                None if menu is None else {**menu, "role_ids": list(menu["role_ids"])}
+            )
+        async with self._lock:
+            if not self.conn:
+                return None
+            async with self.conn.execute(
+                "SELECT * FROM role_menus WHERE message_id=?", (message_id,)
+            ) as cur:
+                row = await cur.fetchone()
+            menu = self._role_menu_row(row) if row else None
+            self._role_menu_index_put(message_id, menu)
+            return (
+                None if menu is None else {**menu, "role_ids": list(menu["role_ids"])}
+            )
+
+    # ---------- ghi ----------
+    async def create_role_menu(
+        self,
+        message_id: int,
+        guild_id: int,
+        channel_id: int,
+        role_ids: list[int],
+        mode: str = "toggle",
+        style: str = "button",
+    ):
+        async with self._lock:
+            if not self.conn:
+                return
+            await self.conn.execute(
+                "INSERT OR IGNORE INTO guilds (guild_id) VALUES (?)", (guild_id,)
+            )
+            await self.conn.execute(
+                """INSERT INTO role_menus
+                   (message_id, guild_id, channel_id, role_ids, mode, style)
+                   VALUES (?,?,?,?,?,?)""",
+                (message_id, guild_id, channel_id, json.dumps(role_ids), mode, style),
+            )
+            await self._commit_if_not_in_tx()
+            self._role_menu_index.pop(message_id, None)
+
+    async def delete_role_menu(self, message_id: int) -> bool:
+        async with self._lock:
+            if not self.conn:
+                return False
+            cur = await self.conn.execute(
+                "DELETE FROM role_menus WHERE message_id=?", (message_id,)
+            )
+            await self._commit_if_not_in_tx()
+            self._role_menu_index_put(message_id, None)
+            return cur.rowcount > 0
+
+    async def list_role_menus(self, guild_id: int) -> list[dict]:
+        async with self._lock:
+            if not self.conn:
+                return []
+            async with self.conn.execute(
+                "SELECT * FROM role_menus WHERE guild_id=? ORDER BY created_at",
+                (guild_id,),
+            ) as cur:
+                return [self._role_menu_row(r) for r in await cur.fetchall()]
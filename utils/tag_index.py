@@ -0,0 +1,62 @@
+"""Index tag trong bộ nhớ: key đã sắp xếp để tra prefix bằng bisect, xếp hạng theo lượt dùng."""
+
+import heapq
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+
+# Ký tự lớn nhất trong BMP: mọi key bắt đầu bằng prefix đều < prefix + _MAX_CHAR
+_MAX_CHAR = "\uffff"
+
+
+class TagIndex:
+    """Tag của một guild. Tra prefix O(log n + k), không đụng DB mỗi phím gõ."""
+
+    def __init__(self, rows: Iterable[tuple[str, str, int]] = ()):
+        self._content: dict[str, str] = {}
+        self.uses: dict[str, int] = {}
+        for tag_id, content, uses in rows:
+            self._content[tag_id] = content
+            self.uses[tag_id] = uses
+        self._keys: list[str] = sorted(self._content)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, tag_id: str) -> bool:
+        return tag_id in self._content
+
+    def keys(self) -> list[str]:
+        return list(self._keys)
+
+    def get(self, tag_id: str) -> str | None:
+        return self._content.get(tag_id)
+
+    def put(self, tag_id: str, content: str) -> None:
+        if tag_id not in self._content:
+            insort(self._keys, tag_id)
+            self.uses.setdefault(tag_id, 0)
+        self._content[tag_id] = content
+
+    def remove(self, tag_id: str) -> bool:
+        if self._content.pop(tag_id, None) is None:
+            return False
+        del self._keys[bisect_left(self._keys, tag_id)]
+        self.uses.pop(tag_id, None)
+        return True
+
+    def bump(self, tag_id: str) -> None:
+        if tag_id in self._content:
+            self.uses[tag_id] = self.uses.get(tag_id, 0) + 1
+
+    def complete(self, prefix: str, limit: int = 25) -> list[str]:
+        """Tối đa ``limit`` tag bắt đầu bằng ``prefix``, dùng nhiều nhất trước."""
+        prefix = prefix.lower().strip()
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + _MAX_CHAR, lo)
+
+        def rank(tag_id: str) -> tuple[int, str]:
+            return (-self.uses.get(tag_id, 0), tag_id)
+
+        if hi - lo <= limit:
+            return sorted(self._keys[lo:hi], key=rank)
+        return heapq.nsmallest(limit, self._keys[lo:hi], key=rank)
@@ -1,9 +1,14 @@
 """Database mixin cho hệ thống ticket. Dùng chung self.conn, self._lock, self._commit_if_not_in_tx."""
 
 import json
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import TypedDict
 
+from utils.tag_index import TagIndex
+from utils.workload import WorkloadHeap
+
 
 class TicketRow(TypedDict):
     id: int
@@ -17,6 +22,9 @@ class TicketRow(TypedDict):
     close_time: str | None
     close_reason: str | None
     last_message_time: str
+    first_response_time: str | None
+    claim_time: str | None
+    stats_rolled: int
 
 
 class TicketSettingsRow(TypedDict):
@@ -27,6 +35,53 @@ class TicketSettingsRow(TypedDict):
     claim_mode: str
     autoclose_hours: int
     ticket_counter: int
+    open_concurrency: int
+
+
+@dataclass(frozen=True)
+class TicketPermissionIndex:
+    """Staff/blacklist của một guild đã biên dịch thành frozenset để kiểm tra O(roles)."""
+
+    staff_roles: frozenset[int] = frozenset()
+    staff_users: frozenset[int] = frozenset()
+    admin_roles: frozenset[int] = frozenset()
+    admin_users: frozenset[int] = frozenset()
+    blacklist_roles: frozenset[int] = frozenset()
+    blacklist_users: frozenset[int] = frozenset()
+
+    @classmethod
+    def from_rows(
+        cls, staff: list[dict], blacklist: list[dict]
+    ) -> "TicketPermissionIndex":
+        def ids(rows, is_role):
+            return frozenset(
+                r["entity_id"] for r in rows if bool(r["is_role"]) == is_role
+            )
+
+        admins = [r for r in staff if r.get("type") == "admin"]
+        return cls(
+            staff_roles=ids(staff, True),
+            staff_users=ids(staff, False),
+            admin_roles=ids(admins, True),
+            admin_users=ids(admins, False),
+            blacklist_roles=ids(blacklist, True),
+            blacklist_users=ids(blacklist, False),
+        )
+
+    @staticmethod
+    def _match(user_id, role_ids, users, roles) -> bool:
+        return user_id in users or not roles.isdisjoint(role_ids)
+
+    def is_staff(self, user_id: int, role_ids) -> bool:
+        return self._match(user_id, role_ids, self.staff_users, self.staff_roles)
+
+    def is_admin_staff(self, user_id: int, role_ids) -> bool:
+        return self._match(user_id, role_ids, self.admin_users, self.admin_roles)
+
+    def is_blacklisted(self, user_id: int, role_ids) -> bool:
+        return self._match(
+            user_id, role_ids, self.blacklist_users, self.blacklist_roles
+        )
 
 
 class TicketDBMixin:
@@ -86,6 +141,90 @@ class TicketDBMixin:
         )
         await self._commit_if_not_in_tx()
 
+    async def migrate_ticket_pool(self):
+        """v2: pool kênh dựng sẵn cho panel."""
+        if not self.conn:
+            return
+        c = self.conn
+        await c.execute(
+            "ALTER TABLE ticket_panels ADD COLUMN pool_size INTEGER NOT NULL DEFAULT 0"
+        )
+        await c.execute(
+            "ALTER TABLE ticket_panels ADD COLUMN pool_refill INTEGER NOT NULL DEFAULT 1"
+        )
+        await c.execute(
+            "ALTER TABLE ticket_panels ADD COLUMN pool_fallback INTEGER NOT NULL DEFAULT 1"
+        )
+        await c.execute("""
+            CREATE TABLE IF NOT EXISTS ticket_pool (
+                channel_id INTEGER PRIMARY KEY,
+                guild_id INTEGER NOT NULL, panel_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+        await c.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ticket_pool_panel ON ticket_pool(panel_id)"
+        )
+        await self._commit_if_not_in_tx()
+
+    async def migrate_ticket_thread_mode(self):
+        """v3: panel chọn backend ticket — 'channel' (mặc định) hoặc 'thread'."""
+        if not self.conn:
+            return
+        await self.conn.execute(
+            "ALTER TABLE ticket_panels ADD COLUMN mode TEXT NOT NULL DEFAULT 'channel'"
+        )
+        await self._commit_if_not_in_tx()
+
+    async def migrate_ticket_overflow(self):
+        """v4: category tràn (overflow) khi category chính đủ 50 kênh."""
+        if not self.conn:
+            return
+        await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ticket_overflow_categories (
+                category_id INTEGER PRIMARY KEY,
+                guild_id INTEGER NOT NULL, primary_id INTEGER NOT NULL,
+                idx INTEGER NOT NULL)""")
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ticket_overflow_primary "
+            "ON ticket_overflow_categories(primary_id)"
+        )
+        await self._commit_if_not_in_tx()
+
+    async def migrate_ticket_queue(self):
+        """v5: số lượt tạo ticket chạy song song mỗi guild."""
+        if not self.conn:
+            return
+        await self.conn.execute(
+            "ALTER TABLE ticket_settings ADD COLUMN open_concurrency INTEGER NOT NULL DEFAULT 2"
+        )
+        await self._commit_if_not_in_tx()
+
+    async def migrate_ticket_panel_message_index(self):
+        """v6: tra panel theo message_id của nút persistent."""
+        if not self.conn:
+            return
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ticket_panels_message ON ticket_panels(message_id)"
+        )
+        await self._commit_if_not_in_tx()
+
+    async def migrate_ticket_auto_assign(self):
+        """v8: panel tự giao ticket cho staff ít việc nhất."""
+        if not self.conn:
+            return
+        await self.conn.execute(
+            "ALTER TABLE ticket_panels ADD COLUMN auto_assign INTEGER NOT NULL DEFAULT 0"
+        )
+        await self._commit_if_not_in_tx()
+
+    async def migrate_ticket_tag_usage(self):
+        """v9: số lượt dùng tag để xếp hạng gợi ý."""
+        if not self.conn:
+            return
+        await self.conn.execute(
+            "ALTER TABLE ticket_tags ADD COLUMN uses INTEGER NOT NULL DEFAULT 0"
+        )
+        await self._commit_if_not_in_tx()
+
     # ---------- settings ----------
     async def get_ticket_settings(self, guild_id: int) -> dict:
         async with self._lock:
@@ -97,6 +236,7 @@ class TicketDBMixin:
                 "claim_mode": "reply_only",
                 "autoclose_hours": 0,
                 "ticket_counter": 0,
+                "open_concurrency": 2,
             }
             if not self.conn:
                 return default
@@ -122,6 +262,7 @@ class TicketDBMixin:
                 "welcome_message",
                 "claim_mode",
                 "autoclose_hours",
+                "open_concurrency",
             ]
             updates = {k: v for k, v in kwargs.items() if k in valid}
             if not updates:
@@ -167,6 +308,7 @@ class TicketDBMixin:
                 (guild_id, entity_id, int(is_role), type_),
             )
             await self._commit_if_not_in_tx()
+            self.invalidate_ticket_permissions(guild_id)
 
     async def remove_staff(self, guild_id: int, entity_id: int, type_: str):
         async with self._lock:
@@ -177,6 +319,7 @@ class TicketDBMixin:
                 (guild_id, entity_id, type_),
             )
             await self._commit_if_not_in_tx()
+            self.invalidate_ticket_permissions(guild_id)
 
     async def get_staff(self, guild_id: int) -> list[dict]:
         async with self._lock:
@@ -205,6 +348,7 @@ class TicketDBMixin:
                     (guild_id, entity_id),
                 )
             await self._commit_if_not_in_tx()
+            self.invalidate_ticket_permissions(guild_id)
 
     async def get_blacklist(self, guild_id: int) -> list[dict]:
         async with self._lock:
@@ -215,6 +359,80 @@ class TicketDBMixin:
             ) as cur:
                 return [dict(r) for r in await cur.fetchall()]
 
+    # ---------- index quyền ----------
+    async def get_ticket_permission_index(self, guild_id: int) -> TicketPermissionIndex:
+        """Index staff/blacklist đã biên dịch; chỉ đọc DB lần đầu hoặc sau khi bị invalidate."""
+        index = self._ticket_perm_index.get(guild_id)
+        if index is not None:
+            return index
+        async with self._lock:
+            if not self.conn:
+                return TicketPermissionIndex()
+            async with self.conn.execute(
+                "SELECT * FROM ticket_staff WHERE guild_id=?", (guild_id,)
+            ) as cur:
+                staff = [dict(r) for r in await cur.fetchall()]
+            async with self.conn.execute(
+                "SELECT * FROM ticket_blacklist WHERE guild_id=?", (guild_id,)
+            ) as cur:
+                blacklist = [dict(r) for r in await cur.fetchall()]
+            index = TicketPermissionIndex.from_rows(staff, blacklist)
+            self._ticket_perm_index[guild_id] = index
+            return index
+
+    def invalidate_ticket_permissions(self, guild_id: int | None = None):
+        if guild_id is None:
+            self._ticket_perm_index.clear()
+            workloads = list(self._workloads.values())
+        else:
+            self._ticket_perm_index.pop(guild_id, None)
+            workloads = [w for w in (self._workloads.get(guild_id),) if w]
+        # Danh sách staff đổi → nạp lại staff 0 ticket ở lần giao kế tiếp
+        for workload in workloads:
+            workload.seeded = False
+
+    # ---------- tải staff ----------
+    async def get_staff_workload(self, guild_id: int) -> WorkloadHeap:
+        """Heap tải của guild; chỉ đếm từ DB lần đầu, sau đó cập nhật theo claim/đóng."""
+        workload = self._workloads.get(guild_id)
+        if workload is not None:
+            return workload
+        async with self._lock:
+            if not self.conn:
+                return WorkloadHeap()
+            async with self.conn.execute(
+                """SELECT claimed_by, COUNT(*) FROM tickets
+                   WHERE guild_id=? AND open=1 AND claimed_by IS NOT NULL
+                   GROUP BY claimed_by""",
+                (guild_id,),
+            ) as cur:
+                counts = {r[0]: r[1] for r in await cur.fetchall()}
+            workload = self._workloads.setdefault(guild_id, WorkloadHeap(counts))
+            return workload
+
+    def peek_staff_workload(self, guild_id: int) -> WorkloadHeap | None:
+        return self._workloads.get(guild_id)
+
+    async def assign_least_loaded(
+        self, guild_id: int, channel_id: int, eligible: Callable[[int], bool]
+    ) -> int | None:
+        """Chọn staff ít ticket nhất thoả ``eligible`` và claim luôn ticket cho họ.
+
+        Chọn và claim cùng giữ self._lock nên hai ticket mở đồng thời không rơi
+        vào cùng một staff chỉ vì chưa kịp cập nhật số đếm.
+        """
+        workload = await self.get_staff_workload(guild_id)
+        async with self._lock:
+            staff_id = workload.pick(eligible)
+            if staff_id is not None:
+                await self.set_claim(channel_id, staff_id)
+            return staff_id
+
+    def _workload_adjust(self, guild_id: int, staff_id: int | None, delta: int):
+        workload = self._workloads.get(guild_id)
+        if workload is not None and staff_id is not None:
+            workload.adjust(staff_id, delta)
+
     # ---------- panels ----------
     async def create_panel(self, guild_id: int, **data) -> int:
         async with self._lock:
@@ -281,12 +499,84 @@ class TicketDBMixin:
                 (channel_id, message_id, panel_id),
             )
             await self._commit_if_not_in_tx()
+            await self._refresh_panel_registry(panel_id)
+
+    # ---------- registry message_id → panel ----------
+    async def load_panel_registry(self):
+        """Nạp mọi panel đã gửi vào bộ nhớ (gọi một lần lúc khởi động)."""
+        async with self._lock:
+            if not self.conn:
+                return
+            async with self.conn.execute(
+                "SELECT * FROM ticket_panels WHERE message_id IS NOT NULL"
+            ) as cur:
+                rows = [dict(r) for r in await cur.fetchall()]
+            self._panel_registry = {}
+            self._panel_registry_ids = {}
+            for d in rows:
+                self._registry_put(d)
+
+    def _registry_put(self, d: dict):
+        d["mention_on_open"] = json.loads(d["mention_on_open"] or "[]")
+        self._registry_drop(d["panel_id"])
+        if d["message_id"] is not None:
+            self._panel_registry[d["message_id"]] = d
+            self._panel_registry_ids[d["panel_id"]] = d["message_id"]
+
+    def _registry_drop(self, panel_id: int):
+        message_id = self._panel_registry_ids.pop(panel_id, None)
+        if message_id is not None:
+            self._panel_registry.pop(message_id, None)
+
+    async def _refresh_panel_registry(self, panel_id: int):
+        """Đồng bộ entry của một panel sau khi ghi (caller đang giữ self._lock)."""
+        if self._panel_registry is None:
+            return
+        async with self.conn.execute(
+            "SELECT * FROM ticket_panels WHERE panel_id=?", (panel_id,)
+        ) as cur:
+            row = await cur.fetchone()
+        if row:
+            self._registry_put(dict(row))
+        else:
+            self._registry_drop(panel_id)
+
+    async def get_panel_by_message(self, message_id: int) -> dict | None:
+        """Panel gắn với message nút persistent: O(1) từ registry, không quét bảng."""
+        if self._panel_registry is not None:
+            d = self._panel_registry.get(message_id)
+            if d is None:
+                return None
+            return {**d, "mention_on_open": list(d["mention_on_open"])}
+        async with self._lock:
+            if not self.conn:
+                return None
+            async with self.conn.execute(
+                "SELECT * FROM ticket_panels WHERE message_id=?", (message_id,)
+            ) as cur:
+                row = await cur.fetchone()
+            if not row:
+                return None
+            d = dict(row)
+            d["mention_on_open"] = json.loads(d["mention_on_open"] or "[]")
+            return d
 
     async def update_panel(self, panel_id: int, **kwargs) -> bool:
         async with self._lock:
             if not self.conn:
                 return False
-            valid = ["title", "content", "button_label", "welcome_message", "color"]
+            valid = [
+                "title",
+                "content",
+                "button_label",
+                "welcome_message",
+                "color",
+                "pool_size",
+                "pool_refill",
+                "pool_fallback",
+                "mode",
+                "auto_assign",
+            ]
             updates = {k: v for k, v in kwargs.items() if k in valid and v is not None}
             if not updates:
                 return False
@@ -296,6 +586,7 @@ class TicketDBMixin:
                 list(updates.values()) + [panel_id],
             )
             await self._commit_if_not_in_tx()
+            await self._refresh_panel_registry(panel_id)
             return True
 
     async def delete_panel(self, panel_id: int):
@@ -305,7 +596,120 @@ class TicketDBMixin:
             await self.conn.execute(
                 "DELETE FROM ticket_panels WHERE panel_id=?", (panel_id,)
             )
+            await self.conn.execute(
+                "DELETE FROM ticket_pool WHERE panel_id=?", (panel_id,)
+            )
             await self._commit_if_not_in_tx()
+            if self._panel_registry is not None:
+                self._registry_drop(panel_id)
+
+    # ---------- pool kênh dựng sẵn ----------
+    async def list_pooled_panels(self) -> list[dict]:
+        """Panel cần xử lý pool trên mọi guild: đang bật pool (kiểu channel) hoặc
+        còn kênh dựng sẵn cần dọn sau khi tắt pool / chuyển sang thread."""
+        async with self._lock:
+            if not self.conn:
+                return []
+            async with self.conn.execute(
+                """SELECT * FROM ticket_panels p
+                   WHERE (p.pool_size > 0 AND p.mode = 'channel')
+                      OR EXISTS (SELECT 1 FROM ticket_pool tp WHERE tp.panel_id = p.panel_id)"""
+            ) as cur:
+                return [dict(r) for r in await cur.fetchall()]
+
+    async def add_pool_channel(self, guild_id: int, panel_id: int, channel_id: int):
+        async with self._lock:
+            if not self.conn:
+                return
+            await self.conn.execute(
+                "INSERT OR IGNORE INTO ticket_pool (channel_id, guild_id, panel_id) VALUES (?,?,?)",
+                (channel_id, guild_id, panel_id),
+            )
+            await self._commit_if_not_in_tx()
+
+    async def take_pool_channel(self, panel_id: int) -> int | None:
+        """Lấy (và xóa khỏi pool) kênh dựng sẵn cũ nhất của panel."""
+        async with self._lock:
+            if not self.conn:
+                return None
+            async with self.conn.execute(
+                "SELECT channel_id FROM ticket_pool WHERE panel_id=? ORDER BY created_at, channel_id LIMIT 1",
+                (panel_id,),
+            ) as cur:
+                row = await cur.fetchone()
+            if not row:
+                return None
+            await self.conn.execute(
+                "DELETE FROM ticket_pool WHERE channel_id=?", (row[0],)
+            )
+            await self._commit_if_not_in_tx()
+            return row[0]
+
+    async def remove_pool_channel(self, channel_id: int) -> bool:
+        async with self._lock:
+            if not self.conn:
+                return False
+            cur = await self.conn.execute(
+                "DELETE FROM ticket_pool WHERE channel_id=?", (channel_id,)
+            )
+            await self._commit_if_not_in_tx()
+            return cur.rowcount > 0
+
+    async def list_pool_channels(self, panel_id: int) -> list[int]:
+        async with self._lock:
+            if not self.conn:
+                return []
+            async with self.conn.execute(
+                "SELECT channel_id FROM ticket_pool WHERE panel_id=? ORDER BY created_at, channel_id",
+                (panel_id,),
+            ) as cur:
+                return [r[0] for r in await cur.fetchall()]
+
+    # ---------- category tràn ----------
+    async def add_overflow_category(
+        self, guild_id: int, primary_id: int, category_id: int, idx: int
+    ):
+        async with self._lock:
+            if not self.conn:
+                return
+            await self.conn.execute(
+                "INSERT OR REPLACE INTO ticket_overflow_categories "
+                "(category_id, guild_id, primary_id, idx) VALUES (?,?,?,?)",
+                (category_id, guild_id, primary_id, idx),
+            )
+            await self._commit_if_not_in_tx()
+
+    async def list_overflow_categories(self, primary_id: int) -> list[dict]:
+        async with self._lock:
+            if not self.conn:
+                return []
+            async with self.conn.execute(
+                "SELECT * FROM ticket_overflow_categories WHERE primary_id=? ORDER BY idx",
+                (primary_id,),
+            ) as cur:
+                return [dict(r) for r in await cur.fetchall()]
+
+    async def get_overflow_category(self, category_id: int) -> dict | None:
+        async with self._lock:
+            if not self.conn:
+                return None
+            async with self.conn.execute(
+                "SELECT * FROM ticket_overflow_categories WHERE category_id=?",
+                (category_id,),
+            ) as cur:
+                row = await cur.fetchone()
+                return dict(row) if row else None
+
+    async def remove_overflow_category(self, category_id: int) -> bool:
+        async with self._lock:
+            if not self.conn:
+                return False
+            cur = await self.conn.execute(
+                "DELETE FROM ticket_overflow_categories WHERE category_id=?",
+                (category_id,),
+            )
+            await self._commit_if_not_in_tx()
+            return cur.rowcount > 0
 
     # ---------- tickets ----------
     async def create_ticket(
@@ -320,10 +724,12 @@ class TicketDBMixin:
             if not self.conn:
                 return 0
             cur = await self.conn.execute(
-                """INSERT INTO tickets (guild_id, number, channel_id, owner_id, panel_id)
-                   VALUES (?,?,?,?,?)""",
+                """INSERT INTO tickets
+                   (guild_id, number, channel_id, owner_id, panel_id, stats_rolled)
+                   VALUES (?,?,?,?,?,1)""",
                 (guild_id, number, channel_id, owner_id, panel_id),
             )
+            await self._stats_on_open(guild_id)
             await self._commit_if_not_in_tx()
             return cur.lastrowid or 0
 
@@ -352,22 +758,79 @@ class TicketDBMixin:
         async with self._lock:
             if not self.conn:
                 return
+            async with self.conn.execute(
+                "SELECT guild_id, claimed_by FROM tickets WHERE channel_id=? AND open=1",
+                (channel_id,),
+            ) as cur:
+                row = await cur.fetchone()
             await self.conn.execute(
                 "UPDATE tickets SET claimed_by=? WHERE channel_id=?",
                 (staff_id, channel_id),
             )
+            if staff_id is not None:
+                await self._stats_on_claim(channel_id, staff_id)
             await self._commit_if_not_in_tx()
+            if row and row["claimed_by"] != staff_id:
+                self._workload_adjust(row["guild_id"], row["claimed_by"], -1)
+                self._workload_adjust(row["guild_id"], staff_id, 1)
+
+    async def _close_ticket_locked(
+        self, channel_id: int, reason: str | None
+    ) -> dict | None:
+        """Đóng ticket đang mở và cộng rollup; caller giữ self._lock. Trả row đã đóng."""
+        cur = await self.conn.execute(
+            "UPDATE tickets SET open=0, close_time=?, close_reason=? WHERE channel_id=? AND open=1",
+            (datetime.now(UTC).isoformat(), reason, channel_id),
+        )
+        if cur.rowcount == 0:
+            return None
+        async with self.conn.execute(
+            "SELECT * FROM tickets WHERE channel_id=? AND open=0 ORDER BY id DESC LIMIT 1",
+            (channel_id,),
+        ) as c:
+            row = dict(await c.fetchone())
+        await self._stats_on_close(row)
+        return row
 
     async def close_ticket_db(self, channel_id: int, reason: str | None) -> bool:
         async with self._lock:
             if not self.conn:
                 return False
-            cur = await self.conn.execute(
-                "UPDATE tickets SET open=0, close_time=?, close_reason=? WHERE channel_id=? AND open=1",
-                (datetime.now(UTC).isoformat(), reason, channel_id),
-            )
+            row = await self._close_ticket_locked(channel_id, reason)
             await self._commit_if_not_in_tx()
-            return cur.rowcount > 0
+            if row:
+                self._workload_adjust(row["guild_id"], row["claimed_by"], -1)
+            return row is not None
+
+    async def close_orphan_tickets(
+        self, channel_ids: list[int], reason: str | None
+    ) -> int:
+        """Đóng nhiều ticket mất channel trong một transaction. Trả số ticket đã đóng."""
+        closed = []
+        async with self.transaction():
+            if not self.conn:
+                return 0
+            for channel_id in channel_ids:
+                row = await self._close_ticket_locked(channel_id, reason)
+                if row:
+                    closed.append(row)
+        for row in closed:
+            self._workload_adjust(row["guild_id"], row["claimed_by"], -1)
+        return len(closed)
+
+    async def list_open_ticket_channels(self) -> dict[int, list[int]]:
+        """guild_id → channel_id của mọi ticket đang mở."""
+        async with self._lock:
+            if not self.conn:
+                return {}
+            async with self.conn.execute(
+                "SELECT guild_id, channel_id FROM tickets WHERE open=1"
+            ) as cur:
+                rows = await cur.fetchall()
+        result: dict[int, list[int]] = {}
+        for guild_id, channel_id in rows:
+            result.setdefault(guild_id, []).append(channel_id)
+        return result
 
     async def touch_ticket(self, channel_id: int):
         async with self._lock:
@@ -404,46 +867,90 @@ class TicketDBMixin:
                 return [dict(r) for r in await cur.fetchall()]
 
     # ---------- tags ----------
+    async def get_tag_index(self, guild_id: int) -> TagIndex:
+        """Index tag của guild; chỉ đọc DB lần đầu, sau đó add/delete_tag tự cập nhật."""
+        index = self._tag_index.get(guild_id)
+        if index is not None:
+            return index
+        async with self._lock:
+            if not self.conn:
+                return TagIndex()
+            async with self.conn.execute(
+                "SELECT tag_id, content, uses FROM ticket_tags WHERE guild_id=?",
+                (guild_id,),
+            ) as cur:
+                rows = [tuple(r) for r in await cur.fetchall()]
+            return self._tag_index.setdefault(guild_id, TagIndex(rows))
+
     async def add_tag(self, guild_id: int, tag_id: str, content: str):
+        tag_id = tag_id.lower()
         async with self._lock:
             if not self.conn:
                 return
             await self.conn.execute(
-                "INSERT OR REPLACE INTO ticket_tags (guild_id, tag_id, content) VALUES (?,?,?)",
-                (guild_id, tag_id.lower(), content),
+                """INSERT INTO ticket_tags (guild_id, tag_id, content) VALUES (?,?,?)
+                   ON CONFLICT(guild_id, tag_id) DO UPDATE SET content=excluded.content""",
+                (guild_id, tag_id, content),
             )
             await self._commit_if_not_in_tx()
+            index = self._tag_index.get(guild_id)
+            if index is not None:
+                index.put(tag_id, content)
 
     async def delete_tag(self, guild_id: int, tag_id: str) -> bool:
+        tag_id = tag_id.lower()
         async with self._lock:
             if not self.conn:
                 return False
             cur = await self.conn.execute(
                 "DELETE FROM ticket_tags WHERE guild_id=? AND tag_id=?",
-                (guild_id, tag_id.lower()),
+                (guild_id, tag_id),
             )
             await self._commit_if_not_in_tx()
+            index = self._tag_index.get(guild_id)
+            if index is not None:
+                index.remove(tag_id)
+            self._tag_usage_pending.pop((guild_id, tag_id), None)
             return cur.rowcount > 0
 
     async def get_tag(self, guild_id: int, tag_id: str) -> str | None:
-        async with self._lock:
-            if not self.conn:
-                return None
-            async with self.conn.execute(
-                "SELECT content FROM ticket_tags WHERE guild_id=? AND tag_id=?",
-                (guild_id, tag_id.lower()),
-            ) as cur:
-                row = await cur.fetchone()
-            return row[0] if row else None
+        index = await self.get_tag_index(guild_id)
+        return index.get(tag_id.lower())
 
     async def list_tags(self, guild_id: int) -> list[str]:
+        index = await self.get_tag_index(guild_id)
+        return index.keys()
+
+    def record_tag_use(self, guild_id: int, tag_id: str):
+        """Đếm lượt dùng trong bộ nhớ; flush_tag_usage() ghi xuống DB theo lô."""
+        tag_id = tag_id.lower()
+        index = self._tag_index.get(guild_id)
+        if index is None or tag_id not in index:
+            return
+        index.bump(tag_id)
+        key = (guild_id, tag_id)
+        self._tag_usage_pending[key] = self._tag_usage_pending.get(key, 0) + 1
+
+    async def flush_tag_usage(self) -> int:
+        """Ghi các lượt dùng tag đang chờ bằng một executemany. Trả số tag đã ghi."""
         async with self._lock:
-            if not self.conn:
-                return []
-            async with self.conn.execute(
-                "SELECT tag_id FROM ticket_tags WHERE guild_id=?", (guild_id,)
-            ) as cur:
-                return [r[0] for r in await cur.fetchall()]
+            if not self.conn or not self._tag_usage_pending:
+                return 0
+            pending, self._tag_usage_pending = self._tag_usage_pending, {}
+            try:
+                await self.conn.executemany(
+                    "UPDATE ticket_tags SET uses=uses+? WHERE guild_id=? AND tag_id=?",
+                    [(n, g, t) for (g, t), n in pending.items()],
+                )
+                await self._commit_if_not_in_tx()
+            except Exception:
+                # Trả lại để lượt flush sau ghi tiếp
+                for key, n in pending.items():
+                    self._tag_usage_pending[key] = (
+                        self._tag_usage_pending.get(key, 0) + n
+                    )
+                raise
+            return len(pending)
 
     # ---------- ticket members ----------
     async def add_ticket_member(self, channel_id: int, user_id: int) -> None:
@@ -475,4 +982,3 @@ class TicketDBMixin:
                 "SELECT user_id FROM ticket_members WHERE channel_id=?", (channel_id,)
             ) as cur:
                 return [r[0] for r in await cur.fetchall()]
-
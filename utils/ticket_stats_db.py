@@ -0,0 +1,216 @@
+"""Database mixin cho thống kê ticket (rollup theo ngày / theo staff).
+
+Rollup được cộng dồn tại các sự kiện của ticket (mở, phản hồi đầu tiên của staff,
+claim, đóng) nên ``/ticket stats`` chỉ đọc vài dòng tổng hợp, không quét ``tickets``.
+Các hàm ``_stats_on_*`` được TicketDBMixin gọi khi đang giữ self._lock.
+
+Cột ``tickets.stats_rolled``: 0 = ticket cũ chưa cộng gì, 1 = đã cộng lượt mở,
+2 = đã cộng cả lượt đóng.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+
+def _parse_ts(value: str | None) -> datetime | None:
+    """open_time là CURRENT_TIMESTAMP (UTC, không tz), close_time là isoformat có tz."""
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value)
+    return dt if dt.tzinfo else dt.replace(tzinfo=UTC)
+
+
+def _seconds_between(start: str | None, end: datetime | None) -> int | None:
+    begin = _parse_ts(start)
+    if begin is None or end is None:
+        return None
+    return max(0, int((end - begin).total_seconds()))
+
+
+class TicketStatsDBMixin:
+    # ---------- bảng ----------
+    async def migrate_ticket_stats(self):
+        """v7: mốc thời gian phục vụ SLA + bảng rollup."""
+        if not self.conn:
+            return
+        c = self.conn
+        await c.execute("ALTER TABLE tickets ADD COLUMN first_response_time TIMESTAMP")
+        await c.execute("ALTER TABLE tickets ADD COLUMN claim_time TIMESTAMP")
+        await c.execute(
+            "ALTER TABLE tickets ADD COLUMN stats_rolled INTEGER NOT NULL DEFAULT 0"
+        )
+        await c.execute("""
+            CREATE TABLE IF NOT EXISTS ticket_stats_daily (
+                guild_id INTEGER NOT NULL, day TEXT NOT NULL,
+                opened INTEGER NOT NULL DEFAULT 0,
+                closed INTEGER NOT NULL DEFAULT 0,
+                responded INTEGER NOT NULL DEFAULT 0,
+                response_secs INTEGER NOT NULL DEFAULT 0,
+                resolution_secs INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, day))""")
+        await c.execute("""
+            CREATE TABLE IF NOT EXISTS ticket_staff_stats_daily (
+                guild_id INTEGER NOT NULL, day TEXT NOT NULL, staff_id INTEGER NOT NULL,
+                claims INTEGER NOT NULL DEFAULT 0,
+                closes INTEGER NOT NULL DEFAULT 0,
+                responded INTEGER NOT NULL DEFAULT 0,
+                response_secs INTEGER NOT NULL DEFAULT 0,
+                resolution_secs INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, day, staff_id))""")
+        await c.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tickets_stats_backlog "
+            "ON tickets(stats_rolled) WHERE open=0 AND stats_rolled<2"
+        )
+        await self._commit_if_not_in_tx()
+
+    # ---------- cộng dồn (caller giữ self._lock) ----------
+    async def _bump_guild_day(self, guild_id: int, day: str, **deltas: int):
+        cols = ", ".join(deltas)
+        marks = ",".join("?" * len(deltas))
+        sets = ", ".join(f"{k}={k}+excluded.{k}" for k in deltas)
+        await self.conn.execute(
+            f"INSERT INTO ticket_stats_daily (guild_id, day, {cols}) VALUES (?,?,{marks}) "
+            f"ON CONFLICT(guild_id, day) DO UPDATE SET {sets}",
+            (guild_id, day, *deltas.values()),
+        )
+
+    async def _bump_staff_day(
+        self, guild_id: int, day: str, staff_id: int, **deltas: int
+    ):
+        cols = ", ".join(deltas)
+        marks = ",".join("?" * len(deltas))
+        sets = ", ".join(f"{k}={k}+excluded.{k}" for k in deltas)
+        await self.conn.execute(
+            f"INSERT INTO ticket_staff_stats_daily (guild_id, day, staff_id, {cols}) "
+            f"VALUES (?,?,?,{marks}) "
+            f"ON CONFLICT(guild_id, day, staff_id) DO UPDATE SET {sets}",
+            (guild_id, day, staff_id, *deltas.values()),
+        )
+
+    async def _stats_on_open(self, guild_id: int):
+        await self._bump_guild_day(
+            guild_id, datetime.now(UTC).date().isoformat(), opened=1
+        )
+
+    async def _stats_on_claim(self, channel_id: int, staff_id: int):
+        now = datetime.now(UTC)
+        async with self.conn.execute(
+            "SELECT guild_id FROM tickets WHERE channel_id=? AND open=1", (channel_id,)
+        ) as cur:
+            row = await cur.fetchone()
+        if not row:
+            return
+        await self.conn.execute(
+            "UPDATE tickets SET claim_time=COALESCE(claim_time, ?) WHERE channel_id=?",
+            (now.isoformat(), channel_id),
+        )
+        await self._bump_staff_day(row[0], now.date().isoformat(), staff_id, claims=1)
+
+    async def _stats_on_close(self, ticket: dict):
+        """Cộng lượt đóng (và lượt mở nếu là ticket cũ) rồi đánh dấu stats_rolled=2."""
+        if ticket["stats_rolled"] == 0:
+            opened = _parse_ts(ticket["open_time"]) or datetime.now(UTC)
+            await self._bump_guild_day(
+                ticket["guild_id"], opened.date().isoformat(), opened=1
+            )
+        closed = _parse_ts(ticket["close_time"]) or datetime.now(UTC)
+        day = closed.date().isoformat()
+        secs = _seconds_between(ticket["open_time"], closed) or 0
+        await self._bump_guild_day(
+            ticket["guild_id"], day, closed=1, resolution_secs=secs
+        )
+        if ticket["claimed_by"]:
+            await self._bump_staff_day(
+                ticket["guild_id"],
+                day,
+                ticket["claimed_by"],
+                closes=1,
+                resolution_secs=secs,
+            )
+        await self.conn.execute(
+            "UPDATE tickets SET stats_rolled=2 WHERE id=?", (ticket["id"],)
+        )
+
+    # ---------- sự kiện ----------
+    async def record_first_response(self, channel_id: int, staff_id: int) -> bool:
+        """Ghi phản hồi đầu tiên của staff. Trả False nếu ticket đã có phản hồi."""
+        async with self._lock:
+            if not self.conn:
+                return False
+            now = datetime.now(UTC)
+            cur = await self.conn.execute(
+                "UPDATE tickets SET first_response_time=? "
+                "WHERE channel_id=? AND open=1 AND first_response_time IS NULL",
+                (now.isoformat(), channel_id),
+            )
+            if cur.rowcount == 0:
+                return False
+            async with self.conn.execute(
+                "SELECT guild_id, open_time FROM tickets WHERE channel_id=? AND open=1",
+                (channel_id,),
+            ) as c:
+                row = await c.fetchone()
+            secs = _seconds_between(row["open_time"], now) or 0
+            day = now.date().isoformat()
+            await self._bump_guild_day(
+                row["guild_id"], day, responded=1, response_secs=secs
+            )
+            await self._bump_staff_day(
+                row["guild_id"], day, staff_id, responded=1, response_secs=secs
+            )
+            await self._commit_if_not_in_tx()
+            return True
+
+    async def backfill_ticket_stats(self, batch_size: int) -> int:
+        """Cộng rollup cho một lô ticket đã đóng chưa được tính. Trả số ticket đã xử lý."""
+        async with self.transaction():
+            if not self.conn:
+                return 0
+            async with self.conn.execute(
+                "SELECT * FROM tickets WHERE open=0 AND stats_rolled<2 LIMIT ?",
+                (batch_size,),
+            ) as cur:
+                rows = [dict(r) for r in await cur.fetchall()]
+            for row in rows:
+                await self._stats_on_close(row)
+            return len(rows)
+
+    # ---------- đọc ----------
+    async def get_ticket_stats(self, guild_id: int, days: int) -> dict:
+        since = (datetime.now(UTC).date() - timedelta(days=days - 1)).isoformat()
+        async with self._lock:
+            empty = {
+                "opened": 0,
+                "closed": 0,
+                "responded": 0,
+                "response_secs": 0,
+                "resolution_secs": 0,
+            }
+            if not self.conn:
+                return empty
+            async with self.conn.execute(
+                """SELECT COALESCE(SUM(opened),0) AS opened, COALESCE(SUM(closed),0) AS closed,
+                          COALESCE(SUM(responded),0) AS responded,
+                          COALESCE(SUM(response_secs),0) AS response_secs,
+                          COALESCE(SUM(resolution_secs),0) AS resolution_secs
+                   FROM ticket_stats_daily WHERE guild_id=? AND day>=?""",
+                (guild_id, since),
+            ) as cur:
+                row = await cur.fetchone()
+            return dict(row) if row else empty
+
+    async def get_staff_stats(
+        self, guild_id: int, days: int, limit: int = 10
+    ) -> list[dict]:
+        since = (datetime.now(UTC).date() - timedelta(days=days - 1)).isoformat()
+        async with self._lock:
+            if not self.conn:
+                return []
+            async with self.conn.execute(
+                """SELECT staff_id, SUM(claims) AS claims, SUM(closes) AS closes,
+                          SUM(responded) AS responded, SUM(response_secs) AS response_secs,
+                          SUM(resolution_secs) AS resolution_secs
+                   FROM ticket_staff_stats_daily WHERE guild_id=? AND day>=?
+                   GROUP BY staff_id ORDER BY closes DESC, claims DESC LIMIT ?""",
+                (guild_id, since, limit),
+            ) as cur:
+                return [dict(r) for r in await cur.fetchall()]
@@ -7,7 +7,7 @@ import discord
 
 
 async def generate_transcript(
-    channel: discord.TextChannel, limit: int = 2000
+    channel: discord.TextChannel | discord.Thread, limit: int = 2000
 ) -> discord.File:
     messages = [m async for m in channel.history(limit=limit, oldest_first=True)]
     rows = []
@@ -0,0 +1,68 @@
+"""Min-heap tải công việc của staff (số ticket đang nhận) với xóa lười."""
+
+import heapq
+from collections.abc import Callable, Iterable
+
+
+class WorkloadHeap:
+    """Chọn staff ít việc nhất trong O(log n).
+
+    Mỗi lần số ticket của một staff đổi chỉ đẩy thêm một entry mới; entry cũ
+    trở thành "stale" (không khớp ``_counts``) và bị bỏ qua khi lên đỉnh heap.
+    ``seeded`` cho biết danh sách staff 0 ticket đã được nạp từ guild chưa.
+    """
+
+    def __init__(self, counts: dict[int, int] | None = None):
+        self._counts: dict[int, int] = {}
+        self._heap: list[tuple[int, int]] = []
+        self.seeded = False
+        for staff_id, count in (counts or {}).items():
+            self.set(staff_id, count)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, staff_id: int) -> bool:
+        return staff_id in self._counts
+
+    def count(self, staff_id: int) -> int:
+        return self._counts.get(staff_id, 0)
+
+    def set(self, staff_id: int, count: int) -> None:
+        count = max(0, count)
+        self._counts[staff_id] = count
+        heapq.heappush(self._heap, (count, staff_id))
+        # Quá nhiều entry stale → dựng lại heap cho gọn
+        if len(self._heap) > 2 * len(self._counts) + 64:
+            self._heap = [(c, s) for s, c in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def adjust(self, staff_id: int, delta: int) -> None:
+        self.set(staff_id, self._counts.get(staff_id, 0) + delta)
+
+    def ensure(self, staff_ids: Iterable[int]) -> None:
+        """Thêm staff chưa có trong heap với 0 ticket."""
+        for staff_id in staff_ids:
+            if staff_id not in self._counts:
+                self.set(staff_id, 0)
+
+    def discard(self, staff_id: int) -> None:
+        self._counts.pop(staff_id, None)
+
+    def pick(self, eligible: Callable[[int], bool]) -> int | None:
+        """Staff ít ticket nhất thoả ``eligible``; không đổi số đếm (caller tự claim)."""
+        skipped: list[tuple[int, int]] = []
+        seen: set[int] = set()
+        chosen = None
+        while self._heap:
+            count, staff_id = heapq.heappop(self._heap)
+            if self._counts.get(staff_id) != count or staff_id in seen:
+                continue
+            seen.add(staff_id)
+            skipped.append((count, staff_id))
+            if eligible(staff_id):
+                chosen = staff_id
+                break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return chosen